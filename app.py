@@ -9,67 +9,69 @@ import os
 import sys
 import base64
 import json
+import time
 import uuid
+import queue
 import shutil
 import tempfile
+import mimetypes
 from datetime import datetime, timedelta
 from functools import wraps
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
-from flask import Flask, request, jsonify, send_file, send_from_directory, render_template
+from flask import Flask, Request, Response, request, jsonify, send_file, render_template, make_response, stream_with_context
+from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge, NotFound
+
+from jobs import JobQueue, QueueFullError, JOB_FAILED
+from sessions import SessionManager, SessionExpiredError, create_session_backend
+from result_cache import ResultCache
+from bulk_ingest import MultipartStreamParser, ZipStreamParser, BulkFormatError
+from renditions import (RenditionCache, RENDITIONS, FORMATS, rendition_size, encode_rendition,
+                        file_digest, rendition_key)
+from static_assets import StaticAssets
+from metrics import MetricsRegistry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from profiling import profile_analysis
 
 # ==============================================================================
 # FLASK APPLICATION SETUP
 # ==============================================================================
-app = Flask(__name__)
+class InMemoryUploadRequest(Request):
+    """Keeps uploaded files in memory (bounded by MAX_CONTENT_LENGTH) so they are decoded without a disk pass"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
+
+# Static files are served by serve_static (fingerprints, precompressed variants)
+app = Flask(__name__, static_folder=None)
+app.request_class = InMemoryUploadRequest
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max upload
-app.config['UPLOAD_FOLDER'] = tempfile.mkdtemp(prefix='textile_qc_')
+# Shared by all worker processes: set TEXTILE_QC_UPLOAD_DIR, or rely on
+# preload_app so the master creates the temporary folder before forking.
+app.config['UPLOAD_FOLDER'] = os.environ.get('TEXTILE_QC_UPLOAD_DIR') or tempfile.mkdtemp(prefix='textile_qc_')
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+UPLOAD_FOLDER_OWNER_PID = os.getpid()
 
-# Session storage for analysis results
-SESSIONS = {}
+# Upload sessions (images + generated PDFs), expired after SESSION_TTL_S of
+# inactivity and kept under SESSION_DISK_QUOTA_MB by evicting the least
+# recently used sessions. The default SQLite backend is shared by all worker
+# processes on the host, so requests of one session may hit any worker.
+SESSIONS = SessionManager(
+    app.config['UPLOAD_FOLDER'],
+    ttl_s=float(os.environ.get('SESSION_TTL_S', '3600')),
+    max_bytes=int(float(os.environ.get('SESSION_DISK_QUOTA_MB', '2048')) * 1024 * 1024),
+    reap_interval_s=float(os.environ.get('SESSION_REAP_INTERVAL_S', '60')),
+    backend=create_session_backend(os.environ.get('SESSION_BACKEND', 'sqlite'), app.config['UPLOAD_FOLDER']),
+)
 
 # ==============================================================================
 # IMPORT ANALYSIS ENGINE
 # ==============================================================================
-# We'll import from the main analysis file
-# First, let's set up the path and imports
-
 import warnings
 warnings.filterwarnings('ignore')
 
-import numpy as np
-import pandas as pd
-import cv2
-from PIL import Image, ImageDraw
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from skimage.metrics import structural_similarity as ssim
-from skimage.color import rgb2gray
-
-# ReportLab for PDF
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
-from reportlab.pdfgen import canvas
-from reportlab.platypus import (SimpleDocTemplate, Paragraph, Image as RLImage, Table, TableStyle,
-                                Spacer, PageBreak, Flowable, KeepTogether)
-from reportlab.lib.enums import TA_LEFT, TA_RIGHT, TA_CENTER
-
-# Advanced analysis libraries
-import pywt
-from scipy import signal, ndimage
-from scipy.stats import chi2
-from scipy.spatial.distance import euclidean
-from skimage.feature import local_binary_pattern, graycomatrix, graycoprops
-from skimage.filters import gabor_kernel, threshold_otsu
-from skimage.morphology import disk, white_tophat, black_tophat, opening, closing
-from skimage.measure import label, regionprops
-from skimage.util import img_as_ubyte
-
 import logging
-from functools import lru_cache
-from dataclasses import dataclass, field
 
 # Configure logging
 logging.basicConfig(
@@ -79,186 +81,260 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# ==============================================================================
-# LOAD THE ANALYSIS ENGINE FROM BackEND.py
-# ==============================================================================
-# Import all the analysis code from the original file
-# We need to exec the file but skip the main() call and Colab-specific imports
-
-def load_analysis_engine():
-    """Load the analysis engine from BackEND.py, excluding Colab-specific code"""
-    global QCSettings, run_pipeline_and_build_pdf, generate_analysis_settings_report
-    global read_rgb, to_same_size, TRANSLATIONS, tr, get_text
-    
-    # Read the original file
-    original_file = os.path.join(os.path.dirname(__file__), 'BackEND.py')
-    
-    if not os.path.exists(original_file):
-        raise RuntimeError("BackEND.py not found!")
-    
-    with open(original_file, 'r', encoding='utf-8') as f:
-        code = f.read()
-    
-    # Remove or replace emojis that cause encoding issues
-    import re
-    # Replace emoji characters with placeholders
-    emoji_pattern = re.compile("["
-        u"\U0001F600-\U0001F64F"  # emoticons
-        u"\U0001F300-\U0001F5FF"  # symbols & pictographs
-        u"\U0001F680-\U0001F6FF"  # transport & map symbols
-        u"\U0001F1E0-\U0001F1FF"  # flags (iOS)
-        u"\U00002702-\U000027B0"
-        u"\U000024C2-\U0001F251"
-        "]+", flags=re.UNICODE)
-    code = emoji_pattern.sub('*', code)
-    
-    # Remove Colab-specific lines
-    lines = code.split('\n')
-    filtered_lines = []
-    skip_block = False
-    
-    for i, line in enumerate(lines):
-        # Skip Colab imports and pip installs
-        if 'from google.colab' in line:
-            continue
-        if 'from IPython.display' in line:
-            # Replace with dummy
-            filtered_lines.append('# IPython display disabled for Flask')
-            filtered_lines.append('def display(*args, **kwargs): pass')
-            filtered_lines.append('def clear_output(*args, **kwargs): pass')
-            filtered_lines.append('class HTML: pass')
-            continue
-        if '!pip' in line or '!apt-get' in line:
-            continue
-        if 'import ipywidgets' in line or 'from ipywidgets' in line:
-            continue
-        if 'colab_files' in line:
-            continue
-        # Skip the main() call at the end
-        if line.strip() == 'main()':
-            continue
-        # Skip widget-related functions
-        if 'def upload_two_images' in line:
-            skip_block = True
-        if skip_block:
-            if line and not line[0].isspace() and not line.startswith('def upload_two_images'):
-                skip_block = False
-            else:
-                continue
-        # Skip the main() function definition and everything after
-        if 'def main():' in line:
-            break
-            
-        filtered_lines.append(line)
-    
-    filtered_code = '\n'.join(filtered_lines)
-    
-    # Create a namespace for execution
-    namespace = {
-        '__name__': '__main__',
-        '__file__': original_file,
-        'np': np,
-        'pd': pd,
-        'cv2': cv2,
-        'Image': Image,
-        'ImageDraw': ImageDraw,
-        'plt': plt,
-        'ssim': ssim,
-        'rgb2gray': rgb2gray,
-        'A4': A4,
-        'inch': inch,
-        'colors': colors,
-        'ParagraphStyle': ParagraphStyle,
-        'getSampleStyleSheet': getSampleStyleSheet,
-        'canvas': canvas,
-        'SimpleDocTemplate': SimpleDocTemplate,
-        'Paragraph': Paragraph,
-        'RLImage': RLImage,
-        'Table': Table,
-        'TableStyle': TableStyle,
-        'Spacer': Spacer,
-        'PageBreak': PageBreak,
-        'Flowable': Flowable,
-        'KeepTogether': KeepTogether,
-        'TA_LEFT': TA_LEFT,
-        'TA_RIGHT': TA_RIGHT,
-        'TA_CENTER': TA_CENTER,
-        'pywt': pywt,
-        'signal': signal,
-        'ndimage': ndimage,
-        'chi2': chi2,
-        'euclidean': euclidean,
-        'local_binary_pattern': local_binary_pattern,
-        'graycomatrix': graycomatrix,
-        'graycoprops': graycoprops,
-        'gabor_kernel': gabor_kernel,
-        'threshold_otsu': threshold_otsu,
-        'disk': disk,
-        'white_tophat': white_tophat,
-        'black_tophat': black_tophat,
-        'opening': opening,
-        'closing': closing,
-        'label': label,
-        'regionprops': regionprops,
-        'img_as_ubyte': img_as_ubyte,
-        'logging': logging,
-        'lru_cache': lru_cache,
-        'dataclass': dataclass,
-        'field': field,
-        'datetime': datetime,
-        'timedelta': timedelta,
-        'io': io,
-        'os': os,
-        'base64': base64,
-        'math': __import__('math'),
-        'textwrap': __import__('textwrap'),
-        'tempfile': tempfile,
-        'uuid': uuid,
-        'warnings': warnings,
-        'logger': logger,
-    }
-    
-    try:
-        exec(filtered_code, namespace)
-    except Exception as e:
-        logger.error(f"Error loading analysis engine: {e}")
-        raise
-    
-    # Extract the functions and classes we need
-    return namespace
-
-# Load the analysis engine
+# The analysis engine is a regular package (textile_qc/), so it is imported once
+# per process and benefits from bytecode caching.
 try:
-    _engine = load_analysis_engine()
-    QCSettings = _engine.get('QCSettings')
-    run_pipeline_and_build_pdf = _engine.get('run_pipeline_and_build_pdf')
-    generate_analysis_settings_report = _engine.get('generate_analysis_settings_report')
-    read_rgb = _engine.get('read_rgb')
-    to_same_size = _engine.get('to_same_size')
-    TRANSLATIONS = _engine.get('TRANSLATIONS', {})
-    tr = _engine.get('tr', lambda key, settings: key)
-    get_text = _engine.get('get_text', lambda key, lang: key)
-    logger.info("Analysis engine loaded successfully")
+    from textile_qc import (QCSettings, run_pipeline_and_build_pdf, build_report_pdf, load_report_context,
+                            generate_analysis_settings_report,
+                            run_decision_analysis, run_batch_analysis, analyse_sample,
+                            load_rgb, read_image_size, load_analysis_pair, analysis_input_size,
+                            estimate_analysis_cost, image_digest, analysis_cache_key,
+                            TRANSLATIONS, tr, get_text, IMPORT_TIME_S)
+    from textile_qc.reference import ReferenceFeatures
+    from textile_qc.stages import add_stage_observer, profile_stages, timed_stage
+    from textile_qc.warmup import warmup_engine, is_engine_ready
+    logger.info(f"Analysis engine loaded successfully ({IMPORT_TIME_S:.2f}s)")
 except Exception as e:
     logger.error(f"Failed to load analysis engine: {e}")
     # Create dummy classes/functions for fallback
     QCSettings = None
     run_pipeline_and_build_pdf = None
+    build_report_pdf = None
+    load_report_context = None
     generate_analysis_settings_report = None
+    run_decision_analysis = None
+    run_batch_analysis = None
+    analyse_sample = None
+    load_rgb = None
+    read_image_size = None
+    warmup_engine = None
+    is_engine_ready = lambda: False
+    add_stage_observer = None
+    profile_stages = None
+    timed_stage = None
+
+# Reports of identical analyses (same decoded images and analysis settings) are
+# reused from this cache. RESULT_CACHE_MB=0 disables it.
+RESULT_CACHE_MB = float(os.environ.get('RESULT_CACHE_MB', '512'))
+RESULTS = ResultCache(
+    os.path.join(app.config['UPLOAD_FOLDER'], 'result_cache'),
+    max_bytes=int(RESULT_CACHE_MB * 1024 * 1024),
+    counters=SESSIONS.backend,
+) if RESULT_CACHE_MB > 0 else None
+
+# Thumbnails and previews (sample cards, image previews) are rendered on first
+# request and kept on disk, shared by all workers. RENDITION_CACHE_MB bounds them.
+RENDITION_CACHE = RenditionCache(
+    os.path.join(app.config['UPLOAD_FOLDER'], 'renditions'),
+    max_bytes=int(float(os.environ.get('RENDITION_CACHE_MB', '64')) * 1024 * 1024),
+)
+# Rendition URLs carrying the source fingerprint (?v=) never change content
+RENDITION_MAX_AGE_S = 365 * 24 * 3600
+RENDITION_REVALIDATE_S = 3600
+
+# Static assets: templates link them with a content fingerprint (?v=), which
+# lets browsers cache them for a year; text assets are sent precompressed.
+STATIC_ASSETS = StaticAssets(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static'),
+    os.path.join(app.config['UPLOAD_FOLDER'], 'static_cache'),
+)
+STATIC_MAX_AGE_S = 365 * 24 * 3600
+# Fixed downloads (sample reports, datasheets, sample images) are revalidated daily
+DOCUMENT_MAX_AGE_S = 24 * 3600
+
+try:
+    logger.info(f"Static assets: {STATIC_ASSETS.precompress()} compressed variants ready")
+except OSError as e:
+    logger.warning(f"Could not precompress static assets: {e}")
+
+@app.context_processor
+def static_url_helper():
+    return {'static_url': STATIC_ASSETS.url}
+
+# Background analysis queue: /api/analyze enqueues, /api/jobs/<id> reports progress.
+# Each analysis writes into its own session directory and chart drawing is
+# serialized inside the engine, so several analysis threads can share a process.
+# Limits are per process (multiply by the gunicorn worker count). Job state is
+# published to the session store so any worker can answer /api/jobs/<job_id>.
+JOBS = JobQueue(
+    max_workers=int(os.environ.get('ANALYSIS_WORKERS', '2')),
+    memory_budget_mb=float(os.environ.get('ANALYSIS_MEMORY_BUDGET_MB', '2048')),
+    max_queued=int(os.environ.get('ANALYSIS_QUEUE_LIMIT', '8')),
+    # Decision mode runs in the request thread (fast lane) but under the same memory budget
+    max_inline=int(os.environ.get('ANALYSIS_DECISION_LIMIT', '4')),
+    listener=lambda job: publish_job(job),
+)
+
+# ==============================================================================
+# METRICS
+# ==============================================================================
+# Prometheus metrics at /metrics. Each worker writes its values to the metrics
+# folder and a scrape of any worker reports the sum over all workers of the host.
+METRICS = MetricsRegistry(os.path.join(app.config['UPLOAD_FOLDER'], 'metrics'))
+STAGE_SECONDS = METRICS.histogram(
+    'textile_qc_stage_duration_seconds', 'Duration of analysis stages (decode, color, metamerism, fft, ...)',
+    ['stage'])
+ANALYSIS_SECONDS = METRICS.histogram(
+    'textile_qc_analysis_duration_seconds', 'Duration of complete analyses', ['mode'])
+ANALYSES = METRICS.counter(
+    'textile_qc_analyses_total', 'Finished analyses by outcome', ['mode', 'outcome'])
+REPORT_BYTES = METRICS.histogram(
+    'textile_qc_report_bytes', 'Size of generated PDF reports', ['kind'],
+    buckets=tuple(2 ** n * 1024 for n in range(6, 17, 2)))
+REPORT_BYTES_WRITTEN = METRICS.counter(
+    'textile_qc_report_bytes_written_total', 'Bytes of PDF reports written', ['kind'])
+CACHE_LOOKUPS = METRICS.counter(
+    'textile_qc_cache_lookups_total', 'Cache lookups by cache and result (hit or miss)', ['cache', 'result'])
+METRICS.gauge('textile_qc_queue_depth', 'Analyses waiting for a worker thread', fn=JOBS.queue_depth)
+METRICS.gauge('textile_qc_active_analyses', 'Analyses running', fn=JOBS.running_count)
+METRICS.gauge('textile_qc_running_memory_mb', 'Estimated memory of the running analyses',
+              fn=JOBS.running_memory_mb)
+METRICS.gauge('textile_qc_live_sessions', 'Upload sessions on disk',
+              fn=lambda: SESSIONS.metrics()['live_sessions'], scope='host')
+METRICS.gauge('textile_qc_session_bytes', 'Disk usage of all upload sessions',
+              fn=lambda: SESSIONS.metrics()['bytes_used'], scope='host')
+if RESULTS is not None:
+    def result_cache_hit_ratio():
+        m = RESULTS.metrics()
+        lookups = m['hits'] + m['misses']
+        return m['hits'] / lookups if lookups else 0.0
+    METRICS.gauge('textile_qc_result_cache_hit_ratio', 'Result cache hits / lookups since the cache was created',
+                  fn=result_cache_hit_ratio, scope='host')
+    METRICS.gauge('textile_qc_result_cache_bytes', 'Size of the result cache',
+                  fn=lambda: RESULTS.metrics()['bytes_used'], scope='host')
+
+if add_stage_observer is not None:
+    add_stage_observer(lambda stage, seconds: STAGE_SECONDS.observe(seconds, stage=stage))
+
+def publish_job(job):
+    """Job listener: share the job state with all workers and refresh this worker's metrics"""
+    SESSIONS.save_job(job.to_dict())
+    METRICS.mark_changed()
+
+@contextmanager
+def observe_analysis(mode):
+    """Count an analysis and record its duration (failures are counted, not timed)"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ANALYSES.inc(mode=mode, outcome='failed')
+        raise
+    ANALYSIS_SECONDS.observe(time.perf_counter() - started, mode=mode)
+    ANALYSES.inc(mode=mode, outcome='done')
+
+def observe_report(path, kind='report'):
+    """Record the size of a written report"""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return
+    REPORT_BYTES.observe(size, kind=kind)
+    REPORT_BYTES_WRITTEN.inc(size, kind=kind)
+
+def observe_reference_features(stats):
+    """Record the reference feature memo hits and misses of a batch"""
+    CACHE_LOOKUPS.inc(stats['hits'], cache='reference_features', result='hit')
+    CACHE_LOOKUPS.inc(stats['misses'], cache='reference_features', result='miss')
+
+# Batch analyses (one reference, many samples): samples analysed concurrently
+# inside one job, and the largest accepted batch
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', '2'))
+BATCH_MAX_SAMPLES = int(os.environ.get('BATCH_MAX_SAMPLES', '50'))
+
+# Streamed bulk uploads (/api/bulk): largest accepted body and sample count.
+# Images are analysed while the body is still arriving; at most BATCH_WORKERS
+# samples of one upload are in flight before reading pauses.
+BULK_MAX_UPLOAD_MB = float(os.environ.get('BULK_MAX_UPLOAD_MB', '2048'))
+BULK_MAX_SAMPLES = int(os.environ.get('BULK_MAX_SAMPLES', '500'))
+BULK_READ_CHUNK = 256 * 1024
+
+# Uploads are decoded from memory and kept with the session as analysis-size
+# arrays; the original files are only written (in the background) when
+# UPLOAD_ARCHIVE is on. Crop analyses need them (crops use source pixels).
+UPLOAD_ARCHIVE = os.environ.get('UPLOAD_ARCHIVE', '1').lower() in ('1', 'true', 'yes')
+ORIGINALS_WAIT_S = 30
+
+# "profile": true on /api/analyze runs that analysis under cProfile (files in the session).
+# Off by default (profiled runs are twice as slow); set ANALYSIS_PROFILING=1 to allow it.
+ANALYSIS_PROFILING = os.environ.get('ANALYSIS_PROFILING', '0').lower() in ('1', 'true', 'yes')
 
 # ==============================================================================
 # FLASK ROUTES
 # ==============================================================================
 
+def send_cached_file(path, max_age=0, private=False, content_etag=False, **kwargs):
+    """
+    send_file with conditional GET (ETag, Last-Modified, 304) and a cache policy.
+    
+    Args:
+        max_age: Seconds the client may reuse the file without asking;
+                 0 means revalidate every time (answered with 304 if unchanged)
+        private: Only the browser may cache it (session downloads)
+        content_etag: ETag from the file contents instead of its mtime and
+                      size, identical on every host (bundled files only: the
+                      hash is remembered per path)
+    """
+    etag = file_digest(path)[:32] if content_etag else True
+    response = send_file(path, etag=etag, max_age=max_age, conditional=True, **kwargs)
+    if private:
+        response.cache_control.public = False
+        response.cache_control.private = True
+    return response
+
 @app.route('/')
 def index():
     """Serve the main application page"""
-    return render_template('index.html')
+    # Revalidated on every load: it links the current static fingerprints
+    response = make_response(render_template('index.html'))
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/static/<path:filename>')
 def serve_static(filename):
-    """Serve static files"""
-    return send_from_directory('static', filename)
+    """
+    Serve static files.
+    
+    Fingerprinted URLs (?v=<current fingerprint>) are cacheable for a year;
+    text assets are sent gzip/brotli-compressed when the client accepts it.
+    """
+    path = STATIC_ASSETS.path(filename)
+    if path is None:
+        raise NotFound()
+    version = STATIC_ASSETS.fingerprint(filename)
+    fingerprinted = request.args.get('v') == version
+    max_age = STATIC_MAX_AGE_S if fingerprinted else 0
+    
+    variant = STATIC_ASSETS.encoding_for(filename, request.accept_encodings.quality)
+    if variant is None:
+        response = send_file(path, etag=version, max_age=max_age, conditional=True)
+    else:
+        encoding, variant_path = variant
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_file(variant_path, mimetype=mimetype, etag=f"{version}-{encoding}",
+                             max_age=max_age, conditional=True)
+        response.content_encoding = encoding
+    if fingerprinted:
+        response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/api/health', methods=['GET'])
+def health():
+    """Readiness probe: 200 once the analysis engine has been warmed up"""
+    ready = is_engine_ready()
+    return jsonify({
+        'status': 'ready' if ready else 'warming_up',
+        'ready': ready,
+        'sessions': SESSIONS.metrics(),
+        'result_cache': RESULTS.metrics() if RESULTS is not None else None,
+    }), 200 if ready else 503
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics, summed over all worker processes of this host"""
+    return Response(METRICS.render(), content_type=METRICS_CONTENT_TYPE)
 
 @app.route('/api/settings/default', methods=['GET'])
 def get_default_settings():
@@ -294,6 +370,37 @@ def get_default_settings():
         'operator_name': settings.operator_name,
     })
 
+def upload_bytes(file):
+    """Contents of an uploaded file, without a copy when it is held in memory"""
+    if isinstance(file.stream, io.BytesIO):
+        return file.stream.getbuffer()
+    return file.read()
+
+_archive_pool = None
+_archive_pool_pid = None
+
+def archive_pool():
+    """Single background writer for original uploads (created per worker process)"""
+    global _archive_pool, _archive_pool_pid
+    if _archive_pool is None or _archive_pool_pid != os.getpid():
+        _archive_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='archive')
+        _archive_pool_pid = os.getpid()
+    return _archive_pool
+
+def archive_originals(session_id, files):
+    """Write the original uploads into the session and record their paths (runs in the background)"""
+    try:
+        paths = {}
+        for key, path, data in files:
+            with open(path + '.part', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.part', path)
+            paths[key] = path
+        SESSIONS.update(session_id, **paths)
+    except (OSError, SessionExpiredError) as e:
+        # The session was removed or evicted while its files were written
+        logger.warning(f"Originals of session {session_id} not archived: {e}")
+
 @app.route('/api/upload', methods=['POST'])
 def upload_images():
     """Handle image upload"""
@@ -307,25 +414,45 @@ def upload_images():
         if ref_file.filename == '' or sample_file.filename == '':
             return jsonify({'error': 'No files selected'}), 400
         
+        if load_rgb is None:
+            return jsonify({'error': 'Analysis engine not loaded'}), 500
+        
         # Create session
-        session_id = str(uuid.uuid4())
-        session_dir = os.path.join(app.config['UPLOAD_FOLDER'], session_id)
-        os.makedirs(session_dir, exist_ok=True)
+        session_id, session_dir = SESSIONS.create()
+        ref_name = 'reference' + os.path.splitext(ref_file.filename)[1]
+        sample_name = 'sample' + os.path.splitext(sample_file.filename)[1]
         
-        # Save files
-        ref_path = os.path.join(session_dir, 'reference' + os.path.splitext(ref_file.filename)[1])
-        sample_path = os.path.join(session_dir, 'sample' + os.path.splitext(sample_file.filename)[1])
+        # Check the headers, then decode both images straight from the upload
+        # buffers to the analysis size (no crop) and keep them with the session
+        ref_data = upload_bytes(ref_file)
+        sample_data = upload_bytes(sample_file)
+        try:
+            ref_size = read_image_size(ref_data, ref_file.filename)
+            sample_size = read_image_size(sample_data, sample_file.filename)
+            size = analysis_input_size(ref_size, sample_size)
+            ref = load_rgb(ref_data, ref_file.filename, size=size)
+            test = load_rgb(sample_data, sample_file.filename, size=size)
+        except RuntimeError as e:
+            SESSIONS.remove(session_id)
+            return jsonify({'error': str(e)}), 400
+        finally:
+            if isinstance(ref_data, memoryview):
+                ref_data.release()
+            if isinstance(sample_data, memoryview):
+                sample_data.release()
         
-        ref_file.save(ref_path)
-        sample_file.save(sample_path)
-        
-        # Store session info
-        SESSIONS[session_id] = {
-            'ref_path': ref_path,
-            'sample_path': sample_path,
-            'created': datetime.now(),
-            'results': None
-        }
+        SESSIONS.save_arrays(session_id, ref_input=ref, sample_input=test)
+        
+        # Store session info (also accounts the arrays against the disk quota)
+        SESSIONS.update(session_id, ref_name=ref_name, sample_name=sample_name,
+                        ref_size=list(ref_size), sample_size=list(sample_size),
+                        input_digests={f"{size[0]}x{size[1]}": [image_digest(ref), image_digest(test)]})
+        
+        if UPLOAD_ARCHIVE:
+            archive_pool().submit(archive_originals, session_id, [
+                ('ref_path', os.path.join(session_dir, ref_name), ref_file.stream.getvalue()),
+                ('sample_path', os.path.join(session_dir, sample_name), sample_file.stream.getvalue()),
+            ])
         
         logger.info(f"Session created: {session_id}")
         
@@ -339,9 +466,272 @@ def upload_images():
         logger.error(f"Upload error: {e}")
         return jsonify({'error': str(e)}), 500
 
+def wait_for_originals(session_id, session):
+    """Session record once the original uploads have been archived"""
+    deadline = time.monotonic() + ORIGINALS_WAIT_S
+    while 'ref_path' not in session or 'sample_path' not in session:
+        if not UPLOAD_ARCHIVE or time.monotonic() > deadline:
+            raise RuntimeError('The original images of this session are not available '
+                               '(cropping needs UPLOAD_ARCHIVE enabled)')
+        time.sleep(0.05)
+        session = SESSIONS.get(session_id)
+        if session is None:
+            raise SessionExpiredError(session_id)
+    return session
+
+def session_analysis_inputs(session_id, session, settings):
+    """
+    Decoded images of a session for an analysis.
+    
+    Returns:
+        (ref, test, source_size, ref_path, sample_path); the paths name the
+        images in reports and are not necessarily written yet
+    """
+    ref_name = session.get('ref_name')
+    if ref_name is not None and not settings.use_crop:
+        arrays = SESSIONS.load_arrays(session_id, 'ref_input', 'sample_input')
+        if arrays is not None:
+            ref, test = arrays
+            source_size = tuple(min(a, b) for a, b in zip(session['ref_size'], session['sample_size']))
+            return (ref, test, source_size, os.path.join(session['dir'], ref_name),
+                    os.path.join(session['dir'], session['sample_name']))
+    # Crops work on source pixels: decode the archived originals
+    session = wait_for_originals(session_id, session)
+    ref, test, source_size = load_analysis_pair(session['ref_path'], session['sample_path'], settings)
+    return ref, test, source_size, session['ref_path'], session['sample_path']
+
+def session_image_sizes(session):
+    """Source sizes of a session's reference and sample"""
+    if 'ref_size' in session:
+        return tuple(session['ref_size']), tuple(session['sample_size'])
+    return read_image_size(session['ref_path']), read_image_size(session['sample_path'])
+
+@contextmanager
+def session_cpu_profile(session_id, session, enabled, title):
+    """
+    profile_analysis() into the session directory when enabled (yields None
+    otherwise); the profile's files are recorded in the session.
+    """
+    if not enabled:
+        yield None
+        return
+    cpu_profile = None
+    try:
+        with profile_analysis(session['dir'], title=title) as cpu_profile:
+            yield cpu_profile
+    finally:
+        if cpu_profile is not None and cpu_profile.summary_path:
+            SESSIONS.update(session_id, profile=cpu_profile.to_dict())
+            logger.info(f"Analysis profile for session {session_id}: {cpu_profile.summary_path}")
+
+def run_analysis_job(job, session_id, settings, cache_key=None, profile_memory=False, cpu_profile=False):
+    """Run the analysis pipeline for a session (executed by the job queue)"""
+    # Pinned while the analysis runs, so the reaper cannot evict it
+    with SESSIONS.use(session_id) as session, observe_analysis('report'):
+        # Wall/CPU time (and with profile_memory the tracemalloc peak) of every stage;
+        # with cpu_profile the whole run also goes through cProfile
+        with session_cpu_profile(session_id, session, cpu_profile, f"Analysis profile, session {session_id}") as run_profile, \
+                profile_stages(trace_memory=profile_memory) as profile:
+            # Images decoded at upload (crop: the originals, decoded once at full size)
+            job.set_stage('loading')
+            logger.info(f"Reading images for session {session_id}")
+            with timed_stage('inputs'):
+                ref, test, source_size, ref_path, sample_path = session_analysis_inputs(session_id, session, settings)
+        
+            logger.info(f"Starting analysis: {ref.shape} (source {source_size[0]}x{source_size[1]})")
+        
+            # Reports and chart images go to the session directory (no process-wide chdir)
+            session_dir = session['dir']
+        
+            # Cached analyses keep the report context, so the reports can be
+            # rendered again for another operator or time zone
+            report_dir = None
+            if cache_key is not None and RESULTS is not None:
+                report_dir = os.path.join(session_dir, '.report_context')
+        
+            # Run main analysis pipeline - returns dict with scores and pdf_path
+            analysis_result = run_pipeline_and_build_pdf(ref_path, sample_path, ref, test, settings,
+                                                         progress=job.set_stage, output_dir=session_dir,
+                                                         report_dir=report_dir)
+            pdf_file = analysis_result['pdf_path']
+        
+            # Generate settings report (its stage table covers everything before it)
+            job.set_stage('settings_report')
+            with timed_stage('settings_report'):
+                settings_pdf_file = generate_analysis_settings_report(ref_path, sample_path, ref, test, settings,
+                                                                      output_dir=session_dir, source_size=source_size,
+                                                                      stage_profile=profile.to_dict())
+    
+        observe_report(pdf_file)
+        observe_report(settings_pdf_file, kind='settings_report')
+    
+        # Store results
+        SESSIONS.update(session_id, results={
+            'pdf_file': pdf_file,
+            'settings_pdf_file': settings_pdf_file,
+        })
+    
+        logger.info(f"Analysis complete for session {session_id}")
+    
+        # Return actual scores from analysis
+        result = {
+            'success': True,
+            'decision': analysis_result['decision'],
+            'color_score': analysis_result['color_score'],
+            'pattern_score': analysis_result['pattern_score'],
+            'overall_score': analysis_result['overall_score'],
+            'pdf_filename': os.path.basename(pdf_file),
+            'settings_pdf_filename': os.path.basename(settings_pdf_file),
+            'stage_profile': profile.to_dict(),
+        }
+        if run_profile is not None:
+            result['profile'] = run_profile.to_dict()
+    
+        if cache_key is not None and RESULTS is not None:
+            try:
+                RESULTS.put(cache_key, dict(result, analyzed_at=time.time(), **report_identity(settings)),
+                            [pdf_file, settings_pdf_file],
+                            report_dir=report_dir if os.path.isdir(report_dir) else None)
+            except Exception as e:
+                logger.warning(f"Could not cache analysis result: {e}")
+            finally:
+                shutil.rmtree(report_dir, ignore_errors=True)
+    
+        return result
+
+def report_identity(settings):
+    """Operator name and time zone printed on a run's reports (not part of the cache key)"""
+    return {
+        'operator_name': settings.operator_name,
+        'timezone_offset_hours': settings.timezone_offset_hours,
+    }
+
+def run_report_job(job, session_id, settings, entry, cache_key):
+    """
+    Render a cached analysis's reports again for the current operator and
+    time zone (executed by the job queue). The scores are the cached ones;
+    if the entry was evicted meanwhile, the full analysis runs instead.
+    """
+    with SESSIONS.use(session_id) as session:
+        session_dir = session['dir']
+        # Private copy: the cache may evict the entry while the PDFs are built
+        context_dir = os.path.join(session_dir, '.report_context')
+        shutil.rmtree(context_dir, ignore_errors=True)
+        try:
+            shutil.copytree(entry['report_dir'], context_dir)
+        except OSError as e:
+            logger.warning(f"Cached report context unavailable ({e}), analysing session {session_id}")
+            return run_analysis_job(job, session_id, settings, cache_key)
+        try:
+            with observe_analysis('render'):
+                job.set_stage('loading')
+                context = load_report_context(context_dir)
+                ref, test, source_size, ref_path, sample_path = session_analysis_inputs(session_id, session, settings)
+                
+                job.set_stage('report')
+                pdf_file = build_report_pdf(context, settings, session_dir)['pdf_path']
+                job.set_stage('settings_report')
+                settings_pdf_file = generate_analysis_settings_report(ref_path, sample_path, ref, test, settings,
+                                                                      output_dir=session_dir, source_size=source_size,
+                                                                      stage_profile=entry['result'].get('stage_profile'))
+        finally:
+            shutil.rmtree(context_dir, ignore_errors=True)
+    
+        observe_report(pdf_file)
+        observe_report(settings_pdf_file, kind='settings_report')
+        SESSIONS.update(session_id, results={
+            'pdf_file': pdf_file,
+            'settings_pdf_file': settings_pdf_file,
+        })
+        logger.info(f"Cached analysis re-rendered for session {session_id} ({settings.operator_name})")
+    
+        return dict(entry['result'], pdf_filename=os.path.basename(pdf_file),
+                    settings_pdf_filename=os.path.basename(settings_pdf_file),
+                    cached=True, **report_identity(settings))
+
+def run_decision_mode(job, session_id, session, settings, profile_memory=False, cpu_profile=False):
+    """Decision-only analysis (no charts / PDFs), run in the request thread by JOBS.run_inline()"""
+    job.set_stage('decision')
+    with observe_analysis('decision'), \
+            session_cpu_profile(session_id, session, cpu_profile, f"Decision profile, session {session_id}") as run_profile, \
+            profile_stages(trace_memory=profile_memory) as profile:
+        started = time.perf_counter()
+        with timed_stage('inputs'):
+            ref, test, _, _, _ = session_analysis_inputs(session_id, session, settings)
+        decode_ms = round((time.perf_counter() - started) * 1000.0, 1)
+        
+        result = run_decision_analysis(ref, test, settings)
+    result['timings_ms'] = dict(decode=decode_ms, **result['timings_ms'])
+    result['total_ms'] = round(decode_ms + result['total_ms'], 1)
+    result['stage_profile'] = profile.to_dict()
+    if run_profile is not None:
+        result['profile'] = run_profile.to_dict()
+    logger.info(f"Decision for session {session_id}: {result['decision']} ({result['total_ms']:.0f} ms)")
+    return dict(result, success=True, mode='decision')
+
+def session_cache_key(session_id, session, settings):
+    """
+    Result cache key of a session's images and settings.
+    
+    The digests cover the decoded analysis inputs, which depend on the
+    input size (cropping keeps full resolution), so they are kept in the
+    session per size.
+    """
+    size = analysis_input_size(*session_image_sizes(session), settings)
+    size_key = f"{size[0]}x{size[1]}"
+    digests = session.get('input_digests', {})
+    if size_key not in digests:
+        ref, test, _, _, _ = session_analysis_inputs(session_id, session, settings)
+        digests = dict(digests, **{size_key: [image_digest(ref), image_digest(test)]})
+        SESSIONS.update(session_id, input_digests=digests)
+    ref_digest, sample_digest = digests[size_key]
+    return analysis_cache_key(ref_digest, sample_digest, settings)
+
+def same_report_identity(entry, settings):
+    """Whether a cached entry's reports were made for this operator and time zone"""
+    return all(entry['result'].get(k) == v for k, v in report_identity(settings).items())
+
+def restore_cached_result(session_id, session, entry):
+    """Link a cached result's reports into the session and return its payload"""
+    files = RESULTS.restore(entry, session['dir'])
+    result = dict(entry['result'])
+    SESSIONS.update(session_id, results={
+        'pdf_file': files[result['pdf_filename']],
+        'settings_pdf_file': files[result['settings_pdf_filename']],
+    })
+    logger.info(f"Analysis served from result cache for session {session_id}")
+    return dict(result, cached=True)
+
+def analysis_error_response(error, error_details):
+    """Error payload returned for a failed analysis"""
+    return {
+        'error': error,
+        'error_details': error_details,
+        'decision': 'ERROR',
+        'color_score': 0,
+        'pattern_score': 0,
+        'overall_score': 0
+    }
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
-    """Run the analysis pipeline"""
+    """
+    Queue an analysis for a session.
+    
+    Returns 202 with a job id; poll /api/jobs/<job_id> for progress and results.
+    Pass "wait": true to block until the analysis has finished instead.
+    Pass "mode": "decision" for the decision and scores only (no reports),
+    answered synchronously through the queue's fast lane (429 when
+    ANALYSIS_DECISION_LIMIT decisions are already running).
+    The result carries a per-stage 'stage_profile' (wall and CPU time);
+    pass "profile_memory": true to also trace each stage's peak memory
+    (slower; always a fresh analysis, never a cached result).
+    A cached analysis made by another operator or in another time zone is
+    answered by a job that only renders its reports again.
+    Pass "profile": true to run it under cProfile: the pstats, collapsed
+    stacks and a text summary are written to the session (downloadable from
+    /api/download/<session_id>/<file>) and listed in the result's 'profile'.
+    """
     try:
         data = request.get_json()
         
@@ -349,108 +739,435 @@ def analyze():
             return jsonify({'error': 'Session ID required'}), 400
         
         session_id = data['session_id']
+        session = SESSIONS.get(session_id)
         
-        if session_id not in SESSIONS:
-            return jsonify({'error': 'Invalid session'}), 400
-        
-        session = SESSIONS[session_id]
-        ref_path = session['ref_path']
-        sample_path = session['sample_path']
+        if session is None:
+            return jsonify({'error': 'Invalid or expired session'}), 400
         
         if QCSettings is None or run_pipeline_and_build_pdf is None:
             return jsonify({'error': 'Analysis engine not loaded'}), 500
         
         # Create settings from request
-        settings = QCSettings()
-        user_settings = data.get('settings', {})
+        settings = settings_from_request(data.get('settings', {}))
         
-        # Apply user settings
-        for key, value in user_settings.items():
-            if hasattr(settings, key):
-                setattr(settings, key, value)
+        if settings.use_crop and 'ref_path' not in session and not UPLOAD_ARCHIVE:
+            return jsonify({'error': 'Cropping needs the original images (UPLOAD_ARCHIVE is disabled)'}), 400
         
-        # Set language based on request
-        settings.language = user_settings.get('language', 'en')
+        profile_memory = bool(data.get('profile_memory'))
+        cpu_profile = bool(data.get('profile'))
+        if cpu_profile and not ANALYSIS_PROFILING:
+            return jsonify({'error': 'Profiling is disabled on this server (ANALYSIS_PROFILING)'}), 403
         
-        # Read and prepare images
-        logger.info(f"Reading images for session {session_id}")
-        ref = read_rgb(ref_path)
-        test = read_rgb(sample_path)
-        ref, test = to_same_size(ref, test)
+        # Estimate the job's cost from the image headers for admission control
+        sizes = session_image_sizes(session)
+        width, height = max(w for w, h in sizes), max(h for w, h in sizes)
         
-        logger.info(f"Starting analysis: {ref.shape}")
+        if data.get('mode') == 'decision':
+            try:
+                job = JOBS.run_inline(run_decision_mode, session_id, session, settings, profile_memory=profile_memory,
+                                      cpu_profile=cpu_profile, session_id=session_id,
+                                      cost=estimate_analysis_cost(width, height, settings, mode='decision'))
+            except QueueFullError as e:
+                logger.warning(f"Decision rejected, too many running (retry after {e.retry_after}s)")
+                response = jsonify({
+                    'error': 'Server busy, too many analyses running. Please retry shortly.',
+                    'retry_after': e.retry_after,
+                })
+                response.headers['Retry-After'] = str(e.retry_after)
+                return response, 429
+            if job.state == JOB_FAILED:
+                return jsonify(analysis_error_response(job.error, job.error_details)), 500
+            return jsonify(job.result)
         
-        # Change to session directory for temp files
-        original_cwd = os.getcwd()
-        session_dir = os.path.dirname(ref_path)
-        os.chdir(session_dir)
+        # Identical images and analysis settings: reuse the stored report, or
+        # render it again when only the operator or time zone changed
+        cache_key = None
+        cached = None
+        if RESULTS is not None:
+            cache_key = session_cache_key(session_id, session, settings)
+        if cache_key is not None and not (profile_memory or cpu_profile):
+            cached = RESULTS.get(cache_key)
+            if cached is not None and not same_report_identity(cached, settings) and cached['report_dir'] is None:
+                cached = None  # stored without a report context: analyse again
+            CACHE_LOOKUPS.inc(cache='result', result='miss' if cached is None else 'hit')
+            if cached is not None and same_report_identity(cached, settings):
+                return jsonify(restore_cached_result(session_id, session, cached))
+        
+        if cached is not None:
+            cost = estimate_analysis_cost(width, height, settings, mode='render')
+            job_args = (run_report_job, session_id, settings, cached, cache_key)
+        else:
+            cost = estimate_analysis_cost(width, height, settings)
+            job_args = (run_analysis_job, session_id, settings, cache_key, profile_memory, cpu_profile)
         
         try:
-            # Run main analysis pipeline - returns dict with scores and pdf_path
-            analysis_result = run_pipeline_and_build_pdf(ref_path, sample_path, ref, test, settings)
-            
-            # Extract PDF path from result (now returns dict)
-            pdf_file = analysis_result['pdf_path']
-            
-            # Generate settings report
-            settings_pdf_file = generate_analysis_settings_report(ref_path, sample_path, ref, test, settings)
-            
-            # Move PDFs to session directory if needed
-            if not os.path.dirname(pdf_file):
-                pdf_file = os.path.join(session_dir, pdf_file)
-            if not os.path.dirname(settings_pdf_file):
-                settings_pdf_file = os.path.join(session_dir, settings_pdf_file)
-            
-            # Store results
-            session['results'] = {
-                'pdf_file': pdf_file,
-                'settings_pdf_file': settings_pdf_file,
-            }
-            
-            logger.info(f"Analysis complete for session {session_id}")
-            
-            # Return actual scores from analysis
-            return jsonify({
-                'success': True,
-                'decision': analysis_result['decision'],
-                'color_score': analysis_result['color_score'],
-                'pattern_score': analysis_result['pattern_score'],
-                'overall_score': analysis_result['overall_score'],
-                'pdf_filename': os.path.basename(pdf_file),
-                'settings_pdf_filename': os.path.basename(settings_pdf_file),
+            job = JOBS.submit(*job_args, session_id=session_id, cost=cost)
+        except QueueFullError as e:
+            logger.warning(f"Analysis rejected, queue full (retry after {e.retry_after}s)")
+            response = jsonify({
+                'error': 'Server busy, too many analyses queued. Please retry shortly.',
+                'retry_after': e.retry_after,
             })
-            
-        finally:
-            os.chdir(original_cwd)
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 429
+        
+        if data.get('wait'):
+            JOBS.wait(job)
+            if job.state == JOB_FAILED:
+                return jsonify(analysis_error_response(job.error, job.error_details)), 500
+            return jsonify(dict(job.result, job_id=job.job_id))
+        
+        return jsonify({
+            'success': True,
+            'job_id': job.job_id,
+            'state': job.state,
+            'status_url': f'/api/jobs/{job.job_id}',
+            'estimated_cost': cost,
+        }), 202
         
     except Exception as e:
         import traceback
         error_traceback = traceback.format_exc()
         logger.error(f"Analysis error: {e}")
         logger.error(f"Full traceback:\n{error_traceback}")
-        print(f"\n{'='*60}\nANALYSIS ERROR:\n{'='*60}")
-        print(error_traceback)
-        print('='*60 + '\n')
+        return jsonify(analysis_error_response(str(e), error_traceback)), 500
+
+def settings_from_request(user_settings):
+    """QCSettings with the known keys of a request's settings dict applied"""
+    settings = QCSettings()
+    for key, value in user_settings.items():
+        if hasattr(settings, key):
+            setattr(settings, key, value)
+    settings.language = user_settings.get('language', 'en')
+    return settings
+
+def report_download_name(entry, pdf_path):
+    """Unique download name of a batch sample's report"""
+    return f"{entry['index']:03d}_{os.path.splitext(os.path.basename(entry['sample']))[0]} - {os.path.basename(pdf_path)}"
+
+def run_batch_job(job, session_id, settings, mode):
+    """Analyse all samples of a batch session against its reference (executed by the job queue)"""
+    with SESSIONS.use(session_id) as session:
+        job.set_stage('loading')
+        ref_size = read_image_size(session['ref_path'])
+        ref = load_rgb(session['ref_path'], size=analysis_input_size(ref_size, ref_size, settings))
+        
+        batch = run_batch_analysis(session['ref_path'], ref, session['samples'], settings,
+                                   output_dir=os.path.join(session['dir'], 'reports'), mode=mode,
+                                   max_workers=BATCH_WORKERS, progress=job.set_stage)
+        
+        observe_reference_features(batch['reference_features'])
+        
+        # Expose each sample's report under a unique download name
+        files = {}
+        for entry in batch['samples']:
+            ANALYSES.inc(mode=f'batch_{mode}', outcome='done' if entry['success'] else 'failed')
+            pdf_path = entry.pop('pdf_path', None)
+            if pdf_path:
+                observe_report(pdf_path)
+                name = report_download_name(entry, pdf_path)
+                files[name] = pdf_path
+                entry['pdf_filename'] = name
+        SESSIONS.update(session_id, results={'files': files})
+        
+        logger.info(f"Batch complete for session {session_id}: {batch['summary']}")
+        return dict(batch, success=True, mode=mode, session_id=session_id)
+
+@app.route('/api/batch', methods=['POST'])
+def analyze_batch():
+    """
+    Analyse one reference against many samples.
+    
+    Multipart form: 'reference' (one image), 'samples' (one or more images),
+    optional 'settings' (JSON), 'mode' ("report" or "decision") and 'wait'.
+    Reference features are computed once and shared by all samples.
+    Returns 202 with a job id (or the result when wait=true); the job result
+    lists the decision and scores per sample.
+    """
+    try:
+        if QCSettings is None or run_batch_analysis is None:
+            return jsonify({'error': 'Analysis engine not loaded'}), 500
+        
+        ref_file = request.files.get('reference')
+        sample_files = [f for f in request.files.getlist('samples') if f.filename]
+        if ref_file is None or not ref_file.filename or not sample_files:
+            return jsonify({'error': 'A reference image and at least one sample image are required'}), 400
+        if len(sample_files) > BATCH_MAX_SAMPLES:
+            return jsonify({'error': f'Too many samples (max {BATCH_MAX_SAMPLES})'}), 400
+        
+        mode = request.form.get('mode', 'report')
+        if mode not in ('report', 'decision'):
+            return jsonify({'error': f'Unknown mode: {mode}'}), 400
+        settings = settings_from_request(json.loads(request.form.get('settings') or '{}'))
+        
+        # Save reference and samples into a new session
+        session_id, session_dir = SESSIONS.create()
+        ref_path = os.path.join(session_dir, 'reference' + os.path.splitext(ref_file.filename)[1])
+        ref_file.save(ref_path)
+        samples_dir = os.path.join(session_dir, 'samples')
+        os.makedirs(samples_dir, exist_ok=True)
+        samples = []
+        for i, f in enumerate(sample_files, start=1):
+            name = secure_filename(f.filename) or f'sample_{i}.png'
+            path = os.path.join(samples_dir, f'{i:03d}_{name}')
+            f.save(path)
+            samples.append((name, path))
+        SESSIONS.update(session_id, ref_path=ref_path, samples=samples)
+        
+        # Admission control: the batch runs BATCH_WORKERS samples at a time
+        ref_w, ref_h = read_image_size(ref_path)
+        per_sample = estimate_analysis_cost(ref_w, ref_h, settings, mode=mode)
+        cost = {
+            'memory_mb': round(per_sample['memory_mb'] * min(BATCH_WORKERS, len(samples)), 1),
+            'cpu_s': round(per_sample['cpu_s'] * len(samples), 1),
+        }
+        
+        try:
+            job = JOBS.submit(run_batch_job, session_id, settings, mode, session_id=session_id, cost=cost)
+        except QueueFullError as e:
+            SESSIONS.remove(session_id)
+            response = jsonify({
+                'error': 'Server busy, too many analyses queued. Please retry shortly.',
+                'retry_after': e.retry_after,
+            })
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, 429
+        
+        if request.form.get('wait', '').lower() in ('1', 'true'):
+            JOBS.wait(job)
+            if job.state == JOB_FAILED:
+                return jsonify(analysis_error_response(job.error, job.error_details)), 500
+            return jsonify(dict(job.result, job_id=job.job_id))
+        
         return jsonify({
-            'error': str(e),
-            'error_details': error_traceback,
-            'decision': 'ERROR',
-            'color_score': 0,
-            'pattern_score': 0,
-            'overall_score': 0
-        }), 500
+            'success': True,
+            'session_id': session_id,
+            'job_id': job.job_id,
+            'state': job.state,
+            'status_url': f'/api/jobs/{job.job_id}',
+            'samples': len(samples),
+            'estimated_cost': cost,
+        }), 202
+        
+    except Exception as e:
+        import traceback
+        error_traceback = traceback.format_exc()
+        logger.error(f"Batch error: {e}")
+        logger.error(f"Full traceback:\n{error_traceback}")
+        return jsonify(analysis_error_response(str(e), error_traceback)), 500
+
+def run_bulk_sample(job, ref_name, ref, index, name, data, settings, ref_features, mode, output_dir, outbox):
+    """Decode and analyse one streamed sample of a bulk upload (executed by the job queue)"""
+    started = time.perf_counter()
+    try:
+        job.set_stage('loading')
+        test = load_rgb(data, name, size=(ref.shape[1], ref.shape[0]))
+        job.set_stage('analysis')
+        with observe_analysis(f'bulk_{mode}'):
+            entry = dict(analyse_sample(ref_name, ref, index, os.path.basename(name), test, settings,
+                                        ref_features, mode=mode, output_dir=output_dir), success=True)
+        if entry.get('pdf_path'):
+            observe_report(entry['pdf_path'])
+    except Exception as e:
+        logger.error(f"Bulk sample {name} failed: {e}")
+        entry = {'success': False, 'error': str(e)}
+    entry.update(sample=name, index=index, elapsed_ms=round((time.perf_counter() - started) * 1000.0, 1))
+    outbox.put(entry)
+    return entry
+
+def is_bulk_reference(item):
+    """The reference is the 'reference' multipart field, or the zip member named reference.<ext>"""
+    if item.field is not None:
+        return item.field == 'reference'
+    return os.path.splitext(os.path.basename(item.filename))[0].lower() == 'reference'
+
+def bulk_analysis_stream(session_id, parser, settings, mode):
+    """
+    NDJSON lines of a bulk upload: read the body chunk by chunk, queue each
+    sample as soon as its last byte (and the reference) has arrived, and emit
+    each result as soon as it is ready.
+    """
+    started = time.time()
+    outbox = queue.Queue()
+    ref_features = ReferenceFeatures()
+    session = SESSIONS.get(session_id)
+    reports_dir = os.path.join(session['dir'], 'reports')
+    reference = None          # (name, image decoded at analysis size)
+    waiting = []              # samples received before the reference
+    in_flight = 0
+    received = 0
+    summary = {}
+    files = {}
+    
+    def line(payload):
+        return json.dumps(payload) + '\n'
+    
+    def collect(block):
+        """Result lines of finished samples (block: wait for at least one)"""
+        nonlocal in_flight
+        lines = []
+        while in_flight:
+            try:
+                entry = outbox.get(block=block and not lines)
+            except queue.Empty:
+                break
+            in_flight -= 1
+            pdf_path = entry.pop('pdf_path', None)
+            if pdf_path:
+                name = report_download_name(entry, pdf_path)
+                files[name] = pdf_path
+                entry['pdf_filename'] = name
+                entry['download_url'] = f'/api/download/{session_id}/{name}'
+                SESSIONS.update(session_id, results={'files': files})
+            key = entry.get('decision', 'ERROR')
+            summary[key] = summary.get(key, 0) + 1
+            lines.append(line(dict(entry, type='result')))
+        return lines
+    
+    def submit(index, item):
+        """Queue one sample; yields result lines while waiting for a free slot"""
+        nonlocal in_flight
+        ref_name, ref = reference
+        try:
+            sample_w, sample_h = read_image_size(item.data, item.filename)
+        except RuntimeError:
+            sample_w, sample_h = ref.shape[1], ref.shape[0]  # run_bulk_sample reports the error
+        cost = estimate_analysis_cost(sample_w, sample_h, settings, mode=mode)
+        while True:
+            # Backpressure: stop reading the body while BATCH_WORKERS samples are in flight
+            while in_flight >= max(1, BATCH_WORKERS):
+                yield from collect(block=True)
+            try:
+                JOBS.submit(run_bulk_sample, ref_name, ref, index, item.filename, item.data, settings,
+                            ref_features, mode, reports_dir, outbox, session_id=session_id, cost=cost)
+                in_flight += 1
+                return
+            except QueueFullError as e:
+                if in_flight:
+                    yield from collect(block=True)
+                else:
+                    time.sleep(min(e.retry_after, 5))
+    
+    yield line({'type': 'accepted', 'session_id': session_id, 'mode': mode})
+    try:
+        with SESSIONS.use(session_id):
+            stream = request.stream
+            while True:
+                chunk = stream.read(BULK_READ_CHUNK)
+                for item in parser.feed(chunk or None):
+                    if reference is None and is_bulk_reference(item):
+                        ref_size = read_image_size(item.data, item.filename)
+                        ref = load_rgb(item.data, item.filename, size=analysis_input_size(ref_size, ref_size, settings))
+                        reference = (os.path.basename(item.filename), ref)
+                        yield line({'type': 'reference', 'name': reference[0], 'width': ref_size[0], 'height': ref_size[1]})
+                        for index, pending in waiting:
+                            yield from submit(index, pending)
+                        waiting = []
+                        continue
+                    received += 1
+                    if received > BULK_MAX_SAMPLES:
+                        raise BulkFormatError(f'Too many samples (max {BULK_MAX_SAMPLES})')
+                    if reference is None:
+                        waiting.append((received, item))
+                    else:
+                        yield from submit(received, item)
+                for result_line in collect(block=False):
+                    yield result_line
+                if not chunk:
+                    break
+            parser.close()
+            if reference is None:
+                raise BulkFormatError('No reference image in the upload')
+            while in_flight:
+                yield from collect(block=True)
+        
+        logger.info(f"Bulk upload complete for session {session_id}: {received} samples, {summary}")
+        observe_reference_features(ref_features.stats())
+        yield line({
+            'type': 'summary',
+            'session_id': session_id,
+            'samples': received,
+            'summary': summary,
+            'reference_features': ref_features.stats(),
+            'elapsed_s': round(time.time() - started, 2),
+        })
+    except (BulkFormatError, RequestEntityTooLarge, RuntimeError) as e:
+        # Results already sent stay valid; samples still running finish in the background
+        message = e.description if isinstance(e, RequestEntityTooLarge) else str(e)
+        logger.warning(f"Bulk upload for session {session_id} aborted: {message}")
+        yield line({'type': 'error', 'error': message, 'samples': received, 'summary': summary})
+
+@app.route('/api/bulk', methods=['POST'])
+def analyze_bulk():
+    """
+    Stream a whole lot in one request and get results back while it uploads.
+    
+    Body: a zip archive (Content-Type application/zip) whose member named
+    reference.<ext> is the reference and all other members are samples, or
+    multipart/form-data with a 'reference' file part and any number of sample
+    file parts. Query parameters: 'mode' ("decision", default, or "report")
+    and 'settings' (JSON).
+    
+    The response is NDJSON (one JSON object per line): 'accepted', 'reference'
+    once the reference is decoded, one 'result' per sample as soon as its
+    analysis finishes, then 'summary' (or 'error').
+    """
+    if QCSettings is None or analyse_sample is None:
+        return jsonify({'error': 'Analysis engine not loaded'}), 500
+    
+    mode = request.args.get('mode', 'decision')
+    if mode not in ('report', 'decision'):
+        return jsonify({'error': f'Unknown mode: {mode}'}), 400
+    try:
+        settings = settings_from_request(json.loads(request.args.get('settings') or '{}'))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid settings: {e}'}), 400
+    
+    max_file_bytes = app.config['MAX_CONTENT_LENGTH']
+    if request.mimetype == 'multipart/form-data':
+        try:
+            parser = MultipartStreamParser(request.mimetype_params.get('boundary'), max_file_bytes=max_file_bytes)
+        except BulkFormatError as e:
+            return jsonify({'error': str(e)}), 400
+    elif request.mimetype in ('application/zip', 'application/x-zip-compressed', 'application/octet-stream'):
+        parser = ZipStreamParser(max_file_bytes=max_file_bytes)
+    else:
+        return jsonify({'error': 'Send a zip archive or a multipart/form-data body'}), 415
+    
+    # The body limit of single uploads does not apply to a whole lot
+    request.max_content_length = int(BULK_MAX_UPLOAD_MB * 1024 * 1024)
+    session_id, _session_dir = SESSIONS.create()
+    logger.info(f"Bulk upload started: session {session_id} ({mode})")
+    
+    response = Response(stream_with_context(bulk_analysis_stream(session_id, parser, settings, mode)),
+                        mimetype='application/x-ndjson')
+    # Results must reach the client while the upload is still running
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report state, current pipeline stage and (when finished) results of a job"""
+    job = JOBS.get(job_id)
+    # Jobs run in the worker that accepted them; others read the published state
+    payload = job.to_dict() if job is not None else SESSIONS.get_job(job_id)
+    if payload is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    if payload['state'] == JOB_FAILED:
+        payload.update(analysis_error_response(payload['error'], payload['error_details']))
+    return jsonify(payload)
 
 @app.route('/api/download/<session_id>/<filename>', methods=['GET'])
 def download_file(session_id, filename):
-    """Download a generated PDF file"""
+    """Download a generated file of a session (reports, analysis profiles)"""
     try:
-        if session_id not in SESSIONS:
-            return jsonify({'error': 'Invalid session'}), 404
-        
-        session = SESSIONS[session_id]
-        session_dir = os.path.dirname(session['ref_path'])
+        session = SESSIONS.get(session_id)
+        if session is None:
+            return jsonify({'error': 'Invalid or expired session'}), 404
         
-        file_path = os.path.join(session_dir, filename)
+        file_path = os.path.join(session['dir'], filename)
         
         if not os.path.exists(file_path):
             # Try results
@@ -459,15 +1176,19 @@ def download_file(session_id, filename):
                     file_path = session['results']['pdf_file']
                 elif filename == os.path.basename(session['results'].get('settings_pdf_file', '')):
                     file_path = session['results']['settings_pdf_file']
+                elif filename in session['results'].get('files', {}):
+                    file_path = session['results']['files'][filename]
         
         if not os.path.exists(file_path):
             return jsonify({'error': 'File not found'}), 404
         
-        return send_file(
+        # Report files never change; re-downloads are answered with 304
+        return send_cached_file(
             file_path,
+            private=True,
             as_attachment=True,
             download_name=filename,
-            mimetype='application/pdf'
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
         )
         
     except Exception as e:
@@ -569,8 +1290,10 @@ def download_datasheet(lang):
             # Return a placeholder message
             return jsonify({'error': 'Datasheet not available yet'}), 404
         
-        return send_file(
+        return send_cached_file(
             datasheet_path,
+            max_age=DOCUMENT_MAX_AGE_S,
+            content_etag=True,
             as_attachment=True,
             download_name=filename,
             mimetype='application/pdf'
@@ -579,6 +1302,49 @@ def download_datasheet(lang):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def rendition_format():
+    """WebP for clients that list it in Accept, JPEG otherwise"""
+    return 'webp' if any(m == 'image/webp' and q > 0 for m, q in request.accept_mimetypes) else 'jpeg'
+
+def send_rendition(source_digest, rendition, render):
+    """
+    Serve a cached rendition, calling render(fmt) for the encoded bytes on a miss.
+    
+    The cache key is the ETag; URLs with the source fingerprint (?v=) are
+    cacheable for a year, others are revalidated hourly.
+    """
+    fmt = rendition_format()
+    key = rendition_key(source_digest, rendition, fmt)
+    path = RENDITION_CACHE.get(key, fmt)
+    CACHE_LOOKUPS.inc(cache='rendition', result='miss' if path is None else 'hit')
+    if path is None:
+        path = RENDITION_CACHE.put(key, fmt, render(fmt))
+    fingerprinted = request.args.get('v') == source_digest[:12]
+    response = send_file(path, mimetype=FORMATS[fmt][1], etag=key,
+                         max_age=RENDITION_MAX_AGE_S if fingerprinted else RENDITION_REVALIDATE_S)
+    if fingerprinted:
+        response.cache_control.immutable = True
+    response.vary.add('Accept')
+    return response
+
+def sample_image_path(filename):
+    """Path of a bundled sample image"""
+    return os.path.join(os.path.dirname(__file__), 'Samples', 'images', filename)
+
+def sample_image_info(filename):
+    """Source size and fingerprinted rendition URLs of a bundled sample image"""
+    path = sample_image_path(filename)
+    info = {'url': f'/api/samples/image/{filename}'}
+    try:
+        version = file_digest(path)[:12]
+        info['size'] = list(read_image_size(path)) if read_image_size is not None else None
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"Sample image {filename} unavailable: {e}")
+        return info
+    for rendition in RENDITIONS:
+        info[rendition] = f'/api/samples/image/{filename}?size={rendition}&v={version}'
+    return info
+
 @app.route('/api/samples/list', methods=['GET'])
 def get_samples_list():
     """Get list of sample tests from the Samples folder"""
@@ -604,19 +1370,78 @@ def get_samples_list():
             'sample': '0032.png',
         },
     ]
+    # Cards and previews load the small renditions; sizes are those of the originals
+    for sample in samples:
+        sample['images'] = {role: sample_image_info(sample[role]) for role in ('reference', 'sample')}
     return jsonify(samples)
 
 @app.route('/api/samples/image/<filename>', methods=['GET'])
 def get_sample_image(filename):
-    """Get sample test image from the Samples/images folder"""
+    """
+    Get sample test image from the Samples/images folder.
+    
+    ?size=thumb or ?size=preview returns a scaled-down WebP/JPEG rendition
+    instead of the original PNG.
+    """
     try:
         # Sample images are stored in Samples/images/ folder (NOT static/images)
-        image_path = os.path.join(os.path.dirname(__file__), 'Samples', 'images', filename)
+        image_path = sample_image_path(filename)
         
         if not os.path.exists(image_path):
             return jsonify({'error': 'Sample image not found'}), 404
         
-        return send_file(image_path, mimetype='image/png')
+        rendition = request.args.get('size')
+        if rendition is None:
+            return send_cached_file(image_path, max_age=DOCUMENT_MAX_AGE_S, content_etag=True,
+                                    mimetype='image/png')
+        if rendition not in RENDITIONS:
+            return jsonify({'error': f'Unknown size: {rendition}'}), 400
+        if load_rgb is None:
+            return jsonify({'error': 'Analysis engine not loaded'}), 500
+        
+        def render(fmt):
+            # Decoded straight to the rendition size
+            size = rendition_size(*read_image_size(image_path), rendition)
+            return encode_rendition(load_rgb(image_path, size=size), fmt)
+        
+        return send_rendition(file_digest(image_path), rendition, render)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/session/<session_id>/image/<role>', methods=['GET'])
+def get_session_image(session_id, role):
+    """
+    Rendition of an uploaded image (?size=thumb or preview, default preview).
+    
+    Rendered from the decoded image kept with the session, so previews are
+    at most the analysis width.
+    """
+    try:
+        if role not in ('reference', 'sample'):
+            return jsonify({'error': f'Unknown image: {role}'}), 404
+        rendition = request.args.get('size', 'preview')
+        if rendition not in RENDITIONS:
+            return jsonify({'error': f'Unknown size: {rendition}'}), 400
+        
+        session = SESSIONS.get(session_id)
+        if session is None:
+            return jsonify({'error': 'Invalid or expired session'}), 400
+        if 'ref_name' not in session:
+            return jsonify({'error': 'No uploaded images in this session'}), 404
+        
+        # Digest of the decoded upload (stored at upload, keyed by its size)
+        size = analysis_input_size(*session_image_sizes(session))
+        digest = session['input_digests'][f"{size[0]}x{size[1]}"][0 if role == 'reference' else 1]
+        
+        def render(fmt):
+            arrays = SESSIONS.load_arrays(session_id, 'ref_input' if role == 'reference' else 'sample_input')
+            if arrays is None:
+                raise RuntimeError('Decoded image not available')
+            rgb = arrays[0]
+            return encode_rendition(rgb, fmt, size=rendition_size(rgb.shape[1], rgb.shape[0], rendition))
+        
+        return send_rendition(digest, rendition, render)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -640,8 +1465,10 @@ def get_sample_report(sample_id):
         if not os.path.exists(report_path):
             return jsonify({'error': f'Report not found: {filename}'}), 404
         
-        return send_file(
+        return send_cached_file(
             report_path,
+            max_age=DOCUMENT_MAX_AGE_S,
+            content_etag=True,
             as_attachment=True,
             download_name=filename,
             mimetype='application/pdf'
@@ -657,6 +1484,9 @@ import atexit
 
 def cleanup_sessions():
     """Clean up temporary files on exit"""
+    # Forked workers share the folder; only the process that created it removes it
+    if os.environ.get('TEXTILE_QC_UPLOAD_DIR') or os.getpid() != UPLOAD_FOLDER_OWNER_PID:
+        return
     try:
         if os.path.exists(app.config['UPLOAD_FOLDER']):
             shutil.rmtree(app.config['UPLOAD_FOLDER'])
@@ -679,6 +1509,19 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5001))
     debug = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     
+    if warmup_engine is not None:
+        if os.environ.get('TEXTILE_QC_WARMUP', '1') == '0':
+            from textile_qc.warmup import mark_engine_ready
+            mark_engine_ready()
+        else:
+            print("Warming up analysis engine...")
+            warmup_engine()
+    
+    # Opt-in numba ΔE kernel (delta_e_backend "numba"): its thread pool is started here, in the main thread
+    if os.environ.get('DELTA_E_NUMBA', '0') == '1':
+        from textile_qc.delta_e import start_jit
+        print(f"Numba ΔE kernel: {'started' if start_jit() else 'unavailable, using numpy'}")
+    
     print(f"Starting server on port {port}")
     print("=" * 60)
     
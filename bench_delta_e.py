@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC System - ΔE kernel benchmark
+
+Times the ΔE2000 map of color_differences() (numpy and, when available, the
+numba backend) against color.deltaE2000 at several image widths:
+
+    python bench_delta_e.py [width ...]
+"""
+
+import sys
+
+from textile_qc.delta_e import benchmark, jit_available, start_jit
+
+
+def main(argv):
+    # The numba thread pool has to be started from the main thread
+    start_jit()
+    widths = tuple(int(w) for w in argv) or (640, 2048, 8192)
+    print(f"ΔE2000 map, float32, numba {'available' if jit_available() else 'unavailable'}")
+    print(f"{'size':>11} {'deltaE2000':>11} {'numpy':>9} {'x':>6} {'numba':>9} {'x':>6}")
+    for row in benchmark(widths):
+        size = f"{row['width']}x{row['height']}"
+        line = f"{size:>11} {row['reference_ms']:>9.0f}ms {row['numpy_ms']:>7.0f}ms {row['numpy_speedup']:>5.1f}x"
+        if row['numba_ms'] is not None:
+            line += f" {row['numba_ms']:>7.0f}ms {row['numba_speedup']:>5.1f}x"
+        print(line + ("  (scaled from row bands)" if row['scaled'] else ""))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
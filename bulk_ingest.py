@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC System - streaming parsers for bulk uploads
+
+A bulk upload is a multipart/form-data body with many file parts, or a zip
+archive. Both parsers are push-style: feed() takes the next chunk of the
+request body as it arrives and returns the files completed by it, so the web
+layer can decode and analyse the first images while the rest of the body is
+still being uploaded. Nothing is written to disk.
+
+Zip archives are read front to back from their local file headers (the
+central directory at the end is never needed). Stored and deflated entries
+are supported, including entries written with a trailing data descriptor by
+streaming zip writers; zip64 and encrypted entries are rejected.
+"""
+
+import zlib
+import struct
+import logging
+
+from werkzeug.sansio.multipart import MultipartDecoder, File, Data, NeedData, Epilogue
+
+logger = logging.getLogger(__name__)
+
+
+class BulkFormatError(ValueError):
+    """Raised when a bulk upload body is malformed or uses an unsupported feature"""
+
+
+class IngestedFile:
+    """One completed file of a bulk upload"""
+
+    __slots__ = ('field', 'filename', 'data')
+
+    def __init__(self, field, filename, data):
+        self.field = field
+        self.filename = filename
+        self.data = data
+
+
+def _check_size(filename, size, max_file_bytes):
+    if max_file_bytes is not None and size > max_file_bytes:
+        raise BulkFormatError(f"{filename}: file larger than {max_file_bytes // (1024 * 1024)} MB")
+
+
+# ----------------------------
+# multipart/form-data
+# ----------------------------
+class MultipartStreamParser:
+    """
+    Incremental multipart/form-data parser returning the file parts.
+
+    Args:
+        boundary: Multipart boundary (from the Content-Type header)
+        max_file_bytes: Size limit of a single file part
+    """
+
+    def __init__(self, boundary, max_file_bytes=None):
+        if not boundary:
+            raise BulkFormatError("Missing multipart boundary")
+        self.max_file_bytes = max_file_bytes
+        self._decoder = MultipartDecoder(boundary.encode("latin-1"))
+        # The decoder can mis-split a closing delimiter that straddles two
+        # chunks, so the last bytes are held back until more data (or the end) arrives
+        self._holdback = len(boundary) + 8
+        self._pending = bytearray()
+        self._part = None
+        self._buffer = bytearray()
+        self._complete = False
+
+    def feed(self, chunk):
+        """Consume the next body chunk (None at end of body); returns the completed IngestedFiles"""
+        try:
+            if chunk:
+                self._pending += chunk
+                if len(self._pending) > self._holdback:
+                    self._decoder.receive_data(bytes(self._pending[:-self._holdback]))
+                    del self._pending[:-self._holdback]
+            else:
+                self._decoder.receive_data(bytes(self._pending))
+                self._pending.clear()
+                self._decoder.receive_data(None)
+            return self._completed_files()
+        except BulkFormatError:
+            raise
+        except ValueError as e:
+            raise BulkFormatError(f"Malformed multipart body ({e})")
+
+    def _completed_files(self):
+        completed = []
+        while True:
+            event = self._decoder.next_event()
+            if isinstance(event, NeedData):
+                break
+            if isinstance(event, Epilogue):
+                self._complete = True
+                break
+            if isinstance(event, File):
+                self._part = event
+                self._buffer = bytearray()
+            elif isinstance(event, Data):
+                if self._part is None:
+                    continue  # plain form field
+                self._buffer += event.data
+                _check_size(self._part.filename, len(self._buffer), self.max_file_bytes)
+                if not event.more_data:
+                    if self._part.filename:
+                        completed.append(IngestedFile(self._part.name, self._part.filename, bytes(self._buffer)))
+                    self._part = None
+                    self._buffer = bytearray()
+            else:
+                self._part = None
+        return completed
+
+    def close(self):
+        """Check that the body ended with the closing boundary"""
+        if not self._complete:
+            raise BulkFormatError("Truncated multipart body")
+
+
+# ----------------------------
+# zip (local file headers)
+# ----------------------------
+ZIP_LOCAL_HEADER = 0x04034b50
+ZIP_DATA_DESCRIPTOR = 0x08074b50
+ZIP_CENTRAL_DIRECTORY = 0x02014b50
+ZIP_END_OF_CENTRAL_DIRECTORY = 0x06054b50
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+_FLAG_ENCRYPTED = 0x0001
+_FLAG_DATA_DESCRIPTOR = 0x0008
+_FLAG_UTF8 = 0x0800
+
+
+class ZipStreamParser:
+    """
+    Incremental zip reader returning the archive members in stored order.
+
+    Directory entries and macOS resource forks (__MACOSX/, ._*) are skipped.
+
+    Args:
+        max_file_bytes: Size limit of a single uncompressed member
+    """
+
+    def __init__(self, max_file_bytes=None):
+        self.max_file_bytes = max_file_bytes
+        self._buffer = bytearray()
+        self._state = "header"
+        self._entry = None
+        self._inflater = None
+        self._data = bytearray()
+        self._members = 0
+
+    def feed(self, chunk):
+        """Consume the next body chunk (None at end of body); returns the completed IngestedFiles"""
+        if chunk:
+            self._buffer += chunk
+        completed = []
+        while self._step(completed):
+            pass
+        return completed
+
+    def close(self):
+        """Check that the archive was not truncated inside a member"""
+        if self._state not in ("header", "done") or (self._state == "header" and self._buffer):
+            raise BulkFormatError("Truncated zip archive")
+        if self._members == 0 and self._state != "done":
+            raise BulkFormatError("Not a zip archive")
+
+    def _step(self, completed):
+        """Advance the state machine once; False when more data is needed"""
+        if self._state == "done":
+            self._buffer.clear()
+            return False
+
+        if self._state == "header":
+            if len(self._buffer) < 4:
+                return False
+            signature = struct.unpack_from("<I", self._buffer)[0]
+            if signature in (ZIP_CENTRAL_DIRECTORY, ZIP_END_OF_CENTRAL_DIRECTORY):
+                self._state = "done"
+                return True
+            if signature != ZIP_LOCAL_HEADER:
+                raise BulkFormatError("Not a zip archive" if self._members == 0 else "Corrupt zip archive")
+            if len(self._buffer) < _LOCAL_HEADER.size:
+                return False
+            (_sig, _version, flags, method, _time, _date, _crc,
+             csize, usize, name_len, extra_len) = _LOCAL_HEADER.unpack_from(self._buffer)
+            header_len = _LOCAL_HEADER.size + name_len + extra_len
+            if len(self._buffer) < header_len:
+                return False
+            raw_name = bytes(self._buffer[_LOCAL_HEADER.size:_LOCAL_HEADER.size + name_len])
+            name = raw_name.decode("utf-8" if flags & _FLAG_UTF8 else "cp437", errors="replace")
+            del self._buffer[:header_len]
+
+            if flags & _FLAG_ENCRYPTED:
+                raise BulkFormatError(f"{name}: encrypted zip members are not supported")
+            if 0xFFFFFFFF in (csize, usize):
+                raise BulkFormatError(f"{name}: zip64 members are not supported")
+            if method not in (ZIP_STORED, ZIP_DEFLATED):
+                raise BulkFormatError(f"{name}: unsupported zip compression method {method}")
+            descriptor = bool(flags & _FLAG_DATA_DESCRIPTOR)
+            if method == ZIP_STORED:
+                _check_size(name, usize, self.max_file_bytes)
+
+            # Stored members of streaming writers carry no sizes: their end is
+            # found by scanning for the data descriptor
+            scan = method == ZIP_STORED and descriptor and csize == 0
+            self._entry = {'name': name, 'method': method, 'csize': csize, 'descriptor': descriptor,
+                           'scan': scan, 'scan_from': 0}
+            self._inflater = zlib.decompressobj(-zlib.MAX_WBITS) if method == ZIP_DEFLATED else None
+            self._data = bytearray()
+            self._state = "data"
+            return True
+
+        if self._state == "data":
+            entry = self._entry
+            if entry['scan']:
+                if not self._scan_stored(entry):
+                    return False
+                self._finish_member(completed)
+                self._state = "header"
+                return True
+            if entry['method'] == ZIP_STORED:
+                if len(self._buffer) < entry['csize']:
+                    return False
+                self._data = self._buffer[:entry['csize']]
+                del self._buffer[:entry['csize']]
+            else:
+                if not self._buffer:
+                    return False
+                # Bounded output per call keeps a zip bomb from expanding in one go
+                limit = (self.max_file_bytes - len(self._data) + 1) if self.max_file_bytes is not None else 0
+                try:
+                    self._data += self._inflater.decompress(bytes(self._buffer), max(0, limit))
+                except zlib.error as e:
+                    raise BulkFormatError(f"{entry['name']}: corrupt deflate data ({e})")
+                _check_size(entry['name'], len(self._data), self.max_file_bytes)
+                self._buffer = bytearray(self._inflater.unconsumed_tail + self._inflater.unused_data)
+                if not self._inflater.eof:
+                    return bool(self._inflater.unconsumed_tail)
+            self._finish_member(completed)
+            self._state = "descriptor" if entry['descriptor'] else "header"
+            return True
+
+        if self._state == "descriptor":
+            if len(self._buffer) < 4:
+                return False
+            size = 16 if struct.unpack_from("<I", self._buffer)[0] == ZIP_DATA_DESCRIPTOR else 12
+            if len(self._buffer) < size:
+                return False
+            del self._buffer[:size]
+            self._state = "header"
+            return True
+
+        raise AssertionError(self._state)
+
+    def _scan_stored(self, entry):
+        """
+        Find the end of a stored member without sizes: a data descriptor
+        whose sizes and CRC match the bytes before it. Consumes the member
+        and its descriptor; False when more data is needed.
+        """
+        self._data += self._buffer
+        self._buffer = bytearray()
+        signature = struct.pack("<I", ZIP_DATA_DESCRIPTOR)
+        while True:
+            pos = self._data.find(signature, entry['scan_from'])
+            if pos < 0:
+                entry['scan_from'] = max(0, len(self._data) - 3)
+                _check_size(entry['name'], len(self._data) - 3, self.max_file_bytes)
+                return False
+            if len(self._data) < pos + 16:
+                entry['scan_from'] = pos
+                return False
+            crc, csize, usize = struct.unpack_from("<III", self._data, pos + 4)
+            if csize == usize == pos and zlib.crc32(memoryview(self._data)[:pos]) == crc:
+                self._buffer = self._data[pos + 16:]
+                del self._data[pos:]
+                return True
+            entry['scan_from'] = pos + 1
+
+    def _finish_member(self, completed):
+        name = self._entry['name']
+        self._members += 1
+        basename = name.rsplit("/", 1)[-1]
+        if name.endswith("/") or name.startswith("__MACOSX/") or basename.startswith("._") or not basename:
+            return
+        completed.append(IngestedFile(None, name, bytes(self._data)))
+        self._data = bytearray()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Gunicorn configuration for the Textile QC web application
+
+The app is preloaded in the master process and the analysis engine is warmed
+up there before any worker is forked, so every worker starts with populated
+font/figure/kernel caches shared copy-on-write.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '300'))
+
+# Threaded workers keep sending heartbeats while a request runs, so a long
+# streamed /api/bulk upload is not killed at `timeout`, and job polling is not
+# stuck behind it. Analyses are still bounded by the job queue.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Import app.py (and the analysis engine) once, before fork
+preload_app = True
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before workers are spawned."""
+    from textile_qc.warmup import warmup_engine, mark_engine_ready
+    if os.environ.get('TEXTILE_QC_WARMUP', '1') == '0':
+        server.log.info("Engine warmup disabled (TEXTILE_QC_WARMUP=0)")
+        mark_engine_ready()
+        return
+    server.log.info("Warming up analysis engine before forking workers...")
+    warmup_engine()
+
+
+def post_fork(server, worker):
+    """Runs in each worker's main thread: start the opt-in numba ΔE kernel (DELTA_E_NUMBA=1)."""
+    if os.environ.get('DELTA_E_NUMBA', '0') != '1':
+        return
+    from textile_qc.delta_e import start_jit
+    if start_jit():
+        server.log.info("Numba ΔE kernel started")
+    else:
+        server.log.warning("DELTA_E_NUMBA=1 but numba with TBB is not installed; using numpy")
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC System - background analysis job queue
+
+A small in-process queue backed by a bounded thread pool. The web layer
+submits an analysis, returns the job id immediately and clients poll the job
+for its state, current pipeline stage and result.
+
+Admission control: at most max_workers analyses run at once, running jobs
+must fit in a memory budget (each job carries an estimated cost), and at most
+max_queued jobs may wait. Beyond that submit() raises QueueFullError with a
+Retry-After estimate.
+
+Jobs live in the process that runs them. An optional listener is called on
+every state/stage change so the web layer can publish job state to other
+worker processes.
+"""
+
+import os
+import math
+import time
+import uuid
+import logging
+import threading
+import traceback
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# Job states
+# ----------------------------
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# Finished jobs are kept this long (seconds) so clients can still fetch the result
+JOB_RETENTION_S = 3600
+
+# Used for Retry-After when a job carries no CPU estimate
+DEFAULT_JOB_CPU_S = 30.0
+
+
+class QueueFullError(Exception):
+    """Raised by JobQueue.submit() when the wait queue is full"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Analysis queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass
+class AnalysisJob:
+    """State of one queued analysis"""
+    job_id: str
+    session_id: str = ""
+    state: str = JOB_QUEUED
+    stage: str = "queued"
+    created: float = field(default_factory=time.time)
+    started: float = None
+    finished: float = None
+    result: dict = None
+    error: str = None
+    error_details: str = None
+    cost: dict = field(default_factory=dict)
+    listener: object = field(default=None, repr=False, compare=False)
+
+    def set_stage(self, stage):
+        """Progress callback handed to the pipeline"""
+        self.stage = stage
+        logger.debug(f"Job {self.job_id}: stage={stage}")
+        self.notify()
+
+    def notify(self):
+        """Report a state/stage change to the listener (errors are logged, not raised)"""
+        if self.listener is None:
+            return
+        try:
+            self.listener(self)
+        except Exception as e:
+            logger.warning(f"Job {self.job_id}: listener failed: {e}")
+
+    def to_dict(self):
+        elapsed_end = self.finished or time.time()
+        return {
+            'job_id': self.job_id,
+            'session_id': self.session_id,
+            'state': self.state,
+            'stage': self.stage,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'elapsed_s': round(elapsed_end - self.started, 2) if self.started else None,
+            'estimated_cost': self.cost,
+            'result': self.result,
+            'error': self.error,
+            'error_details': self.error_details,
+        }
+
+
+class JobQueue:
+    """
+    Bounded pool of analysis workers with admission control.
+
+    The thread pool is created on first use (and re-created after a fork), so
+    the queue can be constructed at import time in a preloaded gunicorn master.
+
+    Args:
+        max_workers: Maximum number of concurrently running analyses
+        memory_budget_mb: Sum of estimated memory of running jobs; a job that
+                          would exceed it waits (a single job always runs)
+        max_queued: Maximum number of waiting jobs before submit() is refused
+        max_inline: Maximum number of concurrent run_inline() jobs (default:
+                    max_workers)
+        listener: Optional callable(job) invoked on every state/stage change
+    """
+
+    def __init__(self, max_workers=1, memory_budget_mb=None, max_queued=None, max_inline=None, listener=None):
+        self.max_workers = max(1, int(max_workers))
+        self.memory_budget_mb = memory_budget_mb
+        self.max_queued = max_queued
+        self.max_inline = self.max_workers if max_inline is None else max(1, int(max_inline))
+        self.listener = listener
+        self._inline_slots = threading.BoundedSemaphore(self.max_inline)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._budget = threading.Condition()
+        self._running_mb = 0.0
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix="analysis")
+            self._pid = os.getpid()
+        return self._executor
+
+    def submit(self, fn, *args, session_id="", cost=None, **kwargs):
+        """
+        Queue fn(job, *args, **kwargs). fn's return value becomes job.result.
+
+        Args:
+            cost: Optional estimate ({'memory_mb': ..., 'cpu_s': ...}) used for
+                  the memory budget and Retry-After
+
+        Returns:
+            AnalysisJob
+
+        Raises:
+            QueueFullError: If max_queued jobs are already waiting
+        """
+        job = AnalysisJob(job_id=str(uuid.uuid4()), session_id=session_id, cost=dict(cost or {}),
+                          listener=self.listener)
+        with self._lock:
+            self._prune()
+            if self.max_queued is not None and self._count(JOB_QUEUED) >= self.max_queued:
+                raise QueueFullError(self._retry_after())
+            self._jobs[job.job_id] = job
+            self._get_executor().submit(self._run, job, fn, args, kwargs)
+        job.notify()
+        logger.info(f"Job queued: {job.job_id} (queue depth {self.queue_depth()})")
+        return job
+
+    def run_inline(self, fn, *args, session_id="", cost=None, **kwargs):
+        """
+        Fast lane for short jobs: run fn(job, *args, **kwargs) in the calling
+        thread instead of behind the queued ones. The job shares the memory
+        budget with the pool (it waits while running jobs fill it), and at
+        most max_inline of them run at once.
+
+        Returns:
+            The finished AnalysisJob (check job.state)
+
+        Raises:
+            QueueFullError: If max_inline inline jobs are already running
+        """
+        job = AnalysisJob(job_id=str(uuid.uuid4()), session_id=session_id, cost=dict(cost or {}),
+                          listener=self.listener)
+        if not self._inline_slots.acquire(blocking=False):
+            with self._lock:
+                raise QueueFullError(self._retry_after())
+        try:
+            with self._lock:
+                self._prune()
+                self._jobs[job.job_id] = job
+            job.notify()
+            self._run(job, fn, args, kwargs)
+        finally:
+            self._inline_slots.release()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job, timeout=None, poll_interval=0.2):
+        """Block until job is finished (or timeout seconds elapsed)."""
+        deadline = None if timeout is None else time.time() + timeout
+        while job.state in (JOB_QUEUED, JOB_RUNNING):
+            if deadline is not None and time.time() >= deadline:
+                break
+            time.sleep(poll_interval)
+        return job
+
+    def queue_depth(self):
+        """Number of jobs waiting for a worker"""
+        with self._lock:
+            return self._count(JOB_QUEUED)
+
+    def running_count(self):
+        with self._lock:
+            return self._count(JOB_RUNNING)
+
+    def running_memory_mb(self):
+        """Estimated memory of the running jobs"""
+        with self._budget:
+            return self._running_mb
+
+    def _count(self, state):
+        return sum(1 for j in self._jobs.values() if j.state == state)
+
+    def _retry_after(self):
+        """Seconds until a queue slot is likely to free up (caller holds the lock)."""
+        pending = [j for j in self._jobs.values() if j.state in (JOB_QUEUED, JOB_RUNNING)]
+        work_s = sum(j.cost.get('cpu_s', DEFAULT_JOB_CPU_S) for j in pending)
+        # Roughly one queued job has to finish before a slot frees up
+        return max(1, int(math.ceil(work_s / self.max_workers / max(1, len(pending)))))
+
+    def _acquire_budget(self, job):
+        """Block until the job's estimated memory fits in the budget."""
+        need = job.cost.get('memory_mb', 0.0)
+        with self._budget:
+            if self.memory_budget_mb is not None:
+                while self._running_mb > 0 and self._running_mb + need > self.memory_budget_mb:
+                    if job.stage != "waiting_for_memory":
+                        job.set_stage("waiting_for_memory")
+                    self._budget.wait()
+            self._running_mb += need
+        return need
+
+    def _release_budget(self, amount):
+        with self._budget:
+            self._running_mb = max(0.0, self._running_mb - amount)
+            self._budget.notify_all()
+
+    def _run(self, job, fn, args, kwargs):
+        reserved = self._acquire_budget(job)
+        job.state = JOB_RUNNING
+        job.stage = "starting"
+        job.started = time.time()
+        job.notify()
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.state = JOB_DONE
+            job.stage = "complete"
+        except Exception as e:
+            job.error = str(e)
+            job.error_details = traceback.format_exc()
+            job.state = JOB_FAILED
+            logger.error(f"Job {job.job_id} failed: {e}")
+            logger.error(f"Full traceback:\n{job.error_details}")
+        finally:
+            job.finished = time.time()
+            self._release_budget(reserved)
+            job.notify()
+
+    def _prune(self):
+        """Drop finished jobs older than JOB_RETENTION_S (caller holds the lock)."""
+        cutoff = time.time() - JOB_RETENTION_S
+        expired = [jid for jid, j in self._jobs.items()
+                   if j.finished is not None and j.finished < cutoff]
+        for jid in expired:
+            del self._jobs[jid]
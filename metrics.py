@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC System - Prometheus metrics
+
+A small metrics registry (counters, gauges, histograms) rendered in the
+Prometheus text exposition format, without a client library dependency.
+
+Every gunicorn worker records into its own registry. With a snapshot
+directory, each process writes its values to <dir>/<pid>.json (at most once
+per FLUSH_INTERVAL_S after a change) and a scrape of any worker adds up the
+snapshots of all processes on the host: counters and histograms of exited
+workers are kept so totals never go backwards, per-process gauges only count
+live processes. Host-wide gauges (computed from shared state such as the
+session store) are evaluated by the scraping process alone.
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_S = 1.0
+
+# Seconds, from a fast decision-mode stage to a slow full report
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# ----------------------------
+# Metric types
+# ----------------------------
+class _Metric:
+    kind = None
+
+    def __init__(self, registry, name, help_text, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def snapshot(self):
+        with self.registry._lock:
+            return {json.dumps(k): v for k, v in self._values.items()}
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self.registry._check_process()
+        with self.registry._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        self.registry.mark_changed()
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down. With fn, the value is fn() at scrape time:
+    fn returns a number, or a dict {label values tuple: number} for labelled gauges.
+    """
+    kind = 'gauge'
+
+    def __init__(self, registry, name, help_text, labelnames=(), fn=None, scope='process'):
+        super().__init__(registry, name, help_text, labelnames)
+        self.fn = fn
+        self.scope = scope
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        self.registry._check_process()
+        with self.registry._lock:
+            self._values[key] = value
+        self.registry.mark_changed()
+
+    def collect(self):
+        """Current values {label values tuple: number}"""
+        if self.fn is None:
+            with self.registry._lock:
+                return dict(self._values)
+        try:
+            value = self.fn()
+        except Exception as e:
+            logger.warning(f"Metric {self.name} unavailable: {e}")
+            return {}
+        if isinstance(value, dict):
+            return {tuple(str(v) for v in (k if isinstance(k, tuple) else (k,))): x for k, x in value.items()}
+        return {(): value}
+
+    def snapshot(self):
+        return {json.dumps(list(k)): v for k, v in self.collect().items()}
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets"""
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        self.registry._check_process()
+        with self.registry._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry['buckets'][i] += 1
+            entry['sum'] += value
+            entry['count'] += 1
+        self.registry.mark_changed()
+
+    def snapshot(self):
+        with self.registry._lock:
+            return {json.dumps(k): {'buckets': list(v['buckets']), 'sum': v['sum'], 'count': v['count']}
+                    for k, v in self._values.items()}
+
+
+# ----------------------------
+# Registry
+# ----------------------------
+class MetricsRegistry:
+    """
+    Metrics of one process, optionally merged with the other processes' snapshots.
+
+    Args:
+        snapshot_dir: Directory shared by the worker processes of the host
+                      (None: report this process only)
+    """
+
+    def __init__(self, snapshot_dir=None):
+        self.snapshot_dir = snapshot_dir
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._last_flush = 0.0
+        self._flush_timer = None
+        self._pid = os.getpid()
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(self, name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=(), fn=None, scope='process'):
+        """scope='process': summed over live workers; 'host': fn() of the scraping process only"""
+        return self._register(Gauge(self, name, help_text, labelnames, fn=fn, scope=scope))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, help_text, labelnames, buckets))
+
+    # ---------------- Snapshots ----------------
+
+    def _check_process(self):
+        """
+        After a fork (gunicorn preload_app), start from zero: the parent's
+        values are in the parent's own snapshot and would be counted twice.
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            for metric in self._metrics.values():
+                metric._values = {}
+            self._flush_lock = threading.Lock()
+            self._flush_timer = None
+            self._last_flush = 0.0
+            self._pid = os.getpid()
+
+    def _snapshot(self):
+        return {name: m.snapshot() for name, m in self._metrics.items()
+                if not (m.kind == 'gauge' and m.scope == 'host')}
+
+    def mark_changed(self):
+        """Write the snapshot now, or within FLUSH_INTERVAL_S when one was just written"""
+        if not self.snapshot_dir:
+            return
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                return
+            delay = self._last_flush + FLUSH_INTERVAL_S - time.monotonic()
+            if delay > 0:
+                self._flush_timer = threading.Timer(delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+                return
+        self.flush()
+
+    def flush(self):
+        """Write this process's values to <snapshot_dir>/<pid>.json"""
+        if not self.snapshot_dir:
+            return
+        with self._flush_lock:
+            self._flush_timer = None
+            self._last_flush = time.monotonic()
+        data = json.dumps(self._snapshot())
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix='.metrics_', dir=self.snapshot_dir)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.snapshot_dir, f'{os.getpid()}.json'))
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot: {e}")
+
+    def _snapshots(self):
+        """(pid, snapshot) of every process, this one read live"""
+        own_pid = os.getpid()
+        result = [(own_pid, self._snapshot())]
+        if not self.snapshot_dir:
+            return result
+        for name in os.listdir(self.snapshot_dir):
+            if not name.endswith('.json') or name.startswith('.'):
+                continue
+            try:
+                pid = int(name[:-5])
+            except ValueError:
+                continue
+            if pid == own_pid:
+                continue
+            try:
+                with open(os.path.join(self.snapshot_dir, name), encoding='utf-8') as f:
+                    result.append((pid, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return result
+
+    # ---------------- Exposition ----------------
+
+    def render(self):
+        """All metrics in the Prometheus text format"""
+        self._check_process()
+        snapshots = self._snapshots()
+        own_pid = os.getpid()
+        alive = {pid: pid == own_pid or _pid_alive(pid) for pid, _ in snapshots}
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            if metric.kind == 'gauge' and metric.scope == 'host':
+                merged = {json.dumps(list(k)): v for k, v in metric.collect().items()}
+            else:
+                merged = {}
+                for pid, snapshot in snapshots:
+                    if metric.kind == 'gauge' and not alive[pid]:
+                        continue
+                    for key, value in snapshot.get(name, {}).items():
+                        if metric.kind == 'histogram':
+                            entry = merged.setdefault(key, {'buckets': [0] * len(metric.buckets),
+                                                            'sum': 0.0, 'count': 0})
+                            if len(value['buckets']) != len(metric.buckets):
+                                continue
+                            entry['buckets'] = [a + b for a, b in zip(entry['buckets'], value['buckets'])]
+                            entry['sum'] += value['sum']
+                            entry['count'] += value['count']
+                        else:
+                            merged[key] = merged.get(key, 0) + value
+            for key in sorted(merged):
+                label_values = json.loads(key)
+                value = merged[key]
+                if metric.kind == 'histogram':
+                    for bound, count in zip(metric.buckets, value['buckets']):
+                        labels = _format_labels(metric.labelnames, label_values, f'le="{_format_value(bound)}"')
+                        lines.append(f'{name}_bucket{labels} {count}')
+                    labels = _format_labels(metric.labelnames, label_values, 'le="+Inf"')
+                    lines.append(f'{name}_bucket{labels} {value["count"]}')
+                    labels = _format_labels(metric.labelnames, label_values)
+                    lines.append(f'{name}_sum{labels} {_format_value(value["sum"])}')
+                    lines.append(f'{name}_count{labels} {value["count"]}')
+                else:
+                    lines.append(f'{name}{_format_labels(metric.labelnames, label_values)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC System - on-demand profiling of one analysis
+
+An analysis requested with "profile": true runs under cProfile, with a
+stack sampler alongside it. Three files are written to the session
+directory:
+
+    profile_<stamp>.pstats     cProfile statistics (python -m pstats, snakeviz)
+    profile_<stamp>.collapsed  sampled stacks, one "frame;frame;... count" line
+                               per distinct stack (flamegraph.pl, speedscope)
+    profile_<stamp>.txt        top functions by cumulative and by own time
+
+cProfile only sees the analysing thread; time spent in native code (OpenCV,
+scipy.ndimage, ReportLab's C helpers) is charged to the Python function that
+called it, which is what tells ndimage.convolve from graycomatrix from
+plot_surface.
+"""
+
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Rows of the text summary
+SUMMARY_TOP = 40
+# Rows returned with the analysis result
+RESULT_TOP = 15
+# Stack sampling interval
+SAMPLE_INTERVAL_S = 0.005
+
+# Python's profiling hooks do not nest well: one profiled analysis at a time
+_profile_lock = threading.Lock()
+
+
+def _frame_label(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{code.co_name}:{code.co_firstlineno}"
+
+
+def _function_label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name  # built-in, e.g. <method 'astype' of 'numpy.ndarray' objects>
+    parts = filename.replace('\\', '/').split('/')
+    # Keep the package path (site-packages/scipy/ndimage/_filters.py -> scipy/ndimage/_filters.py)
+    for marker in ('site-packages', 'dist-packages', 'lib'):
+        if marker in parts:
+            parts = parts[len(parts) - parts[::-1].index(marker):]
+            break
+    else:
+        parts = parts[-2:]
+    return f"{'/'.join(parts)}:{line}({name})"
+
+
+class StackSampler:
+    """
+    Samples the stack of one thread every interval seconds from a daemon
+    thread and counts each distinct stack (root first).
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL_S):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            key = ';'.join(reversed(stack))
+            self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self):
+        """Collapsed stack lines, heaviest first"""
+        return [f"{stack} {count}" for stack, count in
+                sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)]
+
+
+class AnalysisProfile:
+    """Result of profile_analysis(): file paths and the top functions"""
+
+    def __init__(self):
+        self.pstats_path = None
+        self.collapsed_path = None
+        self.summary_path = None
+        self.top = []
+        self.samples = 0
+        self.wall_s = 0.0
+
+    def to_dict(self):
+        return {
+            'pstats_filename': os.path.basename(self.pstats_path) if self.pstats_path else None,
+            'collapsed_filename': os.path.basename(self.collapsed_path) if self.collapsed_path else None,
+            'summary_filename': os.path.basename(self.summary_path) if self.summary_path else None,
+            'wall_s': round(self.wall_s, 3),
+            'stack_samples': self.samples,
+            'top_cumulative': self.top,
+        }
+
+
+def top_functions(stats, limit, sort='cumulative'):
+    """[{function, ncalls, tottime_s, cumtime_s}] of the most expensive functions"""
+    key = {'cumulative': 3, 'tottime': 2}[sort]
+    rows = []
+    for func, (_cc, ncalls, tottime, cumtime, _callers) in stats.stats.items():
+        rows.append((func, ncalls, tottime, cumtime))
+    rows.sort(key=lambda row: row[key], reverse=True)
+    return [{
+        'function': _function_label(func),
+        'ncalls': ncalls,
+        'tottime_s': round(tottime, 4),
+        'cumtime_s': round(cumtime, 4),
+    } for func, ncalls, tottime, cumtime in rows[:limit]]
+
+
+def write_summary(path, stats, sampler, wall_s, title):
+    """Plain-text summary: top functions by cumulative and by own time, heaviest stacks"""
+    lines = [
+        title,
+        f"Wall time: {wall_s:.2f} s, profiled calls: {stats.total_calls}, "
+        f"stack samples: {sampler.samples} (every {sampler.interval * 1000:.0f} ms)",
+        "",
+    ]
+    for sort, heading in (('cumulative', 'Top functions by cumulative time (including callees)'),
+                          ('tottime', 'Top functions by own time')):
+        lines.append(heading)
+        lines.append(f"{'cumtime s':>10} {'tottime s':>10} {'calls':>9}  function")
+        for row in top_functions(stats, SUMMARY_TOP, sort=sort):
+            lines.append(f"{row['cumtime_s']:>10.3f} {row['tottime_s']:>10.3f} {row['ncalls']:>9}  {row['function']}")
+        lines.append("")
+    if sampler.samples:
+        lines.append("Heaviest sampled stacks (leaf last)")
+        for line in sampler.collapsed()[:10]:
+            stack, count = line.rsplit(' ', 1)
+            frames = stack.split(';')
+            lines.append(f"{int(count) / sampler.samples * 100:6.1f}%  ...;" + ';'.join(frames[-4:]))
+        lines.append("")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+@contextmanager
+def profile_analysis(output_dir, title="Analysis profile"):
+    """
+    Profile the enclosed block (run in this thread) and write the profile
+    files to output_dir.
+
+    Yields an AnalysisProfile, complete after the block. The files are
+    written even if the block raises, so a failing run can be inspected too.
+    """
+    result = AnalysisProfile()
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    base = os.path.join(output_dir, f"profile_{stamp}")
+    with _profile_lock:
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident())
+        started = time.perf_counter()
+        sampler.start()
+        profiler.enable()
+        try:
+            yield result
+        finally:
+            profiler.disable()
+            sampler.stop()
+            result.wall_s = time.perf_counter() - started
+            try:
+                stats = pstats.Stats(profiler, stream=io.StringIO())
+                result.pstats_path = base + ".pstats"
+                stats.dump_stats(result.pstats_path)
+                result.collapsed_path = base + ".collapsed"
+                with open(result.collapsed_path, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(sampler.collapsed()) + '\n')
+                result.summary_path = base + ".txt"
+                write_summary(result.summary_path, stats, sampler, result.wall_s, title)
+                result.top = top_functions(stats, RESULT_TOP)
+                result.samples = sampler.samples
+            except Exception as e:
+                logger.warning(f"Could not write analysis profile: {e}")
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC System - thumbnail and preview renditions of images
+
+Sample cards and image previews do not need the full-size PNGs. A rendition
+is the image scaled down to fit a box (RENDITIONS) and encoded as WebP or
+JPEG. Renditions are produced on first request and kept on disk under the
+hash of their source plus the rendition and format, so the key doubles as
+the ETag and every worker process on the host shares the files. The total
+size is bounded; least recently used files (mtime, refreshed on every hit)
+are evicted first.
+"""
+
+import io
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Longest side of each rendition in pixels (never upscaled)
+RENDITIONS = {
+    'thumb': 320,
+    'preview': 1280,
+}
+
+# Encoder settings per output format: (file extension, mimetype, PIL save options)
+FORMATS = {
+    'webp': ('webp', 'image/webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', 'image/jpeg', {'format': 'JPEG', 'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+
+def rendition_size(width, height, rendition):
+    """(width, height) of a rendition of a width x height image, keeping the aspect ratio"""
+    max_side = RENDITIONS[rendition]
+    scale = min(1.0, max_side / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def encode_rendition(rgb, fmt, size=None):
+    """Encode an RGB uint8 array (scaled to size if given) in a rendition format; returns bytes"""
+    _ext, _mimetype, options = FORMATS[fmt]
+    img = Image.fromarray(rgb)
+    if size is not None and tuple(size) != img.size:
+        img = img.resize(tuple(size), Image.LANCZOS, reducing_gap=2.0)
+    buffer = io.BytesIO()
+    img.save(buffer, **options)
+    return buffer.getvalue()
+
+
+# ----------------------------
+# Source hashes
+# ----------------------------
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path):
+    """SHA-256 of a file, remembered per process until the file changes"""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _digests_lock:
+        known = _digests.get(path)
+        if known is not None and known[0] == stamp:
+            return known[1]
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(block)
+    digest = h.hexdigest()
+    with _digests_lock:
+        _digests[path] = (stamp, digest)
+    return digest
+
+
+def rendition_key(source_digest, rendition, fmt):
+    """Cache key (and ETag) of a rendition"""
+    return f"{source_digest[:32]}-{rendition}-{fmt}"
+
+
+# ----------------------------
+# Disk cache
+# ----------------------------
+class RenditionCache:
+    """
+    Size-bounded LRU directory of encoded renditions.
+
+    Args:
+        cache_dir: Directory for the rendition files
+        max_bytes: Total size limit of all renditions
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key, fmt):
+        if not key or not all(c in "0123456789abcdefghijklmnopqrstuvwxyz-" for c in key):
+            raise ValueError(f"Invalid rendition key: {key!r}")
+        return os.path.join(self.cache_dir, f"{key}.{FORMATS[fmt][0]}")
+
+    def get(self, key, fmt):
+        """Path of a stored rendition, or None"""
+        path = self._path(key, fmt)
+        try:
+            os.utime(path)  # LRU: mark as recently used
+        except OSError:
+            return None
+        return path
+
+    def put(self, key, fmt, data):
+        """Store an encoded rendition; returns its path"""
+        path = self._path(key, fmt)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{key[:16]}_", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self.evict()
+        return path
+
+    def evict(self):
+        """
+        Remove least recently used renditions until the cache fits max_bytes.
+
+        Returns:
+            Number of files removed
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.startswith("."):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        used = sum(size for _mtime, size, _path in entries)
+        removed = 0
+        for _mtime, size, path in sorted(entries):
+            if used <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            used -= size
+            removed += 1
+        if removed:
+            logger.info(f"Rendition cache: {removed} files evicted")
+        return removed
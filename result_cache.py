@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC System - content-addressed analysis result cache
+
+Finished analyses are stored under their cache key (see
+textile_qc.fingerprint.analysis_cache_key): one directory per key holding
+result.json (scores), the generated PDF files and, when available, the
+report context the PDFs were rendered from (report/, used to render them
+again for another operator or time zone). Entries are plain files, so
+every worker process on the host shares the cache. The total size is bounded;
+least recently used entries (directory mtime, refreshed on every hit) are
+evicted first.
+"""
+
+import os
+import json
+import shutil
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+RESULT_FILE = "result.json"
+REPORT_DIR = "report"
+
+
+def _dir_size(path):
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of analysis results and report files.
+
+    Args:
+        cache_dir: Directory for the cache entries
+        max_bytes: Total size limit of all entries
+        counters: Optional store with incr_counter(name)/counters() (e.g. a
+                  session backend) so hit/miss counts cover all workers
+    """
+
+    def __init__(self, cache_dir, max_bytes, counters=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.counters = counters
+        self._local_counters = {}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_dir(self, key):
+        if not key or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        return os.path.join(self.cache_dir, key)
+
+    def _count(self, name):
+        if self.counters is not None:
+            self.counters.incr_counter(f"result_cache_{name}")
+        else:
+            with self._lock:
+                self._local_counters[name] = self._local_counters.get(name, 0) + 1
+
+    def get(self, key):
+        """
+        Look up a cached analysis.
+
+        Returns:
+            {'result': dict, 'files': {filename: path}, 'report_dir': path or None}
+            or None
+        """
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, RESULT_FILE), encoding="utf-8") as f:
+                result = json.load(f)
+            files = {name: os.path.join(entry_dir, name) for name in os.listdir(entry_dir)
+                     if name != RESULT_FILE and name != REPORT_DIR}
+            report_dir = os.path.join(entry_dir, REPORT_DIR)
+            os.utime(entry_dir)  # LRU: mark as recently used
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return {'result': result, 'files': files,
+                'report_dir': report_dir if os.path.isdir(report_dir) else None}
+
+    def put(self, key, result, files, report_dir=None):
+        """
+        Store an analysis result and copies of its report files.
+
+        Args:
+            key: Cache key
+            result: JSON-serializable result dict
+            files: Paths of the files to keep (stored under their base name)
+            report_dir: Optional saved report context directory (copied)
+        """
+        entry_dir = self._entry_dir(key)
+        # Build the entry next to its final location, then rename it into place
+        staging = tempfile.mkdtemp(prefix=f".{key[:16]}_", dir=self.cache_dir)
+        try:
+            for path in files:
+                shutil.copy2(path, os.path.join(staging, os.path.basename(path)))
+            if report_dir is not None:
+                shutil.copytree(report_dir, os.path.join(staging, REPORT_DIR))
+            with open(os.path.join(staging, RESULT_FILE), "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            try:
+                os.rename(staging, entry_dir)
+            except OSError:
+                # Another worker stored the same key first
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.evict()
+
+    def restore(self, entry, dest_dir):
+        """
+        Make a cached entry's files available in dest_dir (hard links when
+        possible, copies otherwise).
+
+        Returns:
+            {filename: path in dest_dir}
+        """
+        restored = {}
+        for name, src in entry['files'].items():
+            dst = os.path.join(dest_dir, name)
+            if not os.path.exists(dst):
+                try:
+                    os.link(src, dst)
+                except OSError:
+                    shutil.copy2(src, dst)
+            restored[name] = dst
+        return restored
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            try:
+                entries.append((os.path.getmtime(path), _dir_size(path), path))
+            except OSError:
+                continue
+        used = sum(size for _mtime, size, _path in entries)
+        removed = 0
+        for _mtime, size, path in sorted(entries):
+            if used <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            used -= size
+            removed += 1
+            self._count("evictions")
+            logger.info(f"Result cache entry evicted: {os.path.basename(path)}")
+        return removed
+
+    def metrics(self):
+        """Hit/miss/eviction counters, entry count and size"""
+        if self.counters is not None:
+            counters = {k[len("result_cache_"):]: v for k, v in self.counters.counters().items()
+                        if k.startswith("result_cache_")}
+        else:
+            with self._lock:
+                counters = dict(self._local_counters)
+        entries = [os.path.join(self.cache_dir, n) for n in os.listdir(self.cache_dir)
+                   if not n.startswith(".")]
+        return {
+            'entries': len(entries),
+            'bytes_used': sum(_dir_size(p) for p in entries),
+            'max_bytes': self.max_bytes,
+            'hits': counters.get('hits', 0),
+            'misses': counters.get('misses', 0),
+            'evictions': counters.get('evictions', 0),
+        }
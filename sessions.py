@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC System - upload session store
+
+Each upload creates a session directory holding the two images and, once
+analysed, the generated PDFs. Sessions expire after a configurable idle TTL
+and the total size of all session directories is kept under a disk quota by
+evicting the least recently used sessions first. A background reaper thread
+applies both limits periodically; sessions that an analysis is currently
+using are never evicted.
+
+Session metadata lives in a pluggable backend:
+    MemorySessionBackend - in-process dict (single worker)
+    SQLiteSessionBackend - SQLite file shared by all worker processes on a
+                           host, so upload, analyze, job polling and download
+                           may each land on a different gunicorn worker
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# Defaults
+# ----------------------------
+DEFAULT_SESSION_TTL_S = 3600
+DEFAULT_REAP_INTERVAL_S = 60
+
+# A pin older than this is assumed to belong to a worker that died mid-analysis
+STALE_PIN_S = 6 * 3600
+
+# Decoded images of this many sessions are kept in process memory
+ARRAY_CACHE_SESSIONS = 16
+
+# Columns kept outside the JSON payload (used by eviction queries)
+RECORD_COLUMNS = ('session_id', 'created', 'last_access', 'bytes', 'in_use')
+
+
+class SessionExpiredError(LookupError):
+    """Raised when a session was evicted (TTL or disk quota) or never existed"""
+
+    def __init__(self, session_id):
+        super().__init__(f"Session {session_id} has expired, please upload the images again")
+        self.session_id = session_id
+
+
+def _dir_size(path):
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+
+class MemorySessionBackend:
+    """Session metadata in a process-local dict (one worker process only)"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._jobs = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def insert(self, record):
+        with self._lock:
+            self._sessions[record['session_id']] = dict(record)
+
+    def get(self, session_id):
+        with self._lock:
+            record = self._sessions.get(session_id)
+            return dict(record) if record is not None else None
+
+    def update(self, session_id, fields, pin_delta=0):
+        """Merge fields into a session (and adjust its pin count); None if unknown"""
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None:
+                return None
+            record.update(fields)
+            record['in_use'] = max(0, record['in_use'] + pin_delta)
+            return dict(record)
+
+    def delete(self, session_id):
+        with self._lock:
+            record = self._sessions.pop(session_id, None)
+            for job_id in [j for j, job in self._jobs.items() if job.get('session_id') == session_id]:
+                del self._jobs[job_id]
+            return record
+
+    def all(self):
+        with self._lock:
+            return [dict(r) for r in self._sessions.values()]
+
+    def save_job(self, job):
+        with self._lock:
+            self._jobs[job['job_id']] = dict(job)
+
+    def get_job(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def incr_counter(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+class SQLiteSessionBackend:
+    """
+    Session metadata in a SQLite database (WAL mode) shared by every worker
+    process on the host. Connections are opened per thread and per process.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._transaction() as db:
+            db.execute("""CREATE TABLE IF NOT EXISTS sessions (
+                              session_id TEXT PRIMARY KEY,
+                              created REAL, last_access REAL,
+                              bytes INTEGER, in_use INTEGER,
+                              data TEXT)""")
+            db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+                              job_id TEXT PRIMARY KEY, session_id TEXT, data TEXT)""")
+            db.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+
+    def _connect(self):
+        db = getattr(self._local, 'db', None)
+        if db is None or self._local.pid != os.getpid():
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            self._local.pid = os.getpid()
+        return db
+
+    @contextmanager
+    def _transaction(self):
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    @staticmethod
+    def _to_record(row):
+        record = json.loads(row[5])
+        record.update(zip(RECORD_COLUMNS, row[:5]))
+        return record
+
+    @staticmethod
+    def _to_row(record):
+        data = {k: v for k, v in record.items() if k not in RECORD_COLUMNS}
+        return tuple(record[k] for k in RECORD_COLUMNS) + (json.dumps(data),)
+
+    def insert(self, record):
+        with self._transaction() as db:
+            db.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)", self._to_row(record))
+
+    def get(self, session_id):
+        row = self._connect().execute("SELECT * FROM sessions WHERE session_id = ?",
+                                      (session_id,)).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def update(self, session_id, fields, pin_delta=0):
+        """Merge fields into a session (and adjust its pin count); None if unknown"""
+        with self._transaction() as db:
+            row = db.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            record = self._to_record(row)
+            record.update(fields)
+            record['in_use'] = max(0, record['in_use'] + pin_delta)
+            db.execute("REPLACE INTO sessions VALUES (?, ?, ?, ?, ?, ?)", self._to_row(record))
+        return record
+
+    def delete(self, session_id):
+        with self._transaction() as db:
+            row = db.execute("SELECT * FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            db.execute("DELETE FROM jobs WHERE session_id = ?", (session_id,))
+        return self._to_record(row)
+
+    def all(self):
+        return [self._to_record(row) for row in self._connect().execute("SELECT * FROM sessions")]
+
+    def save_job(self, job):
+        with self._transaction() as db:
+            db.execute("REPLACE INTO jobs VALUES (?, ?, ?)",
+                       (job['job_id'], job.get('session_id', ''), json.dumps(job)))
+
+    def get_job(self, job_id):
+        row = self._connect().execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def incr_counter(self, name, amount=1):
+        with self._transaction() as db:
+            db.execute("INSERT INTO counters VALUES (?, ?) "
+                       "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", (name, amount))
+
+    def counters(self):
+        return dict(self._connect().execute("SELECT name, value FROM counters"))
+
+
+def create_session_backend(kind, root_dir):
+    """
+    Build a session backend by name.
+
+    Args:
+        kind: "sqlite" (shared by all workers on the host) or "memory"
+        root_dir: Session root directory (holds the SQLite file)
+    """
+    if kind == "memory":
+        return MemorySessionBackend()
+    if kind == "sqlite":
+        return SQLiteSessionBackend(os.path.join(root_dir, "sessions.sqlite3"))
+    raise ValueError(f"Unknown session backend: {kind} (expected 'sqlite' or 'memory')")
+
+
+# ----------------------------
+# Session manager
+# ----------------------------
+
+class SessionManager:
+    """
+    Upload sessions with idle expiry and an LRU disk quota.
+
+    Session records are plain dicts (ref_path, sample_path, results, ...) plus
+    the bookkeeping keys 'session_id', 'dir', 'created', 'last_access',
+    'bytes' and 'in_use'. Records are snapshots: change a session through
+    update(), not by mutating the dict.
+
+    The reaper thread is started on first use (and re-started after a fork),
+    so the manager can be constructed at import time in a preloaded gunicorn
+    master.
+
+    Args:
+        root_dir: Directory that holds one subdirectory per session
+        ttl_s: Idle time after which a session is removed
+        max_bytes: Disk quota for all sessions (None = unlimited)
+        reap_interval_s: How often the background reaper runs
+        backend: Session metadata backend (default: MemorySessionBackend)
+    """
+
+    def __init__(self, root_dir, ttl_s=DEFAULT_SESSION_TTL_S, max_bytes=None,
+                 reap_interval_s=DEFAULT_REAP_INTERVAL_S, backend=None):
+        self.root_dir = root_dir
+        self.ttl_s = ttl_s
+        self.max_bytes = max_bytes
+        self.reap_interval_s = reap_interval_s
+        self.backend = backend if backend is not None else MemorySessionBackend()
+        self._lock = threading.Lock()
+        self._reaper = None
+        self._pid = None
+        self._arrays = OrderedDict()
+
+    # ---------------- Session lifecycle ----------------
+
+    def create(self):
+        """
+        Create an empty session directory.
+
+        Returns:
+            (session_id, session_dir)
+        """
+        self._ensure_reaper()
+        session_id = str(uuid.uuid4())
+        session_dir = os.path.join(self.root_dir, session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        now = time.time()
+        self.backend.insert({
+            'session_id': session_id,
+            'dir': session_dir,
+            'created': now,
+            'last_access': now,
+            'bytes': 0,
+            'in_use': 0,
+            'results': None,
+        })
+        return session_id, session_dir
+
+    def get(self, session_id):
+        """Session record (and mark it as recently used), or None"""
+        self._ensure_reaper()
+        return self.backend.update(session_id, {'last_access': time.time()})
+
+    def update(self, session_id, **fields):
+        """
+        Store fields on a session and re-measure its directory (call after
+        writing files into it). Enforces the disk quota.
+        """
+        session = self.backend.update(session_id, dict(fields, last_access=time.time()))
+        if session is None:
+            raise SessionExpiredError(session_id)
+        session = self.backend.update(session_id, {'bytes': _dir_size(session['dir'])})
+        self.enforce_quota(keep=session_id)
+        return session
+
+    @contextmanager
+    def use(self, session_id):
+        """Pin a session for the duration of an analysis (no eviction)."""
+        session = self.backend.update(session_id, {'last_access': time.time()}, pin_delta=1)
+        if session is None:
+            raise SessionExpiredError(session_id)
+        try:
+            yield session
+        finally:
+            # Reports were written into the session directory
+            self.backend.update(session_id, {'last_access': time.time(),
+                                             'bytes': _dir_size(session['dir'])}, pin_delta=-1)
+            self.enforce_quota(keep=session_id)
+
+    def remove(self, session_id):
+        """Delete a session and its files (no-op if unknown)."""
+        session = self.backend.delete(session_id)
+        with self._lock:
+            self._arrays.pop(session_id, None)
+        if session is not None:
+            shutil.rmtree(session['dir'], ignore_errors=True)
+        return session is not None
+
+    # ---------------- Decoded images ----------------
+
+    def save_arrays(self, session_id, **arrays):
+        """
+        Keep decoded images with a session: in this process's memory (the
+        last ARRAY_CACHE_SESSIONS sessions) and as .npy files in the session
+        directory for the other workers. Call update() afterwards so the files
+        count against the quota. Stored arrays are read-only.
+        """
+        import numpy as np
+        session_dir = os.path.join(self.root_dir, session_id)
+        for name, arr in arrays.items():
+            arr.setflags(write=False)
+            tmp_path = os.path.join(session_dir, f".{name}.npy")
+            np.save(tmp_path, arr, allow_pickle=False)
+            os.replace(tmp_path, os.path.join(session_dir, f"{name}.npy"))
+        self._cache_arrays(session_id, arrays)
+
+    def load_arrays(self, session_id, *names):
+        """Read-only decoded images saved by save_arrays() (any worker), or None if missing"""
+        import numpy as np
+        with self._lock:
+            cached = self._arrays.get(session_id, {})
+            if all(name in cached for name in names):
+                self._arrays.move_to_end(session_id)
+                return tuple(cached[name] for name in names)
+        try:
+            loaded = {name: np.load(os.path.join(self.root_dir, session_id, f"{name}.npy"), allow_pickle=False)
+                      for name in names}
+        except OSError:
+            return None
+        for arr in loaded.values():
+            arr.setflags(write=False)
+        self._cache_arrays(session_id, loaded)
+        return tuple(loaded[name] for name in names)
+
+    def _cache_arrays(self, session_id, arrays):
+        with self._lock:
+            self._arrays.setdefault(session_id, {}).update(arrays)
+            self._arrays.move_to_end(session_id)
+            while len(self._arrays) > ARRAY_CACHE_SESSIONS:
+                self._arrays.popitem(last=False)
+
+    # ---------------- Jobs ----------------
+
+    def save_job(self, job):
+        """Publish a job's state (AnalysisJob.to_dict()) to every worker"""
+        self.backend.save_job(job)
+
+    def get_job(self, job_id):
+        """Job state saved by any worker, or None"""
+        return self.backend.get_job(job_id)
+
+    # ---------------- Eviction ----------------
+
+    def reap(self):
+        """
+        Remove sessions idle for longer than the TTL, then enforce the quota.
+
+        Returns:
+            Number of sessions removed
+        """
+        now = time.time()
+        removed = 0
+        for s in self.backend.all():
+            idle = now - s['last_access']
+            if idle > self.ttl_s and (not s['in_use'] or idle > STALE_PIN_S):
+                if self.remove(s['session_id']):
+                    removed += 1
+                    self.backend.incr_counter('evicted_ttl')
+                    logger.info(f"Session expired: {s['session_id']}")
+        return removed + self.enforce_quota()
+
+    def enforce_quota(self, keep=None):
+        """
+        Evict least recently used sessions until the total fits max_bytes.
+        Sessions in use (and the session keep) are skipped, so the quota can
+        be exceeded temporarily.
+
+        Returns:
+            Number of sessions evicted
+        """
+        if self.max_bytes is None:
+            return 0
+        sessions = self.backend.all()
+        used = sum(s['bytes'] for s in sessions)
+        if used <= self.max_bytes:
+            return 0
+        candidates = sorted((s for s in sessions if not s['in_use'] and s['session_id'] != keep),
+                            key=lambda s: s['last_access'])
+        evicted = 0
+        for s in candidates:
+            if used <= self.max_bytes:
+                break
+            used -= s['bytes']
+            if self.remove(s['session_id']):
+                evicted += 1
+                self.backend.incr_counter('evicted_quota')
+                logger.info(f"Session evicted (disk quota): {s['session_id']}")
+        return evicted
+
+    def _ensure_reaper(self):
+        if self.reap_interval_s is None:
+            return
+        with self._lock:
+            if self._reaper is not None and self._pid == os.getpid() and self._reaper.is_alive():
+                return
+            self._pid = os.getpid()
+            self._reaper = threading.Thread(target=self._reap_loop, name="session-reaper", daemon=True)
+            self._reaper.start()
+
+    def _reap_loop(self):
+        while True:
+            time.sleep(self.reap_interval_s)
+            try:
+                self.reap()
+            except Exception as e:
+                logger.error(f"Session reaper error: {e}")
+
+    # ---------------- Metrics ----------------
+
+    def metrics(self):
+        """Live session count, disk usage and eviction counters"""
+        sessions = self.backend.all()
+        counters = self.backend.counters()
+        return {
+            'backend': type(self.backend).__name__,
+            'live_sessions': len(sessions),
+            'active_sessions': sum(1 for s in sessions if s['in_use']),
+            'bytes_used': sum(s['bytes'] for s in sessions),
+            'quota_bytes': self.max_bytes,
+            'ttl_s': self.ttl_s,
+            'evicted_ttl': counters.get('evicted_ttl', 0),
+            'evicted_quota': counters.get('evicted_quota', 0),
+        }
@@ -216,6 +216,9 @@ function showImagePreview(prefix, src, fileName) {
     if (preview && placeholder) {
         var img = new Image();
         img.onload = function() {
+            // Full-size upload: the natural size is the source size
+            delete preview.dataset.sourceWidth;
+            delete preview.dataset.sourceHeight;
             preview.src = src;
             preview.style.display = 'block';
             placeholder.style.display = 'none';
@@ -1031,7 +1034,7 @@ function runSequentialAnalysis() {
         var controller = new AbortController();
         var timeoutId = setTimeout(function() {
             controller.abort();
-        }, 300000); // 5 minute timeout
+        }, 900000); // 15 minute timeout (includes time spent queued)
         
         fetch('/api/analyze', {
             method: 'POST',
@@ -1050,7 +1053,7 @@ function runSequentialAnalysis() {
                 }
                 try {
                     var data = JSON.parse(text);
-                    if (data.error && data.decision === 'ERROR') {
+                    if (data.error && (data.decision === 'ERROR' || !response.ok)) {
                         // Include error details if available
                         var errorMsg = data.error;
                         if (data.error_details) {
@@ -1070,6 +1073,11 @@ function runSequentialAnalysis() {
             });
         })
         .then(function(data) {
+            // The server queues the analysis and returns a job id to poll
+            return data.job_id && !data.decision ? pollAnalysisJob(data.job_id, controller.signal) : data;
+        })
+        .then(function(data) {
+            clearTimeout(timeoutId);
             analysisResult = data;
             analysisComplete = true;
         })
@@ -1087,6 +1095,30 @@ function runSequentialAnalysis() {
     });
 }
 
+// Poll /api/jobs/<id> until the queued analysis has finished
+function pollAnalysisJob(jobId, signal) {
+    return new Promise(function(resolve, reject) {
+        function poll() {
+            fetch('/api/jobs/' + encodeURIComponent(jobId), { signal: signal })
+            .then(function(response) { return response.json(); })
+            .then(function(job) {
+                if (job.state === 'done') {
+                    resolve(job.result);
+                } else if (job.state === 'failed' || job.error) {
+                    if (job.error_details) {
+                        console.error('Server error details:', job.error_details);
+                    }
+                    reject(new Error(job.error || 'Analysis failed'));
+                } else {
+                    setTimeout(poll, 1000);
+                }
+            })
+            .catch(reject);
+        }
+        poll();
+    });
+}
+
 // ==========================================
 // Progress Modal - Sequential Steps with Green Checkmarks
 // ==========================================
@@ -1607,6 +1639,7 @@ function collectSettings() {
         enable_pattern_repetition: getCheck('enable_pattern_repetition', true),
         enable_spectrophotometer: getCheck('enable_spectrophotometer', true),
         enable_analysis_settings: getCheck('enable_analysis_settings', false),
+        enable_stage_profile: getCheck('enable_stage_profile', false),
         
         // Report Sections - Color Sub-sections
         enable_color_measurements: getCheck('enable_color_measurements', true),
@@ -2112,6 +2145,32 @@ function loadSamples() {
         });
 }
 
+// URL of a sample image rendition ('thumb' or 'preview'), falling back to the original
+function sampleImageUrl(sample, role, rendition) {
+    var info = sample.images && sample.images[role];
+    if (info && info[rendition]) return info[rendition];
+    return '/api/samples/image/' + sample[role];
+}
+
+// Record the original size of a sample image on its preview element (renditions are
+// smaller than the source); set before loading so crop coordinates use source pixels
+function setSampleSourceSize(img, sample, role) {
+    var info = sample.images && sample.images[role];
+    if (info && info.size) {
+        img.dataset.sourceWidth = info.size[0];
+        img.dataset.sourceHeight = info.size[1];
+    } else {
+        delete img.dataset.sourceWidth;
+        delete img.dataset.sourceHeight;
+    }
+}
+
+// "W×H" of the source image shown in a preview element
+function previewSourceSize(img) {
+    if (img.dataset.sourceWidth) return img.dataset.sourceWidth + '×' + img.dataset.sourceHeight;
+    return img.naturalWidth + '×' + img.naturalHeight;
+}
+
 function renderSampleCards(samples) {
     var body = document.getElementById('samplesSidebarBody');
     if (!body) return;
@@ -2127,11 +2186,11 @@ function renderSampleCards(samples) {
                 <div class="sample-card-images">
                     <div class="sample-card-image-wrapper">
                         <span class="sample-card-image-label">` + I18n.t('ref.label') + `</span>
-                        <img src="/api/samples/image/${sample.reference}" alt="Reference" class="sample-card-image">
+                        <img src="${sampleImageUrl(sample, 'reference', 'thumb')}" alt="Reference" class="sample-card-image" loading="lazy" decoding="async">
                     </div>
                     <div class="sample-card-image-wrapper">
                         <span class="sample-card-image-label">` + I18n.t('sample.label') + `</span>
-                        <img src="/api/samples/image/${sample.sample}" alt="Sample" class="sample-card-image">
+                        <img src="${sampleImageUrl(sample, 'sample', 'thumb')}" alt="Sample" class="sample-card-image" loading="lazy" decoding="async">
                     </div>
                 </div>
                 <button class="sample-card-btn" data-sample-id="${sample.id}" type="button">
@@ -2193,12 +2252,13 @@ function loadSampleImages(sample) {
     var refInfo = document.getElementById('refInfo');
     
     if (refPreview && refPlaceholder) {
-        refPreview.src = '/api/samples/image/' + sample.reference;
+        setSampleSourceSize(refPreview, sample, 'reference');
+        refPreview.src = sampleImageUrl(sample, 'reference', 'preview');
         refPreview.onload = function() {
             refPreview.style.display = 'block';
             refPlaceholder.style.display = 'none';
             if (refInfo) {
-                refInfo.textContent = refPreview.naturalWidth + '×' + refPreview.naturalHeight;
+                refInfo.textContent = previewSourceSize(refPreview);
                 refInfo.style.display = 'inline-block';
             }
             if (refInfoName) {
@@ -2217,12 +2277,13 @@ function loadSampleImages(sample) {
     var testInfo = document.getElementById('testInfo');
     
     if (testPreview && testPlaceholder) {
-        testPreview.src = '/api/samples/image/' + sample.sample;
+        setSampleSourceSize(testPreview, sample, 'sample');
+        testPreview.src = sampleImageUrl(sample, 'sample', 'preview');
         testPreview.onload = function() {
             testPreview.style.display = 'block';
             testPlaceholder.style.display = 'none';
             if (testInfo) {
-                testInfo.textContent = testPreview.naturalWidth + '×' + testPreview.naturalHeight;
+                testInfo.textContent = previewSourceSize(testPreview);
                 testInfo.style.display = 'inline-block';
             }
             if (testInfoName) {
@@ -179,6 +179,7 @@ var I18n = {
             'pattern.repetition.unit': 'Pattern Repetition',
             'spectrophotometer': 'Spectrophotometer',
             'analysis.settings.page': 'Analysis Settings Page',
+            'analysis.stage.profile': 'Stage Timing',
             'operator.info': 'Operator Info',
             'operator.name': 'Operator Name',
             'operator': 'Operator',
@@ -289,6 +290,7 @@ var I18n = {
             'pattern.rep.hint': 'Repeat detection, spatial analysis',
             'spectro.hint': 'Simulated instrument readings',
             'settings.page.hint': 'Include all settings used in analysis',
+            'stage.profile.hint': 'Time and memory of every analysis stage in the settings report',
             'color.subsections': 'Color Unit Sub-sections',
             'color.subsections.desc': 'Fine-tune color analysis report content.',
             'color.measurements': 'Color Measurements',
@@ -554,6 +556,7 @@ var I18n = {
             'pattern.repetition.unit': 'Desen Tekrarı',
             'spectrophotometer': 'Spektrofotometre',
             'analysis.settings.page': 'Analiz Ayarları Sayfası',
+            'analysis.stage.profile': 'Aşama Süreleri',
             'operator.info': 'Operatör Bilgisi',
             'operator.name': 'Operatör Adı',
             'operator': 'Operatör',
@@ -664,6 +667,7 @@ var I18n = {
             'pattern.rep.hint': 'Tekrar algılama, uzaysal analiz',
             'spectro.hint': 'Simüle edilmiş cihaz okumaları',
             'settings.page.hint': 'Analizde kullanılan tüm ayarları dahil et',
+            'stage.profile.hint': 'Ayarlar raporunda her analiz aşamasının süresi ve belleği',
             'color.subsections': 'Renk Birimi Alt Bölümleri',
             'color.subsections.desc': 'Renk analizi rapor içeriğini ince ayarlayın.',
             'color.measurements': 'Renk Ölçümleri',
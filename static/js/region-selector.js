@@ -163,20 +163,33 @@ var RegionSelector = (function() {
         }
     }
 
+    /**
+     * Source pixel size of a preview image (a scaled-down rendition records
+     * the original size in data-source-width/height)
+     */
+    function sourceSize(img) {
+        return {
+            width: parseInt(img.dataset.sourceWidth, 10) || img.naturalWidth,
+            height: parseInt(img.dataset.sourceHeight, 10) || img.naturalHeight
+        };
+    }
+
     /**
      * Update image dimensions when images are loaded
      */
     function updateImageDimensions(type) {
         if (type === 'ref' && elements.refImage) {
+            var refSource = sourceSize(elements.refImage);
             state.refImageWidth = elements.refImage.clientWidth;
             state.refImageHeight = elements.refImage.clientHeight;
-            state.refOriginalWidth = elements.refImage.naturalWidth;
-            state.refOriginalHeight = elements.refImage.naturalHeight;
+            state.refOriginalWidth = refSource.width;
+            state.refOriginalHeight = refSource.height;
         } else if (type === 'test' && elements.testImage) {
+            var testSource = sourceSize(elements.testImage);
             state.testImageWidth = elements.testImage.clientWidth;
             state.testImageHeight = elements.testImage.clientHeight;
-            state.testOriginalWidth = elements.testImage.naturalWidth;
-            state.testOriginalHeight = elements.testImage.naturalHeight;
+            state.testOriginalWidth = testSource.width;
+            state.testOriginalHeight = testSource.height;
         }
         
         // Update selection if placed
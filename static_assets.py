@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC System - fingerprinted and precompressed static assets
+
+Static URLs carry a fingerprint of the file contents (?v=<hash>), so the
+browser may keep them for a year and a changed file is fetched under a new
+URL. Text assets (JS, CSS, HTML, SVG, JSON) are also served precompressed:
+gzip always, brotli when the optional brotli package is installed. The
+compressed variants are built once per file version into a cache directory
+shared by all worker processes.
+"""
+
+import os
+import gzip
+import logging
+import tempfile
+import threading
+
+from werkzeug.security import safe_join
+
+from renditions import file_digest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_LENGTH = 12
+
+# Files worth compressing (images and PDFs are already compressed)
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.html', '.svg', '.json', '.txt', '.map')
+# Smaller files are sent as they are
+MIN_COMPRESS_BYTES = 1024
+
+# Content-Encoding -> (file suffix, compress function); in order of preference
+ENCODINGS = {}
+if brotli is not None:
+    ENCODINGS['br'] = ('.br', lambda data: brotli.compress(data, quality=11))
+ENCODINGS['gzip'] = ('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))
+
+
+class StaticAssets:
+    """
+    Fingerprints and precompressed variants of the files in a static folder.
+
+    Args:
+        static_dir: Folder served under /static/
+        cache_dir: Folder for the compressed variants
+    """
+
+    def __init__(self, static_dir, cache_dir):
+        self.static_dir = static_dir
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, filename):
+        """Path of a static file, or None if it does not exist (or escapes the folder)"""
+        path = safe_join(self.static_dir, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        return path
+
+    def fingerprint(self, filename):
+        """Content hash prefix of a static file (None if missing)"""
+        path = self.path(filename)
+        if path is None:
+            return None
+        return file_digest(path)[:FINGERPRINT_LENGTH]
+
+    def url(self, filename):
+        """Fingerprinted URL of a static file"""
+        version = self.fingerprint(filename)
+        if version is None:
+            logger.warning(f"Static file not found: {filename}")
+            return f"/static/{filename}"
+        return f"/static/{filename}?v={version}"
+
+    def encoding_for(self, filename, accept_encodings):
+        """
+        Best precompressed variant of a static file the client accepts.
+
+        Args:
+            filename: Static file name
+            accept_encodings: Callable returning the quality of an encoding
+                              (request.accept_encodings.quality)
+
+        Returns:
+            (encoding, path) of the compressed variant, or None to send the
+            file as it is
+        """
+        if not filename.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            return None
+        path = self.path(filename)
+        if path is None or os.path.getsize(path) < MIN_COMPRESS_BYTES:
+            return None
+        for encoding in ENCODINGS:
+            if accept_encodings(encoding) > 0:
+                return encoding, self.compressed(path, encoding)
+        return None
+
+    def compressed(self, path, encoding):
+        """Path of the compressed variant of a file, built on first use"""
+        suffix, compress = ENCODINGS[encoding]
+        digest = file_digest(path)
+        name = f"{digest[:32]}{os.path.splitext(path)[1]}{suffix}"
+        variant = os.path.join(self.cache_dir, name)
+        if os.path.exists(variant):
+            return variant
+        with self._lock:
+            if os.path.exists(variant):
+                return variant
+            with open(path, 'rb') as f:
+                data = compress(f.read())
+            fd, tmp_path = tempfile.mkstemp(prefix=f".{name}_", dir=self.cache_dir)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, variant)
+        return variant
+
+    def precompress(self):
+        """Build the compressed variants of all text assets (e.g. at startup); returns the count"""
+        built = 0
+        for root, _dirs, files in os.walk(self.static_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS) or os.path.getsize(path) < MIN_COMPRESS_BYTES:
+                    continue
+                for encoding in ENCODINGS:
+                    self.compressed(path, encoding)
+                    built += 1
+        return built
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""Single-pass ΔE kernel against the color.py reference formulas"""
+
+from textile_qc.delta_e import check_consistency
+
+# float32 maps round the inputs and every intermediate
+MAX_ERROR = {"float64": 1e-9, "float32": 1e-3}
+
+
+def test_consistent_with_reference_formulas():
+    for name, errors in check_consistency(pixels=50000).items():
+        dtype = name.split()[-1]
+        for metric, error in errors.items():
+            assert error <= MAX_ERROR[dtype], f"{name} {metric}: {error:.2e}"
@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""Table-driven sRGB -> Lab conversion against the float64 reference chain"""
+
+import pytest
+
+from textile_qc.color import WHITE_POINTS
+from textile_qc.lab_lut import MAX_DELTA_E76, check_accuracy
+
+
+@pytest.mark.parametrize("illuminant", sorted(WHITE_POINTS))
+def test_accuracy_within_bound(illuminant):
+    result = check_accuracy([illuminant], step=15)[illuminant]
+    assert result['max_delta_e76'] <= MAX_DELTA_E76
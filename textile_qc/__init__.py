@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC analysis engine
+
+Importable package form of the analysis code used by the Flask application
+(the Colab edition is still shipped as the standalone BackEND.py script).
+
+Modules:
+    config           - report theme, margins and logo paths
+    i18n             - report translations (English / Turkish)
+    settings         - QCSettings dataclass
+    imaging          - image loading, validation and ROI cropping
+    color            - colorimetry and ΔE formulas
+    lab_lut          - table-driven sRGB -> Lab conversion per illuminant
+    delta_e          - ΔE76 / ΔE94 / ΔE2000 / CMC together in one blocked pass
+    delta_e_jit      - optional Numba kernel for delta_e (parallel per-pixel loop)
+    metamerism       - mean ΔE of a pair under several illuminants in one pass
+    palette          - ΔE once per distinct reference/sample color pair (limited colorways)
+    texture          - texture analyzers (FFT, Gabor, GLCM, LBP, wavelet, ...)
+    patterns         - pattern repetition analyzers
+    scoring          - status decisions and sample point selection
+    decision         - decision-only analysis (no charts / PDF)
+    reference        - reference feature memo (shared across a batch)
+    batch            - one reference against many samples
+    cost             - memory / CPU cost model for admission control
+    fingerprint      - image / settings content hashes for result caching
+    report_context   - stored report context (reports rendered again from a cached analysis)
+    stages           - stage timing hooks (metrics observers, per-analysis stage profile)
+    charts           - matplotlib chart helpers
+    fonts            - offline Unicode font registry for PDF output
+    pdf              - ReportLab fonts, styles and table helpers
+    pipeline         - run_pipeline_and_build_pdf, build_report_pdf
+    settings_report  - generate_analysis_settings_report
+"""
+
+import time
+import logging
+
+_import_started = time.perf_counter()
+
+from .config import SOFTWARE_VERSION
+from .i18n import TRANSLATIONS, get_text, tr, translate_status
+from .settings import QCSettings, get_local_time
+from .imaging import (read_rgb, load_rgb, read_image_size, load_analysis_pair,
+                      analysis_input_size, to_same_size)
+from .pipeline import run_pipeline_and_build_pdf, build_report_pdf
+from .report_context import load_report_context
+from .decision import run_decision_analysis, DECISION_LATENCY_TARGET_MS
+from .batch import run_batch_analysis, analyse_sample
+from .settings_report import generate_analysis_settings_report
+from .cost import estimate_analysis_cost
+from .fingerprint import image_digest, analysis_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Import-time budget for the engine (seconds). Exceeding it is logged so that
+# regressions in worker start-up time are visible in the server logs.
+IMPORT_TIME_BUDGET_S = 5.0
+IMPORT_TIME_S = time.perf_counter() - _import_started
+
+if IMPORT_TIME_S > IMPORT_TIME_BUDGET_S:
+    logger.warning(f"Analysis engine import took {IMPORT_TIME_S:.2f}s "
+                   f"(budget {IMPORT_TIME_BUDGET_S:.1f}s)")
+else:
+    logger.info(f"Analysis engine imported in {IMPORT_TIME_S:.2f}s")
+
+__version__ = SOFTWARE_VERSION
+
+
+def __getattr__(name):
+    # fonts.py loads ReportLab: resolved on first access, not at import
+    if name == "FONT_DIR":
+        from .fonts import FONT_DIR
+        return FONT_DIR
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = [
+    'QCSettings',
+    'run_pipeline_and_build_pdf',
+    'build_report_pdf',
+    'load_report_context',
+    'run_decision_analysis',
+    'DECISION_LATENCY_TARGET_MS',
+    'run_batch_analysis',
+    'analyse_sample',
+    'generate_analysis_settings_report',
+    'estimate_analysis_cost',
+    'image_digest',
+    'analysis_cache_key',
+    'read_rgb',
+    'load_rgb',
+    'read_image_size',
+    'load_analysis_pair',
+    'analysis_input_size',
+    'to_same_size',
+    'TRANSLATIONS',
+    'get_text',
+    'tr',
+    'translate_status',
+    'get_local_time',
+    'IMPORT_TIME_S',
+    'IMPORT_TIME_BUDGET_S',
+    'FONT_DIR',
+]
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - one reference against many samples
+
+The reference image is decoded once and its features are shared by every
+sample through a ReferenceFeatures memo; samples are analysed concurrently
+on a small thread pool. Each sample gets the full PDF report ("report"
+mode) or only the decision and scores ("decision" mode).
+"""
+
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .imaging import load_rgb
+from .reference import ReferenceFeatures
+from .decision import run_decision_analysis
+from .pipeline import run_pipeline_and_build_pdf
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# Batch analysis
+# ----------------------------
+BATCH_MODES = ("report", "decision")
+
+
+def analyse_sample(ref_path, ref, index, name, test, settings, ref_features, mode="report", output_dir=None):
+    """
+    Analyse one decoded sample of a batch against the reference.
+
+    Args:
+        ref_path: Path (or file name) of the reference image
+        ref: Decoded reference image
+        index: Position of the sample in the batch (1-based)
+        name: Sample file name
+        test: Decoded sample, same size as ref (load_rgb with size=ref's size)
+        settings: QCSettings shared by all samples
+        ref_features: ReferenceFeatures shared by all samples
+        mode: "report" or "decision"
+        output_dir: Parent directory of the per-sample report directory
+
+    Returns:
+        dict with decision and scores (decision mode: the full
+        run_decision_analysis result; report mode: also 'pdf_path')
+    """
+    if mode == "decision":
+        return run_decision_analysis(ref, test, settings, ref_features=ref_features)
+    sample_dir = os.path.join(output_dir or os.getcwd(), f"{index:03d}_{os.path.splitext(os.path.basename(name))[0]}")
+    os.makedirs(sample_dir, exist_ok=True)
+    result = run_pipeline_and_build_pdf(ref_path, name, ref, test, settings,
+                                        output_dir=sample_dir, ref_features=ref_features)
+    return {
+        'decision': result['decision'],
+        'color_score': result['color_score'],
+        'pattern_score': result['pattern_score'],
+        'overall_score': result['overall_score'],
+        'pdf_path': result['pdf_path'],
+    }
+
+
+def run_batch_analysis(ref_path, ref, samples, settings, output_dir=None, mode="report",
+                       max_workers=2, progress=None):
+    """
+    Analyse several samples against one reference.
+
+    Args:
+        ref_path: Path to the reference image
+        ref: Decoded reference image (samples are decoded straight to its size)
+        samples: List of (name, path) of the sample images
+        settings: QCSettings shared by all samples
+        output_dir: Directory for the reports (report mode); each sample gets
+                    its own subdirectory named after its position and name
+        mode: "report" (full PDF per sample) or "decision" (scores only)
+        max_workers: Samples analysed concurrently
+        progress: Optional callable receiving "samples <done>/<total>"
+
+    Returns:
+        dict with 'samples' (one entry per sample, input order; failed samples
+        carry 'error'), 'summary' (count per decision) and 'reference_features'
+        (memo statistics)
+    """
+    if mode not in BATCH_MODES:
+        raise ValueError(f"Unknown batch mode: {mode} (expected one of {', '.join(BATCH_MODES)})")
+
+    output_dir = output_dir or os.getcwd()
+    ref_features = ReferenceFeatures()
+    total = len(samples)
+    done = 0
+
+    def analyse(index, name, path):
+        test = load_rgb(path, size=(ref.shape[1], ref.shape[0]))
+        return analyse_sample(ref_path, ref, index, name, test, settings, ref_features,
+                              mode=mode, output_dir=output_dir)
+
+    results = [None] * total
+    if progress:
+        progress(f"samples 0/{total}")
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="batch") as pool:
+        futures = {pool.submit(analyse, i, name, path): (i, name) for i, (name, path) in enumerate(samples, start=1)}
+        for future in as_completed(futures):
+            i, name = futures[future]
+            try:
+                entry = dict(future.result(), success=True)
+            except Exception as e:
+                logger.error(f"Batch sample {name} failed: {e}")
+                entry = {'success': False, 'error': str(e)}
+            results[i - 1] = dict(entry, sample=name, index=i)
+            done += 1
+            if progress:
+                progress(f"samples {done}/{total}")
+
+    summary = {}
+    for entry in results:
+        key = entry.get('decision', 'ERROR')
+        summary[key] = summary.get(key, 0) + 1
+
+    return {
+        'samples': results,
+        'summary': summary,
+        'reference_features': ref_features.stats(),
+    }
@@ -0,0 +1,734 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - matplotlib chart helpers (saved to PNG for the PDF reports)
+"""
+
+import functools
+import threading
+
+import numpy as np
+import cv2
+from PIL import Image, ImageDraw, ImageFont
+from skimage.color import rgb2gray
+from skimage.util import img_as_ubyte
+
+from .config import DPI
+
+# ----------------------------
+# 5) Chart helpers (saved to PNG @ 300DPI)
+# ----------------------------
+# Charts are written to the caller's per-analysis directory (no shared image
+# folder). pyplot keeps a process-global "current figure", so drawing is
+# serialized across threads; the analyses themselves still run in parallel.
+_PYPLOT_LOCK = threading.RLock()
+
+def _pyplot():
+    """Import matplotlib on first use (charts are only drawn for PDF reports)"""
+    import matplotlib
+    matplotlib.use("Agg")  # Important: no inline backend
+    import matplotlib.pyplot as plt
+    return plt
+
+def _serialized(fn):
+    """Hold the pyplot lock for the whole figure (create, draw, save, close)"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with _PYPLOT_LOCK:
+            return fn(*args, **kwargs)
+    return wrapper
+
+@_serialized
+def save_fig(path):
+    plt = _pyplot()
+    plt.tight_layout()
+    plt.savefig(path, dpi=DPI, bbox_inches="tight")
+    plt.close()
+
+@_serialized
+def plot_rgb_hist(img_rgb, title, path):
+    plt = _pyplot()
+    data = img_rgb.reshape(-1,3)
+    plt.figure(figsize=(6,2.6))
+    plt.hist(data[:,0], bins=32, alpha=0.6, label='R')
+    plt.hist(data[:,1], bins=32, alpha=0.6, label='G')
+    plt.hist(data[:,2], bins=32, alpha=0.6, label='B')
+    plt.title(title)
+    plt.xlabel("Value")
+    plt.ylabel("Count")
+    plt.legend()
+    save_fig(path)
+
+@_serialized
+def plot_heatmap(de_map, title, path):
+    plt = _pyplot()
+    vmax = np.percentile(de_map, 99)
+    plt.figure(figsize=(7,3))
+    im = plt.imshow(de_map, cmap="inferno", vmin=0, vmax=vmax)
+    plt.title(title)
+    plt.axis("off")
+    plt.colorbar(im, fraction=0.025)
+    save_fig(path)
+
+@_serialized
+def plot_spectral_proxy(mean_rgb_ref, mean_rgb_test, path):
+    plt = _pyplot()
+    # Build a simple proxy spectral curve using Gaussians for RGB primaries
+    wl = np.linspace(380, 700, 161)
+    def gaussian(w, mu, sigma):
+        return np.exp(-0.5*((w-mu)/sigma)**2)
+    # Centers approx: B~450, G~545, R~610 nm
+    base_R = gaussian(wl, 610, 28)
+    base_G = gaussian(wl, 545, 25)
+    base_B = gaussian(wl, 450, 22)
+    ref_curve = (mean_rgb_ref[0]*base_R + mean_rgb_ref[1]*base_G + mean_rgb_ref[2]*base_B)
+    test_curve= (mean_rgb_test[0]*base_R + mean_rgb_test[1]*base_G + mean_rgb_test[2]*base_B)
+    ref_curve /= ref_curve.max()+1e-8
+    test_curve/= test_curve.max()+1e-8
+    plt.figure(figsize=(7,3))
+    plt.plot(wl, ref_curve, label="Reference")
+    plt.plot(wl, test_curve, label="Sample")
+    plt.xlabel("Wavelength (nm)")
+    plt.ylabel("Relative intensity")
+    plt.title("Spectral Distribution (Proxy from RGB)")
+    plt.grid(True, alpha=0.3)
+    plt.legend()
+    save_fig(path)
+
+@_serialized
+def plot_ab_scatter(lab_ref, lab_test, path):
+    plt = _pyplot()
+    a_ref = lab_ref[...,1].flatten()
+    b_ref = lab_ref[...,2].flatten()
+    a_test = lab_test[...,1].flatten()
+    b_test = lab_test[...,2].flatten()
+    plt.figure(figsize=(5,5))
+    plt.axhline(0, color='k', lw=0.5)
+    plt.axvline(0, color='k', lw=0.5)
+    plt.scatter(a_ref[::100], b_ref[::100], s=6, alpha=0.4, label="Ref")
+    plt.scatter(a_test[::100], b_test[::100], s=6, alpha=0.4, label="Sample")
+    plt.xlabel("a* (green − red)")
+    plt.ylabel("b* (blue − yellow)")
+    plt.title("a* vs b* Scatter")
+    plt.legend()
+    save_fig(path)
+
+@_serialized
+def plot_lab_bars(lab_ref_mean, lab_test_mean, path):
+    plt = _pyplot()
+    labels = ["L*", "a*", "b*"]
+    ref_vals = [lab_ref_mean[0], lab_ref_mean[1], lab_ref_mean[2]]
+    tst_vals = [lab_test_mean[0], lab_test_mean[1], lab_test_mean[2]]
+    x = np.arange(len(labels))
+    w = 0.35
+    plt.figure(figsize=(6,3))
+    plt.bar(x-w/2, ref_vals, width=w, label="Ref")
+    plt.bar(x+w/2, tst_vals, width=w, label="Sample")
+    plt.xticks(x, labels)
+    plt.title("Lab Components — Mean")
+    plt.legend()
+    save_fig(path)
+
+def overlay_regions(img, pts, radius=12):
+    """Draw numbered circles on image at sample points.
+    
+    Each circle is numbered (1, 2, 3, etc.) with the number displayed
+    above the circle for easy identification in the report.
+    """
+    pil = Image.fromarray(img.copy())
+    drw = ImageDraw.Draw(pil)
+    
+    # Try to load a font, fallback to default if not available
+    try:
+        # Try to use a better font if available
+        font = ImageFont.truetype("arial.ttf", 14)
+        font_small = ImageFont.truetype("arial.ttf", 11)
+    except:
+        try:
+            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 14)
+            font_small = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 11)
+        except:
+            font = ImageFont.load_default()
+            font_small = font
+    
+    for i, (y, x) in enumerate(pts, start=1):
+        # Draw the circle outline
+        drw.ellipse([(x-radius, y-radius), (x+radius, y+radius)], outline=(255, 0, 0), width=3)
+        
+        # Draw number label above the circle
+        label = str(i)
+        
+        # Calculate text position (above the circle)
+        # Get text bounding box for centering
+        try:
+            bbox = drw.textbbox((0, 0), label, font=font_small)
+            text_width = bbox[2] - bbox[0]
+            text_height = bbox[3] - bbox[1]
+        except:
+            text_width = len(label) * 8
+            text_height = 12
+        
+        # Position: centered above the circle
+        text_x = x - text_width // 2
+        text_y = y - radius - text_height - 4
+        
+        # Draw background rectangle for better visibility
+        padding = 2
+        bg_x1 = text_x - padding
+        bg_y1 = text_y - padding
+        bg_x2 = text_x + text_width + padding
+        bg_y2 = text_y + text_height + padding
+        
+        # Draw semi-transparent background
+        drw.rectangle([bg_x1, bg_y1, bg_x2, bg_y2], fill=(255, 255, 255, 200))
+        
+        # Draw the number text
+        drw.text((text_x, text_y), label, fill=(200, 0, 0), font=font_small)
+        
+        # Also draw a small filled circle at center for precise location
+        center_dot_radius = 3
+        drw.ellipse([(x-center_dot_radius, y-center_dot_radius), 
+                     (x+center_dot_radius, y+center_dot_radius)], 
+                    fill=(255, 0, 0))
+    
+    return np.array(pil)
+
+# ----------------------------
+# 5b) ADVANCED VISUALIZATION FUNCTIONS
+# ----------------------------
+
+@_serialized
+def plot_fft_power_spectrum(power_spectrum, peaks, path):
+    """Plot FFT power spectrum with peaks"""
+    plt = _pyplot()
+    plt.figure(figsize=(7, 5))
+    plt.imshow(power_spectrum, cmap='hot', origin='lower')
+    plt.colorbar(label='Log Magnitude')
+    plt.title('2D FFT Power Spectrum')
+
+    # Mark peaks
+    h, w = power_spectrum.shape
+    cy, cx = h // 2, w // 2
+    for i, peak in enumerate(peaks[:5]):
+        y = cy + peak['radius'] * np.sin(np.radians(peak['angle']))
+        x = cx + peak['radius'] * np.cos(np.radians(peak['angle']))
+        plt.plot(x, y, 'go', markersize=8)
+        plt.text(x+5, y+5, f"P{i+1}", color='white', fontsize=8)
+
+    plt.xlabel('Frequency X')
+    plt.ylabel('Frequency Y')
+    save_fig(path)
+
+@_serialized
+def plot_gabor_montage(energy_maps, frequencies, num_orientations, path):
+    """Plot Gabor filter response montage"""
+    plt = _pyplot()
+    n_freq = len(frequencies)
+    n_orient = num_orientations
+
+    fig, axes = plt.subplots(n_freq, min(n_orient, 8), figsize=(12, n_freq * 1.5))
+    if n_freq == 1:
+        axes = axes[np.newaxis, :]
+
+    idx = 0
+    for i, freq in enumerate(frequencies):
+        for j in range(min(n_orient, 8)):
+            if idx < len(energy_maps):
+                axes[i, j].imshow(energy_maps[idx], cmap='viridis')
+                axes[i, j].axis('off')
+                axes[i, j].set_title(f"{freq:.2f}, {j*180//n_orient}°", fontsize=8)
+            idx += 1
+
+    plt.suptitle('Gabor Filter Bank Responses', fontsize=12, fontweight='bold')
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_gabor_orientation_histogram(gabor_results, path):
+    """Plot orientation histogram from Gabor"""
+    plt = _pyplot()
+    orientations = [r['orientation_deg'] for r in gabor_results]
+    energies = [r['mean'] for r in gabor_results]
+
+    plt.figure(figsize=(6, 4))
+    plt.bar(orientations, energies, width=15, alpha=0.7, color='steelblue')
+    plt.xlabel('Orientation (degrees)')
+    plt.ylabel('Mean Energy')
+    plt.title('Gabor Orientation Energy Distribution')
+    plt.grid(True, alpha=0.3)
+    save_fig(path)
+
+@_serialized
+def plot_glcm_radar(glcm_props_ref, glcm_props_sample, path):
+    """Radar chart for GLCM features"""
+    plt = _pyplot()
+    categories = list(glcm_props_ref.keys())
+    ref_values = [glcm_props_ref[k] for k in categories]
+    sample_values = [glcm_props_sample[k] for k in categories]
+
+    # Normalize to 0-1 for radar
+    max_val = max(max(ref_values), max(sample_values)) + 1e-8
+    ref_norm = [v / max_val for v in ref_values]
+    sample_norm = [v / max_val for v in sample_values]
+
+    angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
+    ref_norm += ref_norm[:1]
+    sample_norm += sample_norm[:1]
+    angles += angles[:1]
+
+    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(projection='polar'))
+    ax.plot(angles, ref_norm, 'o-', linewidth=2, label='Reference', color='green')
+    ax.fill(angles, ref_norm, alpha=0.15, color='green')
+    ax.plot(angles, sample_norm, 'o-', linewidth=2, label='Sample', color='red')
+    ax.fill(angles, sample_norm, alpha=0.15, color='red')
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories, size=9)
+    ax.set_ylim(0, 1)
+    ax.set_title('GLCM Texture Features (Normalized)', size=12, fontweight='bold', pad=20)
+    ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0))
+    ax.grid(True)
+    save_fig(path)
+
+@_serialized
+def plot_lbp_map_and_hist(lbp_map, hist_ref, hist_sample, path):
+    """Plot LBP map and histogram comparison"""
+    plt = _pyplot()
+    fig, axes = plt.subplots(1, 2, figsize=(10, 4))
+
+    # LBP map (sample)
+    axes[0].imshow(lbp_map, cmap='gray')
+    axes[0].set_title('LBP Map (Sample)')
+    axes[0].axis('off')
+
+    # Histogram comparison
+    x = np.arange(len(hist_ref))
+    axes[1].bar(x - 0.2, hist_ref, width=0.4, alpha=0.7, label='Reference', color='green')
+    axes[1].bar(x + 0.2, hist_sample, width=0.4, alpha=0.7, label='Sample', color='red')
+    axes[1].set_xlabel('LBP Bin')
+    axes[1].set_ylabel('Normalized Frequency')
+    axes[1].set_title('LBP Histogram Comparison')
+    axes[1].legend()
+    axes[1].grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_wavelet_energy_bars(energies_ref, energies_sample, path):
+    """Plot wavelet energy comparison"""
+    plt = _pyplot()
+    levels = [e['level'] for e in energies_ref]
+
+    fig, axes = plt.subplots(2, 2, figsize=(10, 6))
+    bands = ['LH', 'HL', 'HH', 'total']
+    colors_ref = ['#2ecc71', '#3498db', '#9b59b6', '#e74c3c']
+    colors_sample = ['#27ae60', '#2980b9', '#8e44ad', '#c0392b']
+
+    for idx, band in enumerate(bands):
+        ax = axes[idx // 2, idx % 2]
+        ref_vals = [e[band] for e in energies_ref]
+        sample_vals = [e[band] for e in energies_sample]
+
+        x = np.arange(len(levels))
+        ax.bar(x - 0.2, ref_vals, width=0.4, alpha=0.7, label='Reference', color=colors_ref[idx])
+        ax.bar(x + 0.2, sample_vals, width=0.4, alpha=0.7, label='Sample', color=colors_sample[idx])
+        ax.set_xlabel('Level')
+        ax.set_ylabel('Energy')
+        ax.set_title(f'{band} Band Energy')
+        ax.set_xticks(x)
+        ax.set_xticklabels(levels)
+        ax.legend()
+        ax.grid(True, alpha=0.3)
+
+    plt.suptitle('Wavelet Decomposition Energy', fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_defect_saliency(saliency_map, binary_map, defects, original_shape, path):
+    """Plot defect saliency and detection results"""
+    plt = _pyplot()
+    fig, axes = plt.subplots(1, 3, figsize=(15, 4))
+
+    # Saliency map
+    axes[0].imshow(saliency_map, cmap='hot')
+    axes[0].set_title('Saliency Map')
+    axes[0].axis('off')
+
+    # Binary map
+    axes[1].imshow(binary_map, cmap='gray')
+    axes[1].set_title(f'Binary Defect Map ({len(defects)} defects)')
+    axes[1].axis('off')
+
+    # Defects overlay
+    overlay = np.zeros((*original_shape, 3), dtype=np.uint8)
+    for defect in defects:
+        x0, y0, x1, y1 = defect['bbox']
+        cv2.rectangle(overlay, (x0, y0), (x1, y1), (255, 0, 0), 2)
+    axes[2].imshow(overlay)
+    axes[2].set_title('Detected Defects')
+    axes[2].axis('off')
+
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_metamerism_illuminants(illuminants, delta_e_values, path):
+    """Plot ΔE across different illuminants"""
+    plt = _pyplot()
+    plt.figure(figsize=(8, 5))
+    x = np.arange(len(illuminants))
+    bars = plt.bar(x, delta_e_values, alpha=0.7, color='steelblue', edgecolor='navy')
+
+    # Color bars by severity
+    for i, de in enumerate(delta_e_values):
+        if de < 2.0:
+            bars[i].set_color('#27ae60')
+        elif de < 3.5:
+            bars[i].set_color('#f39c12')
+        else:
+            bars[i].set_color('#e74c3c')
+
+    plt.axhline(y=2.0, color='green', linestyle='--', linewidth=1, alpha=0.5, label='PASS threshold')
+    plt.axhline(y=3.5, color='orange', linestyle='--', linewidth=1, alpha=0.5, label='Conditional threshold')
+
+    plt.xticks(x, illuminants, rotation=45)
+    plt.xlabel('Illuminant')
+    plt.ylabel('ΔE2000')
+    plt.title('Metamerism Analysis: ΔE Across Illuminants')
+    plt.legend()
+    plt.grid(True, alpha=0.3, axis='y')
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_spectral_curve(wavelengths, reflectance_ref, reflectance_sample, path):
+    """Plot true spectral reflectance curves"""
+    plt = _pyplot()
+    plt.figure(figsize=(8, 5))
+    plt.plot(wavelengths, reflectance_ref, label='Reference', linewidth=2, color='green', marker='o', markersize=3)
+    plt.plot(wavelengths, reflectance_sample, label='Sample', linewidth=2, color='red', marker='s', markersize=3)
+    plt.xlabel('Wavelength (nm)', fontsize=12)
+    plt.ylabel('Reflectance (%)', fontsize=12)
+    plt.title('True Spectral Reflectance Curve', fontsize=14, fontweight='bold')
+    plt.legend(fontsize=11)
+    plt.grid(True, alpha=0.3, linestyle='--')
+    plt.xlim(380, 700)
+    plt.ylim(0, 100)
+    # Add colored background for visible spectrum
+    plt.axvspan(380, 450, alpha=0.1, color='blue', label='_')
+    plt.axvspan(450, 495, alpha=0.1, color='cyan', label='_')
+    plt.axvspan(495, 570, alpha=0.1, color='green', label='_')
+    plt.axvspan(570, 590, alpha=0.1, color='yellow', label='_')
+    plt.axvspan(590, 620, alpha=0.1, color='orange', label='_')
+    plt.axvspan(620, 700, alpha=0.1, color='red', label='_')
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_line_angle_histogram(orientation_degrees, path):
+    """Plot line angle histogram from structure tensor"""
+    plt = _pyplot()
+    plt.figure(figsize=(7, 4))
+
+    # Create histogram
+    bins = np.arange(-90, 91, 10)
+    hist, bin_edges = np.histogram(orientation_degrees, bins=bins)
+    bin_centers = (bin_edges[:-1] + bin_edges[1:]) / 2
+
+    plt.bar(bin_centers, hist, width=8, alpha=0.7, color='steelblue', edgecolor='navy')
+    plt.xlabel('Orientation Angle (degrees)', fontsize=12)
+    plt.ylabel('Frequency', fontsize=12)
+    plt.title('Line Angle Distribution (Structure Tensor)', fontsize=13, fontweight='bold')
+    plt.grid(True, alpha=0.3, axis='y')
+    plt.xlim(-90, 90)
+
+    # Add reference lines
+    plt.axvline(0, color='red', linestyle='--', linewidth=1, alpha=0.5, label='Horizontal')
+    plt.axvline(90, color='green', linestyle='--', linewidth=1, alpha=0.5, label='Vertical')
+    plt.axvline(-90, color='green', linestyle='--', linewidth=1, alpha=0.5)
+
+    plt.legend(fontsize=9)
+    plt.tight_layout()
+    save_fig(path)
+
+# ----------------------------
+# 5c) PATTERN REPETITION VISUALIZATIONS
+# ----------------------------
+
+@_serialized
+def plot_pattern_detection_map(img_rgb, patterns, title, path):
+    """Plot original image with detected patterns marked"""
+    plt = _pyplot()
+    plt.figure(figsize=(8, 6))
+    img_display = img_rgb.copy()
+
+    # Draw bounding boxes or circles for each pattern
+    for pattern in patterns:
+        if 'bbox' in pattern:
+            x0, y0, x1, y1 = pattern['bbox']
+            cv2.rectangle(img_display, (x0, y0), (x1, y1), (0, 255, 0), 2)
+        if 'centroid' in pattern:
+            cx, cy = pattern['centroid']
+            cv2.circle(img_display, (cx, cy), 5, (255, 0, 0), -1)
+
+    plt.imshow(img_display)
+    plt.title(f'{title} ({len(patterns)} patterns detected)', fontsize=13, fontweight='bold')
+    plt.axis('off')
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_pattern_count_comparison(count_ref, count_test, path):
+    """Bar chart comparing pattern counts"""
+    plt = _pyplot()
+    plt.figure(figsize=(7, 5))
+
+    categories = ['Reference', 'Sample']
+    counts = [count_ref, count_test]
+    colors_bar = ['#27ae60', '#e74c3c']
+
+    bars = plt.bar(categories, counts, color=colors_bar, alpha=0.7, edgecolor='navy', linewidth=1.5)
+
+    # Add value labels on bars
+    for bar, count in zip(bars, counts):
+        height = bar.get_height()
+        plt.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(count)}',
+                ha='center', va='bottom', fontsize=14, fontweight='bold')
+
+    plt.ylabel('Pattern Count', fontsize=12)
+    plt.title('Pattern Count Comparison', fontsize=14, fontweight='bold')
+    plt.grid(True, alpha=0.3, axis='y')
+    plt.ylim(0, max(counts) * 1.2)
+
+    # Add difference annotation
+    diff = abs(count_ref - count_test)
+    plt.text(0.5, max(counts) * 1.05, f'Δ = {int(diff)}', ha='center', fontsize=12,
+             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_pattern_density_heatmap(density_grid, path):
+    """Heatmap showing pattern density across grid cells"""
+    plt = _pyplot()
+    plt.figure(figsize=(8, 6))
+
+    im = plt.imshow(density_grid, cmap='YlOrRd', interpolation='nearest')
+    plt.colorbar(im, label='Pattern Count per Cell')
+    plt.title('Pattern Density Heatmap', fontsize=14, fontweight='bold')
+    plt.xlabel('Grid Column', fontsize=11)
+    plt.ylabel('Grid Row', fontsize=11)
+
+    # Add grid lines
+    ax = plt.gca()
+    ax.set_xticks(np.arange(-.5, density_grid.shape[1], 1), minor=True)
+    ax.set_yticks(np.arange(-.5, density_grid.shape[0], 1), minor=True)
+    ax.grid(which="minor", color="white", linestyle='-', linewidth=1.5)
+
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_missing_extra_patterns(img_rgb, missing_patterns, extra_patterns, path):
+    """Visual overlay showing missing (red) and extra (blue) patterns"""
+    plt = _pyplot()
+    plt.figure(figsize=(8, 6))
+    img_display = img_rgb.copy()
+
+    # Draw missing patterns (red circles)
+    for pattern in missing_patterns:
+        cx, cy = pattern['location']
+        cv2.circle(img_display, (cx, cy), 15, (255, 0, 0), 3)
+        cv2.circle(img_display, (cx, cy), 3, (255, 0, 0), -1)
+
+    # Draw extra patterns (blue circles)
+    for pattern in extra_patterns:
+        cx, cy = pattern['location']
+        cv2.circle(img_display, (cx, cy), 15, (0, 0, 255), 3)
+        cv2.circle(img_display, (cx, cy), 3, (0, 0, 255), -1)
+
+    plt.imshow(img_display)
+    plt.title(f'Missing (Red: {len(missing_patterns)}) / Extra (Blue: {len(extra_patterns)}) Patterns',
+             fontsize=12, fontweight='bold')
+    plt.axis('off')
+
+    # Add legend
+    from matplotlib.patches import Patch
+    legend_elements = [Patch(facecolor='red', label=f'Missing ({len(missing_patterns)})'),
+                       Patch(facecolor='blue', label=f'Extra ({len(extra_patterns)})')]
+    plt.legend(handles=legend_elements, loc='upper right', fontsize=10)
+
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_pattern_size_distribution(areas_ref, areas_test, path):
+    """Histogram comparing pattern size distributions"""
+    plt = _pyplot()
+    plt.figure(figsize=(8, 5))
+
+    # Determine bin range
+    all_areas = list(areas_ref) + list(areas_test)
+    bins = np.linspace(min(all_areas), max(all_areas), 20)
+
+    plt.hist(areas_ref, bins=bins, alpha=0.6, label='Reference', color='green', edgecolor='black')
+    plt.hist(areas_test, bins=bins, alpha=0.6, label='Sample', color='red', edgecolor='black')
+
+    plt.xlabel('Pattern Area (px²)', fontsize=12)
+    plt.ylabel('Frequency', fontsize=12)
+    plt.title('Pattern Size Distribution Comparison', fontsize=14, fontweight='bold')
+    plt.legend(fontsize=11)
+    plt.grid(True, alpha=0.3, axis='y')
+
+    # Add mean lines
+    if areas_ref:
+        plt.axvline(np.mean(areas_ref), color='green', linestyle='--', linewidth=2,
+                   label=f'Ref Mean: {np.mean(areas_ref):.1f}')
+    if areas_test:
+        plt.axvline(np.mean(areas_test), color='red', linestyle='--', linewidth=2,
+                   label=f'Sample Mean: {np.mean(areas_test):.1f}')
+
+    plt.legend(fontsize=9)
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_autocorrelation_surface(autocorr, peaks, path):
+    """3D surface plot of auto-correlation"""
+    plt = _pyplot()
+    from mpl_toolkits.mplot3d import Axes3D
+
+    fig = plt.figure(figsize=(10, 7))
+    ax = fig.add_subplot(111, projection='3d')
+
+    # Subsample for performance
+    h, w = autocorr.shape
+    step = max(1, h // 100)
+    autocorr_sub = autocorr[::step, ::step]
+
+    # Create meshgrid
+    X, Y = np.meshgrid(np.arange(autocorr_sub.shape[1]), np.arange(autocorr_sub.shape[0]))
+
+    # Plot surface
+    surf = ax.plot_surface(X, Y, autocorr_sub, cmap='viridis', alpha=0.8,
+                           linewidth=0, antialiased=True)
+
+    ax.set_xlabel('X Position', fontsize=10)
+    ax.set_ylabel('Y Position', fontsize=10)
+    ax.set_zlabel('Correlation', fontsize=10)
+    ax.set_title('Auto-correlation Surface (Pattern Periodicity)', fontsize=13, fontweight='bold')
+
+    # Add colorbar
+    fig.colorbar(surf, shrink=0.5, aspect=5)
+
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_keypoint_matching(img_ref, img_test, kp_ref, kp_test, good_matches, path):
+    """Visualization of matched keypoints between reference and sample"""
+    plt = _pyplot()
+    try:
+        # Draw matches
+        img_ref_8bit = img_as_ubyte(rgb2gray(img_ref)) if len(img_ref.shape) == 3 else img_as_ubyte(img_ref)
+        img_test_8bit = img_as_ubyte(rgb2gray(img_test)) if len(img_test.shape) == 3 else img_as_ubyte(img_test)
+
+        # Convert to BGR for cv2.drawMatches
+        img_ref_bgr = cv2.cvtColor(img_ref_8bit, cv2.COLOR_GRAY2BGR) if len(img_ref_8bit.shape) == 2 else img_ref
+        img_test_bgr = cv2.cvtColor(img_test_8bit, cv2.COLOR_GRAY2BGR) if len(img_test_8bit.shape) == 2 else img_test
+
+        # Draw only top 50 matches for clarity
+        matches_to_draw = good_matches[:50]
+
+        img_matches = cv2.drawMatches(img_ref_bgr, kp_ref, img_test_bgr, kp_test,
+                                      matches_to_draw, None,
+                                      matchColor=(0, 255, 0),
+                                      singlePointColor=(255, 0, 0),
+                                      flags=cv2.DrawMatchesFlags_NOT_DRAW_SINGLE_POINTS)
+
+        plt.figure(figsize=(12, 6))
+        plt.imshow(cv2.cvtColor(img_matches, cv2.COLOR_BGR2RGB))
+        plt.title(f'Keypoint Matching ({len(good_matches)} matches, showing top 50)',
+                 fontsize=13, fontweight='bold')
+        plt.axis('off')
+        plt.tight_layout()
+        save_fig(path)
+    except Exception as e:
+        print(f"* Keypoint matching visualization failed: {e}")
+        # Create placeholder
+        plt.figure(figsize=(12, 6))
+        plt.text(0.5, 0.5, f'Keypoint Matching\n{len(good_matches)} matches found',
+                ha='center', va='center', fontsize=14)
+        plt.axis('off')
+        plt.tight_layout()
+        save_fig(path)
+
+@_serialized
+def plot_blob_detection(img_rgb, keypoints, path):
+    """Visualization of blob detection results"""
+    plt = _pyplot()
+    plt.figure(figsize=(8, 6))
+
+    # Draw blobs
+    img_with_blobs = cv2.drawKeypoints(img_rgb, keypoints, None,
+                                       color=(0, 255, 0),
+                                       flags=cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
+
+    plt.imshow(img_with_blobs)
+    plt.title(f'Blob Detection ({len(keypoints)} blobs)', fontsize=13, fontweight='bold')
+    plt.axis('off')
+    plt.tight_layout()
+    save_fig(path)
+
+@_serialized
+def plot_pattern_integrity_radar(integrity_data_ref, integrity_data_test, path):
+    """Radar chart for pattern integrity comparison"""
+    plt = _pyplot()
+    categories = ['Size\nSimilarity', 'Shape\nSimilarity', 'Spatial\nSimilarity', 'Overall\nIntegrity']
+
+    # Get values (scale to 0-1)
+    ref_values = [
+        integrity_data_ref.get('size_similarity', 0) / 100,
+        integrity_data_ref.get('shape_similarity', 0) / 100,
+        integrity_data_ref.get('spatial_similarity', 0) / 100,
+        integrity_data_ref.get('integrity_score', 0) / 100
+    ]
+
+    test_values = [
+        integrity_data_test.get('size_similarity', 0) / 100,
+        integrity_data_test.get('shape_similarity', 0) / 100,
+        integrity_data_test.get('spatial_similarity', 0) / 100,
+        integrity_data_test.get('integrity_score', 0) / 100
+    ]
+
+    # Number of variables
+    N = len(categories)
+
+    # Compute angle for each axis
+    angles = np.linspace(0, 2 * np.pi, N, endpoint=False).tolist()
+
+    # Complete the circle
+    ref_values += ref_values[:1]
+    test_values += test_values[:1]
+    angles += angles[:1]
+
+    # Plot
+    fig, ax = plt.subplots(figsize=(7, 7), subplot_kw=dict(projection='polar'))
+
+    ax.plot(angles, ref_values, 'o-', linewidth=2, label='Reference', color='green')
+    ax.fill(angles, ref_values, alpha=0.15, color='green')
+
+    ax.plot(angles, test_values, 'o-', linewidth=2, label='Sample', color='red')
+    ax.fill(angles, test_values, alpha=0.15, color='red')
+
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories, size=10)
+    ax.set_ylim(0, 1)
+    ax.set_title('Pattern Integrity Assessment', size=14, fontweight='bold', pad=20)
+    ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1), fontsize=10)
+    ax.grid(True)
+
+    plt.tight_layout()
+    save_fig(path)
@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - colorimetry (sRGB/XYZ/Lab, chromatic adaptation, ΔE formulas,
+whiteness/yellowness indices and spectral data processing)
+"""
+
+import os
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# 2a) Color space conversions
+# ----------------------------
+
+# Linear sRGB (0-100) -> XYZ (D65)
+SRGB_TO_XYZ = np.array([[0.4124564, 0.3575761, 0.1804375],
+                        [0.2126729, 0.7151522, 0.0721750],
+                        [0.0193339, 0.1191920, 0.9503041]])
+
+def _srgb_linearize(x):
+    """Gamma-encoded sRGB in 0-1 -> linear sRGB scaled to 0-100 (in place)"""
+    mask = x > 0.04045
+    x[mask] = ((x[mask] + 0.055) / 1.055) ** 2.4
+    x[~mask] = x[~mask] / 12.92
+    x *= 100.0
+    return x
+
+# Linear value (0-100) of every 8-bit sRGB level
+SRGB_LINEAR_LUT = _srgb_linearize(np.arange(256, dtype=float) / 255.0)
+
+# sRGB -> XYZ (D65)
+def srgb_to_xyz(rgb):
+    if rgb.dtype == np.uint8:
+        x = SRGB_LINEAR_LUT[rgb]  # 8-bit input: table lookup, same values
+    else:
+        x = _srgb_linearize(rgb.astype(float) / 255.0)
+    return x @ SRGB_TO_XYZ.T
+
+# Bradford CAT for illuminant adaptation
+WHITE_POINTS = {
+    "D65": np.array([95.047, 100.000, 108.883]),
+    "D50": np.array([96.422, 100.000, 82.521]),
+    "TL84": np.array([101.385, 100.000, 65.231]),  # F11/TL84
+    "A":   np.array([109.850, 100.000, 35.585]),
+    "F2":  np.array([99.187, 100.000, 67.395]),  # Cool White Fluorescent
+    "CWF": np.array([103.280, 100.000, 69.026]),  # Cool White Fluorescent
+    "F7":  np.array([95.044, 100.000, 108.755]),  # Daylight Fluorescent
+    "F11": np.array([100.966, 100.000, 64.370]),  # TL84 equivalent
+}
+M_BRADFORD = np.array([[ 0.8951,  0.2664, -0.1614],
+                       [-0.7502,  1.7135,  0.0367],
+                       [ 0.0389, -0.0685,  1.0296]])
+M_BRADFORD_INV = np.linalg.inv(M_BRADFORD)
+
+# ----------------------------
+# CIE Standard Observer & Illuminant SPDs (for spectral data)
+# ----------------------------
+# Simplified CIE 1931 2° observer (380-780nm, 5nm step)
+CIE_2DEG_WAVELENGTHS = np.arange(380, 781, 5)
+
+# CIE 1931 2° Standard Observer Color Matching Functions (380-780nm, 5nm step)
+# Source: CIE 15:2004 (Official CIE data)
+CIE_2DEG_CMF = {
+    'x_bar': np.array([
+        0.001368, 0.002236, 0.004243, 0.007650, 0.014310, 0.023190, 0.043510, 0.077630, 0.134380, 0.214770,
+        0.283900, 0.328500, 0.348280, 0.348060, 0.336200, 0.318700, 0.290800, 0.251100, 0.195360, 0.142100,
+        0.095640, 0.058010, 0.032010, 0.014700, 0.004900, 0.002400, 0.009300, 0.029100, 0.063270, 0.109600,
+        0.165500, 0.225750, 0.290400, 0.359700, 0.433450, 0.512050, 0.594500, 0.678400, 0.762100, 0.842500,
+        0.916300, 0.978600, 1.026300, 1.056700, 1.062200, 1.045600, 1.002600, 0.938400, 0.854450, 0.751400,
+        0.642400, 0.541900, 0.447900, 0.360800, 0.283500, 0.218700, 0.164900, 0.121200, 0.087400, 0.063600,
+        0.046770, 0.032900, 0.022700, 0.015840, 0.011359, 0.008111, 0.005790, 0.004109, 0.002899, 0.002049,
+        0.001440, 0.001000, 0.000690, 0.000476, 0.000332, 0.000235, 0.000166, 0.000117, 0.000083, 0.000059,
+        0.000042
+    ]),
+    'y_bar': np.array([
+        0.000039, 0.000064, 0.000120, 0.000217, 0.000396, 0.000640, 0.001210, 0.002180, 0.004000, 0.007300,
+        0.011600, 0.016840, 0.023000, 0.029800, 0.038000, 0.048000, 0.060000, 0.073900, 0.090980, 0.112600,
+        0.139020, 0.169300, 0.208020, 0.258600, 0.323000, 0.407300, 0.503000, 0.608200, 0.710000, 0.793200,
+        0.862000, 0.914850, 0.954000, 0.980300, 0.994950, 1.000000, 0.995000, 0.978600, 0.952000, 0.915400,
+        0.870000, 0.816300, 0.757000, 0.694900, 0.631000, 0.566800, 0.503000, 0.441200, 0.381000, 0.321000,
+        0.265000, 0.217000, 0.175000, 0.138200, 0.107000, 0.081600, 0.061000, 0.044580, 0.032000, 0.023200,
+        0.017000, 0.011920, 0.008210, 0.005723, 0.004102, 0.002929, 0.002091, 0.001484, 0.001047, 0.000740,
+        0.000520, 0.000361, 0.000249, 0.000172, 0.000120, 0.000085, 0.000060, 0.000042, 0.000030, 0.000021,
+        0.000015
+    ]),
+    'z_bar': np.array([
+        0.006450, 0.010550, 0.020050, 0.036210, 0.067850, 0.110200, 0.207400, 0.371300, 0.645600, 1.039050,
+        1.385600, 1.622960, 1.747060, 1.782600, 1.772110, 1.744100, 1.669200, 1.528100, 1.287640, 1.041900,
+        0.812950, 0.616200, 0.465180, 0.353300, 0.272000, 0.212300, 0.158200, 0.111700, 0.078250, 0.057250,
+        0.042160, 0.029840, 0.020300, 0.013400, 0.008750, 0.005750, 0.003900, 0.002750, 0.002100, 0.001800,
+        0.001650, 0.001400, 0.001100, 0.001000, 0.000800, 0.000600, 0.000340, 0.000240, 0.000190, 0.000100,
+        0.000050, 0.000030, 0.000020, 0.000010, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000,
+        0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000,
+        0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000, 0.000000,
+        0.000000
+    ])
+}
+
+# Simplified D65 illuminant SPD (relative, 380-780nm, 5nm step)
+D65_SPD = np.array([49.98, 52.31, 54.65, 68.70, 82.75, 87.12, 91.49, 92.46, 93.43, 90.06,
+                    86.68, 95.77, 104.86, 110.94, 117.01, 117.41, 117.81, 116.34, 114.86, 115.39,
+                    115.92, 112.37, 108.81, 109.08, 109.35, 108.58, 107.80, 106.30, 104.79, 106.24,
+                    107.69, 106.05, 104.41, 104.23, 104.05, 102.02, 100.00, 98.17, 96.33, 96.06,
+                    95.79, 92.24, 88.69, 89.35, 90.01, 89.80, 89.60, 88.65, 87.70, 85.49,
+                    83.29, 83.49, 83.70, 81.86, 80.03, 80.12, 80.21, 81.25, 82.28, 80.28,
+                    78.28, 74.00, 69.72, 70.67, 71.61, 72.98, 74.35, 67.98, 61.60, 65.74,
+                    69.89, 72.49, 75.09, 69.34, 63.59, 55.01, 46.42, 56.61, 66.81, 65.09, 63.38])
+
+def adapt_white_xyz(xyz, src_wp, dst_wp):
+    src_lms = (M_BRADFORD @ xyz.reshape(-1,3).T).T
+    src_wp_lms = M_BRADFORD @ src_wp
+    dst_wp_lms = M_BRADFORD @ dst_wp
+    D = (dst_wp_lms / src_wp_lms)
+    dst_lms = (src_lms * D)
+    out = (M_BRADFORD_INV @ dst_lms.T).T
+    return out.reshape(xyz.shape)
+
+def xyz_to_lab(xyz, wp):
+    xr = xyz[...,0] / wp[0]
+    yr = xyz[...,1] / wp[1]
+    zr = xyz[...,2] / wp[2]
+    delta = 6/29
+    def f(t):
+        return np.where(t > delta**3, np.cbrt(t), (t/(3*delta**2) + 4/29))
+    fx, fy, fz = f(xr), f(yr), f(zr)
+    L = 116*fy - 16
+    a = 500*(fx - fy)
+    b = 200*(fy - fz)
+    return np.stack([L, a, b], axis=-1)
+
+def rgb_to_cmyk(rgb):
+    r, g, b = rgb[...,0]/255.0, rgb[...,1]/255.0, rgb[...,2]/255.0
+    k = 1 - np.max(np.stack([r,g,b], axis=-1), axis=-1)
+    denom = 1 - k + 1e-8
+    c = (1 - r - k) / denom
+    m = (1 - g - k) / denom
+    y = (1 - b - k) / denom
+    return np.stack([c,m,y,k], axis=-1)
+
+# ----------------------------
+# 2) ΔE formulas
+# ----------------------------
+def deltaE76(lab1, lab2):
+    d = lab1 - lab2
+    return np.sqrt(np.sum(d**2, axis=-1))
+
+def deltaE94(lab1, lab2, kL=1, kC=1, kH=1, K1=0.045, K2=0.015):
+    L1,a1,b1 = lab1[...,0], lab1[...,1], lab1[...,2]
+    L2,a2,b2 = lab2[...,0], lab2[...,1], lab2[...,2]
+    dL = L1 - L2
+    C1 = np.sqrt(a1**2 + b1**2)
+    C2 = np.sqrt(a2**2 + b2**2)
+    dC = C1 - C2
+    da = a1 - a2
+    db = b1 - b2
+    dH_sq = da**2 + db**2 - dC**2
+    dH_sq = np.maximum(dH_sq, 0)  # Prevent negative values due to numerical errors
+    SL = 1
+    SC = 1 + K1*C1
+    SH = 1 + K2*C1
+    dH = np.sqrt(dH_sq)
+    return np.sqrt((dL/(kL*SL))**2 + (dC/(kC*SC))**2 + (dH/(kH*SH))**2)
+
+def deltaE2000(lab1, lab2, kL=1, kC=1, kH=1):
+    L1,a1,b1 = lab1[...,0], lab1[...,1], lab1[...,2]
+    L2,a2,b2 = lab2[...,0], lab2[...,1], lab2[...,2]
+    C1 = np.sqrt(a1**2 + b1**2)
+    C2 = np.sqrt(a2**2 + b2**2)
+    Cm = (C1 + C2) / 2
+    G = 0.5 * (1 - np.sqrt((Cm**7) / (Cm**7 + 25**7)))
+    a1p = (1 + G) * a1
+    a2p = (1 + G) * a2
+    C1p = np.sqrt(a1p**2 + b1**2)
+    C2p = np.sqrt(a2p**2 + b2**2)
+    h1p = (np.degrees(np.arctan2(b1, a1p)) + 360) % 360
+    h2p = (np.degrees(np.arctan2(b2, a2p)) + 360) % 360
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180, dhp - 360, dhp)
+    dhp = np.where(dhp < -180, dhp + 360, dhp)
+    dHp = 2*np.sqrt(C1p*C2p)*np.sin(np.radians(dhp)/2)
+    Lpm = (L1 + L2)/2
+    Cpm = (C1p + C2p)/2
+    hp_sum = h1p + h2p
+    hpm = np.where((np.abs(h1p - h2p) > 180), (hp_sum + 360)/2, hp_sum/2)
+    T = 1 - 0.17*np.cos(np.radians(hpm - 30)) + 0.24*np.cos(np.radians(2*hpm)) + \
+        0.32*np.cos(np.radians(3*hpm + 6)) - 0.20*np.cos(np.radians(4*hpm - 63))
+    dRo = 30*np.exp(-((hpm - 275)/25)**2)
+    Rc = 2*np.sqrt((Cpm**7) / (Cpm**7 + 25**7))
+    Sl = 1 + (0.015*((Lpm - 50)**2)) / np.sqrt(20 + (Lpm - 50)**2)
+    Sc = 1 + 0.045*Cpm
+    Sh = 1 + 0.015*Cpm*T
+    Rt = -np.sin(np.radians(2*dRo)) * Rc
+    return np.sqrt((dLp/(kL*Sl))**2 + (dCp/(kC*Sc))**2 + (dHp/(kH*Sh))**2 + Rt*(dCp/(kC*Sc))*(dHp/(kH*Sh)))
+
+def deltaE_CMC(lab1, lab2, l=2, c=1):
+    """CMC l:c color difference (typically l:c = 2:1 or 1:1)"""
+    L1, a1, b1 = lab1[...,0], lab1[...,1], lab1[...,2]
+    L2, a2, b2 = lab2[...,0], lab2[...,1], lab2[...,2]
+
+    dL = L1 - L2
+    C1 = np.sqrt(a1**2 + b1**2)
+    C2 = np.sqrt(a2**2 + b2**2)
+    dC = C1 - C2
+    da = a1 - a2
+    db = b1 - b2
+    dH_sq = da**2 + db**2 - dC**2
+    dH_sq = np.maximum(dH_sq, 0)  # Avoid negative due to numerical errors
+
+    H1 = np.degrees(np.arctan2(b1, a1))
+    H1 = np.where(H1 < 0, H1 + 360, H1)
+
+    # Weighting functions
+    F = np.sqrt(C1**4 / (C1**4 + 1900))
+    T = np.where((H1 >= 164) & (H1 <= 345),
+                 0.56 + np.abs(0.2 * np.cos(np.radians(H1 + 168))),
+                 0.36 + np.abs(0.4 * np.cos(np.radians(H1 + 35))))
+
+    SL = np.where(L1 < 16, 0.511, (0.040975 * L1) / (1 + 0.01765 * L1))
+    SC = ((0.0638 * C1) / (1 + 0.0131 * C1)) + 0.638
+    SH = SC * (F * T + 1 - F)
+
+    return np.sqrt((dL/(l*SL))**2 + (dC/(c*SC))**2 + (dH_sq/(SH**2)))
+
+def cie_whiteness_tint(xyz, illuminant='D65'):
+    """CIE Whiteness and Tint (ISO 11475) for illuminant D65 with 10° observer"""
+    # For D65/10°, the formula uses normalized chromaticity coordinates
+    X, Y, Z = xyz[...,0], xyz[...,1], xyz[...,2]
+
+    # Chromaticity coordinates
+    sum_XYZ = np.maximum(X + Y + Z, 1e-8)
+    x = X / sum_XYZ
+    y = Y / sum_XYZ
+
+    # CIE Whiteness (D65, 10°) - ISO 11475
+    # Reference white point for D65/10°: xn=0.3138, yn=0.3310
+    xn, yn = 0.3138, 0.3310
+    W = Y + 800 * (xn - x) + 1700 * (yn - y)
+
+    # Tint
+    T = 900 * (xn - x) - 650 * (yn - y)
+
+    return W, T
+
+def astm_e313_yellowness(xyz):
+    """ASTM E313 Yellowness Index"""
+    X, Y, Z = xyz[...,0], xyz[...,1], xyz[...,2]
+
+    # Coefficients for D65/10° (newer standard)
+    C_x = 1.3013
+    C_z = 1.1498
+
+    YI = 100 * (C_x * X - C_z * Z) / np.maximum(Y, 1e-8)
+
+    return YI
+
+# ----------------------------
+# 2b) SPECTRAL DATA PROCESSING
+# ----------------------------
+def parse_spectral_csv(csv_path):
+    """
+    Parse spectral CSV file (wavelength, reflectance).
+
+    Args:
+        csv_path: Path to CSV file with spectral data
+
+    Returns:
+        tuple: (wavelengths, reflectance) arrays, or (None, None) on error
+    """
+    import pandas as pd
+    try:
+        if not os.path.exists(csv_path):
+            logger.error(f"Spectral CSV file not found: {csv_path}")
+            return None, None
+
+        df = pd.read_csv(csv_path)
+
+        if df.empty:
+            logger.error(f"Spectral CSV file is empty: {csv_path}")
+            return None, None
+
+        # Try common column name variations
+        wl_cols = [c for c in df.columns if 'wave' in c.lower() or 'nm' in c.lower() or 'λ' in c.lower()]
+        ref_cols = [c for c in df.columns if 'ref' in c.lower() or 'r(' in c.lower() or '%' in c.lower()]
+
+        if not wl_cols or not ref_cols:
+            # Assume first two columns
+            if len(df.columns) < 2:
+                logger.error(f"Spectral CSV must have at least 2 columns: {csv_path}")
+                return None, None
+            wavelengths = df.iloc[:, 0].values
+            reflectance = df.iloc[:, 1].values
+        else:
+            wavelengths = df[wl_cols[0]].values
+            reflectance = df[ref_cols[0]].values
+
+        # Validate data ranges
+        if np.any(wavelengths < 300) or np.any(wavelengths > 800):
+            logger.warning(f"Wavelengths outside typical range (300-800nm) in {csv_path}")
+
+        if np.any(reflectance < 0) or np.any(reflectance > 100):
+            logger.warning(f"Reflectance values outside 0-100% range in {csv_path}")
+            reflectance = np.clip(reflectance, 0, 100)
+
+        # Filter to 380-700nm range
+        mask = (wavelengths >= 380) & (wavelengths <= 700)
+        filtered_wl = wavelengths[mask]
+        filtered_ref = reflectance[mask]
+
+        if len(filtered_wl) == 0:
+            logger.error(f"No data in valid wavelength range (380-700nm) in {csv_path}")
+            return None, None
+
+        logger.info(f"Parsed spectral CSV: {len(filtered_wl)} data points")
+        return filtered_wl, filtered_ref
+
+    except Exception as e:
+        logger.error(f"Error parsing spectral CSV {csv_path}: {str(e)}")
+        return None, None
+
+def spectral_to_xyz(wavelengths, reflectance, illuminant='D65', observer='2'):
+    """Compute XYZ tristimulus values from spectral reflectance"""
+    # Interpolate spectral data to match CIE wavelengths (380-780nm, 5nm step)
+    cie_wl = CIE_2DEG_WAVELENGTHS
+
+    # Interpolate reflectance to CIE wavelengths
+    reflectance_interp = np.interp(cie_wl, wavelengths, reflectance)
+
+    # Get CMF
+    x_bar = CIE_2DEG_CMF['x_bar']
+    y_bar = CIE_2DEG_CMF['y_bar']
+    z_bar = CIE_2DEG_CMF['z_bar']
+
+    # Get illuminant SPD (using D65 as default, others can be added)
+    spd = D65_SPD
+
+    # Compute tristimulus values: X = k * Σ R(λ) * x̄(λ) * S(λ) * Δλ
+    delta_lambda = 5  # 5nm step
+
+    X = np.sum(reflectance_interp * x_bar * spd) * delta_lambda
+    Y = np.sum(reflectance_interp * y_bar * spd) * delta_lambda
+    Z = np.sum(reflectance_interp * z_bar * spd) * delta_lambda
+
+    # Normalize to Y=100 for perfect white
+    k = 100.0 / np.sum(y_bar * spd * delta_lambda)
+
+    return np.array([X * k, Y * k, Z * k])
+
+def find_spectral_peaks_valleys(wavelengths, reflectance, n_peaks=3):
+    """Find peaks and valleys in spectral reflectance curve"""
+    from scipy.signal import find_peaks
+
+    # Find peaks
+    peaks_idx, _ = find_peaks(reflectance, prominence=2)
+    if len(peaks_idx) > 0:
+        # Sort by reflectance value
+        peak_heights = reflectance[peaks_idx]
+        sorted_peaks = peaks_idx[np.argsort(peak_heights)[::-1]][:n_peaks]
+    else:
+        sorted_peaks = []
+
+    # Find valleys (invert signal)
+    valleys_idx, _ = find_peaks(-reflectance, prominence=2)
+    if len(valleys_idx) > 0:
+        valley_depths = reflectance[valleys_idx]
+        sorted_valleys = valleys_idx[np.argsort(valley_depths)][:n_peaks]
+    else:
+        sorted_valleys = []
+
+    results = []
+    for idx in sorted_peaks:
+        results.append({
+            'type': 'Peak',
+            'wavelength': wavelengths[idx],
+            'reflectance': reflectance[idx]
+        })
+
+    for idx in sorted_valleys:
+        results.append({
+            'type': 'Valley',
+            'wavelength': wavelengths[idx],
+            'reflectance': reflectance[idx]
+        })
+
+    return results
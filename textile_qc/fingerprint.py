@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - content fingerprints for result caching
+
+An analysis is identified by the decoded pixels of both images and the
+settings that influence its scores or report content. Two requests with the
+same fingerprint produce the same report, so its result can be reused.
+The operator name and time zone printed on the PDFs only label a run and are
+left out of the key; a hit for another operator re-renders the reports from
+the stored report context (see report_context) with the current values.
+"""
+
+import json
+import hashlib
+import dataclasses
+
+import numpy as np
+
+from .config import SOFTWARE_VERSION, ENGINE_VERSION
+
+# ----------------------------
+# Fingerprints
+# ----------------------------
+
+# Fields that only label a run. They are printed on the reports but do not
+# change any measurement, so they are not part of the fingerprint
+REPORT_IDENTITY_FIELDS = frozenset({"operator_name", "timezone_offset_hours"})
+
+# UI mirrors of list fields (the parsed lists are part of the fingerprint)
+UI_ONLY_FIELDS = frozenset({
+    "gabor_frequencies_str",
+    "glcm_distances_str",
+    "glcm_angles_str",
+})
+
+
+def image_digest(img):
+    """SHA-256 of a decoded image (shape, dtype and pixels)"""
+    arr = np.ascontiguousarray(img)
+    h = hashlib.sha256()
+    h.update(f"{arr.shape}|{arr.dtype.str}|".encode("ascii"))
+    h.update(memoryview(arr).cast("B"))
+    return h.hexdigest()
+
+
+def _canonical(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (np.floating, np.integer, np.bool_)):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def settings_fingerprint(settings):
+    """SHA-256 of the analysis-relevant QCSettings fields (canonical JSON)"""
+    relevant = {
+        f.name: _canonical(getattr(settings, f.name))
+        for f in dataclasses.fields(settings)
+        if f.name not in UI_ONLY_FIELDS and f.name not in REPORT_IDENTITY_FIELDS
+    }
+    payload = json.dumps(relevant, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def analysis_cache_key(ref_digest, test_digest, settings):
+    """
+    Cache key for one analysis.
+
+    Args:
+        ref_digest, test_digest: image_digest() of the decoded reference/sample
+        settings: QCSettings
+
+    Returns:
+        Hex digest (also covers SOFTWARE_VERSION and ENGINE_VERSION, so
+        upgrades and numerics changes invalidate it)
+    """
+    h = hashlib.sha256()
+    for part in (SOFTWARE_VERSION, f"engine{ENGINE_VERSION}", ref_digest, test_digest,
+                 settings_fingerprint(settings)):
+        h.update(part.encode("ascii"))
+        h.update(b"\0")
+    return h.hexdigest()
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - offline font registry for Unicode (Turkish) PDF output
+
+Fonts are resolved only from local directories: the bundled/cache font
+directory (TEXTILE_QC_FONT_DIR, default static/fonts) followed by the usual
+system font locations. Nothing is downloaded or installed; if no suitable
+pair is found the built-in Helvetica fonts are used.
+"""
+
+import os
+import time
+import logging
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from .config import BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# Font registry
+# ----------------------------
+
+# Local font directory checked before the system locations. Drop the TTF files
+# listed in FONT_CANDIDATES here to pin the report font on air-gapped machines.
+FONT_DIR = os.environ.get("TEXTILE_QC_FONT_DIR", os.path.join(BASE_DIR, "static", "fonts"))
+
+SYSTEM_FONT_DIRS = [
+    "/usr/share/fonts/truetype/noto",
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/truetype/liberation",
+    "/usr/share/fonts/truetype/freefont",
+    "/usr/share/fonts/TTF",
+    "/usr/local/share/fonts",
+    "/Library/Fonts",
+    "C:\\Windows\\Fonts",
+]
+
+# (regular name, bold name, regular file, bold file), in order of preference.
+# All of these cover the Turkish alphabet, including dotless i (ı) and ş.
+FONT_CANDIDATES = [
+    ("NotoSans", "NotoSans-Bold", "NotoSans-Regular.ttf", "NotoSans-Bold.ttf"),
+    ("DejaVuSans", "DejaVuSans-Bold", "DejaVuSans.ttf", "DejaVuSans-Bold.ttf"),
+    ("LiberationSans", "LiberationSans-Bold", "LiberationSans-Regular.ttf", "LiberationSans-Bold.ttf"),
+    ("FreeSans", "FreeSansBold", "FreeSans.ttf", "FreeSansBold.ttf"),
+]
+
+FALLBACK_FONTS = {"regular": "Helvetica", "bold": "Helvetica-Bold"}
+
+TURKISH_CORE_CHARS = "ıİşŞöÖüÜğĞçÇ"
+
+# Resolved once per process by register_pdf_fonts()
+_REGISTERED_FONTS = None
+FONT_RESOLUTION_TIME_S = None
+
+
+def font_search_dirs():
+    """Directories searched for report fonts, local font directory first."""
+    dirs = [FONT_DIR] + SYSTEM_FONT_DIRS
+    return [d for d in dirs if os.path.isdir(d)]
+
+
+def _find_font_file(filename, search_dirs):
+    for d in search_dirs:
+        path = os.path.join(d, filename)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _supports_chars(font_name: str, chars: str) -> bool:
+    """Check if a registered ReportLab font has glyphs for all chars."""
+    try:
+        face = pdfmetrics.getFont(font_name).face
+        return all(ord(ch) in face.charWidths for ch in chars)
+    except Exception:
+        return False
+
+
+def register_pdf_fonts():
+    """
+    Register the Unicode report fonts with ReportLab (once per process).
+
+    Returns:
+        Dict with 'regular' and 'bold' ReportLab font names
+    """
+    global _REGISTERED_FONTS, FONT_RESOLUTION_TIME_S
+
+    if _REGISTERED_FONTS is not None:
+        return _REGISTERED_FONTS
+
+    started = time.perf_counter()
+    fonts = dict(FALLBACK_FONTS)
+
+    search_dirs = font_search_dirs()
+    for reg_name, bold_name, reg_file, bold_file in FONT_CANDIDATES:
+        reg_path = _find_font_file(reg_file, search_dirs)
+        bold_path = _find_font_file(bold_file, search_dirs)
+        if not (reg_path and bold_path):
+            continue
+        try:
+            pdfmetrics.registerFont(TTFont(reg_name, reg_path))
+            pdfmetrics.registerFont(TTFont(bold_name, bold_path))
+        except Exception as e:
+            logger.debug(f"Could not register font pair {reg_name}/{bold_name}: {e}")
+            continue
+        if _supports_chars(reg_name, TURKISH_CORE_CHARS) and _supports_chars(bold_name, TURKISH_CORE_CHARS):
+            fonts = {"regular": reg_name, "bold": bold_name}
+            break
+        logger.warning(f"Font pair missing Turkish glyphs: {reg_name}/{bold_name} (trying next)")
+
+    # Register a font family mapping so ReportLab Paragraph markup like <b>...</b>
+    # uses the Unicode-capable bold font instead of silently falling back to Helvetica-Bold.
+    if fonts != FALLBACK_FONTS:
+        try:
+            pdfmetrics.registerFontFamily(
+                fonts["regular"],
+                normal=fonts["regular"],
+                bold=fonts["bold"],
+                italic=fonts["regular"],
+                boldItalic=fonts["bold"],
+            )
+        except Exception as e:
+            logger.warning(f"Could not register font family mapping for {fonts['regular']}: {e}")
+
+    FONT_RESOLUTION_TIME_S = time.perf_counter() - started
+    _REGISTERED_FONTS = fonts
+
+    if fonts == FALLBACK_FONTS:
+        logger.warning(f"No local Unicode font found in {FONT_DIR} or system font directories - "
+                       f"using Helvetica, Turkish characters may not display correctly "
+                       f"({FONT_RESOLUTION_TIME_S * 1000:.1f} ms)")
+    else:
+        logger.info(f"PDF fonts: Regular={fonts['regular']}, Bold={fonts['bold']} "
+                    f"(resolved in {FONT_RESOLUTION_TIME_S * 1000:.1f} ms)")
+    return fonts
@@ -0,0 +1,793 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - report translations (English / Turkish)
+"""
+
+# ----------------------------
+# Language / Internationalization
+# ----------------------------
+TRANSLATIONS = {
+    "en": {
+        # General / UI
+        "language_toggle_label": "Language / Dil",
+        "english": "English",
+        "turkish": "Türkçe",
+        "language_selected": "Language: English",
+
+        # Main UI
+        "textile_qc_system": "Textile Quality Control System",
+        "professional_analysis": "Professional Color & Pattern Analysis",
+        "images_loaded": "Images Loaded Successfully",
+        "reference": "Reference",
+        "sample": "Sample",
+        "pixels": "pixels",
+        "start_processing": "Start Processing",
+        "advanced_settings": "Advanced Settings",
+        "report_sections": "Report Sections",
+        "apply_settings_start": "Apply Settings & Start Processing",
+        "processing_with_custom": "Processing with custom settings...",
+        "processing_with_default": "Processing with default settings...",
+        "analysis_in_progress": "Analysis in Progress...",
+        "analysis_progress_msg": "Performing color and pattern analysis. This may take a moment.",
+        "analysis_complete": "Analysis Complete!",
+        "reports_generated": "Your comprehensive quality control reports have been generated.",
+        "download_report": "Download Report",
+        "download_settings_report": "Download Analysis Settings Report",
+        "main_report": "Main Report",
+        "technical_report": "Technical Settings Report",
+        "error": "Error",
+        "error_occurred": "An error occurred during processing:",
+
+        # Report sections
+        "report_metadata": "Report Metadata",
+        "report_date": "Report Date",
+        "operator": "Operator",
+        "analysis_id": "Analysis ID",
+        "software_version": "Software Version",
+        "executive_summary": "EXECUTIVE SUMMARY",
+
+        # Status (user-friendly)
+        "pass": "SUCCEEDED",
+        "fail": "FAILED",
+        "conditional": "CONDITIONAL",
+        "accept": "ACCEPT",
+        "reject": "REJECT",
+        "conditional_accept": "CONDITIONAL ACCEPT",
+        "disabled": "DISABLED",
+
+        # Metrics
+        "metric": "Metric",
+        "score": "Score",
+        "status": "Status",
+        "value": "Value",
+        "threshold": "Threshold",
+        "interpretation": "Interpretation",
+        "color_score": "Color Score",
+        "pattern_score": "Pattern Score (SSIM)",
+        "pattern_repetition": "Pattern Repetition",
+        "overall_score": "Overall Score",
+        "mean": "Mean",
+        "std_dev": "Std Dev",
+        "min": "Min",
+        "max": "Max",
+
+        # Analysis Settings
+        "analysis_settings": "Analysis Settings",
+        "settings_used": "The following settings were used for this analysis:",
+
+        # Color Unit
+        "color_unit": "Color Unit",
+        "input_images": "Input Images",
+        "filenames": "Filenames",
+        "regional_analysis": "Regional Analysis",
+        "mode": "Mode",
+        "grid_mode_desc": "5-point grid within central area",
+        "circle_radius_px": "Circle radius (px)",
+        "centers_xy": "Centers (x,y)",
+
+        # Color Measurements
+        "color_measurements": "Color Measurements",
+        "regional_analysis_desc": "5-point regional analysis with Reference vs Sample comparison",
+        "rgb_color_values": "RGB Color Values",
+        "lab_color_values": "LAB* Color Space Values",
+        "xyz_tristimulus": "XYZ Tristimulus Values",
+        "cmyk_color_values": "CMYK Color Values",
+        "color_difference_metrics": "Color Difference Metrics",
+        "region": "Region",
+        "position": "Position",
+
+        # Delta E
+        "delta_e_summary": "ΔE Summary Statistics",
+        "overall_status": "Overall Status",
+        "not_perceptible": "Not perceptible",
+        "perceptible_close": "Perceptible (close observation)",
+        "perceptible_glance": "Perceptible at a glance",
+        "clear_difference": "Clear difference",
+        "more_different": "More different than similar",
+
+        # Statistical Analysis
+        "statistical_analysis_rgb": "Statistical Analysis (RGB)",
+        "channel": "Channel",
+        "mean_diff": "Mean Diff",
+        "max_diff": "Max Diff",
+        "min_diff": "Min Diff",
+        "rmse": "RMSE",
+
+        # Color Quality
+        "color_quality_indices": "Color Quality Indices",
+        "metamerism_index": "Metamerism Index",
+        "uniformity_index": "Uniformity Index",
+        "color_consistency_desc": "Color consistency across D65/TL84/A illuminants",
+        "spatial_consistency_desc": "Spatial consistency of color across the sample",
+
+        # Spectral
+        "spectral_analysis_proxy": "Spectral Analysis (Proxy)",
+        "spectral_proxy_desc": "The chart approximates spectral behavior from RGB averages to aid visual comparison.",
+
+        # Visual Difference
+        "visual_diff_analysis": "Visual Difference Analysis",
+        "de2000_heatmap": "ΔE2000 Heatmap (D65)",
+        "abs_diff_gray": "Absolute Difference (gray)",
+        "defect_mask_otsu": "Defect Mask (Otsu)",
+
+        # Lab Analysis
+        "detailed_lab_analysis": "Detailed Lab* Color Space Analysis",
+        "component": "Component",
+        "difference": "Difference",
+        "lightness": "Lightness",
+        "green_red": "Green-Red",
+        "blue_yellow": "Blue-Yellow",
+        "no_significant_change": "No significant change",
+        "lighter": "Lighter",
+        "darker": "Darker",
+        "no_significant_shift": "No significant shift",
+        "more_red": "More Red",
+        "more_green": "More Green",
+        "more_yellow": "More Yellow",
+        "more_blue": "More Blue",
+
+        # Lab Visualizations
+        "lab_visualizations": "Lab* Visualizations",
+        "lab_viz_desc": "a*-b* chromaticity plot and L*a*b* component comparison.",
+
+        # Quality Assessment
+        "quality_assessment_lab": "Quality Assessment (Lab* thresholds)",
+        "parameter": "Parameter",
+        "actual": "Actual",
+        "overall_magnitude": "Overall Magnitude",
+
+        # Recommendations
+        "recommendations_lab": "Recommendations (Based on Lab*)",
+        "action": "Action",
+        "lightness_rec": "Adjust dye concentration / dwell time to correct L*",
+        "red_green_axis": "Red–Green Axis",
+        "red_green_rec": "Tune dye formulation on a* (shift toward opposite hue)",
+        "blue_yellow_axis": "Blue–Yellow Axis",
+        "blue_yellow_rec": "Modify temperature/pH to counter b* deviation",
+        "overall_rec": "Review process parameters; consider re-processing and tighter QC sampling",
+        "within_tolerance": "Within tight tolerances. Maintain current parameters and monitor periodically.",
+
+        # Pattern Unit
+        "pattern_unit": "Pattern Unit",
+        "pattern_metrics": "Pattern Metrics",
+        "ssim": "SSIM",
+        "symmetry": "Symmetry",
+        "repeat_px": "Repeat (px)",
+        "edge_definition": "Edge Definition",
+        "defect_density": "Defect Density (rel.)",
+        "histograms_rgb": "Histograms (RGB)",
+        "histogram_interpretation": "Interpretation: RGB histograms show the distribution of color values across the image. Similar histogram shapes between Reference and Sample indicate consistent color reproduction. Shifts in peak positions suggest color bias; narrower distributions indicate more uniform color.",
+
+        # Advanced Texture
+        "advanced_texture_analysis": "Advanced Texture Analysis",
+        "fourier_domain_analysis": "Fourier Domain Analysis",
+        "fourier_desc": "2D Fast Fourier Transform reveals periodic structures and directional patterns in the fabric.",
+        "peak": "Peak",
+        "radius": "Radius",
+        "angle": "Angle",
+        "magnitude": "Magnitude",
+        "fundamental_period": "Fundamental Period (px)",
+        "dominant_orientation": "Dominant Orientation (°)",
+        "anisotropy_ratio": "Anisotropy Ratio",
+
+        # Gabor
+        "gabor_analysis": "Gabor Filter Bank Analysis",
+        "gabor_desc": "Multi-scale and multi-orientation responses capture texture at different frequencies and angles.",
+        "coherency": "Coherency",
+
+        # GLCM
+        "glcm_features": "GLCM Texture Features",
+        "glcm_desc": "Gray Level Co-occurrence Matrix (GLCM) quantifies spatial relationships in texture.",
+        "feature": "Feature",
+        "z_score": "z-score",
+        "interp": "Interp.",
+        "similar": "Similar",
+        "moderate": "Moderate",
+        "significant": "Significant",
+
+        # LBP
+        "lbp_analysis": "Local Binary Patterns (LBP)",
+        "lbp_desc": "LBP captures local texture by encoding pixel neighborhoods into binary patterns.",
+        "chi2_distance": "χ² Distance",
+        "bhattacharyya_distance": "Bhattacharyya Distance",
+        "lower_more_similar": "Lower is more similar",
+
+        # Wavelet
+        "wavelet_decomposition": "Wavelet Decomposition",
+        "wavelet_desc": "Multiresolution analysis using {wavelet} wavelet at {levels} levels.",
+        "level": "Level",
+        "band": "Band",
+        "ref_energy": "Ref Energy",
+        "sample_energy": "Sample Energy",
+        "ratio": "Ratio",
+
+        # Structure Tensor
+        "structure_tensor": "Structure Tensor Analysis",
+        "mean_coherency": "Mean Coherency",
+        "hog_edge_density": "HOG Edge Density",
+        "line_angle_distribution": "Line Angle Distribution",
+
+        # Defect Detection
+        "defect_detection": "Defect Detection & Saliency Map",
+        "defect_desc": "Spectral residual saliency combined with morphological operations identifies potential defects.",
+        "id": "ID",
+        "type": "Type",
+        "area_px": "Area (px²)",
+        "bounding_box": "Bounding Box (x0,y0,x1,y1)",
+        "total_defects": "Total defects detected:",
+        "no_defects": "No significant defects detected.",
+
+        # Pattern Repetition
+        "pattern_repetition_unit": "Pattern Repetition Unit",
+        "pattern_repetition_desc": "Analysis of pattern count, distribution, and integrity.",
+        "pattern_detection_summary": "Pattern Detection Summary",
+        "total_pattern_count": "Total Pattern Count",
+        "mean_pattern_area": "Mean Pattern Area (px²)",
+        "pattern_size_cv": "Pattern Size CV%",
+        "spacing_uniformity": "Spacing Uniformity (%)",
+        "pattern_integrity": "Pattern Integrity (%)",
+
+        # Pattern Count
+        "pattern_count_analysis": "Pattern Count Analysis",
+        "pattern_count_desc": "Detected patterns in reference and sample images using connected components analysis.",
+
+        # Blob Detection
+        "blob_detection": "Blob Detection Results",
+        "blob_desc": "SimpleBlobDetector analysis with circularity and convexity filtering.",
+        "blob_count": "Blob Count",
+        "mean_area": "Mean Area (px²)",
+        "area_cv": "Area CV%",
+        "mean_size": "Mean Size",
+
+        # Keypoint
+        "keypoint_matching": "Keypoint Matching Analysis",
+        "keypoint_desc": "Feature-based matching using {detector} detector.",
+        "detector_type": "Detector Type",
+        "keypoints_ref": "Keypoints (Reference)",
+        "keypoints_sample": "Keypoints (Sample)",
+        "good_matches": "Good Matches",
+        "match_ratio": "Match Ratio",
+        "matching_score": "Matching Score",
+        "inliers_ransac": "Inliers (RANSAC)",
+
+        # Autocorrelation
+        "autocorrelation_analysis": "Auto-correlation Analysis",
+        "autocorr_desc": "2D auto-correlation reveals pattern periodicity and regularity.",
+        "periodicity_score": "Periodicity Score",
+        "pattern_spacing": "Pattern Spacing (px)",
+        "regularity_score": "Regularity Score",
+        "detected_peaks": "Detected Peaks",
+
+        # Spatial Distribution
+        "spatial_distribution": "Spatial Distribution Analysis",
+        "spatial_desc": "Grid-based pattern density analysis (cell size: {cell_size}px).",
+        "grid_size": "Grid Size",
+        "mean_density": "Mean Density",
+        "density_std": "Density Std Dev",
+        "density_cv": "Density CV%",
+        "uniformity_score": "Uniformity Score",
+
+        # Pattern Integrity
+        "pattern_integrity_assessment": "Pattern Integrity Assessment",
+        "integrity_desc": "Multi-dimensional comparison of pattern properties.",
+        "size_similarity": "Size Similarity",
+        "shape_similarity": "Shape Similarity",
+        "spatial_similarity": "Spatial Similarity",
+        "overall_integrity": "Overall Integrity",
+
+        # Missing/Extra Patterns
+        "missing_extra_catalog": "Missing/Extra Patterns Catalog",
+        "missing_patterns": "Missing Patterns",
+        "extra_patterns": "Extra Patterns",
+        "location": "Location (x, y)",
+        "expected_size": "Expected Size (px²)",
+        "severity": "Severity",
+        "and_more_missing": "... and {count} more missing patterns.",
+        "and_more_extra": "... and {count} more extra patterns.",
+        "no_missing": "No missing patterns detected.",
+        "no_extra": "No extra patterns detected.",
+
+        # Pattern Recommendations
+        "pattern_recommendations": "Pattern Repetition Recommendations",
+        "count_mismatch": "Pattern Count Mismatch",
+        "count_mismatch_rec": "Critical: Investigate dyeing/printing process for pattern dropout or duplication",
+        "count_variation": "Pattern Count Variation",
+        "count_variation_rec": "Monitor: Pattern count is acceptable but close to limit",
+        "poor_uniformity": "Poor Spatial Uniformity",
+        "poor_uniformity_rec": "Check fabric tension and printing alignment",
+        "integrity_issues": "Pattern Integrity Issues",
+        "integrity_issues_rec": "Review pattern size and shape consistency in production",
+        "pattern_ok": "Pattern repetition is within acceptable limits. Maintain current parameters.",
+
+        # Spectrophotometer
+        "spectrophotometer_sim": "Spectrophotometer Simulation",
+        "instrument_config": "Instrument Configuration",
+        "observer_angle": "Observer Angle",
+        "geometry_mode": "Geometry Mode",
+        "illuminant_primary": "Illuminant (Primary)",
+        "uv_control": "UV Control",
+
+        # Color Difference Methods
+        "color_diff_methods": "Color Difference Methods",
+        "method": "Method",
+
+        # Whiteness/Yellowness
+        "whiteness_yellowness": "Whiteness & Yellowness Indices",
+        "index": "Index",
+        "cie_whiteness": "CIE Whiteness (ISO 11475)",
+        "cie_tint": "CIE Tint",
+        "yellowness_index": "Yellowness Index (ASTM E313)",
+
+        # Metamerism
+        "metamerism_analysis": "Metamerism Analysis",
+        "metamerism_desc": "Color difference under various illuminants to assess metamerism.",
+        "illuminant": "Illuminant",
+        "worst_metamerism": "Worst-case metamerism:",
+
+        # Spectral Data
+        "spectral_reflectance": "True Spectral Reflectance Analysis",
+        "spectral_data_desc": "Spectral data provided: Reference ({ref}), Sample ({sample})",
+        "wavelength": "Wavelength (nm)",
+        "reflectance": "Reflectance (%)",
+        "spectral_note": "Note: Tristimulus values computed from spectral data using CIE color matching functions.",
+
+        # Calibration
+        "calibration_limitations": "Calibration & Limitations",
+        "status_note": "Status / Note",
+        "white_tile_calibration": "White Tile Calibration",
+        "simulated": "Simulated (not available for RGB images)",
+        "data_source": "Data Source",
+        "spectral_csv": "Spectral CSV",
+        "rgb_xyz_conversion": "RGB → XYZ conversion",
+
+        # Conclusion
+        "conclusion_decision": "Conclusion & Decision",
+        "recommendation": "Recommendation",
+        "reject_msg_1": "Significant deviation from reference; corrective action required.",
+        "reject_msg_2": "Review dyeing parameters, chemical concentrations, and fabric preparation.",
+        "reject_msg_3": "Consider re-processing and implement enhanced QC measures.",
+        "conditional_msg_1": "Sample is near limits; monitor closely.",
+        "conditional_msg_2": "Fine-tune process parameters to improve stability.",
+        "accept_msg_1": "Sample matches reference within acceptable tolerances.",
+        "accept_msg_2": "Maintain parameters and regular monitoring.",
+
+        # Upload
+        "upload_reference": "Please upload the REFERENCE image first, then the TEST image.",
+        "upload_test": "Now upload the TEST image.",
+        "no_files_uploaded": "No files uploaded.",
+        "only_one_uploaded": "Only one image uploaded. Need two.",
+    },
+
+    "tr": {
+        # General / UI
+        "language_toggle_label": "Language / Dil",
+        "english": "English",
+        "turkish": "Türkçe",
+        "language_selected": "Dil: Türkçe",
+
+        # Main UI
+        "textile_qc_system": "Tekstil Kalite Kontrol Sistemi",
+        "professional_analysis": "Profesyonel Renk ve Desen Analizi",
+        "images_loaded": "Görüntüler Başarıyla Yüklendi",
+        "reference": "Referans",
+        "sample": "Numune",
+        "pixels": "piksel",
+        "start_processing": "İşlemeyi Başlat",
+        "advanced_settings": "Gelişmiş Ayarlar",
+        "report_sections": "Rapor Bölümleri",
+        "apply_settings_start": "Ayarları Uygula ve İşlemeyi Başlat",
+        "processing_with_custom": "Özel ayarlarla işleniyor...",
+        "processing_with_default": "Varsayılan ayarlarla işleniyor...",
+        "analysis_in_progress": "Analiz Devam Ediyor...",
+        "analysis_progress_msg": "Renk ve desen analizi yapılıyor. Bu işlem biraz zaman alabilir.",
+        "analysis_complete": "Analiz Tamamlandı!",
+        "reports_generated": "Kapsamlı kalite kontrol raporlarınız oluşturuldu.",
+        "download_report": "Raporu İndir",
+        "download_settings_report": "Analiz Ayarları Raporunu İndir",
+        "main_report": "Ana Rapor",
+        "technical_report": "Teknik Ayarlar Raporu",
+        "error": "Hata",
+        "error_occurred": "İşlem sırasında bir hata oluştu:",
+
+        # Report sections
+        "report_metadata": "Rapor Bilgileri",
+        "report_date": "Rapor Tarihi",
+        "operator": "Operatör",
+        "analysis_id": "Analiz Kimliği",
+        "software_version": "Yazılım Sürümü",
+        "executive_summary": "YÖNETİCİ ÖZETİ",
+
+        # Status
+        "pass": "BAŞARILI",
+        "fail": "BAŞARISIZ",
+        "conditional": "KOŞULLU",
+        "accept": "KABUL",
+        "reject": "RED",
+        "conditional_accept": "KOŞULLU KABUL",
+        "disabled": "DEVRE DIŞI",
+
+        # Metrics
+        "metric": "Metrik",
+        "score": "Puan",
+        "status": "Durum",
+        "value": "Değer",
+        "threshold": "Eşik",
+        "interpretation": "Yorum",
+        "color_score": "Renk Puanı",
+        "pattern_score": "Desen Puanı (SSIM)",
+        "pattern_repetition": "Desen Tekrarı",
+        "overall_score": "Genel Puan",
+        "mean": "Ortalama",
+        "std_dev": "Std Sapma",
+        "min": "Min",
+        "max": "Maks",
+
+        # Analysis Settings
+        "analysis_settings": "Analiz Ayarları",
+        "settings_used": "Bu analiz için aşağıdaki ayarlar kullanıldı:",
+
+        # Color Unit
+        "color_unit": "Renk Birimi",
+        "input_images": "Giriş Görüntüleri",
+        "filenames": "Dosya Adları",
+        "regional_analysis": "Bölgesel Analiz",
+        "mode": "Mod",
+        "grid_mode_desc": "Merkez alanda 5 noktalı ızgara",
+        "circle_radius_px": "Daire yarıçapı (px)",
+        "centers_xy": "Merkezler (x,y)",
+
+        # Color Measurements
+        "color_measurements": "Renk Ölçümleri",
+        "regional_analysis_desc": "Referans ve Numune karşılaştırmalı 5 noktalı bölgesel analiz",
+        "rgb_color_values": "RGB Renk Değerleri",
+        "lab_color_values": "LAB* Renk Uzayı Değerleri",
+        "xyz_tristimulus": "XYZ Tristimulus Değerleri",
+        "cmyk_color_values": "CMYK Renk Değerleri",
+        "color_difference_metrics": "Renk Farkı Metrikleri",
+        "region": "Bölge",
+        "position": "Konum",
+
+        # Delta E
+        "delta_e_summary": "ΔE Özet İstatistikleri",
+        "overall_status": "Genel Durum",
+        "not_perceptible": "Algılanamaz",
+        "perceptible_close": "Algılanabilir (yakından bakıldığında)",
+        "perceptible_glance": "İlk bakışta algılanabilir",
+        "clear_difference": "Belirgin fark",
+        "more_different": "Benzerden çok farklı",
+
+        # Statistical Analysis
+        "statistical_analysis_rgb": "İstatistiksel Analiz (RGB)",
+        "channel": "Kanal",
+        "mean_diff": "Ort. Fark",
+        "max_diff": "Maks Fark",
+        "min_diff": "Min Fark",
+        "rmse": "RMSE",
+
+        # Color Quality
+        "color_quality_indices": "Renk Kalite İndeksleri",
+        "metamerism_index": "Metamerizm İndeksi",
+        "uniformity_index": "Homojenlik İndeksi",
+        "color_consistency_desc": "D65/TL84/A aydınlatıcıları arasında renk tutarlılığı",
+        "spatial_consistency_desc": "Numune genelinde rengin mekansal tutarlılığı",
+
+        # Spectral
+        "spectral_analysis_proxy": "Spektral Analiz (Tahmini)",
+        "spectral_proxy_desc": "Bu grafik, görsel karşılaştırmaya yardımcı olmak için RGB ortalamalarından spektral davranışı yaklaşık olarak gösterir.",
+
+        # Visual Difference
+        "visual_diff_analysis": "Görsel Fark Analizi",
+        "de2000_heatmap": "ΔE2000 Isı Haritası (D65)",
+        "abs_diff_gray": "Mutlak Fark (gri)",
+        "defect_mask_otsu": "Hata Maskesi (Otsu)",
+
+        # Lab Analysis
+        "detailed_lab_analysis": "Detaylı Lab* Renk Uzayı Analizi",
+        "component": "Bileşen",
+        "difference": "Fark",
+        "lightness": "Açıklık (Lightness)",
+        "green_red": "Yeşil-Kırmızı",
+        "blue_yellow": "Mavi-Sarı",
+        "no_significant_change": "Önemli değişiklik yok",
+        "lighter": "Daha açık",
+        "darker": "Daha koyu",
+        "no_significant_shift": "Önemli kayma yok",
+        "more_red": "Daha kırmızı",
+        "more_green": "Daha yeşil",
+        "more_yellow": "Daha sarı",
+        "more_blue": "Daha mavi",
+
+        # Lab Visualizations
+        "lab_visualizations": "Lab* Görselleştirmeleri",
+        "lab_viz_desc": "a*-b* kromatiklik grafiği ve L*a*b* bileşen karşılaştırması.",
+
+        # Quality Assessment
+        "quality_assessment_lab": "Kalite Değerlendirmesi (Lab* eşikleri)",
+        "parameter": "Parametre",
+        "actual": "Gerçek",
+        "overall_magnitude": "Genel Büyüklük",
+
+        # Recommendations
+        "recommendations_lab": "Öneriler (Lab* Tabanlı)",
+        "action": "Eylem",
+        "lightness_rec": "L* değerini düzeltmek için boya konsantrasyonunu/süresini ayarlayın",
+        "red_green_axis": "Kırmızı–Yeşil Ekseni",
+        "red_green_rec": "a* üzerinde boya formülasyonunu ayarlayın (zıt tona doğru kaydırın)",
+        "blue_yellow_axis": "Mavi–Sarı Ekseni",
+        "blue_yellow_rec": "b* sapmasını dengelemek için sıcaklık/pH değerini değiştirin",
+        "overall_rec": "Proses parametrelerini gözden geçirin; yeniden işleme ve daha sıkı kalite kontrol örneklemesi düşünün",
+        "within_tolerance": "Dar toleranslar içinde. Mevcut parametreleri koruyun ve periyodik olarak izleyin.",
+
+        # Pattern Unit
+        "pattern_unit": "Desen Birimi",
+        "pattern_metrics": "Desen Metrikleri",
+        "ssim": "SSIM",
+        "symmetry": "Simetri",
+        "repeat_px": "Tekrar (px)",
+        "edge_definition": "Kenar Tanımı",
+        "defect_density": "Hata Yoğunluğu (göreceli)",
+        "histograms_rgb": "Histogramlar (RGB)",
+        "histogram_interpretation": "Yorum: RGB histogramları görüntü genelindeki renk değerlerinin dağılımını gösterir. Referans ve Numune arasındaki benzer histogram şekilleri tutarlı renk üretimini gösterir. Tepe noktalarındaki kaymalar renk sapmasını; daha dar dağılımlar daha homojen rengi gösterir.",
+
+        # Advanced Texture
+        "advanced_texture_analysis": "Gelişmiş Doku Analizi",
+        "fourier_domain_analysis": "Fourier Alan Analizi",
+        "fourier_desc": "2B Hızlı Fourier Dönüşümü kumaştaki periyodik yapıları ve yönlü desenleri ortaya çıkarır.",
+        "peak": "Tepe",
+        "radius": "Yarıçap",
+        "angle": "Açı",
+        "magnitude": "Büyüklük",
+        "fundamental_period": "Temel Periyot (px)",
+        "dominant_orientation": "Baskın Yönelim (°)",
+        "anisotropy_ratio": "Anizotropi Oranı",
+
+        # Gabor
+        "gabor_analysis": "Gabor Filtre Bankası Analizi",
+        "gabor_desc": "Çoklu ölçek ve çoklu yönelim tepkileri farklı frekans ve açılarda dokuyu yakalar.",
+        "coherency": "Tutarlılık (Coherency)",
+
+        # GLCM
+        "glcm_features": "GLCM Doku Özellikleri",
+        "glcm_desc": "Gri Seviye Eş-Oluşum Matrisi (GLCM) dokudaki mekansal ilişkileri ölçer.",
+        "feature": "Özellik",
+        "z_score": "z-skoru",
+        "interp": "Yorum",
+        "similar": "Benzer",
+        "moderate": "Orta",
+        "significant": "Önemli",
+
+        # LBP
+        "lbp_analysis": "Yerel İkili Örüntüler (LBP)",
+        "lbp_desc": "LBP, piksel komşuluklarını ikili örüntülere kodlayarak yerel dokuyu yakalar.",
+        "chi2_distance": "χ² Mesafesi",
+        "bhattacharyya_distance": "Bhattacharyya Mesafesi",
+        "lower_more_similar": "Düşük değer daha benzer",
+
+        # Wavelet
+        "wavelet_decomposition": "Dalgacık Ayrıştırması (Wavelet)",
+        "wavelet_desc": "{wavelet} dalgacığı kullanılarak {levels} seviyede çoklu çözünürlük analizi.",
+        "level": "Seviye",
+        "band": "Bant",
+        "ref_energy": "Ref Enerji",
+        "sample_energy": "Numune Enerji",
+        "ratio": "Oran",
+
+        # Structure Tensor
+        "structure_tensor": "Yapı Tensörü Analizi",
+        "mean_coherency": "Ortalama Tutarlılık",
+        "hog_edge_density": "HOG Kenar Yoğunluğu",
+        "line_angle_distribution": "Çizgi Açısı Dağılımı",
+
+        # Defect Detection
+        "defect_detection": "Hata Tespiti ve Belirginlik Haritası",
+        "defect_desc": "Spektral artık belirginliği morfolojik işlemlerle birleştirilerek olası hatalar tespit edilir.",
+        "id": "No",
+        "type": "Tür",
+        "area_px": "Alan (px²)",
+        "bounding_box": "Sınırlayıcı Kutu (x0,y0,x1,y1)",
+        "total_defects": "Tespit edilen toplam hata:",
+        "no_defects": "Önemli bir hata tespit edilmedi.",
+
+        # Pattern Repetition
+        "pattern_repetition_unit": "Desen Tekrarı Birimi",
+        "pattern_repetition_desc": "Desen sayısı, dağılımı ve bütünlüğü analizi.",
+        "pattern_detection_summary": "Desen Tespit Özeti",
+        "total_pattern_count": "Toplam Desen Sayısı",
+        "mean_pattern_area": "Ortalama Desen Alanı (px²)",
+        "pattern_size_cv": "Desen Boyutu CV%",
+        "spacing_uniformity": "Aralık Homojenliği (%)",
+        "pattern_integrity": "Desen Bütünlüğü (%)",
+
+        # Pattern Count
+        "pattern_count_analysis": "Desen Sayısı Analizi",
+        "pattern_count_desc": "Bağlı bileşen analizi kullanılarak referans ve numune görüntülerinde tespit edilen desenler.",
+
+        # Blob Detection
+        "blob_detection": "Blob Tespit Sonuçları",
+        "blob_desc": "Dairesellik ve dışbükeylik filtreli SimpleBlobDetector analizi.",
+        "blob_count": "Blob Sayısı",
+        "mean_area": "Ortalama Alan (px²)",
+        "area_cv": "Alan CV%",
+        "mean_size": "Ortalama Boyut",
+
+        # Keypoint
+        "keypoint_matching": "Anahtar Nokta Eşleştirme Analizi",
+        "keypoint_desc": "{detector} dedektörü kullanılarak özellik tabanlı eşleştirme.",
+        "detector_type": "Dedektör Türü",
+        "keypoints_ref": "Anahtar Noktalar (Referans)",
+        "keypoints_sample": "Anahtar Noktalar (Numune)",
+        "good_matches": "İyi Eşleşmeler",
+        "match_ratio": "Eşleşme Oranı",
+        "matching_score": "Eşleşme Puanı",
+        "inliers_ransac": "İç Noktalar (RANSAC)",
+
+        # Autocorrelation
+        "autocorrelation_analysis": "Otokorelasyon Analizi",
+        "autocorr_desc": "2B otokorelasyon desen periyodikliğini ve düzenliliğini ortaya çıkarır.",
+        "periodicity_score": "Periyodiklik Puanı",
+        "pattern_spacing": "Desen Aralığı (px)",
+        "regularity_score": "Düzenlilik Puanı",
+        "detected_peaks": "Tespit Edilen Tepeler",
+
+        # Spatial Distribution
+        "spatial_distribution": "Mekansal Dağılım Analizi",
+        "spatial_desc": "Izgara tabanlı desen yoğunluğu analizi (hücre boyutu: {cell_size}px).",
+        "grid_size": "Izgara Boyutu",
+        "mean_density": "Ortalama Yoğunluk",
+        "density_std": "Yoğunluk Std Sapma",
+        "density_cv": "Yoğunluk CV%",
+        "uniformity_score": "Homojenlik Puanı",
+
+        # Pattern Integrity
+        "pattern_integrity_assessment": "Desen Bütünlüğü Değerlendirmesi",
+        "integrity_desc": "Desen özelliklerinin çok boyutlu karşılaştırması.",
+        "size_similarity": "Boyut Benzerliği",
+        "shape_similarity": "Şekil Benzerliği",
+        "spatial_similarity": "Mekansal Benzerlik",
+        "overall_integrity": "Genel Bütünlük",
+
+        # Missing/Extra Patterns
+        "missing_extra_catalog": "Eksik/Fazla Desen Kataloğu",
+        "missing_patterns": "Eksik Desenler",
+        "extra_patterns": "Fazla Desenler",
+        "location": "Konum (x, y)",
+        "expected_size": "Beklenen Boyut (px²)",
+        "severity": "Önem Derecesi",
+        "and_more_missing": "... ve {count} eksik desen daha.",
+        "and_more_extra": "... ve {count} fazla desen daha.",
+        "no_missing": "Eksik desen tespit edilmedi.",
+        "no_extra": "Fazla desen tespit edilmedi.",
+
+        # Pattern Recommendations
+        "pattern_recommendations": "Desen Tekrarı Önerileri",
+        "count_mismatch": "Desen Sayısı Uyumsuzluğu",
+        "count_mismatch_rec": "Kritik: Desen düşmesi veya tekrarlanması için boyama/baskı sürecini inceleyin",
+        "count_variation": "Desen Sayısı Değişimi",
+        "count_variation_rec": "İzleme: Desen sayısı kabul edilebilir ancak limite yakın",
+        "poor_uniformity": "Zayıf Mekansal Homojenlik",
+        "poor_uniformity_rec": "Kumaş gerginliğini ve baskı hizalamasını kontrol edin",
+        "integrity_issues": "Desen Bütünlüğü Sorunları",
+        "integrity_issues_rec": "Üretimde desen boyutu ve şekil tutarlılığını gözden geçirin",
+        "pattern_ok": "Desen tekrarı kabul edilebilir sınırlar içinde. Mevcut parametreleri koruyun.",
+
+        # Spectrophotometer
+        "spectrophotometer_sim": "Spektrofotometre Simülasyonu",
+        "instrument_config": "Cihaz Yapılandırması",
+        "observer_angle": "Gözlemci Açısı",
+        "geometry_mode": "Geometri Modu",
+        "illuminant_primary": "Aydınlatıcı (Birincil)",
+        "uv_control": "UV Kontrolü",
+
+        # Color Difference Methods
+        "color_diff_methods": "Renk Farkı Yöntemleri",
+        "method": "Yöntem",
+
+        # Whiteness/Yellowness
+        "whiteness_yellowness": "Beyazlık ve Sarılık İndeksleri",
+        "index": "İndeks",
+        "cie_whiteness": "CIE Beyazlık (ISO 11475)",
+        "cie_tint": "CIE Ton",
+        "yellowness_index": "Sarılık İndeksi (ASTM E313)",
+
+        # Metamerism
+        "metamerism_analysis": "Metamerizm Analizi",
+        "metamerism_desc": "Metamerizmi değerlendirmek için çeşitli aydınlatıcılar altında renk farkı.",
+        "illuminant": "Aydınlatıcı",
+        "worst_metamerism": "En kötü durum metamerizmi:",
+
+        # Spectral Data
+        "spectral_reflectance": "Gerçek Spektral Yansıma Analizi",
+        "spectral_data_desc": "Sağlanan spektral veri: Referans ({ref}), Numune ({sample})",
+        "wavelength": "Dalga Boyu (nm)",
+        "reflectance": "Yansıma (%)",
+        "spectral_note": "Not: Tristimulus değerleri CIE renk eşleştirme fonksiyonları kullanılarak spektral veriden hesaplanmıştır.",
+
+        # Calibration
+        "calibration_limitations": "Kalibrasyon ve Sınırlamalar",
+        "status_note": "Durum / Not",
+        "white_tile_calibration": "Beyaz Karo Kalibrasyonu",
+        "simulated": "Simüle (RGB görüntüler için mevcut değil)",
+        "data_source": "Veri Kaynağı",
+        "spectral_csv": "Spektral CSV",
+        "rgb_xyz_conversion": "RGB → XYZ dönüşümü",
+
+        # Conclusion
+        "conclusion_decision": "Sonuç ve Karar",
+        "recommendation": "Öneri",
+        "reject_msg_1": "Referanstan önemli sapma; düzeltici eylem gerekli.",
+        "reject_msg_2": "Boyama parametrelerini, kimyasal konsantrasyonlarını ve kumaş hazırlığını gözden geçirin.",
+        "reject_msg_3": "Yeniden işleme yapın ve gelişmiş kalite kontrol önlemlerini uygulayın.",
+        "conditional_msg_1": "Numune limitlere yakın; yakından izleyin.",
+        "conditional_msg_2": "Stabiliteyi artırmak için proses parametrelerini ince ayarlayın.",
+        "accept_msg_1": "Numune kabul edilebilir toleranslar içinde referansla eşleşiyor.",
+        "accept_msg_2": "Parametreleri koruyun ve düzenli izleme yapın.",
+
+        # Upload
+        "upload_reference": "Lütfen önce REFERANS görüntüsünü, ardından TEST görüntüsünü yükleyin.",
+        "upload_test": "Şimdi TEST görüntüsünü yükleyin.",
+        "no_files_uploaded": "Dosya yüklenmedi.",
+        "only_one_uploaded": "Sadece bir görüntü yüklendi. İki tane gerekli.",
+    }
+}
+
+def get_text(key, lang="en", **kwargs):
+    """Get translated text for a given key.
+
+    Args:
+        key: Translation key
+        lang: Language code ('en' or 'tr')
+        **kwargs: Format arguments for the text
+
+    Returns:
+        Translated text string
+    """
+    text = TRANSLATIONS.get(lang, TRANSLATIONS["en"]).get(key, TRANSLATIONS["en"].get(key, key))
+    if kwargs:
+        try:
+            text = text.format(**kwargs)
+        except KeyError:
+            pass
+    return text
+
+def tr(key, settings=None, **kwargs):
+    """Shorthand for get_text using settings.language if available."""
+    lang = "en"
+    if settings and hasattr(settings, 'language'):
+        lang = settings.language
+    return get_text(key, lang, **kwargs)
+
+def translate_status(status, lang="en"):
+    """Translate status strings (PASS/FAIL/CONDITIONAL etc.)"""
+    status_map = {
+        "PASS": "pass",
+        "FAIL": "fail",
+        "CONDITIONAL": "conditional",
+        "ACCEPT": "accept",
+        "REJECT": "reject",
+        "CONDITIONAL ACCEPT": "conditional_accept",
+        "DISABLED": "disabled"
+    }
+    key = status_map.get(status.upper(), None)
+    if key:
+        return get_text(key, lang)
+    return status
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - image loading, validation and region-of-interest cropping
+"""
+
+import io
+import os
+
+import numpy as np
+import cv2
+from PIL import Image
+
+from .config import ANALYSIS_WIDTH
+from .stages import timed_stage
+
+# ----------------------------
+# 1) IO & conversions
+# ----------------------------
+def validate_image_file(path):
+    """Validate that the file exists and is a valid image format"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Image file not found: {path}")
+    return validate_image_format(path)
+
+def validate_image_format(path):
+    """Validate the image format from the file name extension"""
+    valid_extensions = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif']
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in valid_extensions:
+        raise ValueError(f"Unsupported image format: {ext}. Supported formats: {', '.join(valid_extensions)}")
+
+    return True
+
+def validate_image_dimensions(img, min_size=100, max_size=10000):
+    """Validate image dimensions are within acceptable range"""
+    h, w = img.shape[:2]
+    return validate_image_size(w, h, min_size=min_size, max_size=max_size)
+
+def validate_image_size(w, h, min_size=100, max_size=10000):
+    """Validate a width/height pair (e.g. read from the file header) before decoding"""
+    if h < min_size or w < min_size:
+        raise ValueError(f"Image too small: {w}x{h}. Minimum size: {min_size}x{min_size}")
+    if h > max_size or w > max_size:
+        raise ValueError(f"Image too large: {w}x{h}. Maximum size: {max_size}x{max_size}")
+    return True
+
+def _open_image(source):
+    """PIL image for a path or in-memory bytes (bytes, memoryview); only the header is read"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return Image.open(io.BytesIO(source))
+    return Image.open(source)
+
+def read_image_size(source, name=None):
+    """
+    Validated (width, height) of an image file, read from its header only.
+
+    Args:
+        source: File path or in-memory file contents
+        name: File name for the format check (default: source when a path)
+    """
+    name = name or source
+    try:
+        validate_image_format(name)
+        with _open_image(source) as img:
+            validate_image_size(*img.size)
+            return img.size
+    except Exception as e:
+        raise RuntimeError(f"Failed to read image {name}: {str(e)}")
+
+def _cv2_decode_rgb(source):
+    """Decode straight into a numpy array with OpenCV (None if unsupported)"""
+    # PIL ignores EXIF orientation, so OpenCV must too
+    flags = cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        arr = cv2.imdecode(np.frombuffer(source, np.uint8), flags)
+    else:
+        arr = cv2.imread(source, flags)
+    if arr is None or arr.dtype != np.uint8:
+        return None
+    return cv2.cvtColor(arr, cv2.COLOR_BGR2RGB, dst=arr)
+
+def load_rgb(source, name=None, size=None):
+    """
+    Decode an RGB image, checking its dimensions before decoding.
+
+    With size=(width, height) the image is resized once, straight to that
+    size. JPEGs far larger than the target are decoded at reduced scale
+    (libjpeg DCT scaling, 1/2 to 1/8) so the full-resolution pixels are
+    never materialized. Other 8-bit images are decoded by OpenCV directly
+    into the array (PIL would hold a second full-size copy).
+
+    Args:
+        source: File path or in-memory file contents
+        name: File name for the format check (default: source when a path)
+        size: Optional target (width, height)
+    """
+    name = name or source
+    try:
+        with timed_stage("decode"):
+            validate_image_format(name)
+            with _open_image(source) as img:
+                validate_image_size(*img.size)
+                arr = None
+                if img.format == "JPEG":
+                    if size is not None:
+                        img.draft("RGB", size)
+                elif img.mode in ("RGB", "RGBA", "L", "LA", "P"):
+                    arr = _cv2_decode_rgb(source)
+                if arr is None:
+                    arr = np.asarray(img.convert("RGB") if img.mode != "RGB" else img)
+            if size is not None and (arr.shape[1], arr.shape[0]) != tuple(size):
+                arr = cv2.resize(arr, tuple(size), interpolation=cv2.INTER_AREA)
+            elif not arr.flags.writeable:
+                arr = arr.copy()  # asarray shares PIL's read-only buffer
+        return arr
+    except Exception as e:
+        raise RuntimeError(f"Failed to read image {name}: {str(e)}")
+
+def read_rgb(path):
+    """Read RGB image with validation"""
+    return load_rgb(path)
+
+def analysis_input_size(ref_size, test_size, settings=None):
+    """
+    Size both images are decoded to for an analysis.
+
+    Both images are brought to their common size (as to_same_size does).
+    Without a crop the pipeline only works at ANALYSIS_WIDTH, so that is
+    the target; crop coordinates are in source pixels, so a crop keeps the
+    common full-resolution size. settings=None means no crop.
+    """
+    w = min(ref_size[0], test_size[0])
+    h = min(ref_size[1], test_size[1])
+    if (settings is not None and settings.use_crop) or w <= ANALYSIS_WIDTH:
+        return w, h
+    return ANALYSIS_WIDTH, max(1, int(h * ANALYSIS_WIDTH / w))
+
+def load_analysis_pair(ref_source, test_source, settings, ref_name=None, test_name=None):
+    """
+    Decode a reference/sample pair for analysis with a single resize each.
+
+    Replaces read_rgb + to_same_size: dimensions are validated from the
+    headers, then each image is decoded (at reduced scale for large JPEGs)
+    and resized once to analysis_input_size, one image at a time.
+
+    Returns:
+        (ref, test, source_size) where source_size is the common
+        full-resolution (width, height) before downscaling
+    """
+    ref_size = read_image_size(ref_source, ref_name)
+    test_size = read_image_size(test_source, test_name)
+    size = analysis_input_size(ref_size, test_size, settings)
+    ref = load_rgb(ref_source, ref_name, size=size)
+    test = load_rgb(test_source, test_name, size=size)
+    source_size = (min(ref_size[0], test_size[0]), min(ref_size[1], test_size[1]))
+    return ref, test, source_size
+
+def to_same_size(a, b):
+    h = min(a.shape[0], b.shape[0])
+    w = min(a.shape[1], b.shape[1])
+    a2 = cv2.resize(a, (w, h), interpolation=cv2.INTER_AREA)
+    b2 = cv2.resize(b, (w, h), interpolation=cv2.INTER_AREA)
+    return a2, b2
+
+def apply_mask_to_image(img, mask):
+    """Apply a binary mask to an image (supports grayscale and color)"""
+    if len(img.shape) == 3:
+        mask_3ch = np.stack([mask, mask, mask], axis=-1)
+        return np.where(mask_3ch > 0, img, 0)
+    else:
+        return np.where(mask > 0, img, 0)
+
+def apply_circular_crop(img, center_x, center_y, diameter):
+    """Apply circular crop to image, masking outside as black"""
+    h, w = img.shape[:2]
+    mask = np.zeros((h, w), dtype=np.uint8)
+    radius = diameter // 2
+    cv2.circle(mask, (center_x, center_y), radius, 255, -1)
+    return apply_mask_to_image(img, mask)
+
+def apply_rectangular_crop(img, center_x, center_y, width, height):
+    """Apply rectangular crop to image, masking outside as black"""
+    h, w = img.shape[:2]
+    mask = np.zeros((h, w), dtype=np.uint8)
+
+    # Calculate rectangle corners
+    x1 = max(0, center_x - width // 2)
+    y1 = max(0, center_y - height // 2)
+    x2 = min(w, center_x + width // 2)
+    y2 = min(h, center_y + height // 2)
+
+    # Fill rectangle
+    mask[y1:y2, x1:x2] = 255
+    return apply_mask_to_image(img, mask)
+
+def apply_crop(img, settings, is_test_image=False):
+    """
+    Apply crop based on settings (circle or rectangle).
+
+    Args:
+        img: Image array to crop
+        settings: QCSettings object
+        is_test_image: If True and mode is 'independent', use test-specific crop settings
+
+    Returns:
+        Cropped image array
+    """
+    if not settings.use_crop:
+        return img
+
+    # Determine which position/size settings to use
+    if is_test_image and settings.crop_mode == "independent":
+        # Use test-specific settings
+        center_x = settings.crop_test_center_x
+        center_y = settings.crop_test_center_y
+        diameter = settings.crop_test_diameter
+        width = settings.crop_test_width
+        height = settings.crop_test_height
+    else:
+        # Use reference settings (or shared settings in simultaneous mode)
+        center_x = settings.crop_center_x
+        center_y = settings.crop_center_y
+        diameter = settings.crop_diameter
+        width = settings.crop_width
+        height = settings.crop_height
+
+    if settings.crop_shape == "circle":
+        return apply_circular_crop(img, center_x, center_y, diameter)
+    else:  # rectangle
+        return apply_rectangular_crop(img, center_x, center_y, width, height)
+
+def draw_circle_on_image(img, center_x, center_y, diameter, color=(255, 0, 0), thickness=3):
+    """Draw a circle on image for visualization"""
+    img_copy = img.copy()
+    radius = diameter // 2
+    cv2.circle(img_copy, (center_x, center_y), radius, color, thickness)
+    # Draw crosshair at center
+    cross_size = 15
+    cv2.line(img_copy, (center_x - cross_size, center_y), (center_x + cross_size, center_y), color, thickness)
+    cv2.line(img_copy, (center_x, center_y - cross_size), (center_x, center_y + cross_size), color, thickness)
+    return img_copy
+
+def draw_rectangle_on_image(img, center_x, center_y, width, height, color=(255, 0, 0), thickness=3):
+    """Draw a rectangle on image for visualization"""
+    img_copy = img.copy()
+    x1 = center_x - width // 2
+    y1 = center_y - height // 2
+    x2 = center_x + width // 2
+    y2 = center_y + height // 2
+    cv2.rectangle(img_copy, (x1, y1), (x2, y2), color, thickness)
+    # Draw crosshair at center
+    cross_size = 15
+    cv2.line(img_copy, (center_x - cross_size, center_y), (center_x + cross_size, center_y), color, thickness)
+    cv2.line(img_copy, (center_x, center_y - cross_size), (center_x, center_y + cross_size), color, thickness)
+    return img_copy
+
+def draw_crop_region_on_image(img, settings, color=(255, 0, 0), thickness=3):
+    """Draw crop region on image based on settings"""
+    if settings.crop_shape == "circle":
+        return draw_circle_on_image(img, settings.crop_center_x, settings.crop_center_y,
+                                   settings.crop_diameter, color, thickness)
+    else:  # rectangle
+        return draw_rectangle_on_image(img, settings.crop_center_x, settings.crop_center_y,
+                                      settings.crop_width, settings.crop_height, color, thickness)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - table-driven sRGB -> CIELAB conversion
+
+Analysis images are 8-bit sRGB, so the gamma linearization is a lookup in
+the 256-entry SRGB_LINEAR_LUT, and the sRGB matrix, the Bradford adaptation
+from D65 and the division by the white point fold into one 3x3 matrix per
+illuminant (built once, CIE 1931 2° white points as in WHITE_POINTS). An
+image then converts to Lab in a single pass over blocks of pixels, in
+float32, without the full-size float64 temporaries of the
+srgb_to_xyz -> adapt_white_xyz -> xyz_to_lab chain.
+
+The result matches that chain to within MAX_DELTA_E76 for every 8-bit
+color; check_accuracy() verifies it over the RGB cube (tests/test_lab_lut.py).
+"""
+
+import logging
+from functools import lru_cache
+
+import numpy as np
+
+from .color import (SRGB_LINEAR_LUT, SRGB_TO_XYZ, WHITE_POINTS, M_BRADFORD, M_BRADFORD_INV,
+                    srgb_to_xyz, adapt_white_xyz, xyz_to_lab, deltaE76)
+
+logger = logging.getLogger(__name__)
+
+# Pixels converted per block: keeps the float32 temporaries in cache
+BLOCK_PIXELS = 32768
+
+# Largest ΔE76 between the table path and the float64 reference chain
+MAX_DELTA_E76 = 1e-3
+
+SRGB_LINEAR_LUT32 = SRGB_LINEAR_LUT.astype(np.float32)
+_DELTA = 6 / 29
+# Lab from (f(X/Xn), f(Y/Yn), f(Z/Zn)): L = 116 fy - 16, a = 500 (fx - fy), b = 200 (fy - fz)
+_LAB_MIX = np.array([[0.0, 116.0, 0.0],
+                     [500.0, -500.0, 0.0],
+                     [0.0, 200.0, -200.0]])
+_LAB_MIX32 = _LAB_MIX.T.astype(np.float32)
+_LAB_OFFSET = np.array([-16.0, 0.0, 0.0], dtype=np.float32)
+
+
+@lru_cache(maxsize=None)
+def lab_matrix(illuminant):
+    """
+    3x3 matrix taking linear sRGB (0-100) to XYZ adapted from D65 to the
+    illuminant and divided by its white point (float32, transposed for
+    row-vector pixels)
+    """
+    src_wp = WHITE_POINTS["D65"]
+    dst_wp = WHITE_POINTS[illuminant]
+    gain = (M_BRADFORD @ dst_wp) / (M_BRADFORD @ src_wp)
+    adapt = M_BRADFORD_INV @ np.diag(gain) @ M_BRADFORD
+    return (np.diag(1.0 / dst_wp) @ adapt @ SRGB_TO_XYZ).T.astype(np.float32)
+
+
+def stacked_lab_matrix(illuminants):
+    """lab_matrix() of several illuminants side by side: (3, 3 * len(illuminants))"""
+    return np.hstack([lab_matrix(name) for name in illuminants])
+
+
+def linear_to_lab(linear, matrix):
+    """
+    Lab of a block of linear sRGB pixels under one or more illuminants.
+
+    Args:
+        linear: float32 (n, 3), linear sRGB 0-100 (SRGB_LINEAR_LUT32[rgb])
+        matrix: lab_matrix() or stacked_lab_matrix() of k illuminants
+
+    Returns:
+        float32 (n, k, 3)
+    """
+    t = (linear @ matrix).reshape(linear.shape[0], -1, 3)
+    f = np.cbrt(t)
+    linear_part = t <= _DELTA ** 3
+    if linear_part.any():
+        f[linear_part] = t[linear_part] * np.float32(1 / (3 * _DELTA ** 2)) + np.float32(4 / 29)
+    lab = f @ _LAB_MIX32
+    lab += _LAB_OFFSET
+    return lab
+
+
+def srgb8_to_lab(rgb, illuminant="D65"):
+    """
+    Lab (float32) of an 8-bit sRGB image under an illuminant.
+
+    Args:
+        rgb: uint8 array (..., 3)
+        illuminant: Key of WHITE_POINTS
+    """
+    if rgb.dtype != np.uint8:
+        raise TypeError(f"srgb8_to_lab needs uint8 input, got {rgb.dtype}")
+    matrix = lab_matrix(illuminant)
+    flat = rgb.reshape(-1, 3)
+    out = np.empty(flat.shape, dtype=np.float32)
+    for start in range(0, flat.shape[0], BLOCK_PIXELS):
+        block = slice(start, start + BLOCK_PIXELS)
+        out[block] = linear_to_lab(SRGB_LINEAR_LUT32[flat[block]], matrix)[:, 0]
+    return out.reshape(rgb.shape)
+
+
+def srgb_to_lab(rgb, illuminant="D65"):
+    """
+    Lab of an sRGB image under an illuminant: the table path for uint8
+    input, the float64 reference chain otherwise.
+    """
+    if rgb.dtype == np.uint8:
+        return srgb8_to_lab(rgb, illuminant)
+    return reference_lab(rgb, illuminant)
+
+
+def reference_lab(rgb, illuminant="D65"):
+    """Lab through srgb_to_xyz -> adapt_white_xyz -> xyz_to_lab (float64)"""
+    dst_wp = WHITE_POINTS[illuminant]
+    xyz = adapt_white_xyz(srgb_to_xyz(rgb), WHITE_POINTS["D65"], dst_wp)
+    return xyz_to_lab(xyz, dst_wp)
+
+
+# ----------------------------
+# Accuracy check
+# ----------------------------
+def check_accuracy(illuminants=None, step=5):
+    """
+    Compare the table path with the reference chain over the RGB cube.
+
+    Args:
+        illuminants: Keys of WHITE_POINTS (default: all)
+        step: Spacing of the sampled levels (1 = all 16.7 million colors;
+              0 and 255 are always included)
+
+    Returns:
+        dict {illuminant: {'max_delta_e76', 'mean_delta_e76'}}
+    """
+    levels = np.unique(np.r_[np.arange(0, 256, step), 255]).astype(np.uint8)
+    results = {}
+    for illuminant in illuminants or WHITE_POINTS:
+        worst = total = 0.0
+        count = 0
+        # One red level at a time bounds the memory of the float64 reference
+        for r in levels:
+            g, b = np.meshgrid(levels, levels, indexing="ij")
+            rgb = np.stack([np.full_like(g, r), g, b], axis=-1)
+            de = deltaE76(reference_lab(rgb, illuminant), srgb8_to_lab(rgb, illuminant).astype(float))
+            worst = max(worst, float(de.max()))
+            total += float(de.sum())
+            count += de.size
+        results[illuminant] = {'max_delta_e76': worst, 'mean_delta_e76': total / count}
+    return results
+
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - multi-illuminant metamerism
+
+Mean color difference of a reference/sample pair under several illuminants.
+The illuminants still to be evaluated are done together in one pass over the
+pixels: each block is linearized once, taken to Lab under all of them with
+the stacked per-illuminant matrices of lab_lut, and its ΔE2000 / ΔE76 summed.
+Means are memoized per illuminant for the run; full Lab maps are only built
+for the illuminants a chart asks for (lab()). With a PairPalette (palette)
+the pass runs over the distinct color pairs instead, weighted by their
+pixel counts.
+"""
+
+import logging
+
+import numpy as np
+
+from .delta_e import color_differences
+from .lab_lut import (SRGB_LINEAR_LUT32, stacked_lab_matrix, linear_to_lab, srgb_to_lab,
+                      reference_lab)
+
+logger = logging.getLogger(__name__)
+
+# Pixels per block; the block is evaluated under every pending illuminant at once
+BLOCK_PIXELS = 8192
+
+
+class MetamerismEngine:
+    """
+    Memoized per-illuminant color differences of one reference/sample pair.
+
+    Args:
+        ref: Reference image, RGB (uint8 uses the lab_lut tables)
+        test: Sample image, same size
+        ref_features: Optional ReferenceFeatures; reference Lab maps
+                      from lab() are shared through it
+        backend: color_differences() backend ("auto", "numpy", "numba")
+        palette: Optional PairPalette of ref / test (palette.pair_palette)
+    """
+
+    def __init__(self, ref, test, ref_features=None, backend="numpy", palette=None):
+        self.ref = ref
+        self.test = test
+        self.ref_features = ref_features
+        self.backend = backend
+        self.palette = palette
+        self._means = {}
+        self._maps = {}
+
+    def record(self, illuminant, mean_delta_e00, mean_delta_e76):
+        """Memoize means already computed elsewhere (e.g. from full ΔE maps)"""
+        self._means[illuminant] = {'delta_e00': float(mean_delta_e00), 'delta_e76': float(mean_delta_e76)}
+
+    def lab(self, illuminant):
+        """Full (reference, sample) Lab maps under an illuminant, kept for the run"""
+        if illuminant not in self._maps:
+            convert = lambda: srgb_to_lab(self.ref, illuminant)
+            lab_ref = self.ref_features.get(("lab", illuminant), convert) if self.ref_features is not None else convert()
+            self._maps[illuminant] = (lab_ref, srgb_to_lab(self.test, illuminant))
+        return self._maps[illuminant]
+
+    def evaluate(self, illuminants):
+        """Compute the means of all illuminants not memoized yet, in one pass over the pixels"""
+        pending = [name for name in dict.fromkeys(illuminants) if name not in self._means]
+        if not pending:
+            return
+        if self.ref.dtype != np.uint8 or self.test.dtype != np.uint8:
+            for name in pending:
+                diffs = color_differences(reference_lab(self.ref, name), reference_lab(self.test, name),
+                                          ("de00", "de76"), maps=False, stats=True, backend=self.backend)
+                self.record(name, diffs["de00"]["mean"], diffs["de76"]["mean"])
+            return
+        matrix = stacked_lab_matrix(pending)
+        if self.palette is not None:
+            self._evaluate_palette(pending, matrix)
+            return
+        ref = self.ref.reshape(-1, 3)
+        test = self.test.reshape(-1, 3)
+        sum00 = np.zeros(len(pending))
+        sum76 = np.zeros(len(pending))
+        for start in range(0, ref.shape[0], BLOCK_PIXELS):
+            block = slice(start, start + BLOCK_PIXELS)
+            lab_ref = linear_to_lab(SRGB_LINEAR_LUT32[ref[block]], matrix)
+            lab_test = linear_to_lab(SRGB_LINEAR_LUT32[test[block]], matrix)
+            diffs = color_differences(lab_ref, lab_test, ("de00", "de76"), backend=self.backend)
+            sum00 += diffs["de00"]["map"].sum(axis=0, dtype=np.float64)
+            sum76 += diffs["de76"]["map"].sum(axis=0, dtype=np.float64)
+        pixels = max(1, ref.shape[0])
+        for i, name in enumerate(pending):
+            self.record(name, sum00[i] / pixels, sum76[i] / pixels)
+
+    def _evaluate_palette(self, pending, matrix):
+        palette = self.palette
+        weights = palette.counts.astype(np.float64)
+        sum00 = np.zeros(len(pending))
+        sum76 = np.zeros(len(pending))
+        for start in range(0, palette.pairs, BLOCK_PIXELS):
+            block = slice(start, start + BLOCK_PIXELS)
+            lab_ref = linear_to_lab(SRGB_LINEAR_LUT32[palette.ref_colors[block]], matrix)
+            lab_test = linear_to_lab(SRGB_LINEAR_LUT32[palette.test_colors[block]], matrix)
+            diffs = color_differences(lab_ref, lab_test, ("de00", "de76"), backend=self.backend)
+            sum00 += weights[block] @ diffs["de00"]["map"].astype(np.float64)
+            sum76 += weights[block] @ diffs["de76"]["map"].astype(np.float64)
+        pixels = max(1, palette.pixels)
+        for i, name in enumerate(pending):
+            self.record(name, sum00[i] / pixels, sum76[i] / pixels)
+
+    def mean_delta_e00(self, illuminant):
+        """Mean ΔE2000 under an illuminant"""
+        self.evaluate([illuminant])
+        return self._means[illuminant]['delta_e00']
+
+    def mean_delta_e76(self, illuminant):
+        """Mean ΔE76 under an illuminant"""
+        self.evaluate([illuminant])
+        return self._means[illuminant]['delta_e76']
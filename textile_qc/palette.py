@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - palette-quantized color differences
+
+Printed and yarn-dyed fabrics have a handful of colorways, so an aligned
+reference/sample pair of 8-bit images holds far fewer distinct
+(reference RGB, sample RGB) pairs than pixels. PairPalette packs each pixel
+pair into one 64-bit key and keeps the unique pairs with their pixel counts
+and the pixel -> pair index. ΔE is then evaluated once per pair, and the
+means, standard deviations, percentiles and full maps are rebuilt by
+weighted lookup. Every pixel's value is the one the per-pixel path gives,
+so the statistics are exactly those of the images passed in. The pipeline
+passes its ANALYSIS_WIDTH (640 px) images: the palette speeds up those
+statistics, it does not make them full-resolution ones.
+
+pair_palette() declines (returns None) when a sample of the pixels shows
+too many distinct pairs (photographs, noise), where the per-pixel kernel is
+the cheaper path.
+"""
+
+import logging
+
+import numpy as np
+
+from .delta_e import color_differences
+from .lab_lut import srgb8_to_lab
+
+logger = logging.getLogger(__name__)
+
+# Largest unique-pair / pixel ratio at which the palette path pays off
+MAX_PAIR_FRACTION = 0.25
+# Pixels sampled to estimate the ratio before building the palette
+SAMPLE_PIXELS = 65536
+
+
+def _pair_keys(rgb1, rgb2):
+    """One uint64 per pixel: the reference RGB bytes, then the sample RGB bytes"""
+    packed = np.zeros((rgb1.shape[0], 8), dtype=np.uint8)
+    packed[:, 0:3] = rgb1
+    packed[:, 3:6] = rgb2
+    return packed.view(np.uint64).ravel()
+
+
+class PairPalette:
+    """
+    Unique (reference, sample) RGB pairs of two aligned 8-bit images.
+
+    Attributes:
+        ref_colors, test_colors: uint8 (k, 3) colors of each pair
+        counts: int64 (k,) pixels per pair
+        inverse: intp (n,) pair index of every pixel
+        shape: Image shape without the channel axis
+    """
+
+    def __init__(self, rgb1, rgb2):
+        if rgb1.shape != rgb2.shape or rgb1.dtype != np.uint8 or rgb2.dtype != np.uint8:
+            raise ValueError("PairPalette needs two uint8 RGB images of the same shape")
+        self.shape = rgb1.shape[:-1]
+        keys, self.inverse, self.counts = np.unique(_pair_keys(rgb1.reshape(-1, 3), rgb2.reshape(-1, 3)),
+                                                    return_inverse=True, return_counts=True)
+        self.inverse = self.inverse.ravel()
+        pairs = keys.view(np.uint8).reshape(-1, 8)
+        self.ref_colors = pairs[:, 0:3]
+        self.test_colors = pairs[:, 3:6]
+
+    @property
+    def pairs(self):
+        return len(self.counts)
+
+    @property
+    def pixels(self):
+        return len(self.inverse)
+
+    def expand(self, values):
+        """Per-pair values to a full per-pixel map"""
+        return values[self.inverse].reshape(self.shape)
+
+    def stats(self, values, percentiles=()):
+        """
+        Count-weighted mean / std / min / max and percentiles (linear
+        interpolation, as np.percentile over the full map) of per-pair values
+        """
+        weights = self.counts.astype(np.float64)
+        v = values.astype(np.float64)
+        n = max(1, self.pixels)
+        mean = float(np.dot(weights, v) / n)
+        std = float(np.sqrt(np.dot(weights, (v - mean) ** 2) / n))
+        result = {'mean': mean, 'std': std, 'min': float(v.min()), 'max': float(v.max())}
+        if percentiles:
+            order = np.argsort(v, kind="stable")
+            sorted_v = v[order]
+            # Last full-map index (0-based) covered by each sorted pair
+            last = np.cumsum(self.counts[order]) - 1
+            result['percentiles'] = {}
+            for p in percentiles:
+                position = p / 100 * (n - 1)
+                lo = int(np.floor(position))
+                hi = min(lo + 1, n - 1)
+                v_lo = sorted_v[np.searchsorted(last, lo)]
+                v_hi = sorted_v[np.searchsorted(last, hi)]
+                result['percentiles'][p] = float(v_lo + (v_hi - v_lo) * (position - lo))
+        return result
+
+
+def estimate_pair_fraction(rgb1, rgb2, sample=SAMPLE_PIXELS):
+    """Unique pairs / pixels over an evenly strided sample of the pixels"""
+    flat1 = rgb1.reshape(-1, 3)
+    flat2 = rgb2.reshape(-1, 3)
+    step = max(1, flat1.shape[0] // sample)
+    keys = _pair_keys(flat1[::step], flat2[::step])
+    return np.unique(keys).size / max(1, keys.size)
+
+
+def pair_palette(rgb1, rgb2, max_fraction=MAX_PAIR_FRACTION):
+    """
+    PairPalette of two aligned images, or None when they are not uint8 or
+    have too many distinct pairs for the palette path to pay off.
+    """
+    if rgb1.dtype != np.uint8 or rgb2.dtype != np.uint8 or rgb1.shape != rgb2.shape:
+        return None
+    fraction = estimate_pair_fraction(rgb1, rgb2)
+    if fraction > max_fraction:
+        logger.debug(f"Pair palette skipped: {fraction:.0%} distinct pairs in the sample")
+        return None
+    palette = PairPalette(rgb1, rgb2)
+    if palette.pairs > max_fraction * palette.pixels:
+        return None
+    return palette
+
+
+def palette_color_differences(palette, illuminant="D65", metrics=("de76", "de94", "de00"), maps=True,
+                              percentiles=(), cmc_l=2, cmc_c=1, backend="numpy"):
+    """
+    color_differences() of the two images of a PairPalette under an
+    illuminant, evaluated once per unique pair.
+
+    Returns:
+        dict {metric: {'mean', 'std', 'min', 'max'[, 'percentiles'][, 'map']}}
+        with 'percentiles' = {p: value} and 'map' the full float32 map
+    """
+    lab_ref = srgb8_to_lab(palette.ref_colors, illuminant)
+    lab_test = srgb8_to_lab(palette.test_colors, illuminant)
+    per_pair = color_differences(lab_ref, lab_test, metrics, cmc_l=cmc_l, cmc_c=cmc_c, backend=backend)
+    result = {}
+    for m, entry in per_pair.items():
+        result[m] = palette.stats(entry['map'], percentiles)
+        if maps:
+            result[m]['map'] = palette.expand(entry['map'])
+    return result
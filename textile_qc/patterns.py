@@ -0,0 +1,522 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - pattern repetition analyzers
+(blobs, connected components, keypoints, auto-correlation, spatial distribution)
+"""
+
+import numpy as np
+import cv2
+from skimage.util import img_as_ubyte
+
+# ===========================
+# PATTERN REPETITION ANALYSIS
+# ===========================
+
+# ========== BLOB DETECTION & CONNECTED COMPONENTS ==========
+def analyze_blob_patterns(gray, min_area=100, max_area=5000, min_circularity=0.5, min_convexity=0.8):
+    """Detect repeating patterns using blob detection"""
+    try:
+        # Convert to 8-bit
+        gray_8bit = img_as_ubyte(gray)
+
+        # Setup SimpleBlobDetector parameters
+        params = cv2.SimpleBlobDetector_Params()
+
+        # Filter by Area
+        params.filterByArea = True
+        params.minArea = min_area
+        params.maxArea = max_area
+
+        # Filter by Circularity
+        params.filterByCircularity = True
+        params.minCircularity = min_circularity
+
+        # Filter by Convexity
+        params.filterByConvexity = True
+        params.minConvexity = min_convexity
+
+        # Filter by Inertia
+        params.filterByInertia = True
+        params.minInertiaRatio = 0.01
+
+        # Create detector
+        detector = cv2.SimpleBlobDetector_create(params)
+
+        # Detect blobs
+        keypoints = detector.detect(gray_8bit)
+
+        # Extract blob properties
+        blobs = []
+        for kp in keypoints:
+            blobs.append({
+                'center': (int(kp.pt[0]), int(kp.pt[1])),
+                'size': float(kp.size),
+                'area': float(np.pi * (kp.size / 2) ** 2)
+            })
+
+        # Calculate statistics
+        if blobs:
+            areas = [b['area'] for b in blobs]
+            sizes = [b['size'] for b in blobs]
+            mean_area = np.mean(areas)
+            std_area = np.std(areas)
+            cv_area = (std_area / mean_area * 100) if mean_area > 0 else 0
+            mean_size = np.mean(sizes)
+            std_size = np.std(sizes)
+        else:
+            mean_area = std_area = cv_area = mean_size = std_size = 0
+
+        return {
+            'blobs': blobs,
+            'count': len(blobs),
+            'keypoints': keypoints,
+            'mean_area': mean_area,
+            'std_area': std_area,
+            'cv_area': cv_area,
+            'mean_size': mean_size,
+            'std_size': std_size
+        }
+    except Exception as e:
+        print(f"* Blob detection failed: {e}")
+        return {
+            'blobs': [],
+            'count': 0,
+            'keypoints': [],
+            'mean_area': 0,
+            'std_area': 0,
+            'cv_area': 0,
+            'mean_size': 0,
+            'std_size': 0
+        }
+
+# ========== CONNECTED COMPONENTS ANALYSIS ==========
+def analyze_connected_components(gray, min_area=100, max_area=5000):
+    """Analyze connected components for pattern counting"""
+    from skimage.filters import threshold_otsu
+    from skimage.measure import label, regionprops
+    try:
+        # Convert to 8-bit and threshold
+        gray_8bit = img_as_ubyte(gray)
+
+        # Use Otsu thresholding
+        thresh_val = threshold_otsu(gray_8bit)
+        binary = gray_8bit > thresh_val
+
+        # Label connected components
+        labeled = label(binary)
+        regions = regionprops(labeled)
+
+        # Filter by area
+        patterns = []
+        for region in regions:
+            if min_area <= region.area <= max_area:
+                y0, x0, y1, x1 = region.bbox
+                patterns.append({
+                    'label': region.label,
+                    'area': region.area,
+                    'bbox': (x0, y0, x1, y1),
+                    'centroid': (int(region.centroid[1]), int(region.centroid[0])),
+                    'perimeter': region.perimeter,
+                    'eccentricity': region.eccentricity,
+                    'solidity': region.solidity
+                })
+
+        # Calculate statistics
+        if patterns:
+            areas = [p['area'] for p in patterns]
+            mean_area = np.mean(areas)
+            std_area = np.std(areas)
+            cv_area = (std_area / mean_area * 100) if mean_area > 0 else 0
+        else:
+            mean_area = std_area = cv_area = 0
+
+        return {
+            'patterns': patterns,
+            'count': len(patterns),
+            'labeled_image': labeled,
+            'binary_image': binary,
+            'mean_area': mean_area,
+            'std_area': std_area,
+            'cv_area': cv_area
+        }
+    except Exception as e:
+        print(f"* Connected components analysis failed: {e}")
+        return {
+            'patterns': [],
+            'count': 0,
+            'labeled_image': None,
+            'binary_image': None,
+            'mean_area': 0,
+            'std_area': 0,
+            'cv_area': 0
+        }
+
+def count_connected_components(gray, min_area=100, max_area=5000):
+    """
+    Number of patterns analyze_connected_components() would report, without
+    computing per-region properties (used by the decision-only analysis).
+    """
+    from skimage.filters import threshold_otsu
+    from skimage.measure import label
+    try:
+        gray_8bit = img_as_ubyte(gray)
+        binary = gray_8bit > threshold_otsu(gray_8bit)
+        areas = np.bincount(label(binary).ravel())[1:]
+        return int(np.count_nonzero((areas >= min_area) & (areas <= max_area)))
+    except Exception as e:
+        print(f"* Connected components count failed: {e}")
+        return 0
+
+# ========== KEYPOINT-BASED PATTERN MATCHING ==========
+def _create_keypoint_detector(detector_type):
+    if detector_type == 'SIFT':
+        try:
+            return cv2.SIFT_create()
+        except:
+            return cv2.xfeatures2d.SIFT_create()
+    elif detector_type == 'AKAZE':
+        return cv2.AKAZE_create()
+    # ORB (default, patent-free)
+    return cv2.ORB_create(nfeatures=1000)
+
+def detect_keypoints(gray, detector_type='ORB'):
+    """Keypoints and descriptors of one image (reusable as ref_detection)"""
+    detector = _create_keypoint_detector(detector_type)
+    return detector.detectAndCompute(img_as_ubyte(gray), None)
+
+def analyze_keypoint_matching(gray_ref, gray_test, detector_type='ORB', match_threshold=0.7, ref_detection=None):
+    """
+    Match patterns using keypoint detection (SIFT, ORB, AKAZE).
+
+    ref_detection: Optional (keypoints, descriptors) of gray_ref from
+                   detect_keypoints(), e.g. shared across a batch
+    """
+    try:
+        # Detect keypoints and compute descriptors
+        if ref_detection is None:
+            ref_detection = detect_keypoints(gray_ref, detector_type)
+        kp_ref, desc_ref = ref_detection
+        kp_test, desc_test = detect_keypoints(gray_test, detector_type)
+
+        if desc_ref is None or desc_test is None or len(kp_ref) == 0 or len(kp_test) == 0:
+            return {
+                'keypoints_ref': [],
+                'keypoints_test': [],
+                'matches': [],
+                'good_matches': [],
+                'match_count': 0,
+                'match_ratio': 0.0,
+                'homography': None,
+                'inliers': 0,
+                'matching_score': 0.0
+            }
+
+        # Match descriptors
+        if detector_type == 'ORB':
+            bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
+        else:
+            bf = cv2.BFMatcher(cv2.NORM_L2, crossCheck=False)
+
+        matches = bf.knnMatch(desc_ref, desc_test, k=2)
+
+        # Apply ratio test (Lowe's ratio test)
+        good_matches = []
+        for match_pair in matches:
+            if len(match_pair) == 2:
+                m, n = match_pair
+                if m.distance < match_threshold * n.distance:
+                    good_matches.append(m)
+
+        match_ratio = len(good_matches) / len(kp_ref) if len(kp_ref) > 0 else 0
+
+        # Compute homography if enough matches
+        homography = None
+        inliers = 0
+        if len(good_matches) >= 4:
+            src_pts = np.float32([kp_ref[m.queryIdx].pt for m in good_matches]).reshape(-1, 1, 2)
+            dst_pts = np.float32([kp_test[m.trainIdx].pt for m in good_matches]).reshape(-1, 1, 2)
+
+            homography, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+            inliers = np.sum(mask) if mask is not None else 0
+
+        # Calculate matching score
+        matching_score = (len(good_matches) / max(len(kp_ref), len(kp_test))) * 100 if max(len(kp_ref), len(kp_test)) > 0 else 0
+
+        return {
+            'keypoints_ref': kp_ref,
+            'keypoints_test': kp_test,
+            'matches': matches,
+            'good_matches': good_matches,
+            'match_count': len(good_matches),
+            'match_ratio': float(match_ratio),
+            'homography': homography,
+            'inliers': int(inliers),
+            'matching_score': float(matching_score)
+        }
+    except Exception as e:
+        print(f"* Keypoint matching failed: {e}")
+        return {
+            'keypoints_ref': [],
+            'keypoints_test': [],
+            'matches': [],
+            'good_matches': [],
+            'match_count': 0,
+            'match_ratio': 0.0,
+            'homography': None,
+            'inliers': 0,
+            'matching_score': 0.0
+        }
+
+# ========== AUTO-CORRELATION ANALYSIS ==========
+def analyze_autocorrelation(gray):
+    """Compute 2D auto-correlation to detect pattern periodicity"""
+    try:
+        # Normalize to zero mean
+        gray_normalized = gray - np.mean(gray)
+
+        # Compute 2D FFT
+        f = np.fft.fft2(gray_normalized)
+        power_spectrum = np.abs(f) ** 2
+
+        # Inverse FFT to get auto-correlation
+        autocorr = np.fft.ifft2(power_spectrum).real
+        autocorr = np.fft.fftshift(autocorr)
+
+        # Normalize
+        autocorr = autocorr / autocorr.max()
+
+        # Find peaks (excluding center)
+        h, w = autocorr.shape
+        cy, cx = h // 2, w // 2
+
+        # Mask center region
+        autocorr_masked = autocorr.copy()
+        mask_radius = 20
+        y_grid, x_grid = np.ogrid[:h, :w]
+        mask = (x_grid - cx) ** 2 + (y_grid - cy) ** 2 <= mask_radius ** 2
+        autocorr_masked[mask] = 0
+
+        # Find local maxima
+        from scipy.ndimage import maximum_filter
+        local_max = maximum_filter(autocorr_masked, size=20)
+        peaks_binary = (autocorr_masked == local_max) & (autocorr_masked > 0.1)
+
+        # Get peak locations
+        peak_coords = np.argwhere(peaks_binary)
+        peaks = []
+        for coord in peak_coords[:10]:  # Top 10 peaks
+            y, x = coord
+            distance = np.sqrt((y - cy) ** 2 + (x - cx) ** 2)
+            angle = np.degrees(np.arctan2(y - cy, x - cx))
+            peaks.append({
+                'location': (int(x), int(y)),
+                'distance': float(distance),
+                'angle': float(angle),
+                'value': float(autocorr[y, x])
+            })
+
+        # Calculate periodicity score (based on peak strength)
+        if peaks:
+            periodicity_score = np.mean([p['value'] for p in peaks]) * 100
+        else:
+            periodicity_score = 0
+
+        # Estimate pattern spacing
+        if peaks:
+            distances = [p['distance'] for p in peaks]
+            pattern_spacing = np.mean(distances)
+            spacing_std = np.std(distances)
+        else:
+            pattern_spacing = 0
+            spacing_std = 0
+
+        return {
+            'autocorr': autocorr,
+            'peaks': peaks,
+            'periodicity_score': float(periodicity_score),
+            'pattern_spacing': float(pattern_spacing),
+            'spacing_std': float(spacing_std),
+            'regularity_score': float(100 - min(100, spacing_std / max(pattern_spacing, 1) * 100))
+        }
+    except Exception as e:
+        print(f"* Auto-correlation analysis failed: {e}")
+        return {
+            'autocorr': np.zeros_like(gray),
+            'peaks': [],
+            'periodicity_score': 0.0,
+            'pattern_spacing': 0.0,
+            'spacing_std': 0.0,
+            'regularity_score': 0.0
+        }
+
+# ========== GRID-BASED SPATIAL ANALYSIS ==========
+def analyze_spatial_distribution(gray, patterns, cell_size=50):
+    """Analyze pattern distribution using grid-based approach"""
+    try:
+        h, w = gray.shape
+        n_rows = h // cell_size
+        n_cols = w // cell_size
+
+        # Create density grid
+        density_grid = np.zeros((n_rows, n_cols))
+
+        # Count patterns in each cell
+        for pattern in patterns:
+            cx, cy = pattern['centroid']
+            grid_x = min(int(cx / cell_size), n_cols - 1)
+            grid_y = min(int(cy / cell_size), n_rows - 1)
+            if 0 <= grid_x < n_cols and 0 <= grid_y < n_rows:
+                density_grid[grid_y, grid_x] += 1
+
+        # Calculate uniformity metrics
+        flat_density = density_grid.flatten()
+        mean_density = np.mean(flat_density)
+        std_density = np.std(flat_density)
+        cv_density = (std_density / mean_density * 100) if mean_density > 0 else 0
+        uniformity_score = max(0, 100 - cv_density)
+
+        return {
+            'density_grid': density_grid,
+            'n_rows': n_rows,
+            'n_cols': n_cols,
+            'mean_density': float(mean_density),
+            'std_density': float(std_density),
+            'cv_density': float(cv_density),
+            'uniformity_score': float(uniformity_score)
+        }
+    except Exception as e:
+        print(f"* Spatial distribution analysis failed: {e}")
+        return {
+            'density_grid': np.zeros((1, 1)),
+            'n_rows': 0,
+            'n_cols': 0,
+            'mean_density': 0.0,
+            'std_density': 0.0,
+            'cv_density': 0.0,
+            'uniformity_score': 0.0
+        }
+
+# ========== PATTERN INTEGRITY ASSESSMENT ==========
+def assess_pattern_integrity(patterns_ref, patterns_test, tolerance=0.15):
+    """Assess integrity of patterns between reference and sample"""
+    try:
+        if not patterns_ref or not patterns_test:
+            return {
+                'integrity_score': 0.0,
+                'size_similarity': 0.0,
+                'shape_similarity': 0.0,
+                'spatial_similarity': 0.0
+            }
+
+        # Size similarity (compare area distributions)
+        areas_ref = [p['area'] for p in patterns_ref]
+        areas_test = [p['area'] for p in patterns_test]
+        mean_area_ref = np.mean(areas_ref)
+        mean_area_test = np.mean(areas_test)
+        size_diff = abs(mean_area_ref - mean_area_test) / max(mean_area_ref, 1)
+        size_similarity = max(0, 100 * (1 - size_diff / tolerance))
+
+        # Shape similarity (using solidity)
+        if 'solidity' in patterns_ref[0] and 'solidity' in patterns_test[0]:
+            solidity_ref = np.mean([p['solidity'] for p in patterns_ref])
+            solidity_test = np.mean([p['solidity'] for p in patterns_test])
+            shape_diff = abs(solidity_ref - solidity_test)
+            shape_similarity = max(0, 100 * (1 - shape_diff))
+        else:
+            shape_similarity = 50.0
+
+        # Spatial similarity (compare pattern spacing)
+        centroids_ref = np.array([p['centroid'] for p in patterns_ref])
+        centroids_test = np.array([p['centroid'] for p in patterns_test])
+
+        if len(centroids_ref) > 1 and len(centroids_test) > 1:
+            from scipy.spatial.distance import pdist
+            spacing_ref = np.mean(pdist(centroids_ref))
+            spacing_test = np.mean(pdist(centroids_test))
+            spacing_diff = abs(spacing_ref - spacing_test) / max(spacing_ref, 1)
+            spatial_similarity = max(0, 100 * (1 - spacing_diff / tolerance))
+        else:
+            spatial_similarity = 50.0
+
+        # Overall integrity score
+        integrity_score = (size_similarity + shape_similarity + spatial_similarity) / 3
+
+        return {
+            'integrity_score': float(integrity_score),
+            'size_similarity': float(size_similarity),
+            'shape_similarity': float(shape_similarity),
+            'spatial_similarity': float(spatial_similarity)
+        }
+    except Exception as e:
+        print(f"* Pattern integrity assessment failed: {e}")
+        return {
+            'integrity_score': 0.0,
+            'size_similarity': 0.0,
+            'shape_similarity': 0.0,
+            'spatial_similarity': 0.0
+        }
+
+# ========== MISSING/EXTRA PATTERNS DETECTION ==========
+def detect_missing_extra_patterns(patterns_ref, patterns_test, spatial_dist, tolerance=50):
+    """Detect missing and extra patterns by spatial matching"""
+    try:
+        missing_patterns = []
+        extra_patterns = []
+
+        if not patterns_ref or not patterns_test:
+            return {
+                'missing_patterns': missing_patterns,
+                'extra_patterns': extra_patterns,
+                'missing_count': len(patterns_ref) if patterns_ref else 0,
+                'extra_count': len(patterns_test) if patterns_test else 0
+            }
+
+        # Build KD-tree for efficient nearest neighbor search
+        from scipy.spatial import cKDTree
+
+        centroids_ref = np.array([p['centroid'] for p in patterns_ref])
+        centroids_test = np.array([p['centroid'] for p in patterns_test])
+
+        tree_test = cKDTree(centroids_test)
+        tree_ref = cKDTree(centroids_ref)
+
+        # Find missing patterns (in ref but not in test)
+        matched_test = set()
+        for i, pattern_ref in enumerate(patterns_ref):
+            dist, idx = tree_test.query(centroids_ref[i])
+            if dist > tolerance:
+                # No match found in test - pattern is missing
+                missing_patterns.append({
+                    'location': pattern_ref['centroid'],
+                    'expected_area': pattern_ref['area'],
+                    'severity': 'High' if pattern_ref['area'] > np.median([p['area'] for p in patterns_ref]) else 'Medium'
+                })
+            else:
+                matched_test.add(idx)
+
+        # Find extra patterns (in test but not in ref)
+        for i, pattern_test in enumerate(patterns_test):
+            if i not in matched_test:
+                dist, idx = tree_ref.query(centroids_test[i])
+                if dist > tolerance:
+                    # No match found in ref - pattern is extra
+                    extra_patterns.append({
+                        'location': pattern_test['centroid'],
+                        'area': pattern_test['area'],
+                        'severity': 'High' if pattern_test['area'] > np.median([p['area'] for p in patterns_test]) else 'Medium'
+                    })
+
+        return {
+            'missing_patterns': missing_patterns,
+            'extra_patterns': extra_patterns,
+            'missing_count': len(missing_patterns),
+            'extra_count': len(extra_patterns)
+        }
+    except Exception as e:
+        print(f"* Missing/extra pattern detection failed: {e}")
+        return {
+            'missing_patterns': [],
+            'extra_patterns': [],
+            'missing_count': 0,
+            'extra_count': 0
+        }
@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - ReportLab helpers (Unicode fonts, paragraph styles, tables,
+page header/footer and the settings summary table)
+"""
+
+import os
+import logging
+
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, Table, TableStyle, Flowable
+from reportlab.lib.enums import TA_LEFT, TA_CENTER
+
+from .config import (COMPANY_NAME, COMPANY_SUBTITLE, MARGIN_L, MARGIN_R, FRAME_MARGIN, THEME_COLORS,
+                     VERTICAL_LOGO)
+from .fonts import register_pdf_fonts
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# Page size and theme colors
+# ----------------------------
+PAGE_SIZE = A4
+BLUE1 = colors.HexColor(THEME_COLORS["BLUE1"])
+BLUE2 = colors.HexColor(THEME_COLORS["BLUE2"])
+GREEN = colors.HexColor(THEME_COLORS["GREEN"])
+RED = colors.HexColor(THEME_COLORS["RED"])
+ORANGE = colors.HexColor(THEME_COLORS["ORANGE"])
+NEUTRAL_DARK = colors.HexColor(THEME_COLORS["NEUTRAL_DARK"])
+NEUTRAL = colors.HexColor(THEME_COLORS["NEUTRAL"])
+NEUTRAL_L = colors.HexColor(THEME_COLORS["NEUTRAL_L"])
+
+STATUS_COLORS = {"PASS": GREEN, "FAIL": RED, "CONDITIONAL": ORANGE}
+
+# ----------------------------
+# 6) PDF helpers (ReportLab)
+# ----------------------------
+
+# Register Unicode-compatible fonts for Turkish character support (ö, ü, ğ, ı, ş, ç, İ, Ğ, Ş, Ç).
+# Fonts are resolved from local directories only (see fonts.py), once per process.
+_PDF_FONTS = register_pdf_fonts()
+PDF_FONT_REGULAR = _PDF_FONTS["regular"]
+PDF_FONT_BOLD = _PDF_FONTS["bold"]
+
+# Verify Turkish characters work with the selected font
+def verify_turkish_font_support():
+    """Verify that the registered fonts support Turkish characters."""
+    test_chars = "öüğışçÖÜĞİŞÇ"
+    try:
+        from reportlab.pdfbase.pdfmetrics import getFont
+        font = getFont(PDF_FONT_REGULAR)
+        # Check if font has the Turkish characters
+        for char in test_chars:
+            try:
+                font.face.getCharWidth(ord(char))
+            except:
+                logger.warning(f"Font {PDF_FONT_REGULAR} may not support character: {char}")
+                return False
+        logger.info(f"* Font {PDF_FONT_REGULAR} supports all Turkish characters: {test_chars}")
+        return True
+    except Exception as e:
+        logger.debug(f"Font verification failed: {e}")
+        return True  # Assume it works if we can't verify
+
+verify_turkish_font_support()
+
+styles = getSampleStyleSheet()
+StyleTitle = ParagraphStyle("Title", parent=styles["Heading1"], fontName=PDF_FONT_BOLD,
+                            fontSize=20, textColor=NEUTRAL_DARK, leading=24, alignment=TA_LEFT)
+StyleH1 = ParagraphStyle("H1", parent=styles["Heading2"], fontName=PDF_FONT_BOLD,
+                         fontSize=15, textColor=BLUE1, leading=18, spaceAfter=8)
+StyleH2 = ParagraphStyle("H2", parent=styles["Heading3"], fontName=PDF_FONT_BOLD,
+                         fontSize=12.5, textColor=BLUE2, leading=16, spaceAfter=6)
+StyleBody = ParagraphStyle("Body", parent=styles["BodyText"], fontName=PDF_FONT_REGULAR,
+                           fontSize=10, leading=14)
+StyleSmall = ParagraphStyle("Small", parent=styles["BodyText"], fontName=PDF_FONT_REGULAR,
+                            fontSize=9, leading=12, textColor=NEUTRAL)
+StyleBadge = ParagraphStyle("Badge", parent=styles["BodyText"], fontName=PDF_FONT_BOLD,
+                            fontSize=10.5, leading=14, textColor=colors.white,
+                            alignment=TA_CENTER)
+
+def badge(text, back_color=NEUTRAL):
+    # little colored label as a Flowable
+    class _Badge(Flowable):
+        def __init__(self, t, bg):
+            super().__init__()
+            self.t = t
+            self.bg = bg
+            self.w = max(60, 8*len(t))
+            self.h = 16
+        def draw(self):
+            self.canv.setFillColor(self.bg)
+            self.canv.roundRect(0,0,self.w,self.h,3,fill=1,stroke=0)
+            self.canv.setFillColor(colors.white)
+            self.canv.setFont(PDF_FONT_BOLD, 9)
+            self.canv.drawCentredString(self.w/2, 3, self.t)
+        def wrap(self, availW, availH):
+            return (self.w, self.h)
+    return _Badge(text, back_color)
+
+def fmt_pct(x):
+    return f"{x:.1f}%"
+
+def fmt2(x):
+    return f"{x:.2f}"
+
+def fmt1(x):
+    return f"{x:.1f}"
+
+def colored_status_cell(text, status):
+    col = STATUS_COLORS.get(status, NEUTRAL)
+    return [Paragraph(f"<b>{text}</b>", ParagraphStyle("s", textColor=colors.white, alignment=TA_CENTER)),
+            col]
+
+def make_table(data, colWidths=None, alt=True, header_bg=NEUTRAL_L):
+    t = Table(data, colWidths=colWidths, hAlign="LEFT", repeatRows=1)
+    style_cmds = [
+        ("BACKGROUND", (0,0), (-1,0), header_bg),
+        ("TEXTCOLOR", (0,0), (-1,0), colors.black),
+        ("FONTNAME", (0,0), (-1,0), PDF_FONT_BOLD),
+        # Ensure body cells also use a Unicode-capable font (critical for Turkish characters)
+        ("FONTNAME", (0,1), (-1,-1), PDF_FONT_REGULAR),
+        ("FONTSIZE", (0,0), (-1,0), 10),
+        ("FONTSIZE", (0,1), (-1,-1), 9),
+        ("BOTTOMPADDING", (0,0), (-1,0), 6),
+        ("TOPPADDING", (0,0), (-1,0), 6),
+        ("GRID", (0,0), (-1,-1), 0.25, colors.Color(0.8,0.8,0.8)),
+        ("VALIGN", (0,0), (-1,-1), "MIDDLE"),
+        ("LEFTPADDING", (0,0), (-1,-1), 5),
+        ("RIGHTPADDING", (0,0), (-1,-1), 5),
+        ("TOPPADDING", (0,1), (-1,-1), 4),
+        ("BOTTOMPADDING", (0,1), (-1,-1), 4),
+        ("WORDWRAP", (0,0), (-1,-1), True),
+    ]
+    if alt:
+        style_cmds += [("BACKGROUND", (0,i), (-1,i), colors.whitesmoke) for i in range(1,len(data),2)]
+    t.setStyle(TableStyle(style_cmds))
+    return t
+
+def wrap_text_cell(text, max_chars=60):
+    """
+    Wrap text into a Paragraph if it exceeds max_chars.
+    This enables automatic line wrapping in table cells.
+
+    Args:
+        text: The text string to wrap
+        max_chars: Maximum characters before wrapping (default 60)
+
+    Returns:
+        Paragraph object if text exceeds max_chars, otherwise original text
+    """
+    if isinstance(text, str) and len(text) > max_chars:
+        wrap_style = ParagraphStyle(
+            'TableWrap',
+            fontName=PDF_FONT_REGULAR,
+            fontSize=9,
+            leading=12,
+            alignment=TA_LEFT,
+            wordWrap='CJK'
+        )
+        return Paragraph(text, wrap_style)
+    return text
+
+# Header/Footer drawing factory - creates header_footer with timestamp access
+def make_header_footer(report_timestamp=None, analysis_id=None):
+    """Create a header_footer function with access to report timestamp.
+
+    Args:
+        report_timestamp: datetime object for the analysis timestamp
+        analysis_id: String identifier for the analysis
+
+    Returns:
+        Function to be used as onLaterPages callback
+    """
+    def header_footer(canvas_, doc):
+        canvas_.saveState()
+        width, height = PAGE_SIZE
+
+        # Draw white rectangular frame with 3mm margins on all sides
+        canvas_.setStrokeColor(colors.HexColor("#E0E0E0"))  # Light gray frame
+        canvas_.setLineWidth(0.8)
+        frame_x1 = FRAME_MARGIN
+        frame_y1 = FRAME_MARGIN
+        frame_x2 = width - FRAME_MARGIN
+        frame_y2 = height - FRAME_MARGIN
+        canvas_.rect(frame_x1, frame_y1, frame_x2 - frame_x1, frame_y2 - frame_y1, stroke=1, fill=0)
+
+        # Header
+        y = height - 40
+        # line
+        canvas_.setStrokeColor(NEUTRAL_L)
+        canvas_.setLineWidth(0.6)
+        canvas_.line(MARGIN_L, y, width - MARGIN_R, y)
+
+        # company text - Company Name (blue, bold) | Subtitle (gray, smaller)
+        canvas_.setFillColor(BLUE1)
+        canvas_.setFont(PDF_FONT_BOLD, 10.5)
+        canvas_.drawString(MARGIN_L, y+10, COMPANY_NAME)
+
+        # Calculate position for pipe symbol
+        company_width = canvas_.stringWidth(COMPANY_NAME, PDF_FONT_BOLD, 10.5)
+
+        # Draw black pipe symbol at current size
+        canvas_.setFillColor(colors.black)
+        canvas_.setFont(PDF_FONT_BOLD, 10.5)
+        canvas_.drawString(MARGIN_L + company_width + 5, y+10, " | ")
+
+        # Calculate position for subtitle
+        pipe_width = canvas_.stringWidth(" | ", PDF_FONT_BOLD, 10.5)
+
+        # Draw gray subtitle in smaller font
+        canvas_.setFillColor(NEUTRAL)  # Gray color
+        canvas_.setFont(PDF_FONT_REGULAR, 8.5)  # Smaller font
+        canvas_.drawString(MARGIN_L + company_width + pipe_width + 5, y+10, COMPANY_SUBTITLE)
+
+        # Add timestamp on right side of header (if provided)
+        if report_timestamp:
+            timestamp_str = report_timestamp.strftime("%Y-%m-%d %H:%M")
+            canvas_.setFillColor(NEUTRAL)
+            canvas_.setFont(PDF_FONT_REGULAR, 7)
+            canvas_.drawRightString(width - MARGIN_R, y+10, f"Generated: {timestamp_str}")
+
+        # Footer
+        fy = 35  # Increased from 28 to provide safe distance from bottom
+        canvas_.setStrokeColor(NEUTRAL_L)
+        canvas_.setLineWidth(0.6)
+        canvas_.line(MARGIN_L, fy+10, width - MARGIN_R, fy+10)
+
+        # page number (start numbering so that "Color Unit" page is 2)
+        pno = canvas_.getPageNumber()
+        # first page (cover) is unnumbered; subsequent pages offset by +0 so second phys page shows "2"
+        if pno >= 2:
+            # Show page number and analysis ID on the LEFT side
+            canvas_.setFillColor(NEUTRAL)
+            canvas_.setFont(PDF_FONT_REGULAR, 9)
+            page_text = f"Page {pno}"
+            if analysis_id:
+                page_text = f"{analysis_id} | {page_text}"
+            canvas_.drawString(MARGIN_L, fy-2, page_text)
+
+            # Company logo on the RIGHT side - use logo_vertical_512x256.png
+            # Try multiple possible paths for the logo
+            logo_paths = [
+                "logo_vertical_512x256.png",
+                "static/images/logo_vertical_512x256.png",
+                VERTICAL_LOGO,
+            ]
+            footer_logo = None
+            for logo_path in logo_paths:
+                if os.path.exists(logo_path):
+                    footer_logo = logo_path
+                    break
+            
+            if footer_logo:
+                # Draw small logo thumbnail (aspect ratio 2:1 for logo_vertical_512x256.png)
+                logo_height = 18
+                logo_width = 36  # 2:1 aspect ratio for logo_vertical_512x256.png
+                try:
+                    # Position logo lower in footer (moved down ~1cm for better appearance)
+                    canvas_.drawImage(footer_logo, width - MARGIN_R - logo_width, fy - 18, 
+                                    width=logo_width, height=logo_height,
+                                    preserveAspectRatio=True, mask='auto')
+                except:
+                    pass  # Silently fail if logo cannot be drawn
+
+        canvas_.restoreState()
+
+    return header_footer
+
+# Keep backward compatibility with old header_footer calls
+def header_footer(canvas_, doc):
+    """Legacy header_footer function without timestamp."""
+    make_header_footer()(canvas_, doc)
+
+def create_settings_summary_table(settings):
+    """Create a comprehensive settings summary table"""
+    data = [["Parameter", "Value"]]
+
+    # Operator info
+    data.append(["Operator", settings.operator_name])
+
+    # Color thresholds
+    data.append(["", ""])  # Separator
+    data.append([Paragraph("<b>Color Analysis Thresholds</b>", StyleSmall), ""])
+    data.append(["ΔE Threshold (PASS)", f"{settings.delta_e_threshold:.2f}"])
+    data.append(["ΔE Conditional", f"{settings.delta_e_conditional:.2f}"])
+    data.append(["Lab L* Threshold", f"{settings.lab_l_threshold:.2f}"])
+    data.append(["Lab a*/b* Threshold", f"{settings.lab_ab_threshold:.2f}"])
+    data.append(["Lab Overall Threshold", f"{settings.lab_overall_threshold:.2f}"])
+
+    # Pattern thresholds
+    data.append(["", ""])  # Separator
+    data.append([Paragraph("<b>Pattern Analysis Thresholds</b>", StyleSmall), ""])
+    data.append(["SSIM PASS Threshold", f"{settings.ssim_pass_threshold:.2f}"])
+    data.append(["SSIM Conditional Threshold", f"{settings.ssim_conditional_threshold:.2f}"])
+
+    # Scoring parameters
+    data.append(["", ""])  # Separator
+    data.append([Paragraph("<b>Scoring Parameters</b>", StyleSmall), ""])
+    data.append(["Color Score Multiplier", f"{settings.color_score_multiplier:.1f}"])
+    data.append(["Uniformity Std Multiplier", f"{settings.uniformity_std_multiplier:.1f}"])
+    data.append(["Color Score Minimum", f"{settings.color_score_threshold:.1f}"])
+    data.append(["Pattern Score Minimum", f"{settings.pattern_score_threshold:.1f}"])
+    data.append(["Overall Score Minimum", f"{settings.overall_score_threshold:.1f}"])
+
+    # Sampling
+    data.append(["", ""])  # Separator
+    data.append([Paragraph("<b>Sampling Configuration</b>", StyleSmall), ""])
+    data.append(["Number of Sample Points", str(settings.num_sample_points)])
+    sampling_mode_text = "Manual" if settings.sampling_mode == "manual" else "Random"
+    data.append(["Sampling Mode", sampling_mode_text])
+    if settings.sampling_mode == "manual" and settings.manual_sample_points:
+        data.append(["Manual Points Defined", f"{len(settings.manual_sample_points)} points"])
+
+    # Region selection
+    data.append(["", ""])  # Separator
+    data.append([Paragraph("<b>Region of Interest</b>", StyleSmall), ""])
+    data.append(["ROI Selection Enabled", "Yes" if settings.use_crop else "No"])
+    if settings.use_crop:
+        data.append(["ROI Shape", settings.crop_shape.title()])
+        data.append(["ROI Mode", settings.crop_mode.title()])
+
+        if settings.crop_mode == "simultaneous":
+            # Same position for both images
+            data.append(["Center X (px)", str(settings.crop_center_x)])
+            data.append(["Center Y (px)", str(settings.crop_center_y)])
+            if settings.crop_shape == "circle":
+                data.append(["Diameter (px)", str(settings.crop_diameter)])
+            else:
+                data.append(["Width (px)", str(settings.crop_width)])
+                data.append(["Height (px)", str(settings.crop_height)])
+        else:
+            # Independent mode - show both positions
+            data.append([Paragraph("<i>Reference Image:</i>", StyleSmall), ""])
+            data.append(["  Center X (px)", str(settings.crop_center_x)])
+            data.append(["  Center Y (px)", str(settings.crop_center_y)])
+            if settings.crop_shape == "circle":
+                data.append(["  Diameter (px)", str(settings.crop_diameter)])
+            else:
+                data.append(["  Width (px)", str(settings.crop_width)])
+                data.append(["  Height (px)", str(settings.crop_height)])
+
+            data.append([Paragraph("<i>Sample Image:</i>", StyleSmall), ""])
+            data.append(["  Center X (px)", str(settings.crop_test_center_x)])
+            data.append(["  Center Y (px)", str(settings.crop_test_center_y)])
+            if settings.crop_shape == "circle":
+                data.append(["  Diameter (px)", str(settings.crop_test_diameter)])
+            else:
+                data.append(["  Width (px)", str(settings.crop_test_width)])
+                data.append(["  Height (px)", str(settings.crop_test_height)])
+
+    # Spectrophotometer settings
+    data.append(["", ""])  # Separator
+    data.append([Paragraph("<b>Spectrophotometer Settings</b>", StyleSmall), ""])
+    data.append(["Observer Angle", f"{settings.observer_angle}°"])
+    data.append(["Geometry Mode", settings.geometry_mode])
+    data.append(["ΔE CMC Enabled", "Yes" if settings.use_delta_e_cmc else "No"])
+    if settings.use_delta_e_cmc:
+        data.append(["CMC l:c Ratio", settings.cmc_l_c_ratio])
+    data.append(["Whiteness Min", f"{settings.whiteness_min:.1f}"])
+    data.append(["Yellowness Max", f"{settings.yellowness_max:.1f}"])
+
+    # Advanced texture parameters
+    data.append(["", ""])  # Separator
+    data.append([Paragraph("<b>Advanced Texture Parameters</b>", StyleSmall), ""])
+    data.append(["FFT Peaks to Detect", str(settings.fft_num_peaks)])
+    data.append(["FFT Notch Filter", "Enabled" if settings.fft_enable_notch else "Disabled"])
+    data.append(["Gabor Frequencies", settings.gabor_frequencies_str])
+    data.append(["Gabor Orientations", str(settings.gabor_num_orientations)])
+    data.append(["GLCM Distances", settings.glcm_distances_str])
+    data.append(["GLCM Angles", settings.glcm_angles_str])
+    data.append(["LBP Points (P)", str(settings.lbp_points)])
+    data.append(["LBP Radius (R)", str(settings.lbp_radius)])
+    data.append(["Wavelet Type", settings.wavelet_type])
+    data.append(["Wavelet Levels", str(settings.wavelet_levels)])
+    data.append(["Min Defect Area (px²)", str(settings.defect_min_area)])
+    data.append(["Morph Kernel Size", str(settings.morph_kernel_size)])
+    data.append(["Saliency Strength", f"{settings.saliency_strength:.1f}"])
+
+    # Create table with proper wrapping
+    table = Table(data, colWidths=[3.2*inch, 3.0*inch], repeatRows=1)
+
+    style_cmds = [
+        ("BACKGROUND", (0, 0), (-1, 0), BLUE2),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), PDF_FONT_BOLD),
+        ("FONTSIZE", (0, 0), (-1, 0), 11),
+        ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+        ("TOPPADDING", (0, 0), (-1, 0), 8),
+        ("GRID", (0, 0), (-1, -1), 0.5, NEUTRAL_L),
+        ("FONTNAME", (0, 1), (-1, -1), PDF_FONT_REGULAR),
+        ("FONTSIZE", (0, 1), (-1, -1), 8.5),
+        ("ALIGN", (0, 1), (0, -1), "LEFT"),
+        ("ALIGN", (1, 1), (1, -1), "LEFT"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LEFTPADDING", (0, 1), (-1, -1), 6),
+        ("RIGHTPADDING", (0, 1), (-1, -1), 6),
+        ("TOPPADDING", (0, 1), (-1, -1), 4),
+        ("BOTTOMPADDING", (0, 1), (-1, -1), 4),
+    ]
+
+    # Alternate row colors
+    for i in range(2, len(data), 2):
+        if data[i][0] != "":  # Skip separator rows
+            style_cmds.append(("BACKGROUND", (0, i), (-1, i), colors.whitesmoke))
+
+    # Make section headers stand out
+    for i, row in enumerate(data):
+        if i > 0 and isinstance(row[0], Paragraph):
+            style_cmds.append(("BACKGROUND", (0, i), (-1, i), NEUTRAL_L))
+            style_cmds.append(("SPAN", (0, i), (-1, i)))
+            style_cmds.append(("FONTNAME", (0, i), (-1, i), PDF_FONT_BOLD))
+            style_cmds.append(("FONTSIZE", (0, i), (-1, i), 9))
+
+    table.setStyle(TableStyle(style_cmds))
+    return table
+
+def first_page_header(canvas_, doc):
+    # cover page: frame and subtle header line, no page number
+    canvas_.saveState()
+    width, height = PAGE_SIZE
+
+    # Draw white rectangular frame with 3mm margins on all sides (same as other pages)
+    canvas_.setStrokeColor(colors.HexColor("#E0E0E0"))  # Light gray frame
+    canvas_.setLineWidth(0.8)
+    frame_x1 = FRAME_MARGIN
+    frame_y1 = FRAME_MARGIN
+    frame_x2 = width - FRAME_MARGIN
+    frame_y2 = height - FRAME_MARGIN
+    canvas_.rect(frame_x1, frame_y1, frame_x2 - frame_x1, frame_y2 - frame_y1, stroke=1, fill=0)
+
+    # Header line
+    y = height - 40
+    canvas_.setStrokeColor(NEUTRAL_L)
+    canvas_.setLineWidth(0.6)
+    canvas_.line(MARGIN_L, y, width - MARGIN_R, y)
+    canvas_.restoreState()
+
+# ----------------------------
+# 6b) Interactive UI Components
@@ -0,0 +1,1919 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - main analysis pipeline and PDF report builder
+"""
+
+import os
+import math
+import shutil
+import logging
+import tempfile
+
+import numpy as np
+import cv2
+from PIL import Image
+from skimage.metrics import structural_similarity as ssim
+from skimage.color import rgb2gray
+
+from .config import (ANALYSIS_WIDTH, SOFTWARE_VERSION, COMPANY_NAME, COMPANY_SUBTITLE, REPORT_TITLE,
+                     MARGIN_L, MARGIN_R, MARGIN_T, MARGIN_B, pick_logo)
+from .i18n import tr, translate_status
+from .settings import get_local_time
+from .imaging import apply_crop
+from .color import (srgb_to_xyz, WHITE_POINTS, xyz_to_lab, rgb_to_cmyk,
+                    deltaE76, deltaE94, deltaE2000, cie_whiteness_tint,
+                    astm_e313_yellowness, spectral_to_xyz, find_spectral_peaks_valleys)
+from .metamerism import MetamerismEngine
+from .delta_e import color_differences
+from .palette import pair_palette, palette_color_differences
+from .texture import (symmetry_score, repeat_period_estimate, edge_definition, analyze_fft,
+                      analyze_gabor, analyze_glcm, compute_glcm_zscores, analyze_lbp,
+                      lbp_chi2_distance, lbp_bhattacharyya_distance, analyze_wavelet,
+                      analyze_structure_tensor, compute_hog_density, analyze_defects)
+from .patterns import (analyze_blob_patterns, analyze_connected_components,
+                       detect_keypoints, analyze_keypoint_matching, analyze_autocorrelation,
+                       analyze_spatial_distribution, assess_pattern_integrity,
+                       detect_missing_extra_patterns)
+from .reference import ReferenceFeatures
+from .stages import StageSequence, timed_stage
+from .report_context import trim_report_context, save_report_context
+from .scoring import (determine_status, get_sample_points, pattern_repetition_status, qc_scores,
+                      qc_decision)
+from .charts import (plot_rgb_hist, plot_heatmap, plot_spectral_proxy, plot_ab_scatter,
+                     plot_lab_bars, overlay_regions, plot_fft_power_spectrum, plot_gabor_montage,
+                     plot_gabor_orientation_histogram, plot_glcm_radar, plot_lbp_map_and_hist,
+                     plot_wavelet_energy_bars, plot_defect_saliency, plot_metamerism_illuminants,
+                     plot_spectral_curve, plot_line_angle_histogram, plot_pattern_detection_map,
+                     plot_pattern_count_comparison, plot_pattern_density_heatmap,
+                     plot_missing_extra_patterns, plot_pattern_size_distribution,
+                     plot_autocorrelation_surface, plot_keypoint_matching, plot_blob_detection,
+                     plot_pattern_integrity_radar)
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# 6b) Export Functions
+# ----------------------------
+def export_analysis_to_csv(df_samples, color_metrics, pattern_metrics, output_path):
+    """
+    Export analysis results to CSV format.
+
+    Args:
+        df_samples: DataFrame with sample point measurements
+        color_metrics: Dictionary of color analysis metrics
+        pattern_metrics: Dictionary of pattern analysis metrics
+        output_path: Path to save CSV file
+    """
+    import pandas as pd
+    try:
+        # Save sample data
+        sample_csv = output_path.replace('.csv', '_samples.csv')
+        df_samples.to_csv(sample_csv, index=False)
+        logger.info(f"Exported sample data to {sample_csv}")
+
+        # Save summary metrics
+        summary_data = {
+            'Metric': [],
+            'Value': [],
+            'Unit': []
+        }
+
+        # Add color metrics
+        for key, value in color_metrics.items():
+            summary_data['Metric'].append(key)
+            summary_data['Value'].append(value)
+            summary_data['Unit'].append('')
+
+        # Add pattern metrics
+        for key, value in pattern_metrics.items():
+            summary_data['Metric'].append(key)
+            summary_data['Value'].append(value)
+            summary_data['Unit'].append('')
+
+        summary_df = pd.DataFrame(summary_data)
+        summary_csv = output_path.replace('.csv', '_summary.csv')
+        summary_df.to_csv(summary_csv, index=False)
+        logger.info(f"Exported summary metrics to {summary_csv}")
+
+        return sample_csv, summary_csv
+    except Exception as e:
+        logger.error(f"Failed to export CSV: {str(e)}")
+        return None, None
+
+# ----------------------------
+# 7) Main pipeline
+# ----------------------------
+def run_pipeline_and_build_pdf(ref_path, test_path, ref, test, settings, progress=None, output_dir=None,
+                               ref_features=None, report_dir=None):
+    """
+    Main analysis pipeline with custom settings.
+
+    Args:
+        ref_path: Path to reference image
+        test_path: Path to test image
+        ref: Reference image array
+        test: Test image array
+        settings: QCSettings object with analysis parameters
+        progress: Optional callable receiving the current stage name
+                  ("color", "pattern", "texture", "repetition", "scoring",
+                  "charts", "report")
+        output_dir: Directory for the PDF and the intermediate chart images
+                    (default: current working directory). Each call renders its
+                    charts into its own temporary subdirectory, so concurrent
+                    analyses never share files.
+        ref_features: Optional ReferenceFeatures shared by several analyses of
+                      the same reference image and settings (batch mode)
+        report_dir: Optional directory to save the report context in (see
+                    report_context), so build_report_pdf() can render the
+                    report again for another operator or time zone
+
+    Returns:
+        dict: 'pdf_path', 'decision', the scores and 'decision_translated'
+
+    Raises:
+        RuntimeError: If analysis or PDF generation fails
+    """
+    # pandas is only loaded when a report is actually built
+    import pandas as pd
+    
+    try:
+        logger.info(f"Starting analysis pipeline for {os.path.basename(ref_path)} vs {os.path.basename(test_path)}")
+
+        # Apply crop if enabled (circle or rectangle)
+        if settings.use_crop:
+            mode_desc = "simultaneous" if settings.crop_mode == "simultaneous" else "independent"
+            logger.info(f"Applying {settings.crop_shape} crop to images (mode: {mode_desc})")
+            ref = apply_crop(ref, settings, is_test_image=False)
+            test = apply_crop(test, settings, is_test_image=True)
+    except Exception as e:
+        logger.error(f"Failed to initialize pipeline: {str(e)}")
+        raise RuntimeError(f"Pipeline initialization failed: {str(e)}")
+
+    H, W = ref.shape[:2]
+    small_w = ANALYSIS_WIDTH
+    scale = small_w / W
+    small_h = max(1, int(H * scale))
+    ref_small = cv2.resize(ref, (small_w, small_h), interpolation=cv2.INTER_AREA)
+    test_small = cv2.resize(test, (small_w, small_h), interpolation=cv2.INTER_AREA)
+
+    # Stage durations go to the observers of textile_qc.stages (metrics) and, inside
+    # profile_stages(), into the analysis' stage profile; paired analyzers are timed per side
+    stages = StageSequence()
+
+    if progress:
+        progress("color")
+    stages.start("color")
+    # ----- Color analysis under D65 (source) then adapted to chosen illuminants for metamerism
+    # Reference-only results are memoized (shared across the samples of a batch)
+    rf = ref_features if ref_features is not None else ReferenceFeatures()
+    src_wp = WHITE_POINTS["D65"]
+    with timed_stage("xyz.ref"):
+        xyz_ref = rf.get("xyz", lambda: srgb_to_xyz(ref_small))
+    with timed_stage("xyz.test"):
+        xyz_test = srgb_to_xyz(test_small)
+
+    # Per-illuminant color differences, memoized for the run; full Lab maps only for D65 (charts)
+    # Limited-colorway prints: ΔE once per distinct reference/sample color pair (None: per pixel)
+    palette = pair_palette(ref_small, test_small) if settings.use_palette_delta_e else None
+    meta = MetamerismEngine(ref_small, test_small, ref_features=rf, backend=settings.delta_e_backend,
+                            palette=palette)
+    lab_ref_D65, lab_test_D65 = meta.lab("D65")
+    xyz_ref_D65, xyz_test_D65 = xyz_ref, xyz_test
+    # ΔE76 / ΔE94 / ΔE2000 (and CMC when enabled) in one pass
+    cmc_l, cmc_c = (2, 1) if settings.cmc_l_c_ratio == "2:1" else (1, 1)
+    de_metrics = ("de76", "de94", "de00") + (("cmc",) if settings.use_delta_e_cmc else ())
+    if palette is not None:
+        diffs = palette_color_differences(palette, "D65", de_metrics, cmc_l=cmc_l, cmc_c=cmc_c,
+                                          backend=settings.delta_e_backend)
+    else:
+        diffs = color_differences(lab_ref_D65, lab_test_D65, de_metrics,
+                                  cmc_l=cmc_l, cmc_c=cmc_c, backend=settings.delta_e_backend)
+    de76_map = diffs["de76"]["map"]
+    de94_map = diffs["de94"]["map"]
+    de00_map = diffs["de00"]["map"]
+    mean_de00_D65 = float(np.mean(de00_map))
+    meta.record("D65", mean_de00_D65, np.mean(de76_map))
+
+    mean76 = float(np.mean(de76_map)); std76 = float(np.std(de76_map))
+    min76 = float(np.min(de76_map)); max76 = float(np.max(de76_map))
+    # Uniformity index: higher std deviation = lower uniformity
+    uni_idx = max(0.0, 100.0 - std76 * settings.uniformity_std_multiplier)
+    # Determine status using settings thresholds
+    status_color = determine_status(mean76, settings.delta_e_threshold, settings.delta_e_conditional, lower_is_better=True)
+
+    # Metamerism across illuminants
+    stages.start("metamerism")
+    extended_illuminants = [name for name in settings.metamerism_illuminants if name in WHITE_POINTS]
+    # One pass over the pixels for every illuminant not evaluated yet
+    meta.evaluate(["TL84", "A"] + extended_illuminants)
+    mean_de00_TL84 = meta.mean_delta_e00("TL84")
+    mean_de00_A = meta.mean_delta_e00("A")
+    metamerism_index = float(np.std([mean_de00_D65, mean_de00_TL84, mean_de00_A]) * 10)
+
+    # Extended Metamerism Analysis
+    metamerism_results = [{'illuminant': name, 'delta_e': meta.mean_delta_e00(name)}
+                          for name in extended_illuminants]
+
+    # Region samples (use settings) - supports random and manual sampling
+    stages.start("sample_points")
+    # Build ROI info if crop is enabled
+    # IMPORTANT: Scale crop coordinates from original image space to resized image space
+    roi_info = None
+    if settings.use_crop:
+        # Get original crop values
+        orig_cx = settings.crop_center_x if settings.crop_center_x else W // 2
+        orig_cy = settings.crop_center_y if settings.crop_center_y else H // 2
+        orig_diameter = settings.crop_diameter
+        orig_width = settings.crop_width if hasattr(settings, 'crop_width') else settings.crop_diameter
+        orig_height = settings.crop_height if hasattr(settings, 'crop_height') else settings.crop_diameter
+        
+        # Scale to resized image coordinates
+        roi_info = {
+            'enabled': True,
+            'shape': settings.crop_shape,
+            'center_x': int(orig_cx * scale),
+            'center_y': int(orig_cy * scale),
+            'diameter': int(orig_diameter * scale),
+            'width': int(orig_width * scale),
+            'height': int(orig_height * scale)
+        }
+    pts = get_sample_points(small_h, small_w, settings, roi_info)
+    rows = []
+    for i,(y,x) in enumerate(pts, start=1):
+        rR, rG, rB = ref_small[y,x].tolist()
+        tR, tG, tB = test_small[y,x].tolist()
+        xyz_r = srgb_to_xyz(np.array([[rR, rG, rB]], float))[0]
+        xyz_t = srgb_to_xyz(np.array([[tR, tG, tB]], float))[0]
+        lab_r = xyz_to_lab(xyz_r[None,:], src_wp)[0]
+        lab_t = xyz_to_lab(xyz_t[None,:], src_wp)[0]
+        cmyk_r = (rgb_to_cmyk(np.array([[rR, rG, rB]]))[0]*100)
+        cmyk_t = (rgb_to_cmyk(np.array([[tR, tG, tB]]))[0]*100)
+        d76 = float(deltaE76(lab_r[None,:], lab_t[None,:])[0])
+        d94 = float(deltaE94(lab_r[None,:], lab_t[None,:])[0])
+        d00 = float(deltaE2000(lab_r[None,:], lab_t[None,:])[0])
+        rows.append({
+            "Region": i, "x": x, "y": y,
+            "Ref R": rR, "Ref G": rG, "Ref B": rB,
+            "Test R": tR, "Test G": tG, "Test B": tB,
+            "Ref L*": lab_r[0], "Ref a*": lab_r[1], "Ref b*": lab_r[2],
+            "Test L*": lab_t[0], "Test a*": lab_t[1], "Test b*": lab_t[2],
+            "Ref C%": cmyk_r[0], "Ref M%": cmyk_r[1], "Ref Y%": cmyk_r[2], "Ref K%": cmyk_r[3],
+            "Test C%": cmyk_t[0], "Test M%": cmyk_t[1], "Test Y%": cmyk_t[2], "Test K%": cmyk_t[3],
+            "Ref X": xyz_r[0], "Ref Y": xyz_r[1], "Ref Z": xyz_r[2],
+            "Test X": xyz_t[0], "Test Y": xyz_t[1], "Test Z": xyz_t[2],
+            "ΔE76": d76, "ΔE94": d94, "ΔE2000": d00
+        })
+    df_samples = pd.DataFrame(rows)
+
+    if progress:
+        progress("pattern")
+    stages.start("pattern")
+    # Pattern analysis
+    gray_ref = rf.get("gray", lambda: rgb2gray(ref_small))
+    gray_test = rgb2gray(test_small)
+    ssim_score = float(ssim(gray_ref, gray_test, data_range=1.0))
+    with timed_stage("symmetry.ref"):
+        sym_ref = rf.get("symmetry", lambda: symmetry_score(gray_ref))
+    with timed_stage("symmetry.test"):
+        sym_test = symmetry_score(gray_test)
+    symmetry = (sym_ref + sym_test)/2
+    px, py = repeat_period_estimate(gray_test)
+    edge_def = edge_definition(gray_test)
+    reg_accuracy = min(100.0, ssim_score * 100.0)
+
+    diff = cv2.absdiff((gray_ref*255).astype(np.uint8),(gray_test*255).astype(np.uint8))
+    thr = cv2.threshold(diff, 0, 255, cv2.THRESH_OTSU)[1]
+    defect_ratio = float(np.sum(thr>0)/thr.size)
+    defect_density = defect_ratio * 10_000  # heuristic scale
+
+    if progress:
+        progress("texture")
+    # ============ ADVANCED TEXTURE ANALYSIS ============
+    # Only needed for the "Advanced Texture Analysis" part of the pattern unit;
+    # skipping it also avoids loading pywt, skimage.feature and scipy.ndimage.
+    run_advanced_texture = settings.enable_pattern_unit and settings.enable_pattern_advanced
+    if run_advanced_texture:
+        logger.info("Running advanced texture analysis...")
+
+        # FFT Analysis
+        stages.start("fft")
+        with timed_stage("fft.ref"):
+            fft_ref = rf.get("fft", lambda: analyze_fft(gray_ref, num_peaks=settings.fft_num_peaks,
+                                                        enable_notch=settings.fft_enable_notch))
+        with timed_stage("fft.test"):
+            fft_test = analyze_fft(gray_test, num_peaks=settings.fft_num_peaks, enable_notch=settings.fft_enable_notch)
+
+        # Gabor Filter Bank
+        stages.start("gabor")
+        with timed_stage("gabor.ref"):
+            gabor_ref = rf.get("gabor", lambda: analyze_gabor(gray_ref, frequencies=settings.gabor_frequencies,
+                                                              num_orientations=settings.gabor_num_orientations))
+        with timed_stage("gabor.test"):
+            gabor_test = analyze_gabor(gray_test, frequencies=settings.gabor_frequencies, num_orientations=settings.gabor_num_orientations)
+
+        # GLCM Features
+        stages.start("glcm")
+        with timed_stage("glcm.ref"):
+            glcm_ref = rf.get("glcm", lambda: analyze_glcm(gray_ref, distances=settings.glcm_distances,
+                                                           angles=settings.glcm_angles))
+        with timed_stage("glcm.test"):
+            glcm_test = analyze_glcm(gray_test, distances=settings.glcm_distances, angles=settings.glcm_angles)
+
+        # LBP
+        stages.start("lbp")
+        with timed_stage("lbp.ref"):
+            lbp_ref = rf.get("lbp", lambda: analyze_lbp(gray_ref, P=settings.lbp_points, R=settings.lbp_radius))
+        with timed_stage("lbp.test"):
+            lbp_test = analyze_lbp(gray_test, P=settings.lbp_points, R=settings.lbp_radius)
+        lbp_chi2 = lbp_chi2_distance(lbp_ref['histogram'], lbp_test['histogram'])
+        lbp_bhatt = lbp_bhattacharyya_distance(lbp_ref['histogram'], lbp_test['histogram'])
+
+        # Wavelet Analysis
+        stages.start("wavelet")
+        with timed_stage("wavelet.ref"):
+            wavelet_ref = rf.get("wavelet", lambda: analyze_wavelet(gray_ref, wavelet=settings.wavelet_type,
+                                                                    levels=settings.wavelet_levels))
+        with timed_stage("wavelet.test"):
+            wavelet_test = analyze_wavelet(gray_test, wavelet=settings.wavelet_type, levels=settings.wavelet_levels)
+
+        # Structure Tensor
+        stages.start("structure_tensor")
+        with timed_stage("structure_tensor.ref"):
+            struct_ref = rf.get("structure_tensor", lambda: analyze_structure_tensor(gray_ref))
+        with timed_stage("structure_tensor.test"):
+            struct_test = analyze_structure_tensor(gray_test)
+
+        # HOG Density
+        stages.start("hog")
+        with timed_stage("hog.ref"):
+            hog_ref = rf.get("hog", lambda: compute_hog_density(gray_ref))
+        with timed_stage("hog.test"):
+            hog_test = compute_hog_density(gray_test)
+
+        # GLCM Z-scores
+        glcm_zscores = compute_glcm_zscores(glcm_ref, glcm_test)
+
+        # Defect Detection
+        stages.start("defects")
+        defects_analysis = analyze_defects(gray_test, min_area=settings.defect_min_area,
+                                           morph_kernel_size=settings.morph_kernel_size,
+                                           saliency_strength=settings.saliency_strength)
+    else:
+        fft_ref = fft_test = gabor_ref = gabor_test = glcm_ref = glcm_test = None
+        lbp_ref = lbp_test = lbp_chi2 = lbp_bhatt = wavelet_ref = wavelet_test = None
+        struct_ref = struct_test = hog_ref = hog_test = glcm_zscores = defects_analysis = None
+
+    if progress:
+        progress("repetition")
+    # ============ PATTERN REPETITION ANALYSIS ============
+    if settings.enable_pattern_repetition:
+        logger.info("Detecting repeating patterns...")
+        stages.start("pattern_repetition")
+
+        # Connected Components Analysis
+        with timed_stage("connected_components.ref"):
+            cc_ref = rf.get("connected_components", lambda: analyze_connected_components(
+                gray_ref, min_area=settings.pattern_min_area, max_area=settings.pattern_max_area))
+        with timed_stage("connected_components.test"):
+            cc_test = analyze_connected_components(gray_test, min_area=settings.pattern_min_area,
+                                                   max_area=settings.pattern_max_area)
+
+        # Blob Detection
+        with timed_stage("blobs.ref"):
+            blob_ref = rf.get("blobs", lambda: analyze_blob_patterns(gray_ref, min_area=settings.pattern_min_area,
+                                                                     max_area=settings.pattern_max_area,
+                                                                     min_circularity=settings.blob_min_circularity,
+                                                                     min_convexity=settings.blob_min_convexity))
+        with timed_stage("blobs.test"):
+            blob_test = analyze_blob_patterns(gray_test, min_area=settings.pattern_min_area,
+                                              max_area=settings.pattern_max_area,
+                                              min_circularity=settings.blob_min_circularity,
+                                              min_convexity=settings.blob_min_convexity)
+
+        # Keypoint-based Matching
+        with timed_stage("keypoints.ref"):
+            ref_keypoints = rf.get("keypoints", lambda: detect_keypoints(gray_ref, settings.keypoint_detector))
+        with timed_stage("keypoints.test"):
+            keypoint_matching = analyze_keypoint_matching(gray_ref, gray_test,
+                                                          detector_type=settings.keypoint_detector,
+                                                          match_threshold=settings.pattern_match_threshold,
+                                                          ref_detection=ref_keypoints)
+
+        # Auto-correlation Analysis
+        with timed_stage("autocorrelation.ref"):
+            autocorr_ref = rf.get("autocorrelation", lambda: analyze_autocorrelation(gray_ref))
+        with timed_stage("autocorrelation.test"):
+            autocorr_test = analyze_autocorrelation(gray_test)
+
+        # Spatial Distribution
+        with timed_stage("spatial.ref"):
+            spatial_ref = rf.get("spatial", lambda: analyze_spatial_distribution(gray_ref, cc_ref['patterns'],
+                                                                                 cell_size=settings.grid_cell_size))
+        with timed_stage("spatial.test"):
+            spatial_test = analyze_spatial_distribution(gray_test, cc_test['patterns'],
+                                                        cell_size=settings.grid_cell_size)
+
+        # Pattern Integrity Assessment
+        integrity_assessment = assess_pattern_integrity(cc_ref['patterns'], cc_test['patterns'])
+
+        # Missing/Extra Patterns Detection
+        missing_extra = detect_missing_extra_patterns(cc_ref['patterns'], cc_test['patterns'],
+                                                      spatial_ref, tolerance=50)
+
+        # Pattern Repetition Status Determination
+        count_diff = abs(cc_ref['count'] - cc_test['count'])
+        pattern_rep_status = pattern_repetition_status(cc_ref['count'], cc_test['count'],
+                                                       settings.pattern_count_tolerance)
+
+        logger.info(f"Pattern repetition analysis complete! ({cc_ref['count']} ref, {cc_test['count']} test patterns)")
+    else:
+        # Placeholder values if pattern repetition is disabled
+        cc_ref = cc_test = blob_ref = blob_test = None
+        keypoint_matching = autocorr_ref = autocorr_test = None
+        spatial_ref = spatial_test = integrity_assessment = missing_extra = None
+        pattern_rep_status = "DISABLED"
+
+    # ============ ENHANCED COLOR ANALYSIS ============
+    logger.info("Running enhanced color analysis...")
+    stages.start("color_indices")
+
+    # Check if spectral data is provided
+    spectral_data_available = (settings.spectral_enable and
+                               len(settings.spectral_ref_wavelengths) > 0 and
+                               len(settings.spectral_sample_wavelengths) > 0)
+
+    if spectral_data_available:
+        logger.info("Processing spectral data...")
+        # Use spectral data to compute XYZ
+        xyz_ref_spectral = spectral_to_xyz(settings.spectral_ref_wavelengths,
+                                           settings.spectral_ref_reflectance)
+        xyz_test_spectral = spectral_to_xyz(settings.spectral_sample_wavelengths,
+                                            settings.spectral_sample_reflectance)
+
+        # Override mean XYZ with spectral data
+        xyz_ref_mean = xyz_ref_spectral
+        xyz_test_mean = xyz_test_spectral
+
+        # Find spectral peaks and valleys
+        spectral_features_ref = find_spectral_peaks_valleys(settings.spectral_ref_wavelengths,
+                                                            settings.spectral_ref_reflectance)
+        spectral_features_sample = find_spectral_peaks_valleys(settings.spectral_sample_wavelengths,
+                                                               settings.spectral_sample_reflectance)
+    else:
+        # Use RGB-derived XYZ
+        xyz_ref_mean = xyz_ref_D65.reshape(-1, 3).mean(axis=0)
+        xyz_test_mean = xyz_test_D65.reshape(-1, 3).mean(axis=0)
+        spectral_features_ref = []
+        spectral_features_sample = []
+
+    # CMC Color Difference
+    if settings.use_delta_e_cmc:
+        de_cmc_map = diffs["cmc"]["map"]
+        mean_de_cmc = float(np.mean(de_cmc_map))
+    else:
+        de_cmc_map = None
+        mean_de_cmc = 0.0
+    whiteness_ref, tint_ref = cie_whiteness_tint(xyz_ref_mean)
+    whiteness_test, tint_test = cie_whiteness_tint(xyz_test_mean)
+
+    # Yellowness Index
+    yi_ref = astm_e313_yellowness(xyz_ref_mean)
+    yi_test = astm_e313_yellowness(xyz_test_mean)
+
+    worst_metamerism = max(metamerism_results, key=lambda x: x['delta_e']) if metamerism_results else None
+
+    if progress:
+        progress("scoring")
+    stages.start("scoring")
+    # QC metrics (using settings)
+    color_score, pattern_score, overall_score = qc_scores(mean76, ssim_score, settings)
+    pattern_status = determine_status(ssim_score, settings.ssim_pass_threshold, settings.ssim_conditional_threshold, lower_is_better=False)
+
+    # Decision logic based on scores (includes pattern repetition status)
+    decision = qc_decision(color_score, pattern_score, overall_score, pattern_rep_status, settings)
+
+    if progress:
+        progress("charts")
+    stages.start("charts")
+    # ---------------- Charts / images to embed ----------------
+    logger.info("Generating visualizations...")
+    output_dir = output_dir or os.getcwd()
+    img_dir = tempfile.mkdtemp(prefix="charts_", dir=output_dir)
+    # RGB histograms
+    hist_ref_path  = os.path.join(img_dir, "hist_ref.png")
+    hist_test_path = os.path.join(img_dir, "hist_test.png")
+    plot_rgb_hist(ref_small, "Reference RGB Histogram", hist_ref_path)
+    plot_rgb_hist(test_small,"Sample RGB Histogram",   hist_test_path)
+
+    # ΔE heatmap
+    heatmap_path = os.path.join(img_dir, "heatmap_de00.png")
+    plot_heatmap(de00_map, "ΔE2000 Heatmap (D65)", heatmap_path)
+
+    # Spectral distribution (proxy)
+    mean_rgb_ref  = ref_small.reshape(-1,3).mean(axis=0)/255.0
+    mean_rgb_test = test_small.reshape(-1,3).mean(axis=0)/255.0
+    spectral_path = os.path.join(img_dir, "spectral_proxy.png")
+    plot_spectral_proxy(mean_rgb_ref, mean_rgb_test, spectral_path)
+
+    # a*b scatter + Lab bars
+    ab_scatter_path = os.path.join(img_dir, "ab_scatter.png")
+    plot_ab_scatter(lab_ref_D65, lab_test_D65, ab_scatter_path)
+    lab_ref_mean = lab_ref_D65.reshape(-1,3).mean(axis=0)
+    lab_test_mean= lab_test_D65.reshape(-1,3).mean(axis=0)
+    lab_bars_path = os.path.join(img_dir, "lab_bars.png")
+    plot_lab_bars(lab_ref_mean, lab_test_mean, lab_bars_path)
+
+    # Region overlay image
+    overlay_ref = overlay_regions(ref_small, pts)
+    overlay_test= overlay_regions(test_small, pts)
+    overlay_ref_path  = os.path.join(img_dir, "ref_overlay.png")
+    overlay_test_path = os.path.join(img_dir, "test_overlay.png")
+    Image.fromarray(overlay_ref).save(overlay_ref_path, "PNG")
+    Image.fromarray(overlay_test).save(overlay_test_path, "PNG")
+
+    # Difference and mask images
+    diff_img_path = os.path.join(img_dir, "abs_diff.png")
+    thr_img_path  = os.path.join(img_dir, "defect_mask.png")
+    Image.fromarray(diff).save(diff_img_path, "PNG")
+    Image.fromarray(thr).save(thr_img_path, "PNG")
+
+    # ============ ADVANCED TEXTURE VISUALIZATIONS ============
+    if run_advanced_texture:
+        # FFT Power Spectrum
+        fft_spectrum_path = os.path.join(img_dir, "fft_power_spectrum.png")
+        plot_fft_power_spectrum(fft_test['power_spectrum'], fft_test['peaks'], fft_spectrum_path)
+
+        # Gabor Montage
+        gabor_montage_path = os.path.join(img_dir, "gabor_montage.png")
+        plot_gabor_montage(gabor_test['energy_maps'], settings.gabor_frequencies,
+                           settings.gabor_num_orientations, gabor_montage_path)
+
+        # Gabor Orientation Histogram
+        gabor_orient_path = os.path.join(img_dir, "gabor_orientation.png")
+        plot_gabor_orientation_histogram(gabor_test['results'], gabor_orient_path)
+
+        # GLCM Radar Chart
+        glcm_radar_path = os.path.join(img_dir, "glcm_radar.png")
+        plot_glcm_radar(glcm_ref, glcm_test, glcm_radar_path)
+
+        # LBP Map and Histogram
+        lbp_map_hist_path = os.path.join(img_dir, "lbp_map_hist.png")
+        plot_lbp_map_and_hist(lbp_test['lbp_map'], lbp_ref['histogram'], lbp_test['histogram'], lbp_map_hist_path)
+
+        # Wavelet Energy Bars
+        wavelet_energy_path = os.path.join(img_dir, "wavelet_energy.png")
+        plot_wavelet_energy_bars(wavelet_ref['energies'], wavelet_test['energies'], wavelet_energy_path)
+
+        # Defect Saliency Map
+        defect_saliency_path = os.path.join(img_dir, "defect_saliency.png")
+        plot_defect_saliency(defects_analysis['saliency_map'], defects_analysis['binary_map'],
+                             defects_analysis['defects'], gray_test.shape, defect_saliency_path)
+
+        # Line-Angle Histogram (Structure Tensor)
+        line_angle_hist_path = os.path.join(img_dir, "line_angle_histogram.png")
+        if len(struct_test['orientation_degrees']) > 0:
+            plot_line_angle_histogram(struct_test['orientation_degrees'], line_angle_hist_path)
+
+    # ============ ENHANCED COLOR VISUALIZATIONS ============
+    # Metamerism across illuminants
+    metamerism_plot_path = os.path.join(img_dir, "metamerism_illuminants.png")
+    if metamerism_results and settings.enable_spectrophotometer and settings.enable_spectro_metamerism:
+        illuminant_names = [m['illuminant'] for m in metamerism_results]
+        illuminant_des = [m['delta_e'] for m in metamerism_results]
+        plot_metamerism_illuminants(illuminant_names, illuminant_des, metamerism_plot_path)
+
+    # True Spectral Curve (if available)
+    spectral_curve_path = os.path.join(img_dir, "spectral_curve.png")
+    if spectral_data_available and settings.enable_spectrophotometer and settings.enable_spectro_spectral_data:
+        plot_spectral_curve(settings.spectral_ref_wavelengths, settings.spectral_ref_reflectance,
+                           settings.spectral_sample_reflectance, spectral_curve_path)
+
+    # ============ PATTERN REPETITION VISUALIZATIONS ============
+    if settings.enable_pattern_repetition and cc_ref is not None:
+        logger.info("Generating pattern repetition visualizations...")
+
+        # Pattern Detection Maps
+        pattern_detection_ref_path = os.path.join(img_dir, "pattern_detection_ref.png")
+        pattern_detection_test_path = os.path.join(img_dir, "pattern_detection_test.png")
+        plot_pattern_detection_map(ref_small, cc_ref['patterns'], "Reference", pattern_detection_ref_path)
+        plot_pattern_detection_map(test_small, cc_test['patterns'], "Sample", pattern_detection_test_path)
+
+        # Pattern Count Comparison
+        pattern_count_path = os.path.join(img_dir, "pattern_count_comparison.png")
+        plot_pattern_count_comparison(cc_ref['count'], cc_test['count'], pattern_count_path)
+
+        # Pattern Density Heatmaps
+        pattern_density_ref_path = os.path.join(img_dir, "pattern_density_ref.png")
+        pattern_density_test_path = os.path.join(img_dir, "pattern_density_test.png")
+        plot_pattern_density_heatmap(spatial_ref['density_grid'], pattern_density_ref_path)
+        plot_pattern_density_heatmap(spatial_test['density_grid'], pattern_density_test_path)
+
+        # Missing/Extra Patterns Overlay
+        missing_extra_path = os.path.join(img_dir, "missing_extra_patterns.png")
+        plot_missing_extra_patterns(test_small, missing_extra['missing_patterns'],
+                                   missing_extra['extra_patterns'], missing_extra_path)
+
+        # Pattern Size Distribution
+        if cc_ref['patterns'] and cc_test['patterns']:
+            pattern_size_dist_path = os.path.join(img_dir, "pattern_size_distribution.png")
+            areas_ref = [p['area'] for p in cc_ref['patterns']]
+            areas_test = [p['area'] for p in cc_test['patterns']]
+            plot_pattern_size_distribution(areas_ref, areas_test, pattern_size_dist_path)
+        else:
+            pattern_size_dist_path = None
+
+        # Auto-correlation Surface
+        autocorr_surface_path = os.path.join(img_dir, "autocorrelation_surface.png")
+        plot_autocorrelation_surface(autocorr_test['autocorr'], autocorr_test['peaks'], autocorr_surface_path)
+
+        # Keypoint Matching Visualization
+        keypoint_matching_path = os.path.join(img_dir, "keypoint_matching.png")
+        if keypoint_matching and keypoint_matching['keypoints_ref'] and keypoint_matching['keypoints_test']:
+            plot_keypoint_matching(ref_small, test_small,
+                                 keypoint_matching['keypoints_ref'],
+                                 keypoint_matching['keypoints_test'],
+                                 keypoint_matching['good_matches'], keypoint_matching_path)
+
+        # Blob Detection Visualization
+        blob_detection_ref_path = os.path.join(img_dir, "blob_detection_ref.png")
+        blob_detection_test_path = os.path.join(img_dir, "blob_detection_test.png")
+        if blob_ref and blob_ref['keypoints']:
+            plot_blob_detection(ref_small, blob_ref['keypoints'], blob_detection_ref_path)
+        if blob_test and blob_test['keypoints']:
+            plot_blob_detection(test_small, blob_test['keypoints'], blob_detection_test_path)
+
+        # Pattern Integrity Radar
+        pattern_integrity_path = os.path.join(img_dir, "pattern_integrity_radar.png")
+        # Create dummy data for reference (perfect integrity)
+        integrity_ref = {'size_similarity': 100.0, 'shape_similarity': 100.0,
+                        'spatial_similarity': 100.0, 'integrity_score': 100.0}
+        plot_pattern_integrity_radar(integrity_ref, integrity_assessment, pattern_integrity_path)
+
+    if progress:
+        progress("report")
+    stages.stop()
+
+    # Everything the report shows, rendered by build_report_pdf (and kept for cached re-renders)
+    values = locals()
+    context = trim_report_context({name: values[name] for name in REPORT_CONTEXT_NAMES})
+    try:
+        result = build_report_pdf(context, settings, output_dir)
+        if report_dir is not None:
+            try:
+                save_report_context(report_dir, context)
+            except (TypeError, ValueError, OSError) as e:
+                logger.warning(f"Report context not saved: {e}")
+        return result
+    finally:
+        # Chart PNGs are embedded in the PDF (and copied into report_dir), they are not needed afterwards
+        shutil.rmtree(img_dir, ignore_errors=True)
+
+
+# Values of run_pipeline_and_build_pdf that build_report_pdf renders
+REPORT_CONTEXT_NAMES = (
+    "decision", "color_score", "pattern_score", "cc_ref", "integrity_assessment", "pattern_rep_status",
+    "status_color", "mean_de00_D65", "overall_score", "overlay_ref_path", "overlay_test_path", "ref_path",
+    "test_path", "pts", "df_samples", "mean76", "std76", "min76", "max76", "de94_map", "de00_map",
+    "ref_small", "test_small", "metamerism_index", "uni_idx", "spectral_path", "heatmap_path",
+    "diff_img_path", "thr_img_path", "lab_test_mean", "lab_ref_mean", "ab_scatter_path", "lab_bars_path",
+    "ssim_score", "symmetry", "px", "py", "edge_def", "defect_density", "hist_ref_path", "hist_test_path",
+    "fft_spectrum_path", "fft_test", "fft_ref", "gabor_montage_path", "gabor_orient_path", "gabor_ref",
+    "gabor_test", "glcm_radar_path", "glcm_ref", "glcm_test", "glcm_zscores", "lbp_map_hist_path", "lbp_chi2",
+    "lbp_bhatt", "wavelet_energy_path", "wavelet_ref", "wavelet_test", "struct_test", "struct_ref", "hog_ref",
+    "hog_test", "line_angle_hist_path", "defect_saliency_path", "defects_analysis", "cc_test", "spatial_test",
+    "spatial_ref", "pattern_detection_ref_path", "pattern_detection_test_path", "pattern_count_path",
+    "blob_ref", "blob_test", "blob_detection_ref_path", "blob_detection_test_path", "keypoint_matching",
+    "keypoint_matching_path", "autocorr_test", "autocorr_ref", "autocorr_surface_path",
+    "pattern_density_ref_path", "pattern_density_test_path", "pattern_integrity_path",
+    "pattern_size_dist_path", "missing_extra", "missing_extra_path", "mean_de_cmc", "whiteness_test",
+    "yi_test", "whiteness_ref", "tint_ref", "tint_test", "yi_ref", "metamerism_results",
+    "metamerism_plot_path", "worst_metamerism", "spectral_data_available", "spectral_curve_path",
+    "spectral_features_ref", "spectral_features_sample",
+)
+
+
+def build_report_pdf(context, settings, output_dir):
+    """
+    Render the analysis report PDF.
+
+    Args:
+        context: Report context (REPORT_CONTEXT_NAMES) from run_pipeline_and_build_pdf,
+                 or load_report_context() of a saved one
+        settings: QCSettings; operator name, time zone and language are taken
+                  from here, so a saved context can be rendered for another run
+        output_dir: Directory for the PDF
+
+    Returns:
+        dict: 'pdf_path', 'decision', the scores and 'decision_translated'
+
+    Raises:
+        RuntimeError: If PDF generation fails
+    """
+    # ReportLab and the PDF styles (font registration) are only loaded
+    # when a report is actually built.
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import (SimpleDocTemplate, Paragraph, Image as RLImage, Table, TableStyle,
+                                    Spacer, PageBreak, KeepTogether)
+    from reportlab.lib.enums import TA_CENTER
+    from .pdf import (PDF_FONT_REGULAR, PDF_FONT_BOLD, StyleTitle, StyleH1, StyleH2, StyleBody,
+                      StyleSmall, StyleBadge, fmt1, fmt2, make_table, wrap_text_cell,
+                      make_header_footer, create_settings_summary_table, first_page_header,
+                      PAGE_SIZE, BLUE1, BLUE2, GREEN, RED, ORANGE, NEUTRAL_DARK, NEUTRAL_L)
+
+    decision, color_score = context["decision"], context["color_score"]
+    pattern_score, cc_ref = context["pattern_score"], context["cc_ref"]
+    integrity_assessment, pattern_rep_status = context["integrity_assessment"], context["pattern_rep_status"]
+    status_color, mean_de00_D65 = context["status_color"], context["mean_de00_D65"]
+    overall_score, overlay_ref_path = context["overall_score"], context["overlay_ref_path"]
+    overlay_test_path, ref_path = context["overlay_test_path"], context["ref_path"]
+    test_path, pts, df_samples = context["test_path"], context["pts"], context["df_samples"]
+    mean76, std76, min76, max76 = context["mean76"], context["std76"], context["min76"], context["max76"]
+    de94_map, de00_map, ref_small = context["de94_map"], context["de00_map"], context["ref_small"]
+    test_small, metamerism_index = context["test_small"], context["metamerism_index"]
+    uni_idx, spectral_path = context["uni_idx"], context["spectral_path"]
+    heatmap_path, diff_img_path = context["heatmap_path"], context["diff_img_path"]
+    thr_img_path, lab_test_mean = context["thr_img_path"], context["lab_test_mean"]
+    lab_ref_mean, ab_scatter_path = context["lab_ref_mean"], context["ab_scatter_path"]
+    lab_bars_path, ssim_score, symmetry = context["lab_bars_path"], context["ssim_score"], context["symmetry"]
+    px, py, edge_def = context["px"], context["py"], context["edge_def"]
+    defect_density, hist_ref_path = context["defect_density"], context["hist_ref_path"]
+    hist_test_path, fft_spectrum_path = context["hist_test_path"], context["fft_spectrum_path"]
+    fft_test, fft_ref = context["fft_test"], context["fft_ref"]
+    gabor_montage_path, gabor_orient_path = context["gabor_montage_path"], context["gabor_orient_path"]
+    gabor_ref, gabor_test = context["gabor_ref"], context["gabor_test"]
+    glcm_radar_path, glcm_ref = context["glcm_radar_path"], context["glcm_ref"]
+    glcm_test, glcm_zscores = context["glcm_test"], context["glcm_zscores"]
+    lbp_map_hist_path, lbp_chi2 = context["lbp_map_hist_path"], context["lbp_chi2"]
+    lbp_bhatt, wavelet_energy_path = context["lbp_bhatt"], context["wavelet_energy_path"]
+    wavelet_ref, wavelet_test = context["wavelet_ref"], context["wavelet_test"]
+    struct_test, struct_ref, hog_ref = context["struct_test"], context["struct_ref"], context["hog_ref"]
+    hog_test, line_angle_hist_path = context["hog_test"], context["line_angle_hist_path"]
+    defect_saliency_path, defects_analysis = context["defect_saliency_path"], context["defects_analysis"]
+    cc_test, spatial_test, spatial_ref = context["cc_test"], context["spatial_test"], context["spatial_ref"]
+    pattern_detection_ref_path = context["pattern_detection_ref_path"]
+    pattern_detection_test_path = context["pattern_detection_test_path"]
+    pattern_count_path, blob_ref = context["pattern_count_path"], context["blob_ref"]
+    blob_test, blob_detection_ref_path = context["blob_test"], context["blob_detection_ref_path"]
+    blob_detection_test_path = context["blob_detection_test_path"]
+    keypoint_matching = context["keypoint_matching"]
+    keypoint_matching_path, autocorr_test = context["keypoint_matching_path"], context["autocorr_test"]
+    autocorr_ref, autocorr_surface_path = context["autocorr_ref"], context["autocorr_surface_path"]
+    pattern_density_ref_path = context["pattern_density_ref_path"]
+    pattern_density_test_path = context["pattern_density_test_path"]
+    pattern_integrity_path = context["pattern_integrity_path"]
+    pattern_size_dist_path, missing_extra = context["pattern_size_dist_path"], context["missing_extra"]
+    missing_extra_path, mean_de_cmc = context["missing_extra_path"], context["mean_de_cmc"]
+    whiteness_test, yi_test = context["whiteness_test"], context["yi_test"]
+    whiteness_ref, tint_ref, tint_test = context["whiteness_ref"], context["tint_ref"], context["tint_test"]
+    yi_ref, metamerism_results = context["yi_ref"], context["metamerism_results"]
+    metamerism_plot_path, worst_metamerism = context["metamerism_plot_path"], context["worst_metamerism"]
+    spectral_data_available = context["spectral_data_available"]
+    spectral_curve_path = context["spectral_curve_path"]
+    spectral_features_ref = context["spectral_features_ref"]
+    spectral_features_sample = context["spectral_features_sample"]
+    stages = StageSequence()
+
+    # ---------------- PDF Build ----------------
+    logger.info("Building PDF report...")
+    stages.start("pdf")
+    now = get_local_time(settings.timezone_offset_hours)  # Use configurable timezone
+    fname_stamp = now.strftime("%Y%m%d-%H%M%S")
+    pdf_name = f"SpectraMatch Report {fname_stamp}.pdf"
+    pdf_path = os.path.join(output_dir, pdf_name)
+
+    doc = SimpleDocTemplate(
+        pdf_path, pagesize=PAGE_SIZE,
+        leftMargin=MARGIN_L, rightMargin=MARGIN_R,
+        topMargin=MARGIN_T, bottomMargin=MARGIN_B
+    )
+
+    elements = []
+
+    # ==== Cover Page (not numbered) ====
+    logo_path = pick_logo()
+    if logo_path:
+        elements.append(RLImage(logo_path, width=1.8*inch, height=1.8*inch))  # Increased from 1.2 to 1.8 inches
+        elements.append(Spacer(1, 15))
+
+    elements.append(Paragraph(f"<font color='{BLUE1}'><b>{COMPANY_NAME}</b></font>", StyleTitle))
+    elements.append(Paragraph(COMPANY_SUBTITLE, StyleSmall))
+    elements.append(Spacer(1, 18))
+    elements.append(Paragraph(f"<font color='{NEUTRAL_DARK}'><b>{REPORT_TITLE}</b></font>", ParagraphStyle("rt", parent=StyleTitle, fontSize=24)))
+    elements.append(Spacer(1, 6))
+
+    # Report metadata
+    nice_date = now.strftime("%B %d, %Y at %I:%M %p")
+    analysis_id = f"SPEC_{now.strftime('%Y%m%d_%H%M%S')}"
+    operator = settings.operator_name  # Use operator from settings
+
+    meta_data = [
+        [tr("report_date", settings), nice_date],
+        [tr("operator", settings), operator],
+        [tr("analysis_id", settings), analysis_id],
+        [tr("software_version", settings), SOFTWARE_VERSION],
+    ]
+    t = make_table([[tr("report_metadata", settings),""]] + meta_data, colWidths=[1.8*inch, 4.0*inch])
+    t.setStyle(TableStyle([("SPAN", (0,0),(1,0)),
+                           ("BACKGROUND",(0,0),(1,0), BLUE2),
+                           ("TEXTCOLOR",(0,0),(1,0), colors.white),
+                           ("ALIGN",(0,0),(1,0), "LEFT")]))
+    elements.append(t)
+    elements.append(Spacer(1, 16))
+
+    # ==== EXECUTIVE SUMMARY (Quick PASS/FAIL Overview) ====
+    dec_color_bg = GREEN if decision.startswith("ACCEPT") else (ORANGE if "CONDITIONAL" in decision else RED)
+
+    # Translate decision for display
+    decision_tr = tr("accept", settings) if decision == "ACCEPT" else (
+        tr("conditional_accept", settings) if "CONDITIONAL" in decision else tr("reject", settings))
+
+    # Create styled executive summary box
+    exec_summary_style = ParagraphStyle("ExecSummary", parent=StyleBody, fontSize=11,
+                                        alignment=TA_CENTER, textColor=colors.white)
+    exec_summary_header = Paragraph(f"<b>* {tr('executive_summary', settings)}: {decision_tr}</b>", exec_summary_style)
+
+    # Create summary metrics table
+    color_status_str = "PASS" if color_score >= settings.color_score_threshold else ("CONDITIONAL" if color_score >= settings.color_score_threshold * 0.8 else "FAIL")
+    pattern_status_str = "PASS" if pattern_score >= settings.pattern_score_threshold else ("CONDITIONAL" if pattern_score >= settings.pattern_score_threshold * 0.8 else "FAIL")
+
+    # Build executive summary rows with RAW status codes for styling, and translated text for display.
+    # This avoids incorrect coloring/text when statuses are localized (e.g., BAŞARISIZ/KOŞULLU).
+    exec_rows = [
+        {"label": tr("color_score", settings), "score": f"{color_score:.1f}/100", "status_code": color_status_str},
+        {"label": tr("pattern_score", settings), "score": f"{pattern_score:.1f}/100", "status_code": pattern_status_str},
+    ]
+
+    # Add pattern repetition if enabled (keep near pattern score)
+    if settings.enable_pattern_repetition and cc_ref is not None:
+        exec_rows.append({
+            "label": tr("pattern_repetition", settings),
+            "score": f"{integrity_assessment['integrity_score']:.1f}%",
+            "status_code": pattern_rep_status
+        })
+
+    exec_rows += [
+        {"label": "ΔE2000 (" + tr("mean", settings) + ")", "score": fmt2(mean_de00_D65), "status_code": status_color},
+        {"label": tr("overall_score", settings), "score": f"{overall_score:.1f}/100", "status_code": decision},
+    ]
+
+    exec_data = [[tr("metric", settings), tr("score", settings), tr("status", settings)]]
+    exec_status_codes = [None]  # aligns with exec_data row indices
+    for row in exec_rows:
+        exec_data.append([row["label"], row["score"], translate_status(row["status_code"], settings.language)])
+        exec_status_codes.append(row["status_code"])
+
+    exec_table = Table(exec_data, colWidths=[2.2*inch, 1.5*inch, 1.5*inch])
+    exec_table_style = [
+        ("BACKGROUND", (0, 0), (-1, 0), NEUTRAL_L),
+        ("FONTNAME", (0, 0), (-1, 0), PDF_FONT_BOLD),
+        # Ensure all body cells use Unicode-capable fonts (fixes ı/ş rendering in this table)
+        ("FONTNAME", (0, 1), (-1, -1), PDF_FONT_REGULAR),
+        ("FONTNAME", (2, 1), (2, -1), PDF_FONT_BOLD),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.white),
+        ("TOPPADDING", (0, 0), (-1, -1), 4),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 4),
+    ]
+    # Color-code status column
+    for i in range(1, len(exec_data)):
+        status_code = (exec_status_codes[i] or "").upper()
+        if status_code in ("PASS", "ACCEPT") or status_code.startswith("ACCEPT"):
+            exec_table_style.append(("BACKGROUND", (2, i), (2, i), GREEN))
+            exec_table_style.append(("TEXTCOLOR", (2, i), (2, i), colors.white))
+        elif "CONDITIONAL" in status_code:
+            exec_table_style.append(("BACKGROUND", (2, i), (2, i), ORANGE))
+            exec_table_style.append(("TEXTCOLOR", (2, i), (2, i), colors.white))
+        elif status_code in ("FAIL", "REJECT") or status_code.startswith("REJECT"):
+            exec_table_style.append(("BACKGROUND", (2, i), (2, i), RED))
+            exec_table_style.append(("TEXTCOLOR", (2, i), (2, i), colors.white))
+
+    exec_table.setStyle(TableStyle(exec_table_style))
+
+    # Wrap in a colored box
+    summary_wrapper = Table([[exec_summary_header], [Spacer(1, 6)], [exec_table]],
+                           colWidths=[5.5*inch])
+    summary_wrapper.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, -1), dec_color_bg),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("TOPPADDING", (0, 0), (-1, -1), 10),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 10),
+        ("LEFTPADDING", (0, 0), (-1, -1), 10),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 10),
+    ]))
+
+    elements.append(summary_wrapper)
+    elements.append(Spacer(1, 20))
+    elements.append(PageBreak())
+
+    # ==== ANALYSIS SETTINGS ====
+    if settings.enable_analysis_settings:
+        settings_section = []
+        settings_section.append(Paragraph(f"<b>{tr('analysis_settings', settings)}</b>", StyleH1))
+        settings_section.append(Spacer(1, 6))
+        settings_section.append(Paragraph(tr("settings_used", settings), StyleBody))
+        settings_section.append(Spacer(1, 6))
+        settings_section.append(create_settings_summary_table(settings))
+        settings_section.append(Spacer(1, 10))
+        elements.append(KeepTogether(settings_section))
+        elements.append(PageBreak())  # Main unit starts on a new page
+
+    # ==== COLOR UNIT ====
+    if settings.enable_color_unit:
+        # Ensure Color Unit starts on new page if Analysis Settings was disabled
+        if not settings.enable_analysis_settings:
+            pass  # PageBreak already added after cover page
+        elements.append(Paragraph(f"<b>{tr('color_unit', settings)}</b>", StyleH1))
+        elements.append(Spacer(1, 6))
+
+        # A. Input Images Section (keep heading with images)
+        if settings.enable_color_input_images:
+            input_section = []
+            input_section.append(Paragraph(tr("input_images", settings), StyleH2))
+            img_row = [
+                [RLImage(overlay_ref_path, width=2.5*inch, height=2.0*inch),
+                 RLImage(overlay_test_path, width=2.5*inch, height=2.0*inch)]
+            ]
+            t_imgs = Table(img_row, colWidths=[2.7*inch, 2.7*inch])
+            input_section.append(t_imgs)
+            input_section.append(Spacer(1, 4))
+            input_section.append(make_table(
+                [[tr("filenames", settings),""],
+                 [tr("reference", settings), os.path.basename(ref_path)],
+                 [tr("sample", settings), os.path.basename(test_path)]],
+                colWidths=[1.2*inch, 4.8*inch]
+            ))
+            input_section.append(Spacer(1, 4))
+            # Regional analysis info
+            rad = 12
+            # Format centers with line breaks after every 6 entries to prevent overflow
+            centers_list = [f"({x},{y})" for (y,x) in pts]
+            centers_per_line = 6
+            if len(centers_list) > centers_per_line:
+                # Split into multiple lines
+                centers_lines = []
+                for i in range(0, len(centers_list), centers_per_line):
+                    centers_lines.append(", ".join(centers_list[i:i+centers_per_line]))
+                centers_formatted = Paragraph("<br/>".join(centers_lines), StyleSmall)
+            else:
+                # Single line - use plain text
+                centers_formatted = ", ".join(centers_list)
+            reg_info = [[tr("regional_analysis", settings), ""],
+                        [tr("mode", settings), tr("grid_mode_desc", settings)],
+                        [tr("circle_radius_px", settings), str(rad)],
+                        [tr("centers_xy", settings), centers_formatted]]
+            t_reg = make_table(reg_info, colWidths=[1.6*inch, 4.4*inch])
+            t_reg.setStyle(TableStyle([("SPAN",(0,0),(1,0)),
+                                       ("BACKGROUND",(0,0),(1,0), NEUTRAL_L),
+                                       ("FONTNAME",(0,0),(1,0),PDF_FONT_BOLD)]))
+            input_section.append(t_reg)
+            input_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(input_section))
+
+        # B. Color Measurements Section (REDESIGNED for better readability)
+        if settings.enable_color_measurements:
+            # Keep heading with first table
+            rgb_section = []
+            rgb_section.append(Paragraph(tr("color_measurements", settings), StyleH2))
+            rgb_section.append(Paragraph(tr("regional_analysis_desc", settings), StyleSmall))
+            rgb_section.append(Spacer(1, 4))
+
+            # REDESIGNED TABLE: Group by measurement type for better readability
+            # Define RGB background colors
+            light_red_bg = colors.HexColor("#FFE6E6")    # Light red for R columns
+            light_green_bg = colors.HexColor("#E6FFE6")  # Light green for G columns
+            light_blue_bg = colors.HexColor("#E6E6FF")   # Light blue for B columns
+
+            # Table 1: Position and RGB Values
+            rgb_section.append(Paragraph(f"<b>{tr('rgb_color_values', settings)}</b>", StyleBody))
+            ref_label = tr("reference", settings)[:3]  # Ref
+            test_label = tr("sample", settings)[:4]  # Test/Numu
+            rgb_cols = [tr("region", settings), tr("position", settings),
+                        f"{ref_label} R", f"{test_label} R", f"{ref_label} G", f"{test_label} G",
+                        f"{ref_label} B", f"{test_label} B"]
+            rgb_tbl = [rgb_cols]
+            for _,r in df_samples.iterrows():
+                row = [int(r["Region"]),
+                       f"({int(r['x'])}, {int(r['y'])})",
+                       int(r["Ref R"]), int(r["Test R"]),
+                       int(r["Ref G"]), int(r["Test G"]),
+                       int(r["Ref B"]), int(r["Test B"])]
+                rgb_tbl.append(row)
+
+            t_rgb = Table(rgb_tbl, colWidths=[0.6*inch, 0.9*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch])
+            rgb_style = [
+                ("BACKGROUND", (0, 0), (-1, 0), BLUE2),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("FONTNAME", (0, 0), (-1, 0), PDF_FONT_BOLD),
+                ("FONTSIZE", (0, 0), (-1, 0), 9),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("GRID", (0, 0), (-1, -1), 0.5, NEUTRAL_L),
+                ("FONTSIZE", (0, 1), (-1, -1), 8),
+                # Highlight comparison columns with RED, GREEN, BLUE backgrounds
+                ("BACKGROUND", (2, 1), (3, -1), light_red_bg),    # R columns - Red
+                ("BACKGROUND", (4, 1), (5, -1), light_green_bg),  # G columns - Green
+                ("BACKGROUND", (6, 1), (7, -1), light_blue_bg),   # B columns - Blue
+            ]
+            t_rgb.setStyle(TableStyle(rgb_style))
+            rgb_section.append(t_rgb)
+            rgb_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(rgb_section))
+
+            # Table 2: LAB Values (ALL COLUMNS REMAIN WHITE - No highlighting)
+            lab_section = []
+            lab_section.append(Paragraph(f"<b>{tr('lab_color_values', settings)}</b>", StyleBody))
+            lab_cols = [tr("region", settings), f"{ref_label} L*", f"{test_label} L*",
+                        f"{ref_label} a*", f"{test_label} a*", f"{ref_label} b*", f"{test_label} b*"]
+            lab_tbl = [lab_cols]
+            for _,r in df_samples.iterrows():
+                row = [int(r["Region"]),
+                       fmt2(r["Ref L*"]), fmt2(r["Test L*"]),
+                       fmt2(r["Ref a*"]), fmt2(r["Test a*"]),
+                       fmt2(r["Ref b*"]), fmt2(r["Test b*"])]
+                lab_tbl.append(row)
+            t_lab = Table(lab_tbl, colWidths=[0.6*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch])
+            lab_style = [
+                ("BACKGROUND", (0, 0), (-1, 0), BLUE2),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("FONTNAME", (0, 0), (-1, 0), PDF_FONT_BOLD),
+                ("FONTSIZE", (0, 0), (-1, 0), 9),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("GRID", (0, 0), (-1, -1), 0.5, NEUTRAL_L),
+                ("FONTSIZE", (0, 1), (-1, -1), 8),
+            ]
+            t_lab.setStyle(TableStyle(lab_style))
+            lab_section.append(t_lab)
+            lab_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(lab_section))
+
+            # Table 3: XYZ Tristimulus Values
+            xyz_section = []
+            xyz_section.append(Paragraph(f"<b>{tr('xyz_tristimulus', settings)}</b>", StyleBody))
+            xyz_cols = [tr("region", settings), f"{ref_label} X", f"{ref_label} Y", f"{ref_label} Z",
+                        f"{test_label} X", f"{test_label} Y", f"{test_label} Z"]
+            xyz_tbl = [xyz_cols]
+            for _,r in df_samples.iterrows():
+                row = [int(r["Region"]),
+                       fmt2(r["Ref X"]), fmt2(r["Ref Y"]), fmt2(r["Ref Z"]),
+                       fmt2(r["Test X"]), fmt2(r["Test Y"]), fmt2(r["Test Z"])]
+                xyz_tbl.append(row)
+            t_xyz = Table(xyz_tbl, colWidths=[0.6*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch, 0.8*inch])
+            xyz_style = [
+                ("BACKGROUND", (0, 0), (-1, 0), BLUE2),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("FONTNAME", (0, 0), (-1, 0), PDF_FONT_BOLD),
+                ("FONTSIZE", (0, 0), (-1, 0), 9),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("GRID", (0, 0), (-1, -1), 0.5, NEUTRAL_L),
+                ("FONTSIZE", (0, 1), (-1, -1), 8),
+            ]
+            t_xyz.setStyle(TableStyle(xyz_style))
+            xyz_section.append(t_xyz)
+            xyz_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(xyz_section))
+
+            # Table 4: CMYK Values
+            cmyk_section = []
+            cmyk_section.append(Paragraph(f"<b>{tr('cmyk_color_values', settings)}</b>", StyleBody))
+            cmyk_cols = [tr("region", settings), f"{ref_label} C%", f"{ref_label} M%", f"{ref_label} Y%", f"{ref_label} K%",
+                         f"{test_label} C%", f"{test_label} M%", f"{test_label} Y%", f"{test_label} K%"]
+            cmyk_tbl = [cmyk_cols]
+            for _,r in df_samples.iterrows():
+                row = [int(r["Region"]),
+                       fmt1(r["Ref C%"]), fmt1(r["Ref M%"]), fmt1(r["Ref Y%"]), fmt1(r["Ref K%"]),
+                       fmt1(r["Test C%"]), fmt1(r["Test M%"]), fmt1(r["Test Y%"]), fmt1(r["Test K%"])]
+                cmyk_tbl.append(row)
+            t_cmyk = Table(cmyk_tbl, colWidths=[0.5*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch])
+            cmyk_style = [
+                ("BACKGROUND", (0, 0), (-1, 0), BLUE2),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("FONTNAME", (0, 0), (-1, 0), PDF_FONT_BOLD),
+                ("FONTSIZE", (0, 0), (-1, 0), 8),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("GRID", (0, 0), (-1, -1), 0.5, NEUTRAL_L),
+                ("FONTSIZE", (0, 1), (-1, -1), 7),
+            ]
+            t_cmyk.setStyle(TableStyle(cmyk_style))
+            cmyk_section.append(t_cmyk)
+            cmyk_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(cmyk_section))
+
+            # Table 5: Color Difference (ΔE) Values
+            de_section = []
+            de_section.append(Paragraph(f"<b>{tr('color_difference_metrics', settings)}</b>", StyleBody))
+            de_cols = [tr("region", settings), "ΔE76", "ΔE94", "ΔE2000", tr("status", settings)]
+            de_tbl = [de_cols]
+            de_status_codes = [None]  # aligns with de_tbl row indices (header row at index 0)
+            for _,r in df_samples.iterrows():
+                de2000_val = r["ΔE2000"]
+                status_code = "PASS" if de2000_val < 2.0 else ("CONDITIONAL" if de2000_val <= 3.5 else "FAIL")
+                row = [int(r["Region"]),
+                       fmt2(r["ΔE76"]),
+                       fmt2(r["ΔE94"]),
+                       fmt2(r["ΔE2000"]),
+                       translate_status(status_code, settings.language)]
+                de_tbl.append(row)
+                de_status_codes.append(status_code)
+            t_de = Table(de_tbl, colWidths=[0.6*inch, 0.9*inch, 0.9*inch, 0.9*inch, 1.0*inch])
+            de_style = [
+                ("BACKGROUND", (0, 0), (-1, 0), BLUE2),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("FONTNAME", (0, 0), (-1, 0), PDF_FONT_BOLD),
+                # Ensure ALL body cells use Unicode-capable fonts (fixes Ş/ı squares inside tables)
+                ("FONTNAME", (0, 1), (-1, -1), PDF_FONT_REGULAR),
+                # Status column emphasized and guaranteed Unicode
+                ("FONTNAME", (4, 1), (4, -1), PDF_FONT_BOLD),
+                ("FONTSIZE", (0, 0), (-1, 0), 9),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+                ("GRID", (0, 0), (-1, -1), 0.5, NEUTRAL_L),
+                ("FONTSIZE", (0, 1), (-1, -1), 8),
+            ]
+            # Add color coding for status column
+            for i in range(1, len(de_tbl)):
+                status_code = (de_status_codes[i] or "").upper()
+                if status_code == "PASS":
+                    de_style.append(("BACKGROUND", (4, i), (4, i), GREEN))
+                    de_style.append(("TEXTCOLOR", (4, i), (4, i), colors.white))
+                elif status_code == "CONDITIONAL":
+                    de_style.append(("BACKGROUND", (4, i), (4, i), ORANGE))
+                    de_style.append(("TEXTCOLOR", (4, i), (4, i), colors.white))
+                else:  # FAIL
+                    de_style.append(("BACKGROUND", (4, i), (4, i), RED))
+                    de_style.append(("TEXTCOLOR", (4, i), (4, i), colors.white))
+            t_de.setStyle(TableStyle(de_style))
+            de_section.append(t_de)
+            de_section.append(Spacer(1, 6))
+            elements.append(KeepTogether(de_section))
+
+            # Add ΔE Summary directly after per-region table (consolidated)
+            th = settings.delta_e_threshold
+            de_overall_status = "PASS" if mean_de00_D65 < th else ("CONDITIONAL" if mean_de00_D65 <= settings.delta_e_conditional else "FAIL")
+            de_interpretation = (tr("not_perceptible", settings) if mean_de00_D65 < 1.0 else
+                                 tr("perceptible_close", settings) if mean_de00_D65 < 2.0 else
+                                 tr("perceptible_glance", settings) if mean_de00_D65 < 3.5 else
+                                 tr("clear_difference", settings) if mean_de00_D65 < 5.0 else
+                                 tr("more_different", settings))
+            de_summary_section = []
+            de_summary_section.append(Paragraph(f"<b>{tr('delta_e_summary', settings)}</b>", StyleBody))
+            de_summary = [[tr("metric", settings), tr("mean", settings), tr("std_dev", settings),
+                          tr("min", settings), tr("max", settings), tr("overall_status", settings)],
+                         ["ΔE76", fmt2(mean76), fmt2(std76), fmt2(min76), fmt2(max76), ""],
+                         ["ΔE94", fmt2(float(np.mean(de94_map))), fmt2(float(np.std(de94_map))),
+                          fmt2(float(np.min(de94_map))), fmt2(float(np.max(de94_map))), ""],
+                         ["ΔE2000", fmt2(mean_de00_D65), fmt2(float(np.std(de00_map))),
+                          fmt2(float(np.min(de00_map))), fmt2(float(np.max(de00_map))), translate_status(de_overall_status, settings.language)]]
+            t_de_summary = Table(de_summary, colWidths=[0.9*inch, 0.9*inch, 0.9*inch, 0.9*inch, 0.9*inch, 1.2*inch])
+            de_summary_style = [
+                ("BACKGROUND", (0, 0), (-1, 0), NEUTRAL_L),
+                ("FONTNAME", (0, 0), (-1, 0), PDF_FONT_BOLD),
+                # Ensure ALL body cells use Unicode-capable fonts (fixes Ş/ı squares here too)
+                ("FONTNAME", (0, 1), (-1, -1), PDF_FONT_REGULAR),
+                # Status column emphasized and guaranteed Unicode
+                ("FONTNAME", (5, 1), (5, -1), PDF_FONT_BOLD),
+                ("FONTSIZE", (0, 0), (-1, 0), 8),
+                ("FONTSIZE", (0, 1), (-1, -1), 7),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("GRID", (0, 0), (-1, -1), 0.5, NEUTRAL_L),
+            ]
+            # Color the status cell
+            if de_overall_status == "PASS":
+                de_summary_style.append(("BACKGROUND", (5, 3), (5, 3), GREEN))
+                de_summary_style.append(("TEXTCOLOR", (5, 3), (5, 3), colors.white))
+            elif de_overall_status == "CONDITIONAL":
+                de_summary_style.append(("BACKGROUND", (5, 3), (5, 3), ORANGE))
+                de_summary_style.append(("TEXTCOLOR", (5, 3), (5, 3), colors.white))
+            else:
+                de_summary_style.append(("BACKGROUND", (5, 3), (5, 3), RED))
+                de_summary_style.append(("TEXTCOLOR", (5, 3), (5, 3), colors.white))
+            t_de_summary.setStyle(TableStyle(de_summary_style))
+            de_summary_section.append(t_de_summary)
+            de_summary_section.append(Paragraph(f"<i>{tr('interpretation', settings)}: {de_interpretation}</i>", StyleSmall))
+            de_summary_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(de_summary_section))
+
+        # C. Color Difference (ΔE) Thresholds (only show if separate section enabled)
+        if settings.enable_color_difference and not settings.enable_color_measurements:
+            # Only show if measurements table is not shown (to avoid redundancy)
+            cd_section = []
+            cd_section.append(Paragraph("Color Difference (ΔE) Summary", StyleH2))
+            th = settings.delta_e_threshold
+            status = "PASS" if mean_de00_D65 < th else ("CONDITIONAL" if mean_de00_D65 <= settings.delta_e_conditional else "FAIL")
+            d_table = [["Metric","Value","Threshold","Status","Interpretation"],
+                       ["ΔE2000 (mean)", fmt2(mean_de00_D65), fmt2(th), status,
+                        ("Not perceptible" if mean_de00_D65 < 1.0 else
+                         "Perceptible (close observation)" if mean_de00_D65 < 2.0 else
+                         "Perceptible at a glance" if mean_de00_D65 < 3.5 else
+                         "Clear difference" if mean_de00_D65 < 5.0 else
+                         "More different than similar")]]
+            cd_section.append(make_table(d_table, colWidths=[1.4*inch,1.1*inch,1.1*inch,1.1*inch,2.0*inch]))
+            cd_section.append(Spacer(1,8))
+            elements.append(KeepTogether(cd_section))
+
+        # D. Statistical Analysis for RGB
+        if settings.enable_color_statistical:
+            stats_section = []
+            stats_section.append(Paragraph(tr("statistical_analysis_rgb", settings), StyleH2))
+            diff_rgb = (ref_small.astype(float) - test_small.astype(float))
+            stats = []
+            for i,ch in enumerate(["R","G","B"]):
+                d = diff_rgb[...,i].ravel()
+                stats.append([ch, fmt2(d.mean()), fmt2(d.std()), fmt2(d.max()), fmt2(d.min()),
+                              fmt2(np.sqrt((d**2).mean()))])
+            stats_tbl = [[tr("channel", settings), tr("mean_diff", settings), tr("std_dev", settings),
+                         tr("max_diff", settings), tr("min_diff", settings), tr("rmse", settings)]] + stats
+            stats_section.append(make_table(stats_tbl, colWidths=[1.0*inch,1.0*inch,1.0*inch,1.0*inch,1.0*inch,1.0*inch]))
+            stats_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(stats_section))
+
+            # D2. Color Quality Indices (moved from Pattern Unit)
+            quality_section = []
+            quality_section.append(Paragraph(tr("color_quality_indices", settings), StyleH2))
+            meta_status = "PASS" if metamerism_index < 2.0 else ("CONDITIONAL" if metamerism_index < 5.0 else "FAIL")
+            uni_status = "PASS" if uni_idx >= 85 else ("CONDITIONAL" if uni_idx >= 70 else "FAIL")
+            quality_indices = [[tr("index", settings), tr("value", settings), tr("status", settings), tr("interpretation", settings)],
+                              [tr("metamerism_index", settings), fmt2(metamerism_index), translate_status(meta_status, settings.language),
+                               tr("color_consistency_desc", settings)],
+                              [tr("uniformity_index", settings), fmt1(uni_idx)+"/100", translate_status(uni_status, settings.language),
+                               tr("spatial_consistency_desc", settings)]]
+            quality_section.append(make_table(quality_indices, colWidths=[1.5*inch, 1.0*inch, 1.0*inch, 2.8*inch]))
+            quality_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(quality_section))
+
+        # E. Spectral Analysis (proxy)
+        if settings.enable_color_spectral_proxy:
+            spectral_proxy_section = []
+            spectral_proxy_section.append(Paragraph(tr("spectral_analysis_proxy", settings), StyleH2))
+            spectral_proxy_section.append(Paragraph(tr("spectral_proxy_desc", settings), StyleSmall))
+            spectral_proxy_section.append(RLImage(spectral_path, width=5.3*inch, height=2.2*inch))
+            spectral_proxy_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(spectral_proxy_section))
+
+        # F. Visual Difference Analysis (Keep together)
+        if settings.enable_color_visual_diff:
+            visual_diff_elements = []
+            visual_diff_elements.append(Paragraph(tr("visual_diff_analysis", settings), StyleH2))
+            v_row = [
+                [Paragraph(tr("de2000_heatmap", settings), StyleSmall),
+                 Paragraph(tr("abs_diff_gray", settings), StyleSmall),
+                 Paragraph(tr("defect_mask_otsu", settings), StyleSmall)],
+                [RLImage(heatmap_path, width=2.7*inch, height=1.4*inch),
+                 RLImage(diff_img_path, width=1.8*inch, height=1.4*inch),
+                 RLImage(thr_img_path,  width=1.8*inch, height=1.4*inch)]
+            ]
+            t_v = Table(v_row, colWidths=[2.7*inch, 2.0*inch, 2.0*inch])
+            visual_diff_elements.append(t_v)
+            visual_diff_elements.append(Spacer(1, 10))
+            elements.append(KeepTogether(visual_diff_elements))
+
+        # Pre-compute Lab* differences (used by multiple sections below)
+        dL = float(lab_test_mean[0] - lab_ref_mean[0])
+        da = float(lab_test_mean[1] - lab_ref_mean[1])
+        db = float(lab_test_mean[2] - lab_ref_mean[2])
+        overall_mag = math.sqrt(dL**2 + da**2 + db**2)
+
+        # G. Detailed Lab Color Space Analysis
+        if settings.enable_color_lab_detailed:
+            lab_section = []
+            lab_section.append(Paragraph(tr("detailed_lab_analysis", settings), StyleH2))
+            lab_detail = [[tr("component", settings), tr("reference", settings), tr("sample", settings),
+                          tr("difference", settings), tr("interpretation", settings)],
+                          [f"L* ({tr('lightness', settings)})", fmt2(lab_ref_mean[0]), fmt2(lab_test_mean[0]), fmt2(dL),
+                           (tr("no_significant_change", settings) if abs(dL)<1.0 else (tr("lighter", settings) if dL>0 else tr("darker", settings)))],
+                          [f"a* ({tr('green_red', settings)})", fmt2(lab_ref_mean[1]), fmt2(lab_test_mean[1]), fmt2(da),
+                           (tr("no_significant_shift", settings) if abs(da)<1.0 else (tr("more_red", settings) if da>0 else tr("more_green", settings)))],
+                          [f"b* ({tr('blue_yellow', settings)})", fmt2(lab_ref_mean[2]), fmt2(lab_test_mean[2]), fmt2(db),
+                           (tr("no_significant_shift", settings) if abs(db)<1.0 else (tr("more_yellow", settings) if db>0 else tr("more_blue", settings)))]]
+            lab_section.append(make_table(lab_detail, colWidths=[1.6*inch,1.1*inch,1.1*inch,1.0*inch,2.3*inch]))
+            lab_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(lab_section))
+
+        # H. Visual Representation of Lab*
+        if settings.enable_color_lab_viz:
+            lab_viz_elements = []
+            lab_viz_elements.append(Paragraph(tr("lab_visualizations", settings), StyleH2))
+            lab_viz_elements.append(Paragraph(tr("lab_viz_desc", settings), StyleSmall))
+            lab_viz_elements.append(Spacer(1, 4))
+            lab_viz_elements.append(RLImage(ab_scatter_path, width=2.5*inch, height=2.5*inch))
+            lab_viz_elements.append(Spacer(1, 4))
+            lab_viz_elements.append(RLImage(lab_bars_path, width=4.5*inch, height=2*inch))
+            lab_viz_elements.append(Spacer(1, 8))
+            elements.append(KeepTogether(lab_viz_elements))
+
+        # I. Quality Assessment based on Lab*
+        if settings.enable_color_quality_assessment:
+            qa_section = []
+            qa_section.append(Paragraph(tr("quality_assessment_lab", settings), StyleH2))
+            qa = [[tr("parameter", settings), tr("threshold", settings), tr("actual", settings), tr("status", settings)],
+                  ["ΔL*", f"≤ {settings.lab_l_threshold}", fmt2(abs(dL)), translate_status("PASS" if abs(dL)<=settings.lab_l_threshold else "FAIL", settings.language)],
+                  ["Δa*", f"≤ {settings.lab_ab_threshold}", fmt2(abs(da)), translate_status("PASS" if abs(da)<=settings.lab_ab_threshold else "FAIL", settings.language)],
+                  ["Δb*", f"≤ {settings.lab_ab_threshold}", fmt2(abs(db)), translate_status("PASS" if abs(db)<=settings.lab_ab_threshold else "FAIL", settings.language)],
+                  [tr("overall_magnitude", settings), f"≤ {settings.lab_overall_threshold}", fmt2(overall_mag), translate_status("PASS" if overall_mag<=settings.lab_overall_threshold else "FAIL", settings.language)]]
+            qa_section.append(make_table(qa, colWidths=[1.8*inch,1.2*inch,1.2*inch,1.0*inch]))
+            qa_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(qa_section))
+
+        # J. Recommendations based on Lab*
+        if settings.enable_color_recommendations:
+            rec_section = []
+            rec_section.append(Paragraph(tr("recommendations_lab", settings), StyleH2))
+            recs = []
+            if abs(dL) > settings.lab_l_threshold:
+                recs.append((tr("lightness", settings), tr("lightness_rec", settings)))
+            if abs(da) > settings.lab_ab_threshold:
+                recs.append((tr("red_green_axis", settings), tr("red_green_rec", settings)))
+            if abs(db) > settings.lab_ab_threshold:
+                recs.append((tr("blue_yellow_axis", settings), tr("blue_yellow_rec", settings)))
+            if overall_mag > settings.lab_overall_threshold:
+                recs.append((tr("overall_score", settings), tr("overall_rec", settings)))
+            if not recs:
+                recs.append((tr("status", settings), tr("within_tolerance", settings)))
+            # Wrap Action column text if it exceeds 60 characters
+            rec_tbl = [[tr("parameter", settings), tr("action", settings)]] + [[param, wrap_text_cell(action, 60)] for param, action in recs]
+            rec_section.append(make_table(rec_tbl, colWidths=[1.8*inch, 4.0*inch]))
+            rec_section.append(Spacer(1, 12))
+            elements.append(KeepTogether(rec_section))
+
+        # K. Scoring & Status
+        if settings.enable_color_scoring:
+            pass  # Scoring section will be added after pattern analysis
+
+    # ==== PATTERN UNIT (starts on new page) ====
+    if settings.enable_pattern_unit:
+        elements.append(PageBreak())
+        elements.append(Paragraph(f"<b>{tr('pattern_unit', settings)}</b>", StyleH1))
+        elements.append(Spacer(1, 6))
+
+        if settings.enable_pattern_ssim:
+            pattern_metrics_section = []
+            pattern_metrics_section.append(Paragraph(tr("pattern_metrics", settings), StyleH2))
+            ssim_status = "PASS" if ssim_score>settings.ssim_pass_threshold else ("CONDITIONAL" if ssim_score>settings.ssim_conditional_threshold else "FAIL")
+            patt_tbl = [[tr("metric", settings), tr("value", settings), tr("status", settings)],
+                        [tr("ssim", settings), fmt1(ssim_score*100)+"%", translate_status(ssim_status, settings.language)]]
+            if settings.enable_pattern_symmetry:
+                patt_tbl.append([tr("symmetry", settings), fmt1(symmetry)+"%", ""])
+            if settings.enable_pattern_repeat:
+                patt_tbl.append([tr("repeat_px", settings), f"H:{px}  V:{py}", ""])
+            if settings.enable_pattern_edge:
+                patt_tbl.append([tr("edge_definition", settings), fmt1(edge_def)+"/100", ""])
+            patt_tbl.append([tr("defect_density", settings), fmt1(defect_density), ""])
+            # Note: Metamerism and Uniformity indices moved to Color Unit
+            pattern_metrics_section.append(make_table(patt_tbl, colWidths=[2.2*inch,1.6*inch,1.2*inch]))
+            pattern_metrics_section.append(Spacer(1, 8))
+            elements.append(KeepTogether(pattern_metrics_section))
+
+        # Histograms row (keep heading with images)
+        hist_section = []
+        hist_section.append(Paragraph(tr("histograms_rgb", settings), StyleH2))
+        hist_row = [[RLImage(hist_ref_path, width=3*inch, height=1.5*inch),
+                     RLImage(hist_test_path, width=3*inch, height=1.5*inch)]]
+        hist_section.append(Table(hist_row, colWidths=[3.2*inch,3.2*inch]))
+        hist_section.append(Spacer(1, 4))
+        # Histogram interpretation
+        hist_interp = f"<i>{tr('histogram_interpretation', settings)}</i>"
+        hist_section.append(Paragraph(hist_interp, StyleSmall))
+        hist_section.append(Spacer(1, 8))
+        elements.append(KeepTogether(hist_section))
+
+        # ==== ADVANCED TEXTURE ANALYSIS ====
+        if settings.enable_pattern_advanced:
+            elements.append(PageBreak())
+            elements.append(Paragraph(f"<b>{tr('advanced_texture_analysis', settings)}</b>", StyleH1))
+            elements.append(Spacer(1, 6))
+
+            # A. FFT / Fourier Domain (keep heading with image)
+            fft_section = []
+            fft_section.append(Paragraph(tr("fourier_domain_analysis", settings), StyleH2))
+            fft_section.append(Paragraph(tr("fourier_desc", settings), StyleSmall))
+            fft_section.append(RLImage(fft_spectrum_path, width=5*inch, height=3.2*inch))
+            fft_section.append(Spacer(1, 4))
+            # FFT Peaks Table
+            fft_peak_tbl = [[tr("peak", settings), tr("radius", settings), tr("angle", settings) + " (°)", tr("magnitude", settings)]]
+            for i, peak in enumerate(fft_test['peaks'][:5], start=1):
+                fft_peak_tbl.append([f"P{i}", fmt2(peak['radius']), fmt2(peak['angle']), fmt2(peak['magnitude'])])
+            fft_section.append(make_table(fft_peak_tbl, colWidths=[1.0*inch, 1.5*inch, 1.5*inch, 1.5*inch]))
+            fft_section.append(Spacer(1, 4))
+            # FFT Metrics
+            fft_metrics_tbl = [[tr("metric", settings), tr("reference", settings), tr("sample", settings)],
+                               [tr("fundamental_period", settings), fmt2(fft_ref['fundamental_period']), fmt2(fft_test['fundamental_period'])],
+                               [tr("dominant_orientation", settings), fmt2(fft_ref['fundamental_orientation']), fmt2(fft_test['fundamental_orientation'])],
+                               [tr("anisotropy_ratio", settings), fmt2(fft_ref['anisotropy']), fmt2(fft_test['anisotropy'])]]
+            fft_section.append(make_table(fft_metrics_tbl, colWidths=[2.5*inch, 1.5*inch, 1.5*inch]))
+            fft_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(fft_section))
+
+            # B. Gabor Filter Bank
+            gabor_section = []
+            gabor_section.append(Paragraph(tr("gabor_analysis", settings), StyleH2))
+            gabor_section.append(Paragraph(tr("gabor_desc", settings), StyleSmall))
+            gabor_section.append(RLImage(gabor_montage_path, width=6.5*inch, height=2.8*inch))
+            gabor_section.append(Spacer(1, 4))
+            gabor_section.append(RLImage(gabor_orient_path, width=4.5*inch, height=2.8*inch))
+            gabor_section.append(Spacer(1, 4))
+            # Gabor Statistics
+            gabor_stats_tbl = [[tr("metric", settings), tr("reference", settings), tr("sample", settings), "Δ"]]
+            gabor_stats_tbl.append([tr("dominant_orientation", settings), fmt2(gabor_ref['dominant_orientation']),
+                                    fmt2(gabor_test['dominant_orientation']),
+                                    fmt2(abs(gabor_ref['dominant_orientation'] - gabor_test['dominant_orientation']))])
+            gabor_stats_tbl.append([tr("coherency", settings), fmt2(gabor_ref['coherency']), fmt2(gabor_test['coherency']),
+                                    fmt2(abs(gabor_ref['coherency'] - gabor_test['coherency']))])
+            gabor_section.append(make_table(gabor_stats_tbl, colWidths=[2.0*inch, 1.5*inch, 1.5*inch, 1.0*inch]))
+            gabor_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(gabor_section))
+
+            # C. GLCM / Haralick Features
+            glcm_section = []
+            glcm_section.append(Paragraph(tr("glcm_features", settings), StyleH2))
+            glcm_section.append(Paragraph(tr("glcm_desc", settings), StyleSmall))
+            glcm_section.append(RLImage(glcm_radar_path, width=4.5*inch, height=4.5*inch))
+            glcm_section.append(Spacer(1, 4))
+            # GLCM Summary Table with Z-scores
+            glcm_summary = [[tr("feature", settings), tr("reference", settings), tr("sample", settings),
+                            "Δ", tr("z_score", settings), tr("interp", settings)]]
+            for feat in glcm_ref.keys():
+                delta = abs(glcm_ref[feat] - glcm_test[feat])
+                z = glcm_zscores[feat]
+                # Interpretation based on z-score
+                if abs(z) < 2:
+                    z_interp = tr("similar", settings)
+                elif abs(z) < 3:
+                    z_interp = tr("moderate", settings)
+                else:
+                    z_interp = tr("significant", settings)
+                glcm_summary.append([feat.capitalize(), fmt2(glcm_ref[feat]), fmt2(glcm_test[feat]),
+                                    fmt2(delta), fmt2(z), z_interp])
+            glcm_section.append(make_table(glcm_summary, colWidths=[1.0*inch, 1.0*inch, 1.0*inch, 0.7*inch, 0.8*inch, 1.0*inch]))
+            glcm_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(glcm_section))
+
+            # D. LBP (Local Binary Patterns)
+            lbp_section = []
+            lbp_section.append(Paragraph(tr("lbp_analysis", settings), StyleH2))
+            lbp_section.append(Paragraph(tr("lbp_desc", settings), StyleSmall))
+            lbp_section.append(RLImage(lbp_map_hist_path, width=6.5*inch, height=2.8*inch))
+            lbp_section.append(Spacer(1, 4))
+            # LBP Similarity Metrics
+            lbp_sim_tbl = [[tr("metric", settings), tr("value", settings), tr("interpretation", settings)],
+                           [tr("chi2_distance", settings), fmt2(lbp_chi2), tr("lower_more_similar", settings)],
+                           [tr("bhattacharyya_distance", settings), fmt2(lbp_bhatt), tr("lower_more_similar", settings)]]
+            lbp_section.append(make_table(lbp_sim_tbl, colWidths=[2.5*inch, 1.5*inch, 2.0*inch]))
+            lbp_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(lbp_section))
+
+            # E. Wavelet Multiresolution
+            wavelet_section = []
+            wavelet_section.append(Paragraph(tr("wavelet_decomposition", settings), StyleH2))
+            wavelet_section.append(Paragraph(tr("wavelet_desc", settings, wavelet=settings.wavelet_type, levels=settings.wavelet_levels), StyleSmall))
+            wavelet_section.append(RLImage(wavelet_energy_path, width=6*inch, height=4*inch))
+            wavelet_section.append(Spacer(1, 4))
+            # Wavelet Energy Table
+            wavelet_tbl = [[tr("level", settings), tr("band", settings), tr("ref_energy", settings), tr("sample_energy", settings), tr("ratio", settings)]]
+            for i, (e_ref, e_test) in enumerate(zip(wavelet_ref['energies'], wavelet_test['energies'])):
+                for band in ['LH', 'HL', 'HH']:
+                    ratio = e_test[band] / (e_ref[band] + 1e-8)
+                    wavelet_tbl.append([str(e_ref['level']), band, f"{e_ref[band]:.1e}", f"{e_test[band]:.1e}", fmt2(ratio)])
+            wavelet_section.append(make_table(wavelet_tbl, colWidths=[0.8*inch, 0.8*inch, 1.5*inch, 1.5*inch, 1.0*inch]))
+            wavelet_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(wavelet_section))
+
+            # F. Structure Tensor & Coherency
+            struct_section = []
+            struct_section.append(Paragraph(tr("structure_tensor", settings), StyleH2))
+            struct_coherency_tbl = [[tr("metric", settings), tr("reference", settings), tr("sample", settings)],
+                                    [tr("mean_coherency", settings), fmt2(struct_ref['mean_coherency']), fmt2(struct_test['mean_coherency'])],
+                                    [tr("hog_edge_density", settings), fmt2(hog_ref['edge_density']), fmt2(hog_test['edge_density'])]]
+            struct_section.append(make_table(struct_coherency_tbl, colWidths=[2.5*inch, 1.5*inch, 1.5*inch]))
+            struct_section.append(Spacer(1, 4))
+            # Line-Angle Histogram
+            if len(struct_test['orientation_degrees']) > 0:
+                struct_section.append(Paragraph(tr("line_angle_distribution", settings), StyleSmall))
+                struct_section.append(RLImage(line_angle_hist_path, width=5*inch, height=2.8*inch))
+            struct_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(struct_section))
+
+            # G. Defect Detection & Saliency
+            defect_section = []
+            defect_section.append(Paragraph(tr("defect_detection", settings), StyleH2))
+            defect_section.append(Paragraph(tr("defect_desc", settings), StyleSmall))
+            defect_section.append(RLImage(defect_saliency_path, width=6*inch, height=2.8*inch))
+            defect_section.append(Spacer(1, 4))
+            # Defect Catalog
+            if defects_analysis['defects']:
+                defect_catalog = [[tr("id", settings), tr("type", settings), tr("area_px", settings), tr("bounding_box", settings)]]
+                for i, defect in enumerate(defects_analysis['defects'][:15], start=1):  # Limit to 15
+                    bbox_str = f"({defect['bbox'][0]},{defect['bbox'][1]},{defect['bbox'][2]},{defect['bbox'][3]})"
+                    defect_catalog.append([str(i), defect['type'], str(defect['area']), bbox_str])
+                defect_section.append(make_table(defect_catalog, colWidths=[0.5*inch, 1.5*inch, 1.5*inch, 2.5*inch]))
+                defect_section.append(Paragraph(f"{tr('total_defects', settings)} {defects_analysis['defect_count']}", StyleSmall))
+            else:
+                defect_section.append(Paragraph(tr("no_defects", settings), StyleBody))
+            defect_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(defect_section))
+
+    # ==== PATTERN REPETITION UNIT (New Page) ====
+    if settings.enable_pattern_repetition and cc_ref is not None:
+        elements.append(PageBreak())
+        elements.append(Paragraph(f"<b>{tr('pattern_repetition_unit', settings)}</b>", StyleH1))
+        elements.append(Paragraph(tr("pattern_repetition_desc", settings), StyleSmall))
+        elements.append(Spacer(1, 8))
+
+        # A. Pattern Detection Summary
+        if settings.enable_pattern_rep_summary:
+            summary_section = []
+            summary_section.append(Paragraph(tr("pattern_detection_summary", settings), StyleH2))
+            # Status determination
+            count_diff = abs(cc_ref['count'] - cc_test['count'])
+            count_status = pattern_rep_status
+            # Calculate spacing uniformity status
+            spacing_status = "PASS" if spatial_test['uniformity_score'] >= 85 else ("CONDITIONAL" if spatial_test['uniformity_score'] >= 70 else "FAIL")
+            summary_table = [[tr("metric", settings), tr("reference", settings), tr("sample", settings), "Δ", tr("status", settings)]]
+            summary_table.append([tr("total_pattern_count", settings), str(cc_ref['count']), str(cc_test['count']),
+                                f"{count_diff:+d}", translate_status(count_status, settings.language)])
+            summary_table.append([tr("mean_pattern_area", settings), fmt2(cc_ref['mean_area']), fmt2(cc_test['mean_area']),
+                                fmt2(cc_test['mean_area'] - cc_ref['mean_area']), ""])
+            summary_table.append([tr("pattern_size_cv", settings), fmt2(cc_ref['cv_area']), fmt2(cc_test['cv_area']),
+                                f"{cc_test['cv_area'] - cc_ref['cv_area']:+.1f}%", ""])
+            summary_table.append([tr("spacing_uniformity", settings), fmt2(spatial_ref['uniformity_score']),
+                                fmt2(spatial_test['uniformity_score']),
+                                fmt2(spatial_test['uniformity_score'] - spatial_ref['uniformity_score']), translate_status(spacing_status, settings.language)])
+            summary_table.append([tr("pattern_integrity", settings), "100.0", fmt2(integrity_assessment['integrity_score']),
+                                fmt2(integrity_assessment['integrity_score'] - 100), ""])
+            summary_section.append(make_table(summary_table, colWidths=[2.0*inch, 1.2*inch, 1.2*inch, 0.8*inch, 1.0*inch]))
+            summary_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(summary_section))
+
+        # B. Pattern Count Analysis
+        if settings.enable_pattern_rep_count:
+            count_section = []
+            count_section.append(Paragraph(tr("pattern_count_analysis", settings), StyleH2))
+            count_section.append(Paragraph(tr("pattern_count_desc", settings), StyleSmall))
+            count_section.append(Spacer(1, 4))
+            # Side-by-side detection maps
+            detection_row = [[RLImage(pattern_detection_ref_path, width=3*inch, height=2.2*inch),
+                            RLImage(pattern_detection_test_path, width=3*inch, height=2.2*inch)]]
+            count_section.append(Table(detection_row, colWidths=[3.2*inch, 3.2*inch]))
+            count_section.append(Spacer(1, 4))
+            # Count comparison chart
+            count_section.append(RLImage(pattern_count_path, width=5*inch, height=3.2*inch))
+            count_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(count_section))
+
+        # C. Blob Detection Results
+        if settings.enable_pattern_rep_blob:
+            blob_section = []
+            blob_section.append(Paragraph(tr("blob_detection", settings), StyleH2))
+            blob_section.append(Paragraph(tr("blob_desc", settings), StyleSmall))
+            blob_section.append(Spacer(1, 4))
+            # Blob statistics table
+            blob_stats = [[tr("metric", settings), tr("reference", settings), tr("sample", settings)]]
+            blob_stats.append([tr("blob_count", settings), str(blob_ref['count']) if blob_ref else "0",
+                             str(blob_test['count']) if blob_test else "0"])
+            if blob_ref and blob_test and blob_ref['count'] > 0 and blob_test['count'] > 0:
+                blob_stats.append([tr("mean_area", settings), fmt2(blob_ref['mean_area']), fmt2(blob_test['mean_area'])])
+                blob_stats.append([tr("area_cv", settings), fmt2(blob_ref['cv_area']), fmt2(blob_test['cv_area'])])
+                blob_stats.append([tr("mean_size", settings), fmt2(blob_ref['mean_size']), fmt2(blob_test['mean_size'])])
+            blob_section.append(make_table(blob_stats, colWidths=[2.0*inch, 2.0*inch, 2.0*inch]))
+            blob_section.append(Spacer(1, 4))
+            # Blob detection visualizations (if available)
+            if blob_ref and blob_test and blob_ref['keypoints'] and blob_test['keypoints']:
+                blob_row = [[RLImage(blob_detection_ref_path, width=3*inch, height=2.2*inch),
+                           RLImage(blob_detection_test_path, width=3*inch, height=2.2*inch)]]
+                blob_section.append(Table(blob_row, colWidths=[3.2*inch, 3.2*inch]))
+            blob_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(blob_section))
+
+        # D. Keypoint Matching Analysis
+        if settings.enable_pattern_rep_keypoint and keypoint_matching:
+            kp_section = []
+            kp_section.append(Paragraph(tr("keypoint_matching", settings), StyleH2))
+            kp_section.append(Paragraph(tr("keypoint_desc", settings, detector=settings.keypoint_detector), StyleSmall))
+            kp_section.append(Spacer(1, 4))
+            # Keypoint statistics
+            kp_stats = [[tr("metric", settings), tr("value", settings)]]
+            kp_stats.append([tr("detector_type", settings), settings.keypoint_detector])
+            kp_stats.append([tr("keypoints_ref", settings), str(len(keypoint_matching['keypoints_ref']))])
+            kp_stats.append([tr("keypoints_sample", settings), str(len(keypoint_matching['keypoints_test']))])
+            kp_stats.append([tr("good_matches", settings), str(keypoint_matching['match_count'])])
+            kp_stats.append([tr("match_ratio", settings), fmt2(keypoint_matching['match_ratio'] * 100) + "%"])
+            kp_stats.append([tr("matching_score", settings), fmt2(keypoint_matching['matching_score']) + "%"])
+            kp_stats.append([tr("inliers_ransac", settings), str(keypoint_matching['inliers'])])
+            kp_section.append(make_table(kp_stats, colWidths=[2.5*inch, 3.0*inch]))
+            kp_section.append(Spacer(1, 4))
+            # Keypoint matching visualization
+            if keypoint_matching['keypoints_ref'] and keypoint_matching['keypoints_test']:
+                kp_section.append(RLImage(keypoint_matching_path, width=6*inch, height=3*inch))
+            kp_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(kp_section))
+
+        # E. Auto-correlation Analysis
+        if settings.enable_pattern_rep_autocorr and autocorr_test:
+            autocorr_section = []
+            autocorr_section.append(Paragraph(tr("autocorrelation_analysis", settings), StyleH2))
+            autocorr_section.append(Paragraph(tr("autocorr_desc", settings), StyleSmall))
+            autocorr_section.append(Spacer(1, 4))
+            # Auto-correlation metrics
+            autocorr_table = [[tr("metric", settings), tr("reference", settings), tr("sample", settings)]]
+            autocorr_table.append([tr("periodicity_score", settings), fmt2(autocorr_ref['periodicity_score']),
+                                 fmt2(autocorr_test['periodicity_score'])])
+            autocorr_table.append([tr("pattern_spacing", settings), fmt2(autocorr_ref['pattern_spacing']),
+                                 fmt2(autocorr_test['pattern_spacing'])])
+            autocorr_table.append([tr("regularity_score", settings), fmt2(autocorr_ref['regularity_score']),
+                                 fmt2(autocorr_test['regularity_score'])])
+            autocorr_table.append([tr("detected_peaks", settings), str(len(autocorr_ref['peaks'])),
+                                 str(len(autocorr_test['peaks']))])
+            autocorr_section.append(make_table(autocorr_table, colWidths=[2.5*inch, 1.5*inch, 1.5*inch]))
+            autocorr_section.append(Spacer(1, 4))
+            # Auto-correlation surface plot
+            autocorr_section.append(RLImage(autocorr_surface_path, width=5.5*inch, height=4*inch))
+            autocorr_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(autocorr_section))
+
+        # F. Spatial Distribution Analysis
+        if settings.enable_pattern_rep_spatial and spatial_test:
+            spatial_section = []
+            spatial_section.append(Paragraph(tr("spatial_distribution", settings), StyleH2))
+            spatial_section.append(Paragraph(tr("spatial_desc", settings, cell_size=settings.grid_cell_size), StyleSmall))
+            spatial_section.append(Spacer(1, 4))
+
+            # Spatial metrics
+            spatial_metrics = [[tr("metric", settings), tr("reference", settings), tr("sample", settings)]]
+            spatial_metrics.append([tr("grid_size", settings), f"{spatial_ref['n_rows']} × {spatial_ref['n_cols']}",
+                                  f"{spatial_test['n_rows']} × {spatial_test['n_cols']}"])
+            spatial_metrics.append([tr("mean_density", settings), fmt2(spatial_ref['mean_density']),
+                                  fmt2(spatial_test['mean_density'])])
+            spatial_metrics.append([tr("density_std", settings), fmt2(spatial_ref['std_density']),
+                                  fmt2(spatial_test['std_density'])])
+            spatial_metrics.append([tr("density_cv", settings), fmt2(spatial_ref['cv_density']),
+                                  fmt2(spatial_test['cv_density'])])
+            spatial_metrics.append([tr("uniformity_score", settings), fmt2(spatial_ref['uniformity_score']),
+                                  fmt2(spatial_test['uniformity_score'])])
+            spatial_section.append(make_table(spatial_metrics, colWidths=[2.0*inch, 2.0*inch, 2.0*inch]))
+            spatial_section.append(Spacer(1, 4))
+            # Density heatmaps
+            density_row = [[RLImage(pattern_density_ref_path, width=2.8*inch, height=2.2*inch),
+                          RLImage(pattern_density_test_path, width=2.8*inch, height=2.2*inch)]]
+            spatial_section.append(Table(density_row, colWidths=[3*inch, 3*inch]))
+            spatial_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(spatial_section))
+
+        # G. Pattern Integrity Assessment
+        if settings.enable_pattern_rep_integrity and integrity_assessment:
+            integrity_section = []
+            integrity_section.append(Paragraph(tr("pattern_integrity_assessment", settings), StyleH2))
+            integrity_section.append(Paragraph(tr("integrity_desc", settings), StyleSmall))
+            integrity_section.append(Spacer(1, 4))
+            # Integrity scores
+            integrity_table = [[tr("metric", settings), tr("score", settings) + " (%)", tr("status", settings)]]
+            size_status = "PASS" if integrity_assessment['size_similarity'] >= 85 else ("CONDITIONAL" if integrity_assessment['size_similarity'] >= 70 else "FAIL")
+            shape_status = "PASS" if integrity_assessment['shape_similarity'] >= 85 else ("CONDITIONAL" if integrity_assessment['shape_similarity'] >= 70 else "FAIL")
+            spatial_status = "PASS" if integrity_assessment['spatial_similarity'] >= 85 else ("CONDITIONAL" if integrity_assessment['spatial_similarity'] >= 70 else "FAIL")
+            overall_status = "PASS" if integrity_assessment['integrity_score'] >= 85 else ("CONDITIONAL" if integrity_assessment['integrity_score'] >= 70 else "FAIL")
+            integrity_table.append([tr("size_similarity", settings), fmt2(integrity_assessment['size_similarity']), translate_status(size_status, settings.language)])
+            integrity_table.append([tr("shape_similarity", settings), fmt2(integrity_assessment['shape_similarity']), translate_status(shape_status, settings.language)])
+            integrity_table.append([tr("spatial_similarity", settings), fmt2(integrity_assessment['spatial_similarity']), translate_status(spatial_status, settings.language)])
+            integrity_table.append([tr("overall_integrity", settings), fmt2(integrity_assessment['integrity_score']), translate_status(overall_status, settings.language)])
+            integrity_section.append(make_table(integrity_table, colWidths=[2.5*inch, 1.5*inch, 1.5*inch]))
+            integrity_section.append(Spacer(1, 4))
+            # Integrity radar chart
+            integrity_section.append(RLImage(pattern_integrity_path, width=4.5*inch, height=4.5*inch))
+            integrity_section.append(Spacer(1, 4))
+            # Pattern size distribution
+            if pattern_size_dist_path:
+                integrity_section.append(RLImage(pattern_size_dist_path, width=5*inch, height=3*inch))
+            integrity_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(integrity_section))
+
+        # H. Missing/Extra Patterns Catalog
+        if settings.enable_pattern_rep_catalog and missing_extra:
+            catalog_section = []
+            catalog_section.append(Paragraph(tr("missing_extra_catalog", settings), StyleH2))
+            catalog_section.append(Spacer(1, 4))
+            # Missing/extra patterns overlay
+            catalog_section.append(RLImage(missing_extra_path, width=5*inch, height=3.5*inch))
+            catalog_section.append(Spacer(1, 4))
+            elements.append(KeepTogether(catalog_section))
+
+            # Missing patterns table
+            if missing_extra['missing_patterns']:
+                missing_section = []
+                missing_section.append(Paragraph(f"<b>{tr('missing_patterns', settings)} ({missing_extra['missing_count']})</b>", StyleBody))
+                missing_section.append(Spacer(1, 4))
+                missing_table = [[tr("id", settings), tr("location", settings), tr("expected_size", settings), tr("severity", settings)]]
+                for i, pattern in enumerate(missing_extra['missing_patterns'][:15], start=1):  # Limit to 15
+                    loc_str = f"({pattern['location'][0]}, {pattern['location'][1]})"
+                    missing_table.append([str(i), loc_str, f"~{int(pattern['expected_area'])}", pattern['severity']])
+                missing_section.append(make_table(missing_table, colWidths=[0.5*inch, 1.5*inch, 1.8*inch, 1.0*inch]))
+                if missing_extra['missing_count'] > 15:
+                    missing_section.append(Paragraph(tr("and_more_missing", settings, count=missing_extra['missing_count'] - 15), StyleSmall))
+                missing_section.append(Spacer(1, 6))
+                elements.append(KeepTogether(missing_section))
+            else:
+                elements.append(Paragraph(f"<b>{tr('no_missing', settings)}</b>", StyleBody))
+                elements.append(Spacer(1, 6))
+
+            # Extra patterns table
+            if missing_extra['extra_patterns']:
+                extra_section = []
+                extra_section.append(Paragraph(f"<b>{tr('extra_patterns', settings)} ({missing_extra['extra_count']})</b>", StyleBody))
+                extra_section.append(Spacer(1, 4))
+                extra_table = [[tr("id", settings), tr("location", settings), tr("area_px", settings), tr("severity", settings)]]
+                for i, pattern in enumerate(missing_extra['extra_patterns'][:15], start=1):  # Limit to 15
+                    loc_str = f"({pattern['location'][0]}, {pattern['location'][1]})"
+                    extra_table.append([str(i), loc_str, str(int(pattern['area'])), pattern['severity']])
+                extra_section.append(make_table(extra_table, colWidths=[0.5*inch, 1.5*inch, 1.8*inch, 1.0*inch]))
+                if missing_extra['extra_count'] > 15:
+                    extra_section.append(Paragraph(tr("and_more_extra", settings, count=missing_extra['extra_count'] - 15), StyleSmall))
+                extra_section.append(Spacer(1, 6))
+                elements.append(KeepTogether(extra_section))
+            else:
+                elements.append(Paragraph(f"<b>{tr('no_extra', settings)}</b>", StyleBody))
+                elements.append(Spacer(1, 6))
+
+            # Recommendations
+            rep_rec_section = []
+            rep_rec_section.append(Paragraph(tr("pattern_recommendations", settings), StyleH2))
+            recs = []
+            if count_diff > settings.pattern_count_tolerance * 2:
+                recs.append((tr("count_mismatch", settings), tr("count_mismatch_rec", settings)))
+            elif count_diff > settings.pattern_count_tolerance:
+                recs.append((tr("count_variation", settings), tr("count_variation_rec", settings)))
+            if spatial_test['uniformity_score'] < 70:
+                recs.append((tr("poor_uniformity", settings), tr("poor_uniformity_rec", settings)))
+            if integrity_assessment['integrity_score'] < 80:
+                recs.append((tr("integrity_issues", settings), tr("integrity_issues_rec", settings)))
+            if not recs:
+                recs.append((tr("status", settings), tr("pattern_ok", settings)))
+            # Wrap Action column text if it exceeds 60 characters
+            rec_tbl = [[tr("parameter", settings), tr("action", settings)]] + [[param, wrap_text_cell(action, 60)] for param, action in recs]
+            rep_rec_section.append(make_table(rec_tbl, colWidths=[2.0*inch, 4.0*inch]))
+            rep_rec_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(rep_rec_section))
+
+    # ==== SPECTROPHOTOMETER-LIKE COLOR MODULE (New Page) ====
+    if settings.enable_spectrophotometer:
+        elements.append(PageBreak())
+        elements.append(Paragraph(f"<b>{tr('spectrophotometer_sim', settings)}</b>", StyleH1))
+        elements.append(Spacer(1, 6))
+
+        # Instrument Metadata
+        if settings.enable_spectro_config:
+            config_section = []
+            config_section.append(Paragraph(tr("instrument_config", settings), StyleH2))
+            inst_meta = [[tr("parameter", settings), tr("value", settings)],
+                         [tr("observer_angle", settings), f"{settings.observer_angle}°"],
+                         [tr("geometry_mode", settings), settings.geometry_mode],
+                         [tr("illuminant_primary", settings), "D65"],
+                         [tr("uv_control", settings), settings.uv_control_note]]
+            config_section.append(make_table(inst_meta, colWidths=[2.5*inch, 3.5*inch]))
+            config_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(config_section))
+
+        # Enhanced Color Difference Suite
+        if settings.enable_spectro_color_diff_methods:
+            color_diff_section = []
+            color_diff_section.append(Paragraph(tr("color_diff_methods", settings), StyleH2))
+            color_diff_suite = [[tr("method", settings), tr("mean", settings) + " ΔE", tr("status", settings)]]
+            color_diff_suite.append(["ΔE76 (CIE 1976)", fmt2(mean76), translate_status(status_color, settings.language)])
+            color_diff_suite.append(["ΔE94 (CIE 1994)", fmt2(float(np.mean(de94_map))), translate_status(status_color, settings.language)])
+            # Determine ΔE2000 status explicitly (avoid relying on unrelated/local variables)
+            de2000_status = determine_status(
+                mean_de00_D65,
+                settings.delta_e_threshold,
+                settings.delta_e_conditional,
+                lower_is_better=True
+            )
+            color_diff_suite.append(["ΔE2000 (CIEDE2000)", fmt2(mean_de00_D65), translate_status(de2000_status, settings.language)])
+            if settings.use_delta_e_cmc:
+                cmc_status = "PASS" if mean_de_cmc < settings.delta_e_threshold else ("CONDITIONAL" if mean_de_cmc <= settings.delta_e_conditional else "FAIL")
+                color_diff_suite.append([f"ΔE CMC ({settings.cmc_l_c_ratio})", fmt2(mean_de_cmc), translate_status(cmc_status, settings.language)])
+            color_diff_section.append(make_table(color_diff_suite, colWidths=[2.5*inch, 1.5*inch, 1.5*inch]))
+            color_diff_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(color_diff_section))
+
+        # Whiteness & Yellowness Indices
+        if settings.enable_spectro_whiteness:
+            wy_section = []
+            wy_section.append(Paragraph(tr("whiteness_yellowness", settings), StyleH2))
+            wy_tbl = [[tr("index", settings), tr("reference", settings), tr("sample", settings), tr("threshold", settings), tr("status", settings)]]
+            w_status = "PASS" if whiteness_test >= settings.whiteness_min else "FAIL"
+            y_status = "PASS" if yi_test <= settings.yellowness_max else "FAIL"
+            wy_tbl.append([tr("cie_whiteness", settings), fmt2(whiteness_ref), fmt2(whiteness_test), f"≥ {settings.whiteness_min}", translate_status(w_status, settings.language)])
+            wy_tbl.append([tr("cie_tint", settings), fmt2(tint_ref), fmt2(tint_test), "—", "—"])
+            wy_tbl.append([tr("yellowness_index", settings), fmt2(yi_ref), fmt2(yi_test), f"≤ {settings.yellowness_max}", translate_status(y_status, settings.language)])
+            wy_section.append(make_table(wy_tbl, colWidths=[2.2*inch, 1.2*inch, 1.2*inch, 1.0*inch, 0.8*inch]))
+            wy_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(wy_section))
+
+        # Metamerism Analysis
+        if settings.enable_spectro_metamerism:
+            meta_section = []
+            meta_section.append(Paragraph(tr("metamerism_analysis", settings), StyleH2))
+            meta_section.append(Paragraph(tr("metamerism_desc", settings), StyleSmall))
+            if metamerism_results:
+                meta_section.append(RLImage(metamerism_plot_path, width=5*inch, height=3.2*inch))
+                meta_section.append(Spacer(1, 4))
+                # Illuminant ΔE Table
+                meta_tbl = [[tr("illuminant", settings), "ΔE2000", tr("status", settings)]]
+                for m in metamerism_results:
+                    m_status = "PASS" if m['delta_e'] < 2.0 else ("CONDITIONAL" if m['delta_e'] < 3.5 else "FAIL")
+                    meta_tbl.append([m['illuminant'], fmt2(m['delta_e']), translate_status(m_status, settings.language)])
+                meta_section.append(make_table(meta_tbl, colWidths=[2.0*inch, 1.5*inch, 1.5*inch]))
+                if worst_metamerism:
+                    meta_section.append(Spacer(1, 4))
+                    meta_section.append(Paragraph(f"<b>{tr('worst_metamerism', settings)}</b> {worst_metamerism['illuminant']} (ΔE = {fmt2(worst_metamerism['delta_e'])})", StyleBody))
+            meta_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(meta_section))
+
+        # True Spectral Data Analysis (if available)
+        if settings.enable_spectro_spectral_data and spectral_data_available:
+            spectral_section = []
+            spectral_section.append(Paragraph(tr("spectral_reflectance", settings), StyleH2))
+            spectral_section.append(Paragraph(tr("spectral_data_desc", settings, ref=settings.spectral_ref_path, sample=settings.spectral_sample_path), StyleSmall))
+            spectral_section.append(RLImage(spectral_curve_path, width=6*inch, height=4*inch))
+            spectral_section.append(Spacer(1, 6))
+            elements.append(KeepTogether(spectral_section))
+
+            # Spectral Peak/Valley Table
+            if spectral_features_ref or spectral_features_sample:
+                peak_valley_tbl = [[tr("sample", settings), tr("type", settings), tr("wavelength", settings), tr("reflectance", settings)]]
+                for feat in spectral_features_ref[:3]:
+                    peak_valley_tbl.append([tr("reference", settings), feat['type'], fmt1(feat['wavelength']), fmt1(feat['reflectance'])])
+                for feat in spectral_features_sample[:3]:
+                    peak_valley_tbl.append([tr("sample", settings), feat['type'], fmt1(feat['wavelength']), fmt1(feat['reflectance'])])
+                elements.append(make_table(peak_valley_tbl, colWidths=[1.5*inch, 1.0*inch, 1.5*inch, 1.5*inch]))
+
+            elements.append(Spacer(1, 6))
+            elements.append(Paragraph(f"<i>{tr('spectral_note', settings)}</i>", StyleSmall))
+            elements.append(Spacer(1, 12))
+
+        # Calibration Notes
+        if settings.enable_spectro_calibration:
+            calib_section = []
+            calib_section.append(Paragraph(tr("calibration_limitations", settings), StyleH2))
+            calib_notes = [[tr("parameter", settings), tr("status_note", settings)],
+                           [tr("white_tile_calibration", settings), tr("simulated", settings)],
+                           [tr("uv_control", settings), settings.uv_control_note],
+                           [tr("data_source", settings), tr("spectral_csv", settings) if spectral_data_available else tr("rgb_xyz_conversion", settings)]]
+            calib_section.append(make_table(calib_notes, colWidths=[2.5*inch, 3.5*inch]))
+            calib_section.append(Spacer(1, 10))
+            elements.append(KeepTogether(calib_section))
+
+    # ==== Conclusion & Decision (Keep together on same page)
+    conclusion_elements = []
+    conclusion_elements.append(Paragraph(tr("conclusion_decision", settings), StyleH2))
+    dec_color = GREEN if decision.startswith("ACCEPT") else (ORANGE if "CONDITIONAL" in decision else RED)
+    # Colored box
+    conclusion_elements.append(Spacer(1, 4))
+    conclusion_elements.append(Paragraph(
+        f"<para backColor='{dec_color}'>"
+        f"<font color='white'><b>{tr('recommendation', settings)}: {decision_tr}</b></font></para>", StyleBadge))
+    conclusion_elements.append(Spacer(1, 6))
+    if "REJECT" in decision:
+        concl = [
+            tr("reject_msg_1", settings),
+            tr("reject_msg_2", settings),
+            tr("reject_msg_3", settings)
+        ]
+    elif "CONDITIONAL" in decision:
+        concl = [
+            tr("conditional_msg_1", settings),
+            tr("conditional_msg_2", settings)
+        ]
+    else:
+        concl = [
+            tr("accept_msg_1", settings),
+            tr("accept_msg_2", settings)
+        ]
+    conclusion_elements.append(Paragraph("• " + "<br/>• ".join(concl), StyleBody))
+    conclusion_elements.append(Spacer(1, 12))
+
+    # Wrap conclusion in KeepTogether to prevent page break
+    elements.append(KeepTogether(conclusion_elements))
+
+    # ==== Build the PDF
+    try:
+        # Create header_footer with timestamp and analysis_id
+        custom_header_footer = make_header_footer(report_timestamp=now, analysis_id=analysis_id)
+        doc.build(elements, onFirstPage=first_page_header, onLaterPages=custom_header_footer)
+        stages.stop()
+        logger.info(f"PDF report generated successfully: {pdf_name}")
+        
+        # Return results dictionary with all analysis data
+        return {
+            'pdf_path': pdf_path,
+            'decision': decision,
+            'color_score': round(color_score, 1),
+            'pattern_score': round(pattern_score, 1),
+            'overall_score': round(overall_score, 1),
+            'decision_translated': decision_tr
+        }
+    except Exception as e:
+        logger.error(f"Failed to build PDF: {str(e)}")
+        raise RuntimeError(f"PDF generation failed: {str(e)}")
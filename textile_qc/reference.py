@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - reference feature memo
+
+Everything the pipeline derives from the reference image alone (XYZ/Lab per
+illuminant, grayscale, texture analyzers, pattern detection, keypoints) is
+looked up through a ReferenceFeatures object. A single analysis uses a fresh
+one; a batch passes the same object to every sample so the reference-side
+work runs once.
+"""
+
+import threading
+
+# ----------------------------
+# Reference feature memo
+# ----------------------------
+
+
+class ReferenceFeatures:
+    """
+    Thread-safe memo of reference-image analysis results.
+
+    Valid for one reference image and one QCSettings: keys name the feature
+    only, not the parameters it was computed with. Values are shared between
+    samples and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        """Return the feature for key, calling compute() only the first time."""
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                return self._values[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Concurrent samples wait for the first one instead of recomputing
+        with key_lock:
+            with self._lock:
+                if key in self._values:
+                    self.hits += 1
+                    return self._values[key]
+            value = compute()
+            with self._lock:
+                self._values[key] = value
+                self.misses += 1
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {'features': len(self._values), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - stored report context
+
+The report PDF is rendered from a report context: the measurements, scores
+and chart images collected by run_pipeline_and_build_pdf(). Saved next to a
+cached analysis, it lets build_report_pdf() render the same report again
+for another operator or time zone without re-running the analysis.
+
+On disk a context is a directory holding context.json, one .npy file per
+array and the chart images. Analyzer results are trimmed to the fields the
+report prints (the full maps and feature vectors are not kept).
+"""
+
+import os
+import json
+import shutil
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_FILE = "context.json"
+
+# Fields of the analyzer results that the report uses; everything else
+# (response maps, feature vectors, matches) is dropped from the context
+REPORT_RESULT_FIELDS = {
+    "autocorr_ref": ("periodicity_score", "pattern_spacing", "regularity_score", "peaks"),
+    "autocorr_test": ("periodicity_score", "pattern_spacing", "regularity_score", "peaks"),
+    "blob_ref": ("count", "mean_area", "cv_area", "mean_size", "keypoints"),
+    "blob_test": ("count", "mean_area", "cv_area", "mean_size", "keypoints"),
+    "cc_ref": ("count", "mean_area", "cv_area"),
+    "cc_test": ("count", "mean_area", "cv_area"),
+    "defects_analysis": ("defects", "defect_count"),
+    "fft_ref": ("peaks", "fundamental_period", "fundamental_orientation", "anisotropy"),
+    "fft_test": ("peaks", "fundamental_period", "fundamental_orientation", "anisotropy"),
+    "gabor_ref": ("dominant_orientation", "coherency"),
+    "gabor_test": ("dominant_orientation", "coherency"),
+    "hog_ref": ("edge_density",),
+    "hog_test": ("edge_density",),
+    "keypoint_matching": ("keypoints_ref", "keypoints_test", "match_count", "match_ratio",
+                          "matching_score", "inliers"),
+    "struct_ref": ("mean_coherency",),
+    "struct_test": ("mean_coherency", "orientation_degrees"),
+    "wavelet_ref": ("energies",),
+    "wavelet_test": ("energies",),
+}
+
+
+def trim_report_context(values):
+    """Copy of values with the analyzer results reduced to REPORT_RESULT_FIELDS"""
+    context = dict(values)
+    for name, fields in REPORT_RESULT_FIELDS.items():
+        result = context.get(name)
+        if result:
+            context[name] = {f: result[f] for f in fields if f in result}
+    return context
+
+
+def _is_chart(name):
+    return name.endswith("_path") and name not in ("ref_path", "test_path")
+
+
+class _Encoder:
+    """JSON form of context values; arrays are written to .npy files in directory"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.arrays = 0
+
+    def encode(self, value):
+        if isinstance(value, np.ndarray):
+            name = f"array_{self.arrays}.npy"
+            self.arrays += 1
+            np.save(os.path.join(self.directory, name), value, allow_pickle=False)
+            return {"__ndarray__": name}
+        if isinstance(value, (np.floating, np.integer, np.bool_)):
+            return value.item()
+        if isinstance(value, dict):
+            return {str(k): self.encode(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self.encode(v) for v in value]
+        if hasattr(value, "to_dict") and hasattr(value, "iterrows"):
+            # pandas DataFrame (sample points table)
+            return {"__dataframe__": self.encode(value.to_dict(orient="split"))}
+        if hasattr(value, "pt") and hasattr(value, "size"):
+            # cv2.KeyPoint: only the position is kept
+            return [float(value.pt[0]), float(value.pt[1])]
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        raise TypeError(f"Cannot store {type(value).__name__} in a report context")
+
+
+def _decode(value, directory):
+    if isinstance(value, dict):
+        if "__ndarray__" in value:
+            return np.load(os.path.join(directory, value["__ndarray__"]), allow_pickle=False)
+        if "__dataframe__" in value:
+            import pandas as pd
+            return pd.DataFrame(**_decode(value["__dataframe__"], directory))
+        return {k: _decode(v, directory) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v, directory) for v in value]
+    return value
+
+
+def save_report_context(directory, context):
+    """
+    Write a (trimmed) report context and copies of its chart images to directory.
+
+    Raises:
+        TypeError: If a value cannot be stored (nothing is left behind)
+    """
+    os.makedirs(directory, exist_ok=True)
+    try:
+        encoder = _Encoder(directory)
+        stored = {}
+        for name, value in context.items():
+            if _is_chart(name) and value:
+                # Charts of disabled sections are never drawn
+                if os.path.exists(value):
+                    shutil.copy2(value, os.path.join(directory, os.path.basename(value)))
+                stored[name] = {"__chart__": os.path.basename(value)}
+            else:
+                stored[name] = encoder.encode(value)
+        with open(os.path.join(directory, CONTEXT_FILE), "w", encoding="utf-8") as f:
+            json.dump(stored, f)
+    except Exception:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+
+def load_report_context(directory):
+    """Report context saved by save_report_context(), chart paths pointing into directory"""
+    with open(os.path.join(directory, CONTEXT_FILE), encoding="utf-8") as f:
+        stored = json.load(f)
+    context = {}
+    for name, value in stored.items():
+        if isinstance(value, dict) and "__chart__" in value:
+            context[name] = os.path.join(directory, value["__chart__"])
+        else:
+            context[name] = _decode(value, directory)
+    return context
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - scoring, status decisions and sample point selection
+"""
+
+import numpy as np
+
+# ----------------------------
+# 4) Scoring & helpers
+# ----------------------------
+def color_uniformity_index(de_map):
+    std = float(np.std(de_map))
+    return max(0.0, 100.0 - std*10.0)
+
+def pass_status(mean_de):
+    if mean_de < 2.0: return "PASS"
+    if mean_de <= 3.5: return "CONDITIONAL"
+    return "FAIL"
+
+def determine_status(value, pass_threshold, conditional_threshold, lower_is_better=True):
+    """
+    Unified status determination function.
+
+    Args:
+        value: The metric value to evaluate
+        pass_threshold: Threshold for PASS status
+        conditional_threshold: Threshold for CONDITIONAL status
+        lower_is_better: If True, lower values are better (e.g., ΔE). If False, higher is better (e.g., SSIM)
+
+    Returns:
+        str: "PASS", "CONDITIONAL", or "FAIL"
+    """
+    if lower_is_better:
+        if value < pass_threshold:
+            return "PASS"
+        elif value <= conditional_threshold:
+            return "CONDITIONAL"
+        else:
+            return "FAIL"
+    else:
+        if value > pass_threshold:
+            return "PASS"
+        elif value > conditional_threshold:
+            return "CONDITIONAL"
+        else:
+            return "FAIL"
+
+def pattern_repetition_status(count_ref, count_test, tolerance):
+    """PASS / CONDITIONAL / FAIL from the difference in detected pattern counts"""
+    count_diff = abs(count_ref - count_test)
+    if count_diff <= tolerance:
+        return "PASS"
+    elif count_diff <= tolerance * 2:
+        return "CONDITIONAL"
+    return "FAIL"
+
+def qc_scores(mean_de76, ssim_score, settings):
+    """Color, pattern and overall scores (0-100) from mean ΔE76 and SSIM"""
+    color_score = max(0.0, 100.0 - mean_de76 * settings.color_score_multiplier)  # ΔE76 -> score
+    pattern_score = ssim_score * 100.0
+    overall_score = (color_score + pattern_score) / 2.0
+    return color_score, pattern_score, overall_score
+
+def qc_decision(color_score, pattern_score, overall_score, pattern_rep_status, settings):
+    """
+    Final QC decision.
+
+    Args:
+        pattern_rep_status: Result of pattern_repetition_status(), or "DISABLED"
+                            when pattern repetition was not analysed
+
+    Returns:
+        str: "ACCEPT", "CONDITIONAL ACCEPT" or "REJECT"
+    """
+    pattern_rep_ok = pattern_rep_status != "FAIL"
+    pattern_rep_conditional = pattern_rep_status == "CONDITIONAL"
+
+    if (color_score >= settings.color_score_threshold and
+        pattern_score >= settings.pattern_score_threshold and
+        pattern_rep_ok and not pattern_rep_conditional):
+        return "ACCEPT"
+    elif not pattern_rep_ok:
+        return "REJECT"  # Pattern repetition failure is critical
+    elif overall_score >= settings.overall_score_threshold or pattern_rep_conditional:
+        return "CONDITIONAL ACCEPT"
+    return "REJECT"
+
+def grid_points(h, w, n=5):
+    """Legacy grid points function - diagonal pattern"""
+    ys = np.linspace(0.2, 0.8, n)
+    xs = np.linspace(0.2, 0.8, n)
+    pts = [(int(y*h), int(x*w)) for y,x in zip(ys, xs)]
+    return pts[:n]
+
+def generate_random_sample_points(h, w, n=5, roi=None):
+    """
+    Generate N random sample points within image bounds or ROI.
+    
+    Args:
+        h, w: Image height and width
+        n: Number of points to generate
+        roi: Optional dict with 'shape', 'center_x', 'center_y', 'diameter'/'width'/'height'
+             If provided, points are constrained to the ROI
+    
+    Returns:
+        List of (y, x) tuples in pixel coordinates
+    """
+    pts = []
+    margin = 0.1  # 10% margin from edges
+    
+    if roi and roi.get('enabled', False):
+        shape = roi.get('shape', 'circle')
+        cx = roi.get('center_x', w // 2)
+        cy = roi.get('center_y', h // 2)
+        
+        if shape == 'circle':
+            radius = roi.get('diameter', min(h, w) // 2) // 2
+            # Use 90% of radius to ensure points are well inside the boundary
+            safe_radius = radius * 0.90
+            
+            # Generate random points STRICTLY within circle
+            for _ in range(n * 100):  # Max attempts
+                if len(pts) >= n:
+                    break
+                # Random angle and radius (uniform distribution in circle)
+                angle = np.random.uniform(0, 2 * np.pi)
+                r = safe_radius * np.sqrt(np.random.uniform(0, 1))
+                x = int(cx + r * np.cos(angle))
+                y = int(cy + r * np.sin(angle))
+                # Verify point is within image bounds AND strictly within circle
+                dist_from_center = np.sqrt((x - cx)**2 + (y - cy)**2)
+                if 0 <= x < w and 0 <= y < h and dist_from_center < safe_radius:
+                    pts.append((y, x))
+        else:  # rectangle or square
+            rw = roi.get('width', w // 2)
+            rh = roi.get('height', h // 2)
+            
+            # Add 5% margin inside rectangle to keep points well within boundary
+            margin_x = max(1, int(rw * 0.05))
+            margin_y = max(1, int(rh * 0.05))
+            
+            # Calculate strict rectangle bounds with margin
+            x_min = max(0, cx - rw // 2 + margin_x)
+            x_max = min(w - 1, cx + rw // 2 - margin_x)
+            y_min = max(0, cy - rh // 2 + margin_y)
+            y_max = min(h - 1, cy + rh // 2 - margin_y)
+            
+            # Ensure valid ranges (low < high required for randint)
+            if x_max <= x_min:
+                x_min = max(0, cx - rw // 2)
+                x_max = min(w - 1, cx + rw // 2)
+                if x_max <= x_min:
+                    x_max = x_min + 1
+            if y_max <= y_min:
+                y_min = max(0, cy - rh // 2)
+                y_max = min(h - 1, cy + rh // 2)
+                if y_max <= y_min:
+                    y_max = y_min + 1
+            
+            # Generate points strictly within the rectangle bounds
+            for _ in range(n * 100):
+                if len(pts) >= n:
+                    break
+                x = np.random.randint(x_min, x_max + 1)
+                y = np.random.randint(y_min, y_max + 1)
+                # Verify point is within image bounds
+                if 0 <= x < w and 0 <= y < h:
+                    pts.append((y, x))
+    else:
+        # Random points within image bounds with margin
+        x_min = int(margin * w)
+        x_max = int((1 - margin) * w)
+        y_min = int(margin * h)
+        y_max = int((1 - margin) * h)
+        
+        # Ensure valid ranges for small images
+        if x_max <= x_min:
+            x_min = 0
+            x_max = max(1, w)
+        if y_max <= y_min:
+            y_min = 0
+            y_max = max(1, h)
+        
+        for _ in range(n):
+            x = np.random.randint(x_min, x_max)
+            y = np.random.randint(y_min, y_max)
+            pts.append((y, x))
+    
+    return pts[:n]
+
+def get_sample_points(h, w, settings, roi=None):
+    """
+    Get sample points for color analysis based on settings.
+    
+    Args:
+        h, w: Image dimensions
+        settings: QCSettings object
+        roi: Optional ROI dict for constraining points
+    
+    Returns:
+        List of (y, x) tuples
+    """
+    n = settings.num_sample_points
+    
+    # Check if manual sampling is enabled and points are provided
+    if settings.sampling_mode == "manual" and settings.manual_sample_points:
+        manual_pts = settings.manual_sample_points
+        pts = []
+        for pt in manual_pts[:n]:
+            if isinstance(pt, (list, tuple)) and len(pt) >= 2:
+                x, y = pt[0], pt[1]
+                # Check if normalized (0-1) or absolute coordinates
+                if 0 <= x <= 1 and 0 <= y <= 1:
+                    x = int(x * w)
+                    y = int(y * h)
+                else:
+                    x, y = int(x), int(y)
+                # Clamp to image bounds
+                x = max(0, min(w - 1, x))
+                y = max(0, min(h - 1, y))
+                pts.append((y, x))
+        
+        # If not enough manual points, fill with random
+        if len(pts) < n:
+            additional = generate_random_sample_points(h, w, n - len(pts), roi)
+            pts.extend(additional)
+        
+        return pts[:n]
+    else:
+        # Random sampling (default)
+        return generate_random_sample_points(h, w, n, roi)
@@ -0,0 +1,497 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - analysis settings technical report
+"""
+
+import os
+import shutil
+import tempfile
+
+from PIL import Image
+
+from .config import ANALYSIS_WIDTH, VERTICAL_LOGO
+
+# ----------------------------
+# Generate Analysis Settings Technical Report
+# ----------------------------
+def generate_analysis_settings_report(ref_path, test_path, ref, test, settings, output_dir=None,
+                                      source_size=None, stage_profile=None):
+    """
+    Generate a compact technical report with analysis settings (small text for technicians).
+
+    The PDF and its temporary input thumbnails are written to output_dir
+    (default: current working directory). source_size is the (width, height)
+    of the images before they were downscaled for analysis (default: the
+    size of ref). stage_profile is the StageProfile.to_dict() breakdown of
+    the analysis, shown as a table when settings.enable_stage_profile is set.
+    Returns the PDF path.
+    """
+    from datetime import datetime, timedelta
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.units import inch
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import (SimpleDocTemplate, Paragraph, Image as RLImage, Table, TableStyle,
+                                    Spacer, PageBreak)
+    from .pdf import PDF_FONT_REGULAR, PDF_FONT_BOLD, wrap_text_cell, BLUE1, BLUE2, GREEN, ORANGE, NEUTRAL_L
+
+    # Use configurable timezone offset (matching main report)
+    tz_offset = timedelta(hours=settings.timezone_offset_hours)
+    now_utc3 = datetime.utcnow() + tz_offset
+    timestamp_str = now_utc3.strftime("%Y%m%d_%H%M%S")
+    output_dir = output_dir or os.getcwd()
+    pdf_path = os.path.join(output_dir, f"Analysis_Settings_Report_{timestamp_str}.pdf")
+    image_w, image_h = source_size or (ref.shape[1], ref.shape[0])
+
+    # Store the main report name that would be generated
+    main_report_name = f"QC_Report_{timestamp_str}.pdf"
+
+    # Create PDF with smaller margins for compact layout
+    doc = SimpleDocTemplate(
+        pdf_path,
+        pagesize=A4,
+        leftMargin=30,
+        rightMargin=30,
+        topMargin=60,
+        bottomMargin=60
+    )
+
+    elements = []
+
+    # Define styles for small text (technical report)
+    styles = getSampleStyleSheet()
+
+    # Small title style
+    StyleTitle = ParagraphStyle(
+        'TechTitle',
+        parent=styles['Heading1'],
+        fontSize=14,
+        textColor=BLUE2,
+        spaceAfter=8,
+        alignment=1,  # Center
+        fontName=PDF_FONT_BOLD
+    )
+
+    # Small heading style
+    StyleHeading = ParagraphStyle(
+        'TechHeading',
+        parent=styles['Heading2'],
+        fontSize=10,
+        textColor=BLUE1,
+        spaceAfter=6,
+        spaceBefore=10,
+        fontName=PDF_FONT_BOLD
+    )
+
+    # Small body text style
+    StyleBody = ParagraphStyle(
+        'TechBody',
+        parent=styles['BodyText'],
+        fontSize=7,
+        leading=9,
+        spaceAfter=4,
+        fontName=PDF_FONT_REGULAR
+    )
+
+    # Title
+    elements.append(Paragraph("* ANALYSIS SETTINGS TECHNICAL REPORT", StyleTitle))
+    elements.append(Paragraph(f"<b>Operator:</b> {settings.operator_name} | <b>Timestamp (UTC+3):</b> {now_utc3.strftime('%Y-%m-%d %H:%M:%S')}",
+                             ParagraphStyle('TechSubtitle', parent=StyleBody, fontSize=8, alignment=1, spaceAfter=10)))
+    elements.append(Spacer(1, 10))
+
+    # Logo (if available)
+    logo_path = VERTICAL_LOGO
+    if os.path.exists(logo_path):
+        try:
+            logo = RLImage(logo_path, width=60, height=30)
+            elements.append(logo)
+            elements.append(Spacer(1, 8))
+        except:
+            pass
+
+    # ===== REPORT METADATA =====
+    elements.append(Paragraph("Report Information", StyleHeading))
+    report_info_data = [
+        ["Field", "Value"],
+        ["Main Report Name", main_report_name],
+        ["Technical Report Name", os.path.basename(pdf_path)],
+        ["Generation Timestamp (UTC+3)", now_utc3.strftime('%Y-%m-%d %H:%M:%S')],
+        ["Operator", settings.operator_name],
+        ["Reference Image", os.path.basename(ref_path)],
+        ["Sample Image", os.path.basename(test_path)],
+        ["Image Dimensions", f"{image_w} × {image_h} pixels"],
+    ]
+
+    report_info_table = Table(report_info_data, colWidths=[2.5*inch, 4.5*inch])
+    report_info_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), BLUE2),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), PDF_FONT_BOLD),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('FONTNAME', (0, 1), (-1, -1), PDF_FONT_REGULAR),
+        ('FONTSIZE', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('TOPPADDING', (0, 0), (-1, 0), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 3),
+        ('TOPPADDING', (0, 1), (-1, -1), 3),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.Color(0.95, 0.95, 0.95)]),
+        ('WORDWRAP', (0, 0), (-1, -1), True),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    elements.append(report_info_table)
+    elements.append(Spacer(1, 10))
+
+    # ===== REGION ANALYSIS DETAILS =====
+    elements.append(Paragraph("Region Analysis Configuration", StyleHeading))
+
+    if settings.use_crop:
+        mode_desc = "Simultaneous" if settings.crop_mode == "simultaneous" else "Independent"
+        analysis_mode = f"Selected Region Only ({settings.crop_shape.upper()}, {mode_desc})"
+
+        if settings.crop_mode == "simultaneous":
+            # Same position for both images
+            if settings.crop_shape == "circle":
+                shape_details = f"Circle: Center ({settings.crop_center_x}, {settings.crop_center_y}), Diameter {settings.crop_diameter} px"
+            else:  # rectangle
+                shape_details = f"Rectangle: Center ({settings.crop_center_x}, {settings.crop_center_y}), Size {settings.crop_width} × {settings.crop_height} px"
+        else:
+            # Independent mode - different positions for each image
+            if settings.crop_shape == "circle":
+                shape_details = (f"Reference: Center ({settings.crop_center_x}, {settings.crop_center_y}), Ø{settings.crop_diameter}px | "
+                               f"Sample: Center ({settings.crop_test_center_x}, {settings.crop_test_center_y}), Ø{settings.crop_test_diameter}px")
+            else:
+                shape_details = (f"Reference: Center ({settings.crop_center_x}, {settings.crop_center_y}), {settings.crop_width}×{settings.crop_height}px | "
+                               f"Sample: Center ({settings.crop_test_center_x}, {settings.crop_test_center_y}), {settings.crop_test_width}×{settings.crop_test_height}px")
+    else:
+        analysis_mode = "Entire Image (No Region Selection)"
+        shape_details = "N/A - Full image analyzed"
+
+    region_data = [
+        ["Configuration", "Details"],
+        ["Analysis Mode", analysis_mode],
+        ["Region Details", wrap_text_cell(shape_details, 60)],
+        ["Sample Points", f"{settings.num_sample_points} points"],
+    ]
+
+    region_table = Table(region_data, colWidths=[2.5*inch, 4.5*inch])
+    region_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), GREEN),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), PDF_FONT_BOLD),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('FONTNAME', (0, 1), (-1, -1), PDF_FONT_REGULAR),
+        ('FONTSIZE', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('TOPPADDING', (0, 0), (-1, 0), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 3),
+        ('TOPPADDING', (0, 1), (-1, -1), 3),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.Color(0.95, 0.95, 0.95)]),
+        ('WORDWRAP', (0, 0), (-1, -1), True),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    elements.append(region_table)
+    elements.append(Spacer(1, 10))
+
+    # ===== ENABLED/DISABLED SECTIONS =====
+    elements.append(Paragraph("Report Sections Included", StyleHeading))
+
+    sections_status = [
+        ["Section", "Status"],
+        # Main sections
+        ["* Analysis Settings", "* Enabled" if settings.enable_analysis_settings else "* Disabled"],
+        ["* Color Unit", "* Enabled" if settings.enable_color_unit else "* Disabled"],
+        # Color sub-sections (only show if Color Unit enabled)
+    ]
+
+    if settings.enable_color_unit:
+        sections_status.extend([
+            ["  * Input Images", "* Enabled" if settings.enable_color_input_images else "* Disabled"],
+            ["  * Color Measurements", "* Enabled" if settings.enable_color_measurements else "* Disabled"],
+            ["  * Color Difference (ΔE)", "* Enabled" if settings.enable_color_difference else "* Disabled"],
+            ["  * Statistical Analysis", "* Enabled" if settings.enable_color_statistical else "* Disabled"],
+            ["  * Spectral Proxy", "* Enabled" if settings.enable_color_spectral_proxy else "* Disabled"],
+            ["  * Visual Difference", "* Enabled" if settings.enable_color_visual_diff else "* Disabled"],
+            ["  * Lab* Detailed Analysis", "* Enabled" if settings.enable_color_lab_detailed else "* Disabled"],
+            ["  * Lab* Visualizations", "* Enabled" if settings.enable_color_lab_viz else "* Disabled"],
+            ["  * Quality Assessment", "* Enabled" if settings.enable_color_quality_assessment else "* Disabled"],
+            ["  * Scoring & Status", "* Enabled" if settings.enable_color_scoring else "* Disabled"],
+            ["  * Recommendations", "* Enabled" if settings.enable_color_recommendations else "* Disabled"],
+        ])
+
+    sections_status.append(["* Pattern Unit", "* Enabled" if settings.enable_pattern_unit else "* Disabled"])
+
+    if settings.enable_pattern_unit:
+        sections_status.extend([
+            ["  * SSIM Analysis", "* Enabled" if settings.enable_pattern_ssim else "* Disabled"],
+            ["  * Symmetry Analysis", "* Enabled" if settings.enable_pattern_symmetry else "* Disabled"],
+            ["  * Edge Definition", "* Enabled" if settings.enable_pattern_edge else "* Disabled"],
+            ["  * Repeat Period", "* Enabled" if settings.enable_pattern_repeat else "* Disabled"],
+            ["  * Advanced Texture", "* Enabled" if settings.enable_pattern_advanced else "* Disabled"],
+        ])
+
+    sections_status.append(["* Spectrophotometer", "* Enabled" if settings.enable_spectrophotometer else "* Disabled"])
+
+    if settings.enable_spectrophotometer:
+        sections_status.extend([
+            ["  * Instrument Config", "* Enabled" if settings.enable_spectro_config else "* Disabled"],
+            ["  * Color Diff Methods", "* Enabled" if settings.enable_spectro_color_diff_methods else "* Disabled"],
+            ["  * Whiteness/Yellowness", "* Enabled" if settings.enable_spectro_whiteness else "* Disabled"],
+            ["  * Metamerism", "* Enabled" if settings.enable_spectro_metamerism else "* Disabled"],
+            ["  * Spectral Data", "* Enabled" if settings.enable_spectro_spectral_data else "* Disabled"],
+            ["  * Calibration Notes", "* Enabled" if settings.enable_spectro_calibration else "* Disabled"],
+        ])
+
+    sections_table = Table(sections_status, colWidths=[4.5*inch, 2.5*inch])
+    sections_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), ORANGE),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), PDF_FONT_BOLD),
+        ('FONTSIZE', (0, 0), (-1, 0), 8),
+        ('FONTNAME', (0, 1), (-1, -1), 'Courier'),  # Monospace for tree structure
+        ('FONTSIZE', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+        ('TOPPADDING', (0, 0), (-1, 0), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 2),
+        ('TOPPADDING', (0, 1), (-1, -1), 2),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.Color(0.95, 0.95, 0.95)]),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    elements.append(sections_table)
+    elements.append(Spacer(1, 10))
+
+    # ===== TWO-COLUMN LAYOUT FOR SETTINGS =====
+    elements.append(PageBreak())
+    elements.append(Paragraph("Detailed Analysis Parameters", StyleHeading))
+
+    # Create TWO-COLUMN layout for settings (left and right tables)
+    # LEFT COLUMN - Color & Pattern Settings
+    left_settings = [
+        ["Parameter", "Value"],
+        # Color Thresholds
+        ["— COLOR THRESHOLDS —", ""],
+        ["ΔE Threshold", f"{settings.delta_e_threshold}"],
+        ["ΔE Conditional", f"{settings.delta_e_conditional}"],
+        ["Lab L* Threshold", f"{settings.lab_l_threshold}"],
+        ["Lab a*b* Threshold", f"{settings.lab_ab_threshold}"],
+        ["Lab Overall Threshold", f"{settings.lab_overall_threshold}"],
+        ["— PATTERN THRESHOLDS —", ""],
+        ["SSIM Pass Threshold", f"{settings.ssim_pass_threshold}"],
+        ["SSIM Conditional", f"{settings.ssim_conditional_threshold}"],
+        ["— SCORING PARAMETERS —", ""],
+        ["Color Score Multiplier", f"{settings.color_score_multiplier}"],
+        ["Uniformity Std Multiplier", f"{settings.uniformity_std_multiplier}"],
+        ["Color Score Threshold", f"{settings.color_score_threshold}"],
+        ["Pattern Score Threshold", f"{settings.pattern_score_threshold}"],
+        ["Overall Score Threshold", f"{settings.overall_score_threshold}"],
+        ["— TEXTURE ANALYSIS —", ""],
+        ["FFT Notch Filter", "Enabled" if settings.fft_enable_notch else "Disabled"],
+        ["FFT Peaks", str(settings.fft_num_peaks)],
+        ["Gabor Frequencies", settings.gabor_frequencies_str],
+        ["Gabor Orientations", str(settings.gabor_num_orientations)],
+        ["GLCM Distances", settings.glcm_distances_str],
+        ["GLCM Angles", settings.glcm_angles_str],
+    ]
+
+    # RIGHT COLUMN - Spectrophotometer & Advanced Settings
+    right_settings = [
+        ["Parameter", "Value"],
+        # Spectrophotometer
+        ["— SPECTROPHOTOMETER —", ""],
+        ["Observer Angle", f"{settings.observer_angle}°"],
+        ["Geometry Mode", settings.geometry_mode],
+        ["ΔE CMC", "Enabled" if settings.use_delta_e_cmc else "Disabled"],
+        ["CMC l:c Ratio", settings.cmc_l_c_ratio],
+        ["ΔE Backend", settings.delta_e_backend],
+        # Same ΔE statistics either way, at the analysis width only
+        ["Palette ΔE", f"Enabled ({ANALYSIS_WIDTH} px)" if settings.use_palette_delta_e else "Disabled"],
+        ["Whiteness Min", f"{settings.whiteness_min}"],
+        ["Yellowness Max", f"{settings.yellowness_max}"],
+        ["Metamerism Illuminants", ", ".join(settings.metamerism_illuminants)[:30] + "..."],
+        ["Spectral Analysis", "Enabled" if settings.spectral_enable else "Disabled"],
+        ["— ADVANCED PARAMS —", ""],
+        ["LBP Points", str(settings.lbp_points)],
+        ["LBP Radius", str(settings.lbp_radius)],
+        ["Wavelet Type", settings.wavelet_type],
+        ["Wavelet Levels", str(settings.wavelet_levels)],
+        ["Defect Min Area", f"{settings.defect_min_area} px"],
+        ["Saliency Strength", f"{settings.saliency_strength}"],
+        ["Morph Kernel Size", f"{settings.morph_kernel_size}"],
+    ]
+
+    # Create left table
+    left_table = Table(left_settings, colWidths=[1.8*inch, 1.4*inch])
+    left_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), BLUE2),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('BACKGROUND', (0, 1), (-1, 1), NEUTRAL_L),  # Section headers
+        ('BACKGROUND', (0, 8), (-1, 8), NEUTRAL_L),
+        ('BACKGROUND', (0, 11), (-1, 11), NEUTRAL_L),
+        ('BACKGROUND', (0, 17), (-1, 17), NEUTRAL_L),
+        ('SPAN', (0, 1), (1, 1)),  # Span section headers
+        ('SPAN', (0, 8), (1, 8)),
+        ('SPAN', (0, 11), (1, 11)),
+        ('SPAN', (0, 17), (1, 17)),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), PDF_FONT_BOLD),
+        ('FONTSIZE', (0, 0), (-1, 0), 7),
+        ('FONTNAME', (0, 1), (-1, -1), PDF_FONT_REGULAR),
+        ('FONTSIZE', (0, 1), (-1, -1), 5.5),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 4),
+        ('TOPPADDING', (0, 0), (-1, 0), 4),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 2),
+        ('TOPPADDING', (0, 1), (-1, -1), 2),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('WORDWRAP', (0, 0), (-1, -1), True),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+
+    # Create right table
+    right_table = Table(right_settings, colWidths=[1.8*inch, 1.4*inch])
+    right_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), BLUE2),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('BACKGROUND', (0, 1), (-1, 1), NEUTRAL_L),  # Section headers
+        ('BACKGROUND', (0, 10), (-1, 10), NEUTRAL_L),
+        ('SPAN', (0, 1), (1, 1)),  # Span section headers
+        ('SPAN', (0, 10), (1, 10)),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), PDF_FONT_BOLD),
+        ('FONTSIZE', (0, 0), (-1, 0), 7),
+        ('FONTNAME', (0, 1), (-1, -1), PDF_FONT_REGULAR),
+        ('FONTSIZE', (0, 1), (-1, -1), 5.5),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 4),
+        ('TOPPADDING', (0, 0), (-1, 0), 4),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 2),
+        ('TOPPADDING', (0, 1), (-1, -1), 2),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('WORDWRAP', (0, 0), (-1, -1), True),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+
+    # Place tables side-by-side
+    two_column_layout = Table([[left_table, right_table]], colWidths=[3.4*inch, 3.4*inch])
+    two_column_layout.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 0),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+    ]))
+
+    elements.append(two_column_layout)
+    elements.append(Spacer(1, 12))
+
+    # ===== STAGE TIMING =====
+    if settings.enable_stage_profile and stage_profile:
+        elements.append(Paragraph("Stage Timing and Memory", StyleHeading))
+        traced = stage_profile.get('memory_traced')
+        profile_rows = [["Stage", "Wall (ms)", "CPU (ms)", "Peak (MB)"]]
+        for entry in stage_profile['stages']:
+            peak = entry.get('peak_mb')
+            profile_rows.append([
+                "  " * entry['depth'] + entry['stage'],
+                f"{entry['wall_ms']:.1f}",
+                f"{entry['cpu_ms']:.1f}",
+                f"{peak:.2f}" if peak is not None else "-",
+            ])
+        total_peak = stage_profile.get('peak_mb')
+        profile_rows.append([
+            "Total",
+            f"{stage_profile['total_wall_ms']:.1f}",
+            f"{stage_profile['total_cpu_ms']:.1f}",
+            f"{total_peak:.2f}" if total_peak is not None else "-",
+        ])
+        profile_table = Table(profile_rows, colWidths=[3.4*inch, 1.2*inch, 1.2*inch, 1.2*inch], repeatRows=1)
+        profile_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), BLUE1),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), PDF_FONT_BOLD),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('FONTNAME', (0, 1), (-1, -2), 'Courier'),  # Monospace for the nesting
+            ('FONTSIZE', (0, 1), (-1, -1), 6),
+            ('FONTNAME', (0, -1), (-1, -1), PDF_FONT_BOLD),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+            ('TOPPADDING', (0, 0), (-1, 0), 6),
+            ('BOTTOMPADDING', (0, 1), (-1, -1), 2),
+            ('TOPPADDING', (0, 1), (-1, -1), 2),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -2), [colors.white, colors.Color(0.95, 0.95, 0.95)]),
+            ('BACKGROUND', (0, -1), (-1, -1), NEUTRAL_L),
+        ]))
+        elements.append(profile_table)
+        note = ("CPU time is the analysing thread only. Indented rows are the reference (.ref) and "
+                "sample (.test) side of each analyzer; a memoized reference side shows near zero.")
+        if not traced:
+            note += " Memory was not traced for this analysis (request option \"profile_memory\")."
+        elements.append(Paragraph(f"<i>{note}</i>", StyleBody))
+        elements.append(Spacer(1, 12))
+
+    # Input Images (smaller size for compact layout)
+    elements.append(PageBreak())
+    elements.append(Paragraph("Input Images", StyleHeading))
+
+    # Reference image
+    temp_dir = tempfile.mkdtemp(prefix="settings_", dir=output_dir)
+    ref_temp = os.path.join(temp_dir, "temp_ref_tech.png")
+    Image.fromarray(ref).save(ref_temp)
+    ref_img = RLImage(ref_temp, width=3*inch, height=3*inch)
+    elements.append(Paragraph("<b>Reference Image:</b>", StyleBody))
+    elements.append(ref_img)
+    elements.append(Spacer(1, 8))
+
+    # Test image
+    test_temp = os.path.join(temp_dir, "temp_test_tech.png")
+    Image.fromarray(test).save(test_temp)
+    test_img = RLImage(test_temp, width=3*inch, height=3*inch)
+    elements.append(Paragraph("<b>Sample Image:</b>", StyleBody))
+    elements.append(test_img)
+    elements.append(Spacer(1, 8))
+
+    # File info
+    elements.append(Paragraph(f"<b>Reference File:</b> {os.path.basename(ref_path)}", StyleBody))
+    elements.append(Paragraph(f"<b>Sample File:</b> {os.path.basename(test_path)}", StyleBody))
+    elements.append(Paragraph(f"<b>Image Size:</b> {image_w}×{image_h} pixels", StyleBody))
+
+    # Footer note
+    elements.append(Spacer(1, 15))
+    elements.append(Paragraph("<i>This is a technical report for internal use by technicians. Contains detailed analysis configuration.</i>",
+                             ParagraphStyle('TechFootnote', parent=StyleBody, fontSize=6, textColor=colors.grey, alignment=1)))
+
+    # Build PDF with simplified header/footer
+    def tech_header_footer(canvas, doc):
+        canvas.saveState()
+
+        # Header line
+        canvas.setStrokeColor(BLUE2)
+        canvas.setLineWidth(1)
+        canvas.line(30, A4[1] - 40, A4[0] - 30, A4[1] - 40)
+
+        # Footer
+        canvas.setFont(PDF_FONT_REGULAR, 7)
+        canvas.setFillColor(colors.grey)
+        canvas.drawString(30, 30, f"Analysis Settings Report | {settings.operator_name}")
+        canvas.drawRightString(A4[0] - 30, 30, f"Page {doc.page}")
+
+        # Logo in footer (if available)
+        if os.path.exists(logo_path):
+            try:
+                canvas.drawImage(logo_path, A4[0] - 60, 20, width=24, height=12, preserveAspectRatio=True, mask='auto')
+            except:
+                pass
+
+        canvas.restoreState()
+
+    try:
+        doc.build(elements, onFirstPage=tech_header_footer, onLaterPages=tech_header_footer)
+    finally:
+        # Clean up temp files
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    return pdf_path
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - stage timing hooks
+
+The pipeline reports how long each of its stages took (decode, color,
+metamerism, fft, gabor, ..., charts, pdf) to the observers registered with
+add_stage_observer(); the web layer feeds them into its metrics. Observers
+are called in the analysing thread and must be cheap; their errors are
+logged, never raised into the analysis.
+
+Within profile_stages(), the same stages (and the reference and sample side
+of every paired analyzer, e.g. "gabor.ref" / "gabor.test") are also recorded
+for that one analysis: wall time, CPU time of the analysing thread and,
+optionally, the tracemalloc peak.
+"""
+
+import time
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# Stage observers
+# ----------------------------
+_observers = []
+_observers_lock = threading.Lock()
+
+
+def add_stage_observer(observer):
+    """Register observer(stage, seconds), called after every timed stage"""
+    with _observers_lock:
+        if observer not in _observers:
+            _observers.append(observer)
+
+
+def remove_stage_observer(observer):
+    with _observers_lock:
+        if observer in _observers:
+            _observers.remove(observer)
+
+
+def observe_stage(stage, seconds):
+    """Report one stage duration to all observers"""
+    for observer in list(_observers):
+        try:
+            observer(stage, seconds)
+        except Exception as e:
+            logger.warning(f"Stage observer failed for {stage}: {e}")
+
+
+@contextmanager
+def timed_stage(stage):
+    """Time the enclosed block as one stage (not reported if it raises)"""
+    profile = current_profile()
+    entry = profile._begin(stage) if profile is not None else None
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if entry is not None:
+            profile._end(entry)
+    observe_stage(stage, time.perf_counter() - started)
+
+
+class StageSequence:
+    """
+    Times consecutive stages of a long function: start() ends the running
+    stage and begins the next one, stop() ends the last one.
+    """
+
+    def __init__(self):
+        self._stage = None
+        self._started = 0.0
+        self._entry = None
+        self._profile = None
+
+    def start(self, stage):
+        """End the running stage and begin the next one; returns the seconds of the ended stage"""
+        elapsed = self.stop()
+        self._stage = stage
+        self._profile = current_profile()
+        self._entry = self._profile._begin(stage) if self._profile is not None else None
+        self._started = time.perf_counter()
+        return elapsed
+
+    def stop(self):
+        """End the running stage; returns its seconds (0.0 if none was running)"""
+        if self._stage is None:
+            return 0.0
+        elapsed = time.perf_counter() - self._started
+        if self._entry is not None:
+            self._profile._end(self._entry)
+        observe_stage(self._stage, elapsed)
+        self._stage = self._entry = self._profile = None
+        return elapsed
+
+
+# ----------------------------
+# Per-analysis stage profile
+# ----------------------------
+_local = threading.local()
+
+# tracemalloc's peak is process-wide (reset_peak() affects every reader):
+# one memory-traced profile at a time
+_memory_profile_lock = threading.Lock()
+
+MB = 1024.0 * 1024.0
+
+
+def current_profile():
+    """StageProfile recording in this thread, or None"""
+    return getattr(_local, 'profile', None)
+
+
+class StageProfile:
+    """
+    Wall time, CPU time and (with trace_memory) tracemalloc peak of every
+    stage of one analysis, in the order the stages ran.
+
+    CPU time is that of the analysing thread (time.thread_time), so work done
+    by native libraries in their own threads is not included. The peak of a
+    stage is the highest traced allocation above what was allocated when the
+    stage began; nested stages count towards their parent's peak. The total
+    peak is likewise relative to what was allocated when the profile began.
+    tracemalloc counts the allocations of all threads, so analyses running
+    alongside a memory-traced one (untraced; traced ones are serialized by
+    profile_stages) still add to its peaks.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.entries = []
+        self._open = []
+        self._started = time.perf_counter()
+        self._cpu_started = time.thread_time()
+        self._wall = None
+        self._cpu = None
+        self._base = self._peak = 0
+        if trace_memory:
+            self._base = self._peak = self._fold_peak()
+
+    def _fold_peak(self):
+        """Credit the peak since the last reset to all open stages, then reset it"""
+        current, peak = tracemalloc.get_traced_memory()
+        for entry in self._open:
+            entry['_peak'] = max(entry['_peak'], peak)
+        self._peak = max(self._peak, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _begin(self, stage):
+        entry = {'stage': stage, 'depth': len(self._open)}
+        if self.trace_memory:
+            entry['_base'] = entry['_peak'] = self._fold_peak()
+        entry['_wall'] = time.perf_counter()
+        entry['_cpu'] = time.thread_time()
+        self._open.append(entry)
+        self.entries.append(entry)
+        return entry
+
+    def _end(self, entry):
+        wall = time.perf_counter() - entry.pop('_wall')
+        cpu = time.thread_time() - entry.pop('_cpu')
+        if self.trace_memory:
+            self._fold_peak()
+        if entry in self._open:
+            self._open.remove(entry)
+        entry['wall_ms'] = round(wall * 1000.0, 1)
+        entry['cpu_ms'] = round(cpu * 1000.0, 1)
+        if self.trace_memory:
+            entry['peak_mb'] = round((entry.pop('_peak') - entry.pop('_base')) / MB, 2)
+        else:
+            entry['peak_mb'] = None
+
+    def finish(self):
+        """Close the profile (and any stage left open by an error)"""
+        for entry in reversed(list(self._open)):
+            self._end(entry)
+        if self.trace_memory:
+            self._fold_peak()
+        self._wall = time.perf_counter() - self._started
+        self._cpu = time.thread_time() - self._cpu_started
+
+    def to_dict(self):
+        """
+        JSON-ready breakdown: 'stages' (stage, depth, wall_ms, cpu_ms,
+        peak_mb; depth 1 = analyzer inside the stage before it), totals and
+        whether memory was traced.
+        """
+        # Before finish() (e.g. for a report written inside the profile): totals so far
+        wall = self._wall if self._wall is not None else time.perf_counter() - self._started
+        cpu = self._cpu if self._cpu is not None else time.thread_time() - self._cpu_started
+        return {
+            'stages': [{k: v for k, v in entry.items() if not k.startswith('_')}
+                       for entry in self.entries if 'wall_ms' in entry],
+            'total_wall_ms': round(wall * 1000.0, 1),
+            'total_cpu_ms': round(cpu * 1000.0, 1),
+            'peak_mb': round((self._peak - self._base) / MB, 2) if self.trace_memory else None,
+            'memory_traced': self.trace_memory,
+        }
+
+
+@contextmanager
+def _memory_tracing():
+    """Hold the memory-profile lock and trace allocations (unless tracemalloc was started elsewhere)"""
+    with _memory_profile_lock:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if started:
+                tracemalloc.stop()
+
+
+@contextmanager
+def profile_stages(trace_memory=False):
+    """
+    Record the stages run by this thread in the enclosed block.
+
+    Yields the StageProfile; its to_dict() is complete after the block.
+    Tracing memory slows allocation-heavy stages down noticeably (and, being
+    process-wide, other analyses running at the same time), so it is opt-in;
+    memory-traced profiles run one at a time, later ones wait for the lock.
+    """
+    with (_memory_tracing() if trace_memory else nullcontext()):
+        previous = current_profile()
+        profile = StageProfile(trace_memory=trace_memory)
+        _local.profile = profile
+        try:
+            yield profile
+        finally:
+            profile.finish()
+            _local.profile = previous
@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - pattern helpers and advanced texture analyzers
+(FFT, Gabor, GLCM, LBP, wavelet, structure tensor, HOG, defect saliency)
+"""
+
+import logging
+from functools import lru_cache
+
+import numpy as np
+import cv2
+from skimage.metrics import structural_similarity as ssim
+from skimage.color import rgb2gray
+from skimage.util import img_as_ubyte
+
+# Heavy dependencies (pywt, scipy.ndimage, skimage.feature/filters/morphology/
+# measure) are imported inside the analyzers that use them, so requests that
+# skip the advanced texture section never load them.
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# 3) Pattern helpers
+# ----------------------------
+def ssim_percent(ref_rgb, test_rgb):
+    gr1 = rgb2gray(ref_rgb)
+    gr2 = rgb2gray(test_rgb)
+    return float(ssim(gr1, gr2, data_range=1.0) * 100.0)
+
+def symmetry_score(gray):
+    h, w = gray.shape
+    left = gray[:, :w//2]
+    right = np.fliplr(gray[:, w - w//2:])
+    top = gray[:h//2, :]
+    bottom = np.flipud(gray[h - h//2:, :])
+    sh = ssim(left, right, data_range=1.0)
+    sv = ssim(top, bottom, data_range=1.0)
+    return float((sh + sv)/2 * 100)
+
+def repeat_period_estimate(gray):
+    f = np.fft.fftshift(np.fft.fft2(gray))
+    mag = np.log(np.abs(f) + 1e-8)
+    cy, cx = np.array(mag.shape)//2
+    window = 10
+    mag[cy-window:cy+window, cx-window:cx+window] = 0
+    y_idx, x_idx = np.unravel_index(np.argmax(mag), mag.shape)
+    fy = abs(y_idx - cy) / gray.shape[0]
+    fx = abs(x_idx - cx) / gray.shape[1]
+    px = int(round(1/fx)) if fx > 1e-4 else 0
+    py = int(round(1/fy)) if fy > 1e-4 else 0
+    return px, py
+
+def edge_definition(gray):
+    lap = cv2.Laplacian((gray*255).astype(np.uint8), cv2.CV_64F)
+    var = np.var(lap)
+    return float(min(100.0, var / 50.0))
+
+# ----------------------------
+# 3b) ADVANCED TEXTURE ANALYSIS
+# ----------------------------
+
+# ========== FOURIER DOMAIN ==========
+def analyze_fft(gray, num_peaks=5, enable_notch=False):
+    """2D FFT analysis with peak detection"""
+    h, w = gray.shape
+    f = np.fft.fft2(gray)
+    f_shift = np.fft.fftshift(f)
+    magnitude = np.abs(f_shift)
+    power_spectrum = np.log(magnitude + 1)
+
+    # Find peaks (excluding DC component)
+    cy, cx = h // 2, w // 2
+    magnitude_copy = magnitude.copy()
+    magnitude_copy[cy-5:cy+5, cx-5:cx+5] = 0  # Mask DC
+
+    peaks = []
+    for _ in range(num_peaks):
+        y, x = np.unravel_index(np.argmax(magnitude_copy), magnitude_copy.shape)
+        if magnitude_copy[y, x] < 1e-5:
+            break
+        r = np.sqrt((y - cy)**2 + (x - cx)**2)
+        angle = np.degrees(np.arctan2(y - cy, x - cx))
+        peaks.append({'radius': r, 'angle': angle, 'magnitude': magnitude_copy[y, x]})
+        # Mask region around peak
+        magnitude_copy[max(0,y-3):min(h,y+3), max(0,x-3):min(w,x+3)] = 0
+
+    # Fundamental period and orientation
+    if peaks:
+        fund_r = peaks[0]['radius']
+        fund_period = min(h, w) / max(fund_r, 1e-5)
+        fund_orientation = peaks[0]['angle']
+    else:
+        fund_period = 0
+        fund_orientation = 0
+
+    # Anisotropy ratio
+    radial_profile = []
+    for r in range(1, min(cx, cy)):
+        mask = ((np.arange(h)[:, None] - cy)**2 + (np.arange(w) - cx)**2 < (r+1)**2) & \
+               ((np.arange(h)[:, None] - cy)**2 + (np.arange(w) - cx)**2 >= r**2)
+        radial_profile.append(np.mean(magnitude[mask]) if mask.any() else 0)
+
+    anisotropy = np.std(radial_profile) / (np.mean(radial_profile) + 1e-8) if radial_profile else 0
+
+    # Optional notch filter
+    if enable_notch and peaks:
+        for peak in peaks[:3]:
+            y = int(cy + peak['radius'] * np.sin(np.radians(peak['angle'])))
+            x = int(cx + peak['radius'] * np.cos(np.radians(peak['angle'])))
+            cv2.circle(f_shift, (x, y), 10, 0, -1)
+        f_ishift = np.fft.ifftshift(f_shift)
+        filtered = np.fft.ifft2(f_ishift)
+        residual = np.abs(filtered).real
+    else:
+        residual = None
+
+    return {
+        'power_spectrum': power_spectrum,
+        'peaks': peaks,
+        'fundamental_period': fund_period,
+        'fundamental_orientation': fund_orientation,
+        'anisotropy': anisotropy,
+        'residual': residual
+    }
+
+# ========== GABOR FILTER BANK ==========
+@lru_cache(maxsize=128)
+def _gabor_kernel_parts(freq, theta):
+    """Real/imaginary Gabor kernels, cached across analyses (read-only arrays)"""
+    from skimage.filters import gabor_kernel
+    kernel = gabor_kernel(freq, theta=theta, sigma_x=3, sigma_y=3)
+    real, imag = np.ascontiguousarray(kernel.real), np.ascontiguousarray(kernel.imag)
+    real.setflags(write=False)
+    imag.setflags(write=False)
+    return real, imag
+
+def analyze_gabor(gray, frequencies=[0.1, 0.2, 0.3], num_orientations=8):
+    """Multi-scale, multi-orientation Gabor analysis"""
+    from scipy import ndimage
+    results = []
+    energy_maps = []
+
+    for freq in frequencies:
+        for i in range(num_orientations):
+            theta = i * np.pi / num_orientations
+            kernel_real, kernel_imag = _gabor_kernel_parts(float(freq), float(theta))
+            filtered_real = ndimage.convolve(gray, kernel_real, mode='wrap')
+            filtered_imag = ndimage.convolve(gray, kernel_imag, mode='wrap')
+            energy = np.sqrt(filtered_real**2 + filtered_imag**2)
+            energy_maps.append(energy)
+
+            results.append({
+                'frequency': freq,
+                'orientation_deg': np.degrees(theta),
+                'mean': float(np.mean(energy)),
+                'variance': float(np.var(energy)),
+                'max': float(np.max(energy))
+            })
+
+    # Dominant orientation
+    mean_energies = [r['mean'] for r in results]
+    dom_idx = np.argmax(mean_energies)
+    dominant_orientation = results[dom_idx]['orientation_deg']
+
+    # Coherency (ratio of max to mean energy)
+    coherency = np.max(mean_energies) / (np.mean(mean_energies) + 1e-8)
+
+    return {
+        'results': results,
+        'energy_maps': energy_maps,
+        'dominant_orientation': dominant_orientation,
+        'coherency': coherency
+    }
+
+# ========== GLCM / HARALICK ==========
+def analyze_glcm(gray, distances=[1, 3, 5], angles=[0, 45, 90, 135]):
+    """GLCM texture features"""
+    from skimage.feature import graycomatrix, graycoprops
+    # Convert to 8-bit
+    gray_8bit = img_as_ubyte(gray)
+
+    # Convert angles to radians
+    angles_rad = [np.radians(a) for a in angles]
+
+    # Compute GLCM
+    glcm = graycomatrix(gray_8bit, distances=distances, angles=angles_rad,
+                         levels=256, symmetric=True, normed=True)
+
+    # Extract properties
+    props = {}
+    for prop in ['contrast', 'dissimilarity', 'homogeneity', 'energy', 'correlation', 'ASM']:
+        prop_name = 'energy' if prop == 'energy' else prop
+        if prop_name != 'ASM':
+            props[prop] = graycoprops(glcm, prop_name).mean()
+        else:
+            props['ASM'] = graycoprops(glcm, 'energy').mean()  # ASM = energy
+
+    # Calculate entropy manually
+    glcm_mean = glcm.mean(axis=(2, 3))
+    entropy = -np.sum(glcm_mean * np.log(glcm_mean + 1e-10))
+    props['entropy'] = entropy
+
+    return props
+
+def compute_glcm_zscores(glcm_ref, glcm_test):
+    """Compute z-scores for GLCM features"""
+    # Typical standard deviations for GLCM features (empirical values)
+    typical_stds = {
+        'contrast': 50.0,
+        'dissimilarity': 5.0,
+        'homogeneity': 0.1,
+        'energy': 0.05,
+        'correlation': 0.1,
+        'ASM': 0.05,
+        'entropy': 0.5
+    }
+
+    zscores = {}
+    for feat in glcm_ref.keys():
+        diff = glcm_test[feat] - glcm_ref[feat]
+        std = typical_stds.get(feat, 1.0)
+        zscores[feat] = diff / std
+
+    return zscores
+
+# ========== LBP ==========
+def analyze_lbp(gray, P=24, R=3):
+    """Local Binary Patterns"""
+    from skimage.feature import local_binary_pattern
+    lbp = local_binary_pattern(gray, P, R, method='uniform')
+
+    # Histogram
+    n_bins = int(lbp.max() + 1)
+    hist, _ = np.histogram(lbp.ravel(), bins=n_bins, range=(0, n_bins), density=True)
+
+    return {'lbp_map': lbp, 'histogram': hist, 'n_bins': n_bins}
+
+def lbp_chi2_distance(hist1, hist2):
+    """Chi-squared distance between LBP histograms"""
+    return 0.5 * np.sum((hist1 - hist2)**2 / (hist1 + hist2 + 1e-10))
+
+def lbp_bhattacharyya_distance(hist1, hist2):
+    """Bhattacharyya distance"""
+    bc = np.sum(np.sqrt(hist1 * hist2))
+    return -np.log(bc + 1e-10)
+
+# ========== WAVELET ==========
+def analyze_wavelet(gray, wavelet='db4', levels=3):
+    """Wavelet multiresolution analysis"""
+    import pywt
+    coeffs = pywt.wavedec2(gray, wavelet, level=levels)
+
+    # Calculate energies for each level
+    energies = []
+    for i, (cH, cV, cD) in enumerate(coeffs[1:], start=1):
+        energy_LL = np.sum(coeffs[0]**2) if i == 1 else 0
+        energy_LH = np.sum(cH**2)
+        energy_HL = np.sum(cV**2)
+        energy_HH = np.sum(cD**2)
+
+        energies.append({
+            'level': i,
+            'LL': energy_LL,
+            'LH': energy_LH,
+            'HL': energy_HL,
+            'HH': energy_HH,
+            'total': energy_LL + energy_LH + energy_HL + energy_HH
+        })
+
+    return {'coeffs': coeffs, 'energies': energies}
+
+# ========== EDGE / STRUCTURE ==========
+def analyze_structure_tensor(gray):
+    """Structure tensor for coherency and line orientation"""
+    from scipy import ndimage
+    # Gradients
+    Iy, Ix = np.gradient(gray)
+
+    # Structure tensor components
+    Ixx = ndimage.gaussian_filter(Ix * Ix, sigma=1.5)
+    Iyy = ndimage.gaussian_filter(Iy * Iy, sigma=1.5)
+    Ixy = ndimage.gaussian_filter(Ix * Iy, sigma=1.5)
+
+    # Eigenvalues
+    trace = Ixx + Iyy
+    det = Ixx * Iyy - Ixy**2
+    lambda1 = trace / 2 + np.sqrt(np.maximum((trace/2)**2 - det, 0))
+    lambda2 = trace / 2 - np.sqrt(np.maximum((trace/2)**2 - det, 0))
+
+    # Coherency
+    coherency = (lambda1 - lambda2) / (lambda1 + lambda2 + 1e-10)
+
+    # Orientation (in radians)
+    orientation = 0.5 * np.arctan2(2 * Ixy, Ixx - Iyy)
+
+    # Create orientation histogram (convert to degrees)
+    orientation_deg = np.degrees(orientation).flatten()
+    # Filter by coherency (only include strong edges)
+    strong_edges_mask = coherency.flatten() > 0.3
+    filtered_orientations = orientation_deg[strong_edges_mask]
+
+    return {
+        'coherency': coherency,
+        'orientation': orientation,
+        'mean_coherency': float(np.mean(coherency)),
+        'orientation_degrees': filtered_orientations
+    }
+
+def compute_hog_density(gray):
+    """Compute HOG (Histogram of Oriented Gradients) edge density"""
+    from skimage.feature import hog
+    try:
+        # Compute HOG features
+        fd, hog_image = hog(gray, orientations=9, pixels_per_cell=(8, 8),
+                           cells_per_block=(2, 2), visualize=True)
+
+        # Edge density metric: mean magnitude of HOG features
+        edge_density = float(np.mean(np.abs(fd)))
+
+        return {
+            'edge_density': edge_density,
+            'hog_features': fd,
+            'hog_image': hog_image
+        }
+    except Exception as e:
+        print(f"* HOG computation failed: {e}")
+        return {
+            'edge_density': 0.0,
+            'hog_features': None,
+            'hog_image': None
+        }
+
+# ========== DEFECT SALIENCY & MORPHOLOGY ==========
+def analyze_defects(gray, min_area=50, morph_kernel_size=5, saliency_strength=1.0):
+    """
+    Defect detection using morphology and saliency.
+
+    Args:
+        gray: Grayscale image (0-1 range)
+        min_area: Minimum defect area in pixels
+        morph_kernel_size: Size of morphological kernel
+        saliency_strength: Saliency multiplier
+
+    Returns:
+        dict: Dictionary with defect analysis results
+    """
+    from scipy import ndimage
+    from skimage.filters import threshold_otsu
+    from skimage.morphology import disk, white_tophat, black_tophat
+    from skimage.measure import label, regionprops
+    try:
+        gray_8bit = img_as_ubyte(gray)
+    except Exception as e:
+        logger.error(f"Failed to convert image for defect detection: {str(e)}")
+        return {
+            'tophat': np.zeros_like(gray),
+            'bottomhat': np.zeros_like(gray),
+            'saliency_map': np.zeros_like(gray),
+            'binary_map': np.zeros_like(gray, dtype=bool),
+            'defects': [],
+            'defect_count': 0
+        }
+
+    # Top-hat and bottom-hat
+    selem = disk(morph_kernel_size)
+    tophat = white_tophat(gray_8bit, selem)
+    bottomhat = black_tophat(gray_8bit, selem)
+
+    # Spectral residual saliency
+    f = np.fft.fft2(gray)
+    magnitude = np.abs(f)
+    phase = np.angle(f)
+    log_magnitude = np.log(magnitude + 1)
+    spectral_residual = log_magnitude - ndimage.gaussian_filter(log_magnitude, sigma=3)
+    saliency_map = np.abs(np.fft.ifft2(np.exp(spectral_residual + 1j * phase)))**2
+    saliency_map = (saliency_map - saliency_map.min()) / (saliency_map.max() - saliency_map.min() + 1e-10)
+    saliency_map = saliency_map * saliency_strength
+
+    # Threshold saliency
+    thresh = threshold_otsu(saliency_map)
+    binary = saliency_map > thresh
+
+    # Label defects
+    labeled = label(binary)
+    regions = regionprops(labeled)
+
+    # Filter by area
+    defects = []
+    for region in regions:
+        if region.area >= min_area:
+            y0, x0, y1, x1 = region.bbox
+            defects.append({
+                'type': 'Anomaly',  # Simple classification
+                'area': region.area,
+                'bbox': (x0, y0, x1, y1),
+                'centroid': region.centroid
+            })
+
+    return {
+        'tophat': tophat,
+        'bottomhat': bottomhat,
+        'saliency_map': saliency_map,
+        'binary_map': binary,
+        'defects': defects,
+        'defect_count': len(defects)
+    }
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Textile QC engine - process warmup
+
+Runs a tiny synthetic analysis so that one-off costs (matplotlib font cache
+and first figure, ReportLab font/style setup, Gabor kernels, first NumPy/
+OpenCV/scikit-image calls) are paid once. Under gunicorn with preload_app the
+warmup runs in the master before fork, so workers inherit the warm state
+copy-on-write.
+"""
+
+import os
+import time
+import shutil
+import logging
+import tempfile
+import threading
+
+import numpy as np
+import cv2
+
+from .settings import QCSettings
+from .imaging import load_analysis_pair
+from .pipeline import run_pipeline_and_build_pdf
+from .settings_report import generate_analysis_settings_report
+from .decision import run_decision_analysis
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------
+# Warmup / readiness
+# ----------------------------
+WARMUP_IMAGE_SIZE = 128  # pixels (read_rgb rejects images below 100x100)
+
+_ENGINE_READY = threading.Event()
+WARMUP_TIME_S = None
+
+
+def is_engine_ready():
+    """True once warmup_engine() has completed."""
+    return _ENGINE_READY.is_set()
+
+
+def mark_engine_ready():
+    """Flag the engine as ready without warming it up (warmup disabled)."""
+    _ENGINE_READY.set()
+
+
+def _synthetic_fabric(size, shift=0.0):
+    """Small periodic RGB test pattern (stripes plus a dot grid)."""
+    y, x = np.mgrid[0:size, 0:size].astype(np.float32)
+    stripes = 0.5 + 0.5 * np.sin(2 * np.pi * (x + shift) / 12.0)
+    dots = ((x % 16 - 8) ** 2 + (y % 16 - 8) ** 2 < 9).astype(np.float32)
+    img = np.stack([
+        120 + 80 * stripes,
+        90 + 60 * stripes + 40 * dots,
+        60 + 30 * dots,
+    ], axis=-1)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def warmup_engine(size=WARMUP_IMAGE_SIZE):
+    """
+    Run the decision-only analysis and the full pipeline (main report and
+    settings report) on a synthetic image pair and mark the engine as ready.
+
+    Failures are logged and do not prevent readiness: the warmup only exists
+    to prime caches, real requests still report their own errors.
+
+    Returns:
+        Warmup wall time in seconds
+    """
+    global WARMUP_TIME_S
+
+    if _ENGINE_READY.is_set():
+        return WARMUP_TIME_S
+
+    started = time.perf_counter()
+    work_dir = tempfile.mkdtemp(prefix="textile_qc_warmup_")
+    try:
+        ref_path = os.path.join(work_dir, "reference.png")
+        test_path = os.path.join(work_dir, "sample.png")
+        cv2.imwrite(ref_path, cv2.cvtColor(_synthetic_fabric(size), cv2.COLOR_RGB2BGR))
+        cv2.imwrite(test_path, cv2.cvtColor(_synthetic_fabric(size, shift=1.0), cv2.COLOR_RGB2BGR))
+
+        settings = QCSettings()
+        settings.operator_name = "warmup"
+        settings.num_sample_points = 3
+        settings.enable_analysis_settings = True
+        # Runs before the fork: keep numba's thread pool out of the master
+        settings.delta_e_backend = "numpy"
+
+        ref, test, source_size = load_analysis_pair(ref_path, test_path, settings)
+
+        run_decision_analysis(ref, test, settings)
+        run_pipeline_and_build_pdf(ref_path, test_path, ref, test, settings, output_dir=work_dir)
+        generate_analysis_settings_report(ref_path, test_path, ref, test, settings, output_dir=work_dir,
+                                          source_size=source_size)
+    except Exception as e:
+        logger.warning(f"Engine warmup failed (continuing without it): {e}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    WARMUP_TIME_S = time.perf_counter() - started
+    _ENGINE_READY.set()
+    logger.info(f"Analysis engine warmed up in {WARMUP_TIME_S:.2f}s")
+    return WARMUP_TIME_S